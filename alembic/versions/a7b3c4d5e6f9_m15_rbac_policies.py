@@ -0,0 +1,72 @@
+"""M15 rbac_policies: переопределения RBAC per org + счётчик версии / NOTIFY для hot reload
+
+Revision ID: a7b3c4d5e6f9
+Revises: f6a2b3c4d5e8
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "a7b3c4d5e6f9"
+down_revision = "f6a2b3c4d5e8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Строка = permission org целиком заменяет роли из статического ALLOW (app/core/rbac.py).
+    # Нет строки -> действует ALLOW.
+    op.execute(
+        """
+        CREATE TABLE rbac_policies (
+            org_id      uuid        NOT NULL,
+            permission  text        NOT NULL,
+            roles       text[]      NOT NULL DEFAULT '{}',
+            updated_by  uuid        NULL,
+            updated_at  timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (org_id, permission)
+        )
+        """
+    )
+
+    # Один счётчик на всю таблицу: worker'ы сравнивают его со своей версией (poll),
+    # а NOTIFY будит их сразу.
+    op.execute(
+        """
+        CREATE TABLE rbac_policy_version (
+            id       boolean PRIMARY KEY DEFAULT true CHECK (id),
+            version  bigint  NOT NULL
+        )
+        """
+    )
+    op.execute("INSERT INTO rbac_policy_version (id, version) VALUES (true, 0)")
+
+    op.execute(
+        """
+        CREATE FUNCTION rbac_policies_bump_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v bigint;
+        BEGIN
+            UPDATE rbac_policy_version SET version = version + 1 WHERE id RETURNING version INTO v;
+            -- доставляется после COMMIT; payload — новая версия
+            PERFORM pg_notify('rbac_policies', v::text);
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_rbac_policies_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rbac_policies
+        FOR EACH STATEMENT EXECUTE FUNCTION rbac_policies_bump_version()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_rbac_policies_bump_version ON rbac_policies")
+    op.execute("DROP FUNCTION IF EXISTS rbac_policies_bump_version()")
+    op.execute("DROP TABLE IF EXISTS rbac_policy_version")
+    op.execute("DROP TABLE IF EXISTS rbac_policies")
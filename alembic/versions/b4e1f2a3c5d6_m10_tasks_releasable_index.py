@@ -0,0 +1,28 @@
+"""M10 shift release: partial index for active assignments
+
+Revision ID: b4e1f2a3c5d6
+Revises: 9f2a1c7d0b3e
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "b4e1f2a3c5d6"
+down_revision = "9f2a1c7d0b3e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ShiftReleaseJob: keyset scan by id over assigned/in_progress tasks of a project
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_tasks_releasable
+        ON tasks (org_id, project_id, id)
+        WHERE status IN ('assigned', 'in_progress')
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_tasks_releasable")
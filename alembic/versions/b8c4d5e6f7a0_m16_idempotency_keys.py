@@ -0,0 +1,38 @@
+"""M16 idempotency_keys: сохранённые ответы write-endpoint'ов по (org, endpoint, key)
+
+Revision ID: b8c4d5e6f7a0
+Revises: a7b3c4d5e6f9
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "b8c4d5e6f7a0"
+down_revision = "a7b3c4d5e6f9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # endpoint = "METHOD /route/{template}"; key = Idempotency-Key или Command.client_event_id.
+    # request_hash ловит повтор ключа с другим запросом (409), response_body отдаётся как есть.
+    op.execute(
+        """
+        CREATE TABLE idempotency_keys (
+            org_id         uuid        NOT NULL,
+            endpoint       text        NOT NULL,
+            key            text        NOT NULL,
+            request_hash   text        NOT NULL,
+            status_code    smallint    NOT NULL,
+            response_body  bytea       NOT NULL,
+            created_at     timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT pk_idempotency_keys PRIMARY KEY (org_id, endpoint, key)
+        )
+        """
+    )
+    # sweeper удаляет по created_at пачками
+    op.execute("CREATE INDEX ix_idempotency_keys_created_at ON idempotency_keys (created_at)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS idempotency_keys")
@@ -0,0 +1,241 @@
+"""M11 task_transitions: monthly range partitions + keys table + archive tier
+
+Revision ID: c7d2e9f0a1b4
+Revises: b4e1f2a3c5d6
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "c7d2e9f0a1b4"
+down_revision = "b4e1f2a3c5d6"
+branch_labels = None
+depends_on = None
+
+
+# Сколько месяцев вперёд создаём партиции при миграции (дальше — TransitionPartitionJob).
+MONTHS_AHEAD = 3
+
+
+def upgrade():
+    # -------------------------------------------------------------------------
+    # 1) старая таблица -> task_transitions_legacy, освобождаем имена индексов
+    # -------------------------------------------------------------------------
+    op.execute("ALTER TABLE task_transitions RENAME TO task_transitions_legacy")
+    op.execute("DROP INDEX IF EXISTS uq_task_transitions_task_client_event")
+    op.execute("DROP INDEX IF EXISTS uq_task_transitions_org_client_event")
+    op.execute("DROP INDEX IF EXISTS uq_task_transitions_task_result_rv")
+    op.execute("DROP INDEX IF EXISTS idx_task_transitions_task_time")
+    op.execute("DROP INDEX IF EXISTS idx_task_transitions_org_project_time")
+
+    # -------------------------------------------------------------------------
+    # 2) партиционированная таблица (CHECK'и и defaults копируются из legacy)
+    #    Unique-индекс на партиционированной таблице обязан включать created_at,
+    #    поэтому PK = (id, created_at), а глобальная уникальность — в task_transition_keys.
+    # -------------------------------------------------------------------------
+    op.execute(
+        """
+        CREATE TABLE task_transitions (
+            LIKE task_transitions_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER TABLE task_transitions ADD CONSTRAINT pk_task_transitions PRIMARY KEY (id, created_at)")
+    op.execute("CREATE TABLE task_transitions_default PARTITION OF task_transitions DEFAULT")
+
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            m date;
+            last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            -- границы месяцев по UTC (так же считает TransitionPartitionJob)
+            SELECT date_trunc('month', COALESCE(min(created_at), now()) AT TIME ZONE 'UTC')
+            INTO m
+            FROM task_transitions_legacy;
+
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF task_transitions FOR VALUES FROM (%L) TO (%L)',
+                    'task_transitions_p' || to_char(m, 'YYYY_MM'),
+                    m::timestamp AT TIME ZONE 'UTC',
+                    (m + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END$$;
+        """
+    )
+
+    op.execute("INSERT INTO task_transitions SELECT * FROM task_transitions_legacy")
+
+    # -------------------------------------------------------------------------
+    # 3) индексы (на каждой партиции) и FK — после заливки данных
+    # -------------------------------------------------------------------------
+    op.execute(
+        "CREATE INDEX idx_task_transitions_task_time ON task_transitions (org_id, task_id, created_at DESC)"
+    )
+    op.execute(
+        "CREATE INDEX idx_task_transitions_org_project_time ON task_transitions (org_id, project_id, created_at)"
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE r record;
+        BEGIN
+            FOR r IN
+                SELECT conname, pg_get_constraintdef(oid) AS def
+                FROM pg_constraint
+                WHERE conrelid = 'task_transitions_legacy'::regclass AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE task_transitions_legacy DROP CONSTRAINT %I', r.conname);
+                EXECUTE format('ALTER TABLE task_transitions ADD CONSTRAINT %I %s', r.conname, r.def);
+            END LOOP;
+        END$$;
+        """
+    )
+
+    # -------------------------------------------------------------------------
+    # 4) task_transition_keys: глобальные unique-инварианты (idempotency + M7.1)
+    #    Узкая таблица без payload; имена индексов прежние.
+    # -------------------------------------------------------------------------
+    op.execute(
+        """
+        CREATE TABLE task_transition_keys (
+            transition_id      uuid PRIMARY KEY,
+            org_id             uuid NOT NULL,
+            task_id            uuid NOT NULL,
+            client_event_id    uuid NULL,
+            result_row_version integer NOT NULL,
+            created_at         timestamptz NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO task_transition_keys (transition_id, org_id, task_id, client_event_id, result_row_version, created_at)
+        SELECT id, org_id, task_id, client_event_id, result_row_version, created_at
+        FROM task_transitions
+        """
+    )
+    op.execute(
+        """
+        CREATE UNIQUE INDEX uq_task_transitions_task_client_event
+        ON task_transition_keys (task_id, client_event_id)
+        WHERE client_event_id IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        CREATE UNIQUE INDEX uq_task_transitions_task_result_rv
+        ON task_transition_keys (org_id, task_id, result_row_version)
+        """
+    )
+    op.execute("CREATE INDEX ix_task_transition_keys_created_at ON task_transition_keys (created_at)")
+
+    op.execute(
+        """
+        CREATE FUNCTION task_transition_keys_sync() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO task_transition_keys
+                    (transition_id, org_id, task_id, client_event_id, result_row_version, created_at)
+                VALUES
+                    (NEW.id, NEW.org_id, NEW.task_id, NEW.client_event_id, NEW.result_row_version, NEW.created_at);
+                RETURN NEW;
+            END IF;
+
+            DELETE FROM task_transition_keys WHERE transition_id = OLD.id;
+            RETURN OLD;
+        END$$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_task_transition_keys_sync
+        AFTER INSERT OR DELETE ON task_transitions
+        FOR EACH ROW EXECUTE FUNCTION task_transition_keys_sync()
+        """
+    )
+
+    # -------------------------------------------------------------------------
+    # 5) archive tier: отсоединённые старые месяцы (см. TransitionPartitionJob).
+    #    Без unique/CHECK — только то, что нужно timeline; payload сжимаем lz4.
+    # -------------------------------------------------------------------------
+    op.execute(
+        """
+        CREATE TABLE task_transitions_archive (
+            LIKE task_transitions_legacy INCLUDING DEFAULTS
+        )
+        """
+    )
+    op.execute("ALTER TABLE task_transitions_archive ALTER COLUMN payload SET COMPRESSION lz4")
+    op.execute(
+        "CREATE INDEX ix_task_transitions_archive_task_time ON task_transitions_archive (org_id, task_id, created_at)"
+    )
+    op.execute("CREATE INDEX ix_task_transitions_archive_created_at ON task_transitions_archive (created_at)")
+
+    op.execute("DROP TABLE task_transitions_legacy")
+
+
+def downgrade():
+    # Обратно в одну таблицу: hot + archive
+    op.execute("DROP TRIGGER IF EXISTS trg_task_transition_keys_sync ON task_transitions")
+    op.execute("DROP FUNCTION IF EXISTS task_transition_keys_sync()")
+
+    op.execute("ALTER TABLE task_transitions RENAME TO task_transitions_partitioned")
+    op.execute("DROP INDEX IF EXISTS idx_task_transitions_task_time")
+    op.execute("DROP INDEX IF EXISTS idx_task_transitions_org_project_time")
+    op.execute(
+        """
+        CREATE TABLE task_transitions (
+            LIKE task_transitions_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        )
+        """
+    )
+    op.execute("INSERT INTO task_transitions SELECT * FROM task_transitions_archive")
+    op.execute("INSERT INTO task_transitions SELECT * FROM task_transitions_partitioned")
+    op.execute("ALTER TABLE task_transitions ADD PRIMARY KEY (id)")
+
+    op.execute(
+        """
+        DO $$
+        DECLARE r record;
+        BEGIN
+            FOR r IN
+                SELECT conname, pg_get_constraintdef(oid) AS def
+                FROM pg_constraint
+                WHERE conrelid = 'task_transitions_partitioned'::regclass AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE task_transitions_partitioned DROP CONSTRAINT %I', r.conname);
+                EXECUTE format('ALTER TABLE task_transitions ADD CONSTRAINT %I %s', r.conname, r.def);
+            END LOOP;
+        END$$;
+        """
+    )
+
+    op.execute("DROP TABLE task_transitions_partitioned")
+    op.execute("DROP TABLE task_transitions_archive")
+    op.execute("DROP TABLE task_transition_keys")
+
+    op.execute(
+        "CREATE INDEX idx_task_transitions_task_time ON task_transitions (org_id, task_id, created_at DESC)"
+    )
+    op.execute(
+        "CREATE INDEX idx_task_transitions_org_project_time ON task_transitions (org_id, project_id, created_at)"
+    )
+    op.execute(
+        """
+        CREATE UNIQUE INDEX uq_task_transitions_task_client_event
+        ON task_transitions (task_id, client_event_id)
+        WHERE client_event_id IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        CREATE UNIQUE INDEX uq_task_transitions_task_result_rv
+        ON task_transitions (org_id, task_id, result_row_version)
+        """
+    )
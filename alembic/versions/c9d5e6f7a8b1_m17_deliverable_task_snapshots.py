@@ -0,0 +1,38 @@
+"""M17 deliverable_task_snapshots: периодические снимки состояния задач изделия для as_of
+
+Revision ID: c9d5e6f7a8b1
+Revises: b8c4d5e6f7a0
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "c9d5e6f7a8b1"
+down_revision = "b8c4d5e6f7a0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # GET /deliverables/{id}/tasks?as_of=: состояние = последний снимок <= as_of
+    # + переходы (taken_at, as_of]. Индекс для DISTINCT ON по переходам уже есть:
+    # (org_id, task_id, created_at) на hot-партициях и archive (M11).
+    op.execute(
+        """
+        CREATE TABLE deliverable_task_snapshots (
+            org_id          uuid        NOT NULL,
+            deliverable_id  uuid        NOT NULL REFERENCES deliverables (id) ON DELETE CASCADE,
+            taken_at        timestamptz NOT NULL,
+            task_id         uuid        NOT NULL,
+            status          text        NOT NULL,
+            row_version     integer     NOT NULL,
+            -- created_at последнего перехода <= taken_at; NULL — переходов ещё не было
+            changed_at      timestamptz,
+            CONSTRAINT pk_deliverable_task_snapshots PRIMARY KEY (deliverable_id, taken_at, task_id)
+        )
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS deliverable_task_snapshots")
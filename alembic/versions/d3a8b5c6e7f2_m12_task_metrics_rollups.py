@@ -0,0 +1,62 @@
+"""M12 analytics: daily rollups over task_transitions
+
+Revision ID: d3a8b5c6e7f2
+Revises: c7d2e9f0a1b4
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "d3a8b5c6e7f2"
+down_revision = "c7d2e9f0a1b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Суммы/счётчики (а не средние): rollup аддитивен, догоняется только новыми transitions.
+    op.execute(
+        """
+        CREATE TABLE task_metrics_daily (
+            org_id                  uuid    NOT NULL,
+            project_id              uuid    NOT NULL,
+            day                     date    NOT NULL,
+            completed               integer NOT NULL DEFAULT 0,
+            completed_fix           integer NOT NULL DEFAULT 0,
+            lead_time_seconds_sum   double precision NOT NULL DEFAULT 0,
+            cycle_time_seconds_sum  double precision NOT NULL DEFAULT 0,
+            cycle_time_count        integer NOT NULL DEFAULT 0,
+            review_approves         integer NOT NULL DEFAULT 0,
+            review_rejects          integer NOT NULL DEFAULT 0,
+            PRIMARY KEY (org_id, project_id, day)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE task_status_time_daily (
+            org_id       uuid    NOT NULL,
+            project_id   uuid    NOT NULL,
+            day          date    NOT NULL,
+            status       text    NOT NULL,
+            seconds_sum  double precision NOT NULL DEFAULT 0,
+            exits        integer NOT NULL DEFAULT 0,
+            PRIMARY KEY (org_id, project_id, day, status)
+        )
+        """
+    )
+    # Водяной знак TaskMetricsRollupJob: transitions с created_at <= watermark уже учтены
+    op.execute(
+        """
+        CREATE TABLE task_metrics_rollup_state (
+            id         smallint PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+            watermark  timestamptz NOT NULL
+        )
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS task_metrics_rollup_state")
+    op.execute("DROP TABLE IF EXISTS task_status_time_daily")
+    op.execute("DROP TABLE IF EXISTS task_metrics_daily")
@@ -0,0 +1,40 @@
+"""M13 executor stats: per-executor daily rollup (payroll / quality)
+
+Revision ID: e5f1a2b3c4d7
+Revises: d3a8b5c6e7f2
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "e5f1a2b3c4d7"
+down_revision = "d3a8b5c6e7f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Инкременты пишутся в той же транзакции, что и transition -> done / create_fix.
+    op.execute(
+        """
+        CREATE TABLE executor_stats_daily (
+            org_id                 uuid    NOT NULL,
+            user_id                uuid    NOT NULL,
+            day                    date    NOT NULL,
+            completed              integer NOT NULL DEFAULT 0,
+            completed_fix          integer NOT NULL DEFAULT 0,
+            minutes_spent          bigint  NOT NULL DEFAULT 0,
+            fixes_caused           integer NOT NULL DEFAULT 0,
+            fixes_caused_minor     integer NOT NULL DEFAULT 0,
+            fixes_caused_major     integer NOT NULL DEFAULT 0,
+            fixes_caused_critical  integer NOT NULL DEFAULT 0,
+            PRIMARY KEY (org_id, user_id, day)
+        )
+        """
+    )
+    # отчёт за период по всей org: (org_id, day) -> все исполнители
+    op.execute("CREATE INDEX ix_executor_stats_daily_org_day ON executor_stats_daily (org_id, day)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS executor_stats_daily")
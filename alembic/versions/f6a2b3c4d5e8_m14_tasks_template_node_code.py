@@ -0,0 +1,56 @@
+"""M14 tasks.template_node_code: связь задачи с node шаблона (diff / re-bootstrap)
+
+Revision ID: f6a2b3c4d5e8
+Revises: e5f1a2b3c4d7
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "f6a2b3c4d5e8"
+down_revision = "e5f1a2b3c4d7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE tasks ADD COLUMN template_node_code text")
+
+    # Backfill для уже развёрнутых deliverables: node ищем по title внутри версии шаблона
+    # deliverable'а. Неоднозначные title (несколько nodes / задач) оставляем NULL —
+    # такие задачи миграция шаблона не трогает.
+    op.execute(
+        """
+        WITH nodes AS (
+            SELECT template_version_id, title, min(code) AS code
+            FROM project_template_nodes
+            GROUP BY template_version_id, title
+            HAVING count(*) = 1
+        ),
+        candidates AS (
+            SELECT t.id, n.code,
+                   count(*) OVER (PARTITION BY t.deliverable_id, t.title) AS same_title
+            FROM tasks t
+            JOIN deliverables d ON d.id = t.deliverable_id
+            JOIN nodes n ON n.template_version_id = d.template_version_id AND n.title = t.title
+            WHERE t.work_kind = 'work'
+        )
+        UPDATE tasks t
+        SET template_node_code = c.code
+        FROM candidates c
+        WHERE c.id = t.id AND c.same_title = 1
+        """
+    )
+
+    op.execute(
+        """
+        CREATE INDEX ix_tasks_deliverable_node_code
+        ON tasks (deliverable_id, template_node_code)
+        WHERE template_node_code IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_tasks_deliverable_node_code")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS template_node_code")
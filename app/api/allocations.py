@@ -6,15 +6,15 @@ from datetime import date
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.schemas.allocation import AllocationBatchRequest, AllocationOut
 from app.services.task_allocation_service import TaskAllocationService
 from app.api.deps import ActorContext, get_actor_context, get_current_user_id
-from app.models.task import Task
-from app.models.deliverable import Deliverable
-
+from app.api.idempotency import Idempotency, get_idempotency
+from app.api.responses import ALLOCATION_OUT_LIST, FastJSONResponse, adapter_response
 
 
 router = APIRouter(prefix="/allocations", tags=["allocations"])
@@ -25,10 +25,15 @@ def create_batch(
     req: AllocationBatchRequest,
     ctx: ActorContext = Depends(get_actor_context),
     db: Session = Depends(get_db),
+    idem: Idempotency = Depends(get_idempotency),
 ):
     org_id = ctx.org_id
     actor_user_id = ctx.actor_user_id
 
+    replay = idem.begin(db, org_id=org_id, body=req)
+    if replay is not None:
+        return replay
+
     service = TaskAllocationService(db)
 
     try:
@@ -43,6 +48,9 @@ def create_batch(
 
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        # uq_task_alloc_org_task_user_role: такое распределение уже есть
+        return idem.unique_violation(db, "Task is already allocated to this user")
 
     # NOTE: DB schema for task_allocations stores only (org_id, task_id, user_id, role, created_at).
     # The batch payload contains additional scheduling/context fields; for B1 we echo them in response.
@@ -64,7 +72,49 @@ def create_batch(
                 note=item.get("note"),
             )
         )
-    return out
+    return idem.commit(db, adapter_response(ALLOCATION_OUT_LIST, out))
+
+
+def _allocation_view_out(
+    rows,
+    *,
+    project_id: UUID,
+    work_date: date,
+    shift_code: str,
+) -> FastJSONResponse:
+    """
+    rows: tuples из TaskAllocationService.list_view
+      (id, org_id, task_id, user_id, deliverable_id, deliverable_type, deliverable_serial)
+
+    Собираем dict'ы (без AllocationOut на каждую строку), сериализуем одним
+    dump_json через ALLOCATION_OUT_LIST.
+    """
+    items = [
+        {
+            "id": alloc_id,
+            "org_id": org_id,
+            "project_id": project_id,
+            "task_id": task_id,
+            "work_date": work_date,
+            "shift_code": shift_code,
+            "allocated_to": user_id,
+            "allocated_by": user_id,
+            "note": None,
+            "deliverable_id": deliverable_id,
+            "deliverable_type": deliverable_type,
+            "deliverable_serial": deliverable_serial,
+        }
+        for (
+            alloc_id,
+            org_id,
+            task_id,
+            user_id,
+            deliverable_id,
+            deliverable_type,
+            deliverable_serial,
+        ) in rows
+    ]
+    return adapter_response(ALLOCATION_OUT_LIST, items)
 
 
 @router.get("/today", response_model=list[AllocationOut])
@@ -73,61 +123,12 @@ def list_for_shift(
     project_id: UUID = Query(...),
     work_date: date = Query(...),
     shift_code: str = Query(..., pattern="^(begin_of_week|end_of_week)$"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     actor_user_id: UUID = Depends(get_current_user_id),
 ):
-    service = TaskAllocationService(db)
-
-    rows = service.list_for_shift(
-        org_id=org_id,
-        project_id=project_id,
-        work_date=work_date,
-        shift_code=shift_code,
-    )
-    # --- batch load tasks ---
-    task_ids = [r.task_id for r in rows]
-    tasks = (
-        db.query(Task)
-        .filter(Task.id.in_(task_ids))
-        .all()
-    )
-    task_by_id = {t.id: t for t in tasks}
-
-    # --- batch load deliverables ---
-    deliverable_ids = [t.deliverable_id for t in tasks if t.deliverable_id is not None]
-    deliverables = []
-    if deliverable_ids:
-        deliverables = (
-            db.query(Deliverable)
-            .filter(Deliverable.id.in_(deliverable_ids))
-            .all()
-        )
-    deliverable_by_id = {d.id: d for d in deliverables}
-
-    out: list[AllocationOut] = []
-    for r in rows:
-        t = task_by_id.get(r.task_id)
-        deliverable_id = t.deliverable_id if t else None
-        d = deliverable_by_id.get(deliverable_id) if deliverable_id else None
-
-        out.append(
-            AllocationOut(
-                id=r.id,
-                org_id=r.org_id,
-                project_id=project_id,
-                task_id=r.task_id,
-                work_date=work_date,
-                shift_code=shift_code,
-                allocated_to=r.user_id,
-                allocated_by=r.user_id,
-                note=None,
-
-                deliverable_id=deliverable_id,
-                deliverable_type=d.deliverable_type if d else None,
-                deliverable_serial=d.serial if d else None,
-            )
-        )
-    return out
+    # task_allocations не хранит work_date/shift_code — фильтруем только по org/project
+    rows = TaskAllocationService(db).list_view(org_id=org_id, project_id=project_id)
+    return _allocation_view_out(rows, project_id=project_id, work_date=work_date, shift_code=shift_code)
 
 
 @router.get("/my", response_model=list[AllocationOut])
@@ -135,59 +136,12 @@ def list_my(
     org_id: UUID = Query(...),
     project_id: UUID = Query(...),
     work_date: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     actor_user_id: UUID = Depends(get_current_user_id),
 ):
-    service = TaskAllocationService(db)
-
-    rows = service.list_for_user(
+    rows = TaskAllocationService(db).list_view(
         org_id=org_id,
         project_id=project_id,
-        work_date=work_date,
         user_id=actor_user_id,
     )
-    # --- batch load tasks ---
-    task_ids = [r.task_id for r in rows]
-    tasks = (
-        db.query(Task)
-        .filter(Task.id.in_(task_ids))
-        .all()
-    )
-    task_by_id = {t.id: t for t in tasks}
-
-    # --- batch load deliverables ---
-    deliverable_ids = [t.deliverable_id for t in tasks if t.deliverable_id is not None]
-    deliverables = []
-    if deliverable_ids:
-        deliverables = (
-            db.query(Deliverable)
-            .filter(Deliverable.id.in_(deliverable_ids))
-            .all()
-        )
-    deliverable_by_id = {d.id: d for d in deliverables}
-
-    out: list[AllocationOut] = []
-    for r in rows:
-        t = task_by_id.get(r.task_id)
-        deliverable_id = t.deliverable_id if t else None
-        d = deliverable_by_id.get(deliverable_id) if deliverable_id else None
-
-        out.append(
-            AllocationOut(
-                id=r.id,
-                org_id=r.org_id,
-                project_id=project_id,
-                task_id=r.task_id,
-                work_date=work_date,
-                shift_code="begin_of_week",
-                allocated_to=r.user_id,
-                allocated_by=r.user_id,
-                note=None,
-
-                deliverable_id=deliverable_id,
-                deliverable_type=d.deliverable_type if d else None,
-                deliverable_serial=d.serial if d else None,
-            )
-        )
-    return out
-
+    return _allocation_view_out(rows, project_id=project_id, work_date=work_date, shift_code="begin_of_week")
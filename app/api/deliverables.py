@@ -2,145 +2,71 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from uuid import UUID
+from datetime import datetime, timezone
 
 from pydantic import BaseModel
 
-from app.core.db import get_db
+from app.core.cache import Cache, get_cache
+from app.core.config import settings
+from app.core.db import get_db, get_read_db
 
 from app.models.deliverable import Deliverable, DeliverableStatus
 from app.models.deliverable_signoff import DeliverableSignoff, SignoffResult
+from app.models.project_template_version import ProjectTemplateVersion
 from app.models.qc_inspection import QcInspection, QcResult
 from app.models.task import Task, FixSeverity
 
-from app.api.deps import ActorContext, get_actor_context, get_actor_role
+from app.api.deps import ActorContext, get_actor_context, get_actor_role, get_task_fields
+from app.api.docs import openapi_examples
+from app.api.idempotency import Idempotency, get_idempotency
+from app.api.responses import (
+    DELIVERABLE_DASHBOARD,
+    DELIVERABLE_READ,
+    DELIVERABLE_READ_LIST,
+    DELIVERABLE_SIGNOFF_READ,
+    TASK_PARTIAL_LIST,
+    TASK_READ,
+    TASK_READ_LIST,
+    FastJSONResponse,
+    adapter_response,
+    etag_matches,
+    json_bytes,
+    make_etag,
+    not_modified,
+)
 from app.core.rbac import ensure_allowed, Forbidden
 
 from app.schemas.deliverable import DeliverableCreate, DeliverableRead
 from app.schemas.deliverable_signoff import DeliverableSignoffCreate, DeliverableSignoffRead
-from app.schemas.deliverable_actions import SubmitToQcRequest, DeliverableBootstrapRequest
+from app.schemas.deliverable_actions import (
+    DeliverableBootstrapRequest,
+    DeliverableTemplateMigrateRequest,
+    DeliverableTemplateMigrateResponse,
+    SubmitToQcRequest,
+)
 from app.schemas.deliverable_dashboard import DeliverableDashboard
 from app.schemas.qc_inspection import QcDecisionRequest, QcInspectionRead
-from app.schemas.task import TaskRead
+from app.schemas.task import TASK_READ_FIELDS, TaskRead
+from app.schemas.timeline import TimelinePage
 from app.schemas.command import Command
 from app.schemas.fix_task import DeliverableFixPayload
 
 from app.services.task_fix_service import TaskFixService
 from app.services.deliverable_bootstrap_service import DeliverableBootstrapService, BootstrapError
+from app.services.deliverable_timeline import InvalidCursor, TimelineCursor, TimelineResult, deliverable_timeline
+from app.services.task_as_of import task_states_as_of
+from app.services.template_diff import diff_template_versions
+from app.services.template_migration import TemplateMigrationService, invalidate_migrated
 
 
 router = APIRouter(prefix="/deliverables", tags=["deliverables"])
 
-DELIVERABLE_FIX_OPENAPI_EXAMPLES = {
-    "worker_initiative": {
-        "summary": "Create deliverable fix-task (worker initiative)",
-        "description": "Исправление по инициативе работника на уровне deliverable (без origin_task).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "expected_row_version": 1,
-            "client_event_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
-            "payload": {
-                "title": "Инициативный фикс",
-                "description": "Нашел косяк по месту — исправил.",
-                "severity": "minor",
-                "minutes_spent": 15,
-                "attachments": []
-            }
-        },
-    }
-}
-
-QC_DECISION_OPENAPI_EXAMPLES = {
-    "approve": {
-        "summary": "QC approve deliverable",
-        "description": "QC подтверждает изделие. notes опционально.",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-            "inspector_user_id": "33333333-3333-3333-3333-333333333333",
-            "result": "approved",
-            "notes": "OK",
-        },
-    },
-    "reject": {
-        "summary": "QC reject deliverable",
-        "description": "QC отклоняет изделие. notes обязательно (причина/замечания).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-            "inspector_user_id": "33333333-3333-3333-3333-333333333333",
-            "result": "rejected",
-            "notes": "Царапина на корпусе, требуется исправление",
-        },
-    },
-}
-
-SUBMIT_TO_QC_OPENAPI_EXAMPLES = {
-    "submit": {
-        "summary": "Submit deliverable to QC",
-        "description": "Отправить изделие в QC. Требуется последний production sign-off со статусом approved.",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333"
-        }
-    }
-}
-
-SIGNOFF_OPENAPI_EXAMPLES = {
-    "approve": {
-        "summary": "Production sign-off (approve)",
-        "description": "Подтверждение, что все задачи по изделию выполнены.",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-            "signed_off_by": "33333333-3333-3333-3333-333333333333",
-            "result": "approved",
-            "comment": "Все задачи выполнены, изделие готово к QC"
-        },
-    },
-    "reject": {
-        "summary": "Production sign-off (reject)",
-        "description": "Отклонение sign-off (редкий случай).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-            "signed_off_by": "33333333-3333-3333-3333-333333333333",
-            "result": "rejected",
-            "comment": "Не все задачи выполнены"
-        },
-    },
-}
-
-DELIVERABLE_CREATE_OPENAPI_EXAMPLES = {
-    "basic": {
-        "summary": "Create deliverable",
-        "description": "Создать изделие (serial приходит извне).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-            "created_by": "33333333-3333-3333-3333-333333333333",
-            "deliverable_type": "box_v1",
-            "serial": "SN-2026-0001",
-        },
-    },
-}
-
-DELIVERABLE_BOOTSTRAP_OPENAPI_EXAMPLES = {
-    "basic": {
-        "summary": "Bootstrap deliverable",
-        "description": "Развернуть дерево задач по активной версии шаблона проекта.",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "project_id": "22222222-2222-2222-2222-222222222222",
-        },
-    }
-}
-
 class DeliverableBootstrapResponse(BaseModel):
     template_version_id: UUID
     created_tasks: int
@@ -149,10 +75,15 @@ class DeliverableBootstrapResponse(BaseModel):
 
 @router.post("", response_model=DeliverableRead, status_code=status.HTTP_201_CREATED)
 def create_deliverable(
-        data: DeliverableCreate = Body(..., openapi_examples=DELIVERABLE_CREATE_OPENAPI_EXAMPLES),
+        data: DeliverableCreate = Body(..., openapi_examples=openapi_examples("DELIVERABLE_CREATE_OPENAPI_EXAMPLES")),
         ctx: ActorContext = Depends(get_actor_context),
         db: Session = Depends(get_db),
+        idem: Idempotency = Depends(get_idempotency),
     ):
+    replay = idem.begin(db, org_id=ctx.org_id, body=data)
+    if replay is not None:
+        return replay
+
     # Проверим уникальность serial в org (чтобы вернуть 409, а не 500)
     existing = db.execute(
         select(Deliverable).where(
@@ -172,27 +103,45 @@ def create_deliverable(
         created_by=ctx.actor_user_id,
     )
     db.add(d)
-    db.commit()
+    try:
+        db.flush()
+    except IntegrityError:
+        # параллельный запрос с тем же serial успел раньше (uq_deliverables_org_serial)
+        return idem.unique_violation(db, "Deliverable with this serial already exists in org")
     db.refresh(d)
-    return d
+    return idem.commit(db, adapter_response(DELIVERABLE_READ, d, status_code=status.HTTP_201_CREATED))
 
 
 @router.get("/{deliverable_id}", response_model=DeliverableRead)
-def get_deliverable(deliverable_id: UUID, db: Session = Depends(get_db)):
+def get_deliverable(
+    deliverable_id: UUID,
+    db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
+):
+    key = Cache.deliverable_key(deliverable_id)
+    body = cache.get_versioned(key)
+    if body is not None:
+        return FastJSONResponse(body)
+
     d = db.get(Deliverable, deliverable_id)
     if not d:
         raise HTTPException(status_code=404, detail="Deliverable not found")
-    return d
+
+    resp = adapter_response(DELIVERABLE_READ, d)
+    # версия — updated_at: отстающий читатель не затрёт более свежую запись
+    cache.set_if_newer(key, Cache.version(d.updated_at), resp.body)
+    return resp
 
 
 @router.get("", response_model=list[DeliverableRead])
 def list_deliverables(org_id: UUID, project_id: UUID, db: Session = Depends(get_db)):
-    return (
+    deliverables = (
         db.query(Deliverable)
         .filter(Deliverable.org_id == org_id, Deliverable.project_id == project_id)
         .order_by(Deliverable.created_at.desc())
         .all()
     )
+    return adapter_response(DELIVERABLE_READ_LIST, deliverables)
 
 
 @router.post(    "/{deliverable_id}/signoffs",
@@ -207,18 +156,23 @@ def list_deliverables(org_id: UUID, project_id: UUID, db: Session = Depends(get_
         )
 def create_signoff(
     deliverable_id: UUID,
-    body: DeliverableSignoffCreate = Body(..., openapi_examples=SIGNOFF_OPENAPI_EXAMPLES),
+    body: DeliverableSignoffCreate = Body(..., openapi_examples=openapi_examples("SIGNOFF_OPENAPI_EXAMPLES")),
     ctx: ActorContext = Depends(get_actor_context),
     actor_role: str = Depends(get_actor_role),
     db: Session = Depends(get_db),
+    idem: Idempotency = Depends(get_idempotency),
 ):
     # RBAC
     try:
-        ensure_allowed("deliverable.signoff", actor_role)
+        ensure_allowed("deliverable.signoff", actor_role, ctx.org_id)
     except Forbidden as e:
         # B5: deterministic error contract
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
+    replay = idem.begin(db, org_id=ctx.org_id, body=body)
+    if replay is not None:
+        return replay
+
     d = db.get(Deliverable, deliverable_id)
     if not d:
         raise HTTPException(status_code=404, detail="Deliverable not found")
@@ -235,9 +189,9 @@ def create_signoff(
         comment=body.comment,
     )
     db.add(s)
-    db.commit()
+    db.flush()
     db.refresh(s)
-    return s
+    return idem.commit(db, adapter_response(DELIVERABLE_SIGNOFF_READ, s, status_code=status.HTTP_201_CREATED))
 
 
 @router.get("/{deliverable_id}/signoffs", response_model=list[DeliverableSignoffRead])
@@ -276,14 +230,15 @@ def list_signoffs(
     )
 def submit_to_qc(
     deliverable_id: UUID,
-    body: SubmitToQcRequest = Body(..., openapi_examples=SUBMIT_TO_QC_OPENAPI_EXAMPLES),
+    body: SubmitToQcRequest = Body(..., openapi_examples=openapi_examples("SUBMIT_TO_QC_OPENAPI_EXAMPLES")),
     ctx: ActorContext = Depends(get_actor_context),
     actor_role: str = Depends(get_actor_role),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
 ):
     # RBAC
     try:
-        ensure_allowed("deliverable.submit_to_qc", actor_role)
+        ensure_allowed("deliverable.submit_to_qc", actor_role, ctx.org_id)
     except Forbidden as e:
         # B5: deterministic error contract
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
@@ -317,6 +272,7 @@ def submit_to_qc(
     db.add(d)
     db.commit()
     db.refresh(d)
+    cache.delete(Cache.deliverable_key(deliverable_id))
     return d
 
 
@@ -344,6 +300,51 @@ def list_qc_inspections(
     )
 
 
+@router.get(
+    "/{deliverable_id}/timeline",
+    response_model=TimelinePage,
+    response_model_exclude_none=True,
+    summary="Unified audit timeline of a deliverable",
+    description=(
+        "Переходы задач изделия, production sign-off'ы, QC-инспекции и fix-task'и одним "
+        "потоком по created_at (при равенстве — signoff, qc_inspection, fix, transition). "
+        "Постранично: next_cursor последней страницы — null."
+    ),
+)
+def get_deliverable_timeline(
+    deliverable_id: UUID,
+    org_id: UUID = Query(
+        ...,
+        description="Организация (мультитенантность). Пока query, позже будет из auth.",
+        examples=["11111111-1111-1111-1111-111111111111"],
+    ),
+    cursor: str | None = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(100, ge=1, le=500, description="Событий на странице"),
+    db: Session = Depends(get_read_db),
+):
+    d = db.get(Deliverable, deliverable_id)
+    if not d:
+        raise HTTPException(status_code=404, detail="Deliverable not found")
+    if d.org_id != org_id:
+        raise HTTPException(status_code=422, detail="org_id mismatch")
+
+    try:
+        after = TimelineCursor.decode(cursor) if cursor is not None else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # Запросы выполняются здесь (сессия ещё открыта), потоково — только сериализация
+    page = deliverable_timeline(db, org_id=org_id, deliverable_id=deliverable_id, cursor=after, limit=limit)
+    return StreamingResponse(_iter_timeline_json(page), media_type="application/json")
+
+
+def _iter_timeline_json(page: TimelineResult):
+    yield b'{"items":['
+    for n, event in enumerate(page.items):
+        yield (b"," if n else b"") + json_bytes(event)
+    yield b'],"next_cursor":' + json_bytes(page.next_cursor) + b"}"
+
+
 @router.post(
     "/{deliverable_id}/qc_decision",
     response_model=DeliverableRead,
@@ -358,18 +359,25 @@ def list_qc_inspections(
 )
 def qc_decision(
     deliverable_id: UUID,
-    body: QcDecisionRequest = Body(..., openapi_examples=QC_DECISION_OPENAPI_EXAMPLES),
+    body: QcDecisionRequest = Body(..., openapi_examples=openapi_examples("QC_DECISION_OPENAPI_EXAMPLES")),
     ctx: ActorContext = Depends(get_actor_context),
     actor_role: str = Depends(get_actor_role),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
+    idem: Idempotency = Depends(get_idempotency),
 ):
     # RBAC
     try:
-        ensure_allowed("deliverable.qc_decision", actor_role)
+        ensure_allowed("deliverable.qc_decision", actor_role, ctx.org_id)
     except Forbidden as e:
         # B5: deterministic error contract
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
+    # повтор того же решения отдаёт сохранённый ответ, а не 422 из-за уже сменённого статуса
+    replay = idem.begin(db, org_id=ctx.org_id, body=body)
+    if replay is not None:
+        return replay
+
     d = db.get(Deliverable, deliverable_id)
     if not d:
         raise HTTPException(status_code=404, detail="Deliverable not found")
@@ -405,33 +413,38 @@ def qc_decision(
     )
     db.add(qc)
 
-    if body.result == QcResult.approved:
-        d.status = DeliverableStatus.qc_approved.value
-    else:
-        d.status = DeliverableStatus.qc_rejected.value
-        # (создание fix-task у тебя тут уже есть — оставляем как есть или позже переведём на TaskFixService)
-        # гарантируем qc.id (если id генерится python-ом — flush не обязателен, но безопасен)
-        db.flush()
-
-        svc = TaskFixService(db)
+    try:
+        if body.result == QcResult.approved:
+            d.status = DeliverableStatus.qc_approved.value
+        else:
+            d.status = DeliverableStatus.qc_rejected.value
+            # (создание fix-task у тебя тут уже есть — оставляем как есть или позже переведём на TaskFixService)
+            # гарантируем qc.id (если id генерится python-ом — flush не обязателен, но безопасен)
+            db.flush()
 
-        fix_title = f"Исправление (QC): {d.deliverable_type} {d.serial}"
-        fix_title = fix_title[:250]  # чтобы не разрастался
+            svc = TaskFixService(db)
 
-        svc.create_qc_reject_fix(
-            deliverable=d,
-            actor_user_id=ctx.actor_user_id,
-            qc_inspection_id=qc.id,
-            title=fix_title,
-            description=body.notes,
-            severity=FixSeverity.major,
-        )
+            fix_title = f"Исправление (QC): {d.deliverable_type} {d.serial}"
+            fix_title = fix_title[:250]  # чтобы не разрастался
 
+            svc.create_qc_reject_fix(
+                deliverable=d,
+                actor_user_id=ctx.actor_user_id,
+                qc_inspection_id=qc.id,
+                title=fix_title,
+                description=body.notes,
+                severity=FixSeverity.major,
+            )
 
-    db.add(d)
-    db.commit()
+        db.add(d)
+        db.flush()
+    except IntegrityError:
+        # параллельное решение по тому же изделию (uq_qc_one_per_deliverable)
+        return idem.unique_violation(db, "QC decision already recorded for this deliverable")
     db.refresh(d)
-    return d
+    resp = idem.commit(db, adapter_response(DELIVERABLE_READ, d))
+    cache.delete(Cache.deliverable_key(deliverable_id))
+    return resp
 
 @router.get("/{deliverable_id}/tasks", response_model=list[TaskRead])
 def list_deliverable_tasks(
@@ -441,7 +454,15 @@ def list_deliverable_tasks(
         description="Организация (мультитенантность). Пока query, позже будет из auth.",
         examples=["11111111-1111-1111-1111-111111111111"],
     ),
-    db: Session = Depends(get_db),
+    as_of: datetime | None = Query(
+        None,
+        description=(
+            "Состояние на момент времени (ISO 8601, без зоны — UTC): только задачи, созданные до as_of; "
+            "status / row_version / updated_at — по журналу переходов, остальные поля — текущие."
+        ),
+    ),
+    fields: tuple[str, ...] | None = Depends(get_task_fields),
+    db: Session = Depends(get_read_db),
 ):
     d = db.get(Deliverable, deliverable_id)
     if not d:
@@ -449,24 +470,147 @@ def list_deliverable_tasks(
     if d.org_id != org_id:
         raise HTTPException(status_code=422, detail="org_id mismatch")
 
-    return (
+    if as_of is not None:
+        return _tasks_as_of_response(db, d, as_of, fields)
+
+    if fields is not None:
+        rows = db.execute(
+            select(*(getattr(Task, f) for f in fields))
+            .where(Task.deliverable_id == deliverable_id)
+            .order_by(Task.created_at.asc())
+        ).mappings().all()
+        return adapter_response(TASK_PARTIAL_LIST, [dict(r) for r in rows], exclude_unset=True)
+
+    tasks = (
         db.query(Task)
         .filter(Task.deliverable_id == deliverable_id)
         .order_by(Task.created_at.asc())
         .all()
     )
+    return adapter_response(TASK_READ_LIST, tasks)
+
+
+def _tasks_as_of_response(
+    db: Session, d: Deliverable, as_of: datetime, fields: tuple[str, ...] | None
+) -> FastJSONResponse:
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+
+    tasks = (
+        db.query(Task)
+        .filter(Task.deliverable_id == d.id, Task.created_at <= as_of)
+        .order_by(Task.created_at.asc())
+        .all()
+    )
+    states = task_states_as_of(
+        db,
+        org_id=d.org_id,
+        deliverable_id=d.id,
+        tasks=[(t.id, t.status, t.row_version) for t in tasks],
+        as_of=as_of,
+    )
+
+    items = []
+    for t in tasks:
+        st = states[t.id]
+        item = {name: getattr(t, name) for name in (fields or TASK_READ_FIELDS)}
+        item.update(
+            (k, v)
+            for k, v in (
+                ("status", st.status),
+                ("row_version", st.row_version),
+                # переходов до as_of не было — статус не менялся с создания
+                ("updated_at", st.changed_at or t.created_at),
+            )
+            if k in item
+        )
+        items.append(item)
+
+    if fields is not None:
+        return adapter_response(TASK_PARTIAL_LIST, items, exclude_unset=True)
+    return adapter_response(TASK_READ_LIST, items)
+
+
+def _dashboard_etag(
+    deliverable_id: UUID,
+    deliverable_updated_at,
+    task_count: int,
+    task_row_version_sum: int,
+    task_max_updated_at,
+    last_signoff_at,
+    last_qc_at,
+) -> str:
+    """
+    Водяной знак dashboard:
+    - sum(row_version) растёт на каждом transition любой задачи, count ловит create/delete,
+      max(updated_at) — PATCH без инкремента row_version;
+    - signoffs/qc_inspections append-only => достаточно max(created_at).
+    """
+    return make_etag(
+        "dashboard",
+        deliverable_id,
+        deliverable_updated_at,
+        task_count,
+        task_row_version_sum,
+        task_max_updated_at,
+        last_signoff_at,
+        last_qc_at,
+    )
 
 
-@router.get("/{deliverable_id}/dashboard", response_model=DeliverableDashboard)
+def _dashboard_watermark(db: Session, deliverable_id: UUID):
+    """Один version-only запрос: (org_id, etag-части) без загрузки задач."""
+    return db.execute(
+        select(
+            Deliverable.org_id,
+            Deliverable.updated_at,
+            select(func.count(Task.id))
+            .where(Task.deliverable_id == Deliverable.id)
+            .scalar_subquery(),
+            select(func.coalesce(func.sum(Task.row_version), 0))
+            .where(Task.deliverable_id == Deliverable.id)
+            .scalar_subquery(),
+            select(func.max(Task.updated_at))
+            .where(Task.deliverable_id == Deliverable.id)
+            .scalar_subquery(),
+            select(func.max(DeliverableSignoff.created_at))
+            .where(DeliverableSignoff.deliverable_id == Deliverable.id)
+            .scalar_subquery(),
+            select(func.max(QcInspection.created_at))
+            .where(QcInspection.deliverable_id == Deliverable.id)
+            .scalar_subquery(),
+        ).where(Deliverable.id == deliverable_id)
+    ).one_or_none()
+
+
+@router.get(
+    "/{deliverable_id}/dashboard",
+    response_model=DeliverableDashboard,
+    responses={304: {"description": "Not Modified (ETag matches If-None-Match)"}},
+)
 def get_dashboard(
     deliverable_id: UUID,
+    request: Request,
     org_id: UUID = Query(
         ...,
         description="Организация (мультитенантность). Пока query, позже будет из auth.",
         examples=["11111111-1111-1111-1111-111111111111"],
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    cache: Cache = Depends(get_cache),
 ):
+    if cache.enabled or request.headers.get("if-none-match"):
+        wm = _dashboard_watermark(db, deliverable_id)
+        if wm is not None and wm[0] == org_id:
+            etag = _dashboard_etag(deliverable_id, *wm[1:])
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            # ключ содержит водяной знак => устаревшие версии просто истекают по TTL
+            body = cache.get(Cache.dashboard_key(deliverable_id, etag))
+            if body is not None:
+                return FastJSONResponse(body, headers={"ETag": etag})
+
     d = db.get(Deliverable, deliverable_id)
     if not d:
         raise HTTPException(status_code=404, detail="Deliverable not found")
@@ -494,12 +638,27 @@ def get_dashboard(
         .first()
     )
 
-    return DeliverableDashboard(
-        deliverable=d,
-        tasks=tasks,
-        last_signoff=last_signoff,
-        last_qc_inspection=last_qc,
+    resp = adapter_response(
+        DELIVERABLE_DASHBOARD,
+        {
+            "deliverable": d,
+            "tasks": tasks,
+            "last_signoff": last_signoff,
+            "last_qc_inspection": last_qc,
+        },
     )
+    etag = _dashboard_etag(
+        d.id,
+        d.updated_at,
+        len(tasks),
+        sum(t.row_version for t in tasks),
+        max((t.updated_at for t in tasks), default=None),
+        last_signoff.created_at if last_signoff else None,
+        last_qc.created_at if last_qc else None,
+    )
+    resp.headers["ETag"] = etag
+    cache.set(Cache.dashboard_key(d.id, etag), resp.body)
+    return resp
 
 @router.post(
     "/{deliverable_id}/bootstrap",
@@ -513,19 +672,20 @@ def get_dashboard(
 )
 def bootstrap_deliverable(
     deliverable_id: UUID,
-    body: DeliverableBootstrapRequest = Body(..., openapi_examples=DELIVERABLE_BOOTSTRAP_OPENAPI_EXAMPLES),
+    body: DeliverableBootstrapRequest = Body(..., openapi_examples=openapi_examples("DELIVERABLE_BOOTSTRAP_OPENAPI_EXAMPLES")),
     ctx: ActorContext = Depends(get_actor_context),
     actor_role: str = Depends(get_actor_role),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
 ):
     # RBAC
     try:
-        ensure_allowed("deliverable.bootstrap", actor_role)
+        ensure_allowed("deliverable.bootstrap", actor_role, ctx.org_id)
     except Forbidden as e:
         # B5: deterministic error contract
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
-    service = DeliverableBootstrapService(db)
+    service = DeliverableBootstrapService(db, engine=settings.bootstrap_engine)
 
     try:
         with db.begin():
@@ -538,6 +698,8 @@ def bootstrap_deliverable(
     except BootstrapError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
+    cache.delete(Cache.deliverable_key(deliverable_id))
+
     return DeliverableBootstrapResponse(
         template_version_id=result.template_version_id,
         created_tasks=result.created_tasks,
@@ -545,13 +707,71 @@ def bootstrap_deliverable(
     )
 
 
+@router.post(
+    "/{deliverable_id}/template-migrate",
+    response_model=DeliverableTemplateMigrateResponse,
+    summary="Migrate deliverable to another template version",
+    description=(
+        "Переводит развёрнутый deliverable на другую версию шаблона, применяя только diff: "
+        "новые nodes -> задачи, изменённые -> обновление, удалённые -> cancel, edges -> зависимости.\n\n"
+        "Задачи в статусе done не затрагиваются. Доступ ограничен RBAC."
+    ),
+)
+def migrate_deliverable_template(
+    deliverable_id: UUID,
+    body: DeliverableTemplateMigrateRequest,
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
+):
+    try:
+        ensure_allowed("deliverable.bootstrap", ctx.role, ctx.org_id)
+    except Forbidden:
+        # B5: deterministic error contract
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+
+    try:
+        with db.begin():
+            d = db.get(Deliverable, deliverable_id)
+            if d is None or d.org_id != ctx.org_id or d.project_id != body.project_id:
+                raise HTTPException(status_code=404, detail="Deliverable not found")
+            if d.template_version_id is None:
+                raise BootstrapError("Deliverable is not bootstrapped")
+
+            tv = db.get(ProjectTemplateVersion, body.to_version_id)
+            if tv is None or tv.org_id != ctx.org_id or tv.project_id != body.project_id:
+                raise HTTPException(status_code=404, detail="Template version not found")
+
+            diff = diff_template_versions(db, d.template_version_id, tv.id)
+            result = TemplateMigrationService(db, actor_user_id=ctx.actor_user_id).migrate_deliverable(d, diff)
+    except BootstrapError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    invalidate_migrated(cache, ctx.org_id, result)
+
+    return DeliverableTemplateMigrateResponse(
+        template_version_id=tv.id,
+        created_tasks=result.created_tasks,
+        updated_tasks=result.updated_tasks,
+        canceled_tasks=result.canceled_tasks,
+        skipped_done=result.skipped_done,
+        added_dependencies=result.added_dependencies,
+        removed_dependencies=result.removed_dependencies,
+    )
+
+
 @router.post("/{deliverable_id}/fix-tasks", response_model=TaskRead)
 def create_deliverable_fix(
     deliverable_id: UUID,
-    cmd: Command[DeliverableFixPayload] = Body(..., openapi_examples=DELIVERABLE_FIX_OPENAPI_EXAMPLES),
+    cmd: Command[DeliverableFixPayload] = Body(..., openapi_examples=openapi_examples("DELIVERABLE_FIX_OPENAPI_EXAMPLES")),
     ctx: ActorContext = Depends(get_actor_context),
     db: Session = Depends(get_db),
+    idem: Idempotency = Depends(get_idempotency),
 ):
+    replay = idem.begin(db, org_id=ctx.org_id, body=cmd, client_event_id=cmd.client_event_id)
+    if replay is not None:
+        return replay
+
     deliverable = db.get(Deliverable, deliverable_id)
     if not deliverable:
         raise HTTPException(404, "Deliverable not found")
@@ -571,6 +791,6 @@ def create_deliverable_fix(
         attachments=[a.model_dump() for a in cmd.payload.attachments] if cmd.payload.attachments else None,
     )
 
-    db.commit()
+    db.flush()
     db.refresh(fix)
-    return fix
+    return idem.commit(db, adapter_response(TASK_READ, fix))
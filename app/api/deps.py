@@ -4,15 +4,60 @@ from __future__ import annotations
 from dataclasses import dataclass
 from uuid import UUID
 
-from fastapi import Depends, Header, HTTPException
+from fastapi import Depends, Header, HTTPException, Query, Request
+
+from app.schemas.task import TASK_READ_FIELDS
 
 
 # -----------------------------------------------------------------------------
 # MVP auth headers
 # -----------------------------------------------------------------------------
+#
+# Заголовки разбирает один раз ActorHeadersMiddleware (app/api/middleware.py) и кладёт
+# результат в scope["state"]; dependency ниже только читают его (без повторного UUID()).
+# Все dependency — async: sync-dependency FastAPI гоняет через threadpool на каждый запрос.
+# Header(...) в сигнатурах остаются ради OpenAPI (Contract v2) и fallback без middleware.
+
+ACTOR_HEADERS_STATE = "actor_headers"
+
+
+@dataclass(frozen=True)
+class ActorHeaders:
+    """X-Org-Id / X-Actor-User-Id / X-Role запроса. UUID = None: заголовка нет или он невалиден."""
+
+    org_id: UUID | None
+    actor_user_id: UUID | None
+    role: str | None
+    # заголовки, которые есть, но не являются UUID
+    invalid: frozenset[str] = frozenset()
+
+
+def _parse_uuid(name: str, raw: str | None, invalid: set[str]) -> UUID | None:
+    if not raw:
+        return None
+    try:
+        return UUID(raw)
+    except ValueError:
+        invalid.add(name)
+        return None
+
+
+def parse_actor_headers(org_id: str | None, actor_user_id: str | None, role: str | None) -> ActorHeaders:
+    invalid: set[str] = set()
+    return ActorHeaders(
+        org_id=_parse_uuid("X-Org-Id", org_id, invalid),
+        actor_user_id=_parse_uuid("X-Actor-User-Id", actor_user_id, invalid),
+        role=role.strip() if role is not None else None,
+        invalid=frozenset(invalid),
+    )
+
+
+def _actor_headers(request: Request) -> ActorHeaders | None:
+    return request.scope.get("state", {}).get(ACTOR_HEADERS_STATE)
 
 
-def get_current_user_id(
+async def get_current_user_id(
+    request: Request,
     x_actor_user_id: str | None = Header(
         default=None,
         alias="X-Actor-User-Id",
@@ -21,20 +66,20 @@ def get_current_user_id(
     ),
 ) -> UUID:
     """MVP auth: X-Actor-User-Id header."""
-    if not x_actor_user_id:
-        raise HTTPException(status_code=401, detail="Missing X-Actor-User-Id header")
-    try:
-        return UUID(x_actor_user_id)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail="Invalid X-Actor-User-Id format (must be UUID)") from e
+    parsed = _actor_headers(request) or parse_actor_headers(None, x_actor_user_id, None)
+    if parsed.actor_user_id is not None:
+        return parsed.actor_user_id
+    if "X-Actor-User-Id" in parsed.invalid:
+        raise HTTPException(status_code=400, detail="Invalid X-Actor-User-Id format (must be UUID)")
+    raise HTTPException(status_code=401, detail="Missing X-Actor-User-Id header")
 
 
 # Backward-compatible alias
-def get_actor_user_id(actor_user_id: UUID = Depends(get_current_user_id)) -> UUID:
+async def get_actor_user_id(actor_user_id: UUID = Depends(get_current_user_id)) -> UUID:
     return actor_user_id
 
 
-def get_actor_role(
+async def get_actor_role(
     x_role: str = Header(
         "system",
         alias="X-Role",
@@ -50,7 +95,7 @@ def get_actor_role(
     return x_role.strip()
 
 
-def get_actor_role_optional(
+async def get_actor_role_optional(
     x_role: str | None = Header(
         default=None,
         alias="X-Role",
@@ -63,7 +108,8 @@ def get_actor_role_optional(
     return x_role.strip()
 
 
-def get_org_id(
+async def get_org_id(
+    request: Request,
     x_org_id: str | None = Header(
         default=None,
         alias="X-Org-Id",
@@ -73,12 +119,12 @@ def get_org_id(
     ),
 ) -> UUID:
     """B1 Auth Hardening: org context comes from X-Org-Id header."""
-    if not x_org_id:
-        raise HTTPException(status_code=401, detail="Missing X-Org-Id header")
-    try:
-        return UUID(x_org_id)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail="Invalid X-Org-Id format (must be UUID)") from e
+    parsed = _actor_headers(request) or parse_actor_headers(x_org_id, None, None)
+    if parsed.org_id is not None:
+        return parsed.org_id
+    if "X-Org-Id" in parsed.invalid:
+        raise HTTPException(status_code=400, detail="Invalid X-Org-Id format (must be UUID)")
+    raise HTTPException(status_code=401, detail="Missing X-Org-Id header")
 
 
 @dataclass(frozen=True)
@@ -88,9 +134,37 @@ class ActorContext:
     role: str
 
 
-def get_actor_context(
+async def get_actor_context(
     org_id: UUID = Depends(get_org_id),
     actor_user_id: UUID = Depends(get_actor_user_id),
     role: str = Depends(get_actor_role),
 ) -> ActorContext:
     return ActorContext(org_id=org_id, actor_user_id=actor_user_id, role=role)
+
+
+# -----------------------------------------------------------------------------
+# Sparse fieldsets (?fields=...)
+# -----------------------------------------------------------------------------
+
+
+def get_task_fields(
+    fields: str | None = Query(
+        default=None,
+        description=(
+            "Sparse fieldset: поля TaskRead через запятую. "
+            "В ответе и в SELECT будут только они (id всегда включён)."
+        ),
+        examples=["id,title,status,priority,row_version"],
+    ),
+) -> tuple[str, ...] | None:
+    """None = полный TaskRead. Иначе — запрошенные поля в порядке TaskRead."""
+    if fields is None or not fields.strip():
+        return None
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(TASK_READ_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    requested.add("id")
+    return tuple(f for f in TASK_READ_FIELDS if f in requested)
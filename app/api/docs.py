@@ -0,0 +1,142 @@
+# app/api/docs.py
+"""
+OpenAPI / Swagger в зависимости от settings.openapi_mode:
+
+- runtime  — схема генерируется при первом GET /openapi.json (как раньше), с примерами;
+- snapshot — схема берётся из сжатого артефакта (scripts/openapi_snapshot.py --artifact,
+             собирается при сборке образа); docs-only примеры (app/api/openapi_examples.py)
+             не импортируются. Если routes_hash артефакта не совпадает с текущими routes —
+             fallback на генерацию;
+- off      — /openapi.json, /docs, /redoc выключены.
+
+GET /openapi.json отдаёт заранее сериализованные bytes (identity / gzip / br) с ETag:
+документ собирается один раз на worker, дальше — без json.dumps и без сжатия на запрос.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.api.responses import etag_matches, not_modified
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+OPENAPI_MODES = ("runtime", "snapshot", "off")
+
+# Ключ верхнего уровня артефакта: хеш routes, из которых он собран
+ROUTES_HASH_KEY = "x-routes-hash"
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def openapi_examples(name: str) -> dict[str, Any] | None:
+    """Body(openapi_examples=...): в runtime-режиме — пример из openapi_examples.py, иначе None."""
+    if settings.openapi_mode != "runtime":
+        return None
+    from app.api import openapi_examples as examples
+
+    return getattr(examples, name)
+
+
+def artifact_path() -> Path:
+    path = Path(settings.openapi_artifact_path)
+    return path if path.is_absolute() else ROOT / path
+
+
+def routes_hash(title: str, version: str, description: str | None, routes: Iterable[Any]) -> str:
+    """
+    Дешёвый (без генерации схемы) отпечаток API: path/methods/модели каждого APIRoute.
+    Изменение полей внутри pydantic-модели хеш не меняет — артефакт пересобирается при сборке.
+    """
+    h = hashlib.sha256(f"{title}\n{version}\n{description}\n".encode("utf-8"))
+    lines = []
+    for r in routes:
+        if not isinstance(r, APIRoute):
+            continue
+        body = r.body_field.field_info.annotation if r.body_field is not None else None
+        lines.append(
+            f"{r.path}|{','.join(sorted(r.methods))}|{r.name}|{r.status_code}|{r.response_model}|"
+            f"{body}|{','.join(map(str, r.tags))}|{r.include_in_schema}"
+        )
+    for line in sorted(lines):
+        h.update(line.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class OpenAPIDocument:
+    body: bytes
+    gzip: bytes
+    br: bytes | None
+    etag: str
+
+
+def dump_schema(schema: dict[str, Any]) -> bytes:
+    # как JSONResponse FastAPI: порядок ключей (и путей в Swagger) сохраняется
+    return json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_document(body: bytes, *, gzipped: bytes | None = None) -> OpenAPIDocument:
+    return OpenAPIDocument(
+        body=body,
+        # mtime=0: одинаковые bytes при одинаковой схеме (воспроизводимый артефакт)
+        gzip=gzipped if gzipped is not None else gzip.compress(body, compresslevel=9, mtime=0),
+        br=brotli.compress(body) if brotli is not None else None,
+        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+    )
+
+
+def write_artifact(schema: dict[str, Any], expected_routes_hash: str, path: Path) -> OpenAPIDocument:
+    doc = build_document(dump_schema({**schema, ROUTES_HASH_KEY: expected_routes_hash}))
+    path.write_bytes(doc.gzip)
+    return doc
+
+
+def load_artifact(path: Path, expected_routes_hash: str) -> OpenAPIDocument | None:
+    """Документ из артефакта; None — артефакта нет или он собран из других routes."""
+    if not path.exists():
+        return None
+    gzipped = path.read_bytes()
+    body = gzip.decompress(gzipped)
+    if json.loads(body).get(ROUTES_HASH_KEY) != expected_routes_hash:
+        return None
+    # gzip отдаём как есть — это и есть артефакт
+    return build_document(body, gzipped=gzipped)
+
+
+def _accepts(request: Request, coding: str) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def openapi_response(request: Request, doc: OpenAPIDocument) -> Response:
+    # strong ETag различается по content-coding (RFC 9110 8.8.3): суффикс у сжатых представлений
+    if doc.br is not None and _accepts(request, "br"):
+        coding, body = "br", doc.br
+    elif _accepts(request, "gzip"):
+        coding, body = "gzip", doc.gzip
+    else:
+        coding, body = None, doc.body
+
+    etag = doc.etag if coding is None else f'{doc.etag[:-1]}-{coding}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,86 @@
+# app/api/executor_stats.py
+"""
+Статистика по исполнителям (payroll / качество): отвечает только из
+executor_stats_daily (M13), которую пишут transition -> done и create_fix.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.deps import ActorContext, get_actor_context
+from app.api.metrics import _date_range, _ratio
+from app.core.db import get_read_db
+from app.core.rbac import Forbidden, ensure_allowed
+from app.models.executor_stats import ExecutorStatsDaily
+from app.schemas.executor_stats import ExecutorStats, ExecutorStatsReport
+
+router = APIRouter(prefix="/orgs", tags=["metrics"])
+
+_SUMS = (
+    "completed",
+    "completed_fix",
+    "minutes_spent",
+    "fixes_caused",
+    "fixes_caused_minor",
+    "fixes_caused_major",
+    "fixes_caused_critical",
+)
+
+
+@router.get(
+    "/{org_id}/executor-stats",
+    response_model=ExecutorStatsReport,
+    summary="Executor stats for a period",
+    description=(
+        "Агрегаты по исполнителям за период: выполненные задачи, минуты, вызванные fix-task по severity.\n\n"
+        "Fix засчитывается исполнителю origin_task, иначе responsible_user_id из QC.\n"
+        "Доступ ограничен RBAC; org_id должен совпадать с X-Org-Id."
+    ),
+)
+def get_executor_stats(
+    org_id: UUID,
+    date_from: date | None = Query(None, description="Начало периода (UTC, включительно). По умолчанию date_to - 29 дней"),
+    date_to: date | None = Query(None, description="Конец периода (UTC, включительно). По умолчанию сегодня"),
+    user_id: UUID | None = Query(None, description="Только один исполнитель"),
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        ensure_allowed("org.executor_stats", ctx.role, ctx.org_id)
+    except Forbidden:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+    if ctx.org_id != org_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+
+    date_from, date_to = _date_range(date_from, date_to)
+
+    stmt = (
+        select(
+            ExecutorStatsDaily.user_id,
+            *(func.sum(getattr(ExecutorStatsDaily, c)).label(c) for c in _SUMS),
+        )
+        .where(
+            ExecutorStatsDaily.org_id == org_id,
+            ExecutorStatsDaily.day >= date_from,
+            ExecutorStatsDaily.day <= date_to,
+        )
+        .group_by(ExecutorStatsDaily.user_id)
+        .order_by(ExecutorStatsDaily.user_id)
+    )
+    if user_id is not None:
+        stmt = stmt.where(ExecutorStatsDaily.user_id == user_id)
+
+    executors = []
+    for row in db.execute(stmt).all():
+        sums = {c: int(getattr(row, c)) for c in _SUMS}
+        executors.append(
+            ExecutorStats(user_id=row.user_id, fix_rate=_ratio(sums["fixes_caused"], sums["completed"]), **sums)
+        )
+
+    return ExecutorStatsReport(org_id=org_id, date_from=date_from, date_to=date_to, executors=executors)
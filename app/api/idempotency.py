@@ -0,0 +1,123 @@
+# app/api/idempotency.py
+"""
+Idempotency для write-endpoint'ов (app/services/idempotency.py).
+
+Handler:
+    replay = idem.begin(db, org_id=ctx.org_id, body=data)
+    if replay is not None:
+        return replay
+    ... работа без db.commit(), flush/refresh для server defaults ...
+    return idem.commit(db, adapter_response(..., status_code=201))
+
+Вставка строки с unique-индексом: IntegrityError из flush -> return idem.unique_violation(db, detail).
+
+Ключ — заголовок Idempotency-Key; для Command-endpoint'ов без заголовка — cmd.client_event_id.
+Без ключа begin() ничего не делает, commit() — обычный db.commit().
+"""
+from __future__ import annotations
+
+from typing import Any
+from uuid import UUID
+
+from fastapi import Header, HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api.responses import FastJSONResponse
+from app.services.idempotency import IdempotencyStore, StoredResponse, idempotency_store, request_hash
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+# ответ отдан из idempotency_keys, handler не выполнялся
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+
+
+class Idempotency:
+    def __init__(self, store: IdempotencyStore, *, endpoint: str, path_params: dict[str, Any], key: str | None):
+        self.store = store
+        self.endpoint = endpoint
+        self.path_params = path_params
+        self.key = key
+        self.org_id: UUID | None = None
+        self.request_hash: str | None = None
+
+    def begin(
+        self,
+        db: Session,
+        *,
+        org_id: UUID,
+        body: BaseModel | None,
+        client_event_id: UUID | None = None,
+    ) -> Response | None:
+        """Сохранённый ответ для повтора; None — выполнять handler."""
+        if self.key is None and client_event_id is not None:
+            self.key = str(client_event_id)
+        if self.key is None:
+            return None
+
+        self.org_id = org_id
+        self.request_hash = request_hash(
+            {"path": self.path_params, "body": body.model_dump(mode="json") if body is not None else None}
+        )
+        self.store.lock(db, org_id=org_id, endpoint=self.endpoint, key=self.key)
+        stored = self.store.get(db, org_id=org_id, endpoint=self.endpoint, key=self.key)
+        return self._replay(stored) if stored is not None else None
+
+    def commit(self, db: Session, response: Response) -> Response:
+        """Сохранить ответ вместе с операцией и закоммитить; проиграли гонку — ответ победителя."""
+        if self.key is None:
+            db.commit()
+            return response
+
+        stored = StoredResponse(request_hash=self.request_hash, status_code=response.status_code, body=bytes(response.body))
+        if not self.store.save(db, org_id=self.org_id, endpoint=self.endpoint, key=self.key, stored=stored):
+            # параллельный запрос с тем же ключом закоммитил первым: наша работа — дубль
+            db.rollback()
+            winner = self.store.get(db, org_id=self.org_id, endpoint=self.endpoint, key=self.key)
+            if winner is None:
+                # ключ успели удалить между INSERT и SELECT (sweeper) — крайне маловероятно
+                raise HTTPException(status_code=409, detail="Idempotency key conflict, retry the request")
+            return self._replay(winner)
+
+        db.commit()
+        self.store.remember(org_id=self.org_id, endpoint=self.endpoint, key=self.key, stored=stored)
+        return response
+
+    def unique_violation(self, db: Session, detail: str) -> Response:
+        """
+        IntegrityError unique-индекса операции: откатить и отдать ответ победителя
+        с тем же ключом; без ключа (или ключ другой) — 409.
+        """
+        db.rollback()
+        if self.key is not None:
+            winner = self.store.get(db, org_id=self.org_id, endpoint=self.endpoint, key=self.key)
+            if winner is not None:
+                return self._replay(winner)
+        raise HTTPException(status_code=409, detail=detail)
+
+    def _replay(self, stored: StoredResponse) -> Response:
+        if stored.request_hash != self.request_hash:
+            # B5: deterministic error contract
+            raise HTTPException(status_code=409, detail="Idempotency key already used with different request data")
+        return FastJSONResponse(stored.body, status_code=stored.status_code, headers={IDEMPOTENT_REPLAY_HEADER: "true"})
+
+
+def get_idempotency(
+    request: Request,
+    idempotency_key: str | None = Header(
+        None,
+        alias=IDEMPOTENCY_KEY_HEADER,
+        min_length=1,
+        max_length=255,
+        description=(
+            "Ключ идемпотентности (например UUID, сгенерированный клиентом). Повтор с тем же ключом "
+            "возвращает сохранённый ответ без повторного выполнения; с другим телом — 409."
+        ),
+    ),
+) -> Idempotency:
+    route = request.scope["route"]
+    return Idempotency(
+        idempotency_store,
+        endpoint=f"{request.method} {route.path}",
+        path_params={k: str(v) for k, v in request.path_params.items()},
+        key=idempotency_key,
+    )
@@ -0,0 +1,149 @@
+# app/api/metrics.py
+"""
+Аналитика по проекту: отвечает только из дневных rollup'ов (M12),
+которые догоняет TaskMetricsRollupJob. task_transitions здесь не читаем.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.db import get_read_db
+from app.models.task_metrics import TaskMetricsDaily, TaskStatusTimeDaily
+from app.schemas.metrics import (
+    CycleTimeDay,
+    CycleTimeMetrics,
+    StatusTime,
+    ThroughputDay,
+    ThroughputMetrics,
+)
+
+router = APIRouter(prefix="/projects", tags=["metrics"])
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+def _ratio(num: float, den: float) -> float | None:
+    return num / den if den else None
+
+
+def _date_range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=422, detail="date_from must be <= date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"Date range is limited to {MAX_RANGE_DAYS} days")
+    return date_from, date_to
+
+
+def _daily_rows(db: Session, *, org_id: UUID, project_id: UUID, date_from: date, date_to: date):
+    return db.execute(
+        select(TaskMetricsDaily)
+        .where(
+            TaskMetricsDaily.org_id == org_id,
+            TaskMetricsDaily.project_id == project_id,
+            TaskMetricsDaily.day >= date_from,
+            TaskMetricsDaily.day <= date_to,
+        )
+        .order_by(TaskMetricsDaily.day.asc())
+    ).scalars().all()
+
+
+@router.get("/{project_id}/metrics/cycle-time", response_model=CycleTimeMetrics)
+def get_cycle_time(
+    project_id: UUID,
+    org_id: UUID = Query(..., description="Организация"),
+    date_from: date | None = Query(None, description="Начало периода (UTC, включительно). По умолчанию date_to - 29 дней"),
+    date_to: date | None = Query(None, description="Конец периода (UTC, включительно). По умолчанию сегодня"),
+    db: Session = Depends(get_read_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    rows = _daily_rows(db, org_id=org_id, project_id=project_id, date_from=date_from, date_to=date_to)
+
+    status_rows = db.execute(
+        select(
+            TaskStatusTimeDaily.status,
+            func.sum(TaskStatusTimeDaily.seconds_sum),
+            func.sum(TaskStatusTimeDaily.exits),
+        )
+        .where(
+            TaskStatusTimeDaily.org_id == org_id,
+            TaskStatusTimeDaily.project_id == project_id,
+            TaskStatusTimeDaily.day >= date_from,
+            TaskStatusTimeDaily.day <= date_to,
+        )
+        .group_by(TaskStatusTimeDaily.status)
+        .order_by(TaskStatusTimeDaily.status)
+    ).all()
+
+    completed = sum(r.completed for r in rows)
+    cycle_count = sum(r.cycle_time_count for r in rows)
+
+    return CycleTimeMetrics(
+        project_id=project_id,
+        date_from=date_from,
+        date_to=date_to,
+        completed=completed,
+        avg_lead_time_seconds=_ratio(sum(r.lead_time_seconds_sum for r in rows), completed),
+        avg_cycle_time_seconds=_ratio(sum(r.cycle_time_seconds_sum for r in rows), cycle_count),
+        time_in_status=[
+            StatusTime(status=s, avg_seconds=seconds / exits, exits=exits)
+            for s, seconds, exits in status_rows
+            if exits
+        ],
+        days=[
+            CycleTimeDay(
+                day=r.day,
+                completed=r.completed,
+                avg_lead_time_seconds=_ratio(r.lead_time_seconds_sum, r.completed),
+                avg_cycle_time_seconds=_ratio(r.cycle_time_seconds_sum, r.cycle_time_count),
+            )
+            for r in rows
+        ],
+    )
+
+
+@router.get("/{project_id}/metrics/throughput", response_model=ThroughputMetrics)
+def get_throughput(
+    project_id: UUID,
+    org_id: UUID = Query(..., description="Организация"),
+    date_from: date | None = Query(None, description="Начало периода (UTC, включительно). По умолчанию date_to - 29 дней"),
+    date_to: date | None = Query(None, description="Конец периода (UTC, включительно). По умолчанию сегодня"),
+    db: Session = Depends(get_read_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    rows = _daily_rows(db, org_id=org_id, project_id=project_id, date_from=date_from, date_to=date_to)
+
+    completed = sum(r.completed for r in rows)
+    completed_fix = sum(r.completed_fix for r in rows)
+    approves = sum(r.review_approves for r in rows)
+    rejects = sum(r.review_rejects for r in rows)
+
+    return ThroughputMetrics(
+        project_id=project_id,
+        date_from=date_from,
+        date_to=date_to,
+        completed=completed,
+        completed_fix=completed_fix,
+        review_approves=approves,
+        review_rejects=rejects,
+        fix_ratio=_ratio(completed_fix, completed),
+        rework_rate=_ratio(rejects, approves + rejects),
+        days=[
+            ThroughputDay(
+                day=r.day,
+                completed=r.completed,
+                completed_fix=r.completed_fix,
+                review_approves=r.review_approves,
+                review_rejects=r.review_rejects,
+            )
+            for r in rows
+        ],
+    )
@@ -0,0 +1,48 @@
+# app/api/middleware.py
+"""
+Pure-ASGI middleware (без BaseHTTPMiddleware: тот оборачивает каждый запрос/ответ
+в Request/StreamingResponse и гонит тело ответа через дополнительную очередь).
+"""
+from __future__ import annotations
+
+from typing import Collection
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.deps import ACTOR_HEADERS_STATE, parse_actor_headers
+
+
+class ActorHeadersMiddleware:
+    """
+    Contract v2: X-Role обязателен везде, кроме open_paths (иначе 401).
+    X-Org-Id / X-Actor-User-Id / X-Role разбираются один раз прямо из scope["headers"]
+    и кладутся в scope["state"] (читают get_org_id / get_current_user_id в app/api/deps.py).
+    """
+
+    def __init__(self, app: ASGIApp, *, open_paths: Collection[str]):
+        self.app = app
+        self.open_paths = frozenset(open_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.open_paths:
+            await self.app(scope, receive, send)
+            return
+
+        org_id = actor_user_id = role = None
+        # ASGI: имена заголовков — bytes в нижнем регистре
+        for name, value in scope["headers"]:
+            if name == b"x-role":
+                role = value.decode("latin-1")
+            elif name == b"x-org-id":
+                org_id = value.decode("latin-1")
+            elif name == b"x-actor-user-id":
+                actor_user_id = value.decode("latin-1")
+
+        if not role or not role.strip():
+            response = JSONResponse(status_code=401, content={"detail": "Missing X-Role header"})
+            await response(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})[ACTOR_HEADERS_STATE] = parse_actor_headers(org_id, actor_user_id, role)
+        await self.app(scope, receive, send)
@@ -0,0 +1,278 @@
+# app/api/openapi_examples.py
+"""
+Docs-only примеры тел запросов для Swagger (Body(openapi_examples=...)).
+
+Импортируется лениво через app.api.docs.openapi_examples(): при OPENAPI_MODE != runtime
+модуль не загружается вовсе (схема отдаётся из snapshot или выключена).
+"""
+
+# ---------- tasks ----------
+
+TASK_TRANSITION_OPENAPI_EXAMPLES = {
+    "unblock": {
+        "summary": "Unblock task",
+        "description": "Перевести задачу из blocked в available (готова к выдаче/выбору).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "unblock",
+            "expected_row_version": 1,
+            "client_event_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+            "payload": {},
+        },
+    },
+    "self_assign": {
+        "summary": "Self-assign (pick from pool)",
+        "description": "Исполнитель выбирает задачу из пула (available -> assigned).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "self_assign",
+            "expected_row_version": 2,
+            "client_event_id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb",
+            "payload": {},
+        },
+    },
+    "assign": {
+        "summary": "Assign task (leader)",
+        "description": "Лид назначает исполнителя (available -> assigned).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "assign",
+            "expected_row_version": 3,
+            "client_event_id": "cccccccc-cccc-cccc-cccc-cccccccccccc",
+            "payload": {"assign_to": "33333333-3333-3333-3333-333333333333"},
+        },
+    },
+    "start": {
+        "summary": "Start task",
+        "description": "Начать работу (assigned -> in_progress).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "start",
+            "expected_row_version": 4,
+            "client_event_id": "dddddddd-dddd-dddd-dddd-dddddddddddd",
+            "payload": {},
+        },
+    },
+    "submit": {
+        "summary": "Submit task",
+        "description": "Отправить результат на проверку (in_progress -> submitted).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "submit",
+            "expected_row_version": 5,
+            "client_event_id": "eeeeeeee-eeee-eeee-eeee-eeeeeeeeeeee",
+            "payload": {},
+        },
+    },
+    "review_approve": {
+        "summary": "Approve submitted task",
+        "description": "Принять результат (submitted -> done).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "review_approve",
+            "expected_row_version": 6,
+            "client_event_id": "ffffffff-ffff-ffff-ffff-ffffffffffff",
+            "payload": {},
+        },
+    },
+    "review_reject": {
+        "summary": "Reject submitted task",
+        "description": "Отклонить результат и вернуть в работу (submitted -> in_progress).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "review_reject",
+            "expected_row_version": 7,
+            "client_event_id": "11111111-2222-3333-4444-555555555555",
+            "payload": {
+                "reason": "Найдены дефекты, требуется доработка",
+                "fix_title": "Исправить дефекты по задаче",
+                "assign_to": "33333333-3333-3333-3333-333333333333"
+            },
+        },
+    },
+    "shift_release": {
+        "summary": "Shift release",
+        "description": "Автоматически вернуть задачу в пул в конце смены (assigned/in_progress -> available).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "shift_release",
+            "expected_row_version": 8,
+            "client_event_id": "22222222-2222-3333-4444-555555555555",
+            "payload": {},
+        },
+    },
+    "recall_to_pool": {
+        "summary": "Recall to pool (leader)",
+        "description": "Лид принудительно отзывает задачу в пул (assigned/in_progress -> available).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "recall_to_pool",
+            "expected_row_version": 9,
+            "client_event_id": "33333333-2222-3333-4444-555555555555",
+            "payload": {},
+        },
+    },
+    "escalate": {
+        "summary": "Escalate",
+        "description": "Сигнал лидu: нужна помощь/переназначение (без смены статуса).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "action": "escalate",
+            "expected_row_version": 10,
+            "client_event_id": "44444444-2222-3333-4444-555555555555",
+            "payload": {"message": "Нужна помощь: нет инструмента/не уверен в операции"},
+        },
+    },
+}
+
+REPORT_FIX_OPENAPI_EXAMPLES = {
+    "worker_initiative_fix": {
+        "summary": "Report fix (worker initiative)",
+        "description": "Работник заметил косяк и исправил — фиксируем время и серьёзность.",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "expected_row_version": 1,
+            "client_event_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+            "payload": {
+                "title": "Исправил косяк по месту",
+                "description": "Нашёл дефект на соседнем этапе и устранил.",
+                "severity": "minor",
+                "minutes_spent": 15,
+                "attachments": []
+            }
+        },
+    }
+}
+
+# ---------- deliverables ----------
+
+DELIVERABLE_FIX_OPENAPI_EXAMPLES = {
+    "worker_initiative": {
+        "summary": "Create deliverable fix-task (worker initiative)",
+        "description": "Исправление по инициативе работника на уровне deliverable (без origin_task).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333",
+            "expected_row_version": 1,
+            "client_event_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+            "payload": {
+                "title": "Инициативный фикс",
+                "description": "Нашел косяк по месту — исправил.",
+                "severity": "minor",
+                "minutes_spent": 15,
+                "attachments": []
+            }
+        },
+    }
+}
+
+QC_DECISION_OPENAPI_EXAMPLES = {
+    "approve": {
+        "summary": "QC approve deliverable",
+        "description": "QC подтверждает изделие. notes опционально.",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+            "inspector_user_id": "33333333-3333-3333-3333-333333333333",
+            "result": "approved",
+            "notes": "OK",
+        },
+    },
+    "reject": {
+        "summary": "QC reject deliverable",
+        "description": "QC отклоняет изделие. notes обязательно (причина/замечания).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+            "inspector_user_id": "33333333-3333-3333-3333-333333333333",
+            "result": "rejected",
+            "notes": "Царапина на корпусе, требуется исправление",
+        },
+    },
+}
+
+SUBMIT_TO_QC_OPENAPI_EXAMPLES = {
+    "submit": {
+        "summary": "Submit deliverable to QC",
+        "description": "Отправить изделие в QC. Требуется последний production sign-off со статусом approved.",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+            "actor_user_id": "33333333-3333-3333-3333-333333333333"
+        }
+    }
+}
+
+SIGNOFF_OPENAPI_EXAMPLES = {
+    "approve": {
+        "summary": "Production sign-off (approve)",
+        "description": "Подтверждение, что все задачи по изделию выполнены.",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+            "signed_off_by": "33333333-3333-3333-3333-333333333333",
+            "result": "approved",
+            "comment": "Все задачи выполнены, изделие готово к QC"
+        },
+    },
+    "reject": {
+        "summary": "Production sign-off (reject)",
+        "description": "Отклонение sign-off (редкий случай).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+            "signed_off_by": "33333333-3333-3333-3333-333333333333",
+            "result": "rejected",
+            "comment": "Не все задачи выполнены"
+        },
+    },
+}
+
+DELIVERABLE_CREATE_OPENAPI_EXAMPLES = {
+    "basic": {
+        "summary": "Create deliverable",
+        "description": "Создать изделие (serial приходит извне).",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+            "created_by": "33333333-3333-3333-3333-333333333333",
+            "deliverable_type": "box_v1",
+            "serial": "SN-2026-0001",
+        },
+    },
+}
+
+DELIVERABLE_BOOTSTRAP_OPENAPI_EXAMPLES = {
+    "basic": {
+        "summary": "Bootstrap deliverable",
+        "description": "Развернуть дерево задач по активной версии шаблона проекта.",
+        "value": {
+            "org_id": "11111111-1111-1111-1111-111111111111",
+            "project_id": "22222222-2222-2222-2222-222222222222",
+        },
+    }
+}
+
+# ---------- projects ----------
+
+DELIVERABLE_BULK_BOOTSTRAP_OPENAPI_EXAMPLES = {
+    "batch": {
+        "summary": "Create and bootstrap a production batch",
+        "description": "Создать партию изделий одного типа и развернуть для каждого активный шаблон.",
+        "value": {
+            "deliverable_type": "box_v1",
+            "serials": ["SN-2026-0001", "SN-2026-0002", "SN-2026-0003"],
+        },
+    }
+}
@@ -0,0 +1,302 @@
+# app/api/projects.py
+"""
+Операции уровня проекта (партии deliverables, шаблоны).
+"""
+
+from __future__ import annotations
+
+import io
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Literal
+from urllib.parse import quote
+from uuid import UUID
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.deps import ActorContext, get_actor_context
+from app.api.docs import openapi_examples
+from app.core.config import settings
+from app.core.db import get_db, get_read_db
+from app.core.rbac import Forbidden, ensure_allowed
+from app.schemas.deliverable_actions import (
+    BulkBootstrapDeliverable,
+    DeliverableBulkBootstrapRequest,
+    DeliverableBulkBootstrapResponse,
+)
+from app.schemas.fix_lineage import ReworkStats
+from app.services.deliverable_batch_bootstrap import DeliverableBatchBootstrap, SerialConflict
+from app.models.project_template_version import ProjectTemplateVersion
+from app.schemas.template import (
+    TemplateDiffRead,
+    TemplateEdgeRead,
+    TemplateImportResponse,
+    TemplateNodeChangeRead,
+    TemplateNodeRead,
+)
+from app.services.deliverable_bootstrap_service import BootstrapError
+from app.services.fix_lineage import rework_stats
+from app.services.template_diff import diff_template_versions
+from app.services.template_io import (
+    MEDIA_TYPES,
+    TemplateImportError,
+    TemplateImportResult,
+    import_template_version,
+    iter_export_lines,
+)
+
+router = APIRouter(prefix="/projects", tags=["projects"])
+
+# Тело импорта копится в памяти до этого размера, дальше — во временный файл на диске
+TEMPLATE_IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+async def _spool_body(request: Request, raw: BinaryIO, *, max_bytes: int) -> None:
+    """Тело запроса в raw; больше max_bytes — 413 (по Content-Length сразу, иначе по мере чтения)."""
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Template file is too large")
+
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Template file is too large")
+        raw.write(chunk)
+
+
+def _export_disposition(tv: ProjectTemplateVersion, fmt: str) -> str:
+    """
+    RFC 6266: ASCII filename по version_id + filename* с именем версии в UTF-8
+    (заголовки кодируются latin-1, кириллица и кавычки в filename="..." ломают ответ).
+    """
+    name = quote(f"template-{tv.version}.{fmt}", safe="")
+    return f"attachment; filename=\"template-{tv.id}.{fmt}\"; filename*=UTF-8''{name}"
+
+
+@router.post(
+    "/{project_id}/deliverables:bulk-create-and-bootstrap",
+    response_model=DeliverableBulkBootstrapResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create and bootstrap a batch of deliverables",
+    description=(
+        "Создаёт N deliverables одного типа и разворачивает активную версию шаблона для всех сразу.\n\n"
+        "Шаблон читается один раз, задачи и зависимости вставляются COPY (set-based), "
+        "вся партия — одна транзакция: либо создаются все serials, либо ни один.\n"
+        "Занятые serials -> 409. Доступ ограничен RBAC."
+    ),
+)
+def bulk_create_and_bootstrap(
+    project_id: UUID,
+    body: DeliverableBulkBootstrapRequest = Body(..., openapi_examples=openapi_examples("DELIVERABLE_BULK_BOOTSTRAP_OPENAPI_EXAMPLES")),
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_db),
+):
+    try:
+        ensure_allowed("deliverable.bootstrap", ctx.role, ctx.org_id)
+    except Forbidden:
+        # B5: deterministic error contract
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+
+    batch = DeliverableBatchBootstrap(
+        db,
+        org_id=ctx.org_id,
+        project_id=project_id,
+        deliverable_type=body.deliverable_type,
+        actor_user_id=ctx.actor_user_id,
+    )
+
+    try:
+        with db.begin():
+            result = batch.create_and_bootstrap(body.serials)
+    except SerialConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except BootstrapError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError as e:
+        # гонка с параллельным созданием того же serial
+        if getattr(getattr(e.orig, "diag", None), "constraint_name", None) == "uq_deliverables_org_serial":
+            raise HTTPException(status_code=409, detail="Deliverable with this serial already exists in org")
+        raise
+
+    return DeliverableBulkBootstrapResponse(
+        template_version_id=result.template_version_id,
+        deliverables=[BulkBootstrapDeliverable(id=d.id, serial=d.serial) for d in result.deliverables],
+        created_tasks=result.created_tasks,
+        created_dependencies=result.created_dependencies,
+    )
+
+
+@router.get(
+    "/{project_id}/template-versions:diff",
+    response_model=TemplateDiffRead,
+    summary="Diff two template versions",
+    description=(
+        "Сравнение двух версий шаблона проекта: nodes по code, edges по паре "
+        "(predecessor_code, successor_code). Используется перед миграцией deliverables "
+        "(POST /deliverables/{id}/template-migrate)."
+    ),
+)
+def diff_template_versions_endpoint(
+    project_id: UUID,
+    org_id: UUID = Query(..., description="Организация"),
+    from_version_id: UUID = Query(..., description="Исходная версия шаблона"),
+    to_version_id: UUID = Query(..., description="Целевая версия шаблона"),
+    db: Session = Depends(get_read_db),
+):
+    for version_id in (from_version_id, to_version_id):
+        tv = db.get(ProjectTemplateVersion, version_id)
+        if tv is None or tv.org_id != org_id or tv.project_id != project_id:
+            raise HTTPException(status_code=404, detail="Template version not found")
+
+    diff = diff_template_versions(db, from_version_id, to_version_id)
+
+    return TemplateDiffRead(
+        from_version_id=from_version_id,
+        to_version_id=to_version_id,
+        added_nodes=[TemplateNodeRead.model_validate(n) for n in diff.added_nodes],
+        removed_nodes=diff.removed_nodes,
+        changed_nodes=[
+            TemplateNodeChangeRead(code=c.code, fields=sorted(c.changes), node=TemplateNodeRead.model_validate(c.node))
+            for c in diff.changed_nodes
+        ],
+        added_edges=[TemplateEdgeRead(predecessor_code=p, successor_code=s) for p, s in diff.added_edges],
+        removed_edges=[TemplateEdgeRead(predecessor_code=p, successor_code=s) for p, s in diff.removed_edges],
+    )
+
+
+@router.get(
+    "/{project_id}/rework-stats",
+    response_model=ReworkStats,
+    summary="Rework amplification statistics of a project",
+    description=(
+        "Один проход recursive CTE по деревьям доработок проекта (origin_task_id): сколько "
+        "fix-task приходится на задачу, глубина фиксов фиксов, minutes_spent, разбивка по "
+        "fix_source / fix_severity."
+    ),
+)
+def get_rework_stats(
+    project_id: UUID,
+    org_id: UUID = Query(..., description="Организация"),
+    db: Session = Depends(get_read_db),
+):
+    return rework_stats(db, org_id=org_id, project_id=project_id)
+
+
+def _import_format(format: str | None, content_type: str | None) -> str:
+    if format is not None:
+        return format
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return "csv" if media_type == "text/csv" else "jsonl"
+
+
+@router.post(
+    "/{project_id}/template-versions:import",
+    response_model=TemplateImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Import a template version from JSON Lines / CSV",
+    description=(
+        "Создаёт новую версию шаблона из потока записей node/edge (тело запроса — файл целиком, "
+        "JSON Lines или CSV; формат — ?format= или Content-Type text/csv).\n\n"
+        "Файл проверяется за один проход (уникальность code, parent_code, концы edges, "
+        "ацикличность), nodes и edges вставляются COPY. Любая ошибка -> 422 с номером строки, "
+        "версия не создаётся. activate=true делает версию активной. Доступ ограничен RBAC.\n\n"
+        "Тело больше TEMPLATE_IMPORT_MAX_BYTES (по умолчанию 64 MiB) -> 413."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {MEDIA_TYPES["jsonl"]: {"schema": {"type": "string"}}, MEDIA_TYPES["csv"]: {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_template_version_endpoint(
+    project_id: UUID,
+    request: Request,
+    version: str = Query(..., min_length=1, max_length=120, description="Имя новой версии"),
+    description: str | None = Query(None, description="Описание версии"),
+    format: Literal["jsonl", "csv"] | None = Query(None, description="Формат файла (по умолчанию — из Content-Type)"),
+    activate: bool = Query(False, description="Сделать версию активной"),
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_db),
+):
+    try:
+        ensure_allowed("template.import", ctx.role, ctx.org_id)
+    except Forbidden:
+        # B5: deterministic error contract
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+
+    fmt = _import_format(format, request.headers.get("content-type"))
+
+    def run(raw) -> TemplateImportResult:
+        stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        try:
+            with db.begin():
+                return import_template_version(
+                    db,
+                    stream,
+                    org_id=ctx.org_id,
+                    project_id=project_id,
+                    actor_user_id=ctx.actor_user_id,
+                    version=version,
+                    description=description,
+                    fmt=fmt,
+                    activate=activate,
+                )
+        finally:
+            stream.detach()
+
+    with SpooledTemporaryFile(max_size=TEMPLATE_IMPORT_SPOOL_BYTES) as raw:
+        await _spool_body(request, raw, max_bytes=settings.template_import_max_bytes)
+        raw.seek(0)
+
+        try:
+            # парсинг + COPY синхронные: не блокируем event loop
+            result = await run_in_threadpool(run, raw)
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except (TemplateImportError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except IntegrityError as e:
+            if getattr(getattr(e.orig, "diag", None), "constraint_name", None) == "uq_tpl_versions_org_project_version":
+                raise HTTPException(status_code=409, detail="Template version with this name already exists")
+            raise
+
+    return TemplateImportResponse(
+        template_version_id=result.template_version_id,
+        version=result.version,
+        nodes=result.nodes,
+        edges=result.edges,
+        activated=result.activated,
+    )
+
+
+@router.get(
+    "/{project_id}/template-versions/{version_id}:export",
+    summary="Export a template version as JSON Lines / CSV",
+    description=(
+        "Потоковая выгрузка версии шаблона (nodes, затем edges) в формате, "
+        "который принимает POST /projects/{project_id}/template-versions:import."
+    ),
+    response_class=StreamingResponse,
+    responses={200: {"content": {MEDIA_TYPES["jsonl"]: {}, MEDIA_TYPES["csv"]: {}}}},
+)
+def export_template_version_endpoint(
+    project_id: UUID,
+    version_id: UUID,
+    org_id: UUID = Query(..., description="Организация"),
+    format: Literal["jsonl", "csv"] = Query("jsonl", description="Формат файла"),
+    db: Session = Depends(get_read_db),
+):
+    tv = db.get(ProjectTemplateVersion, version_id)
+    if tv is None or tv.org_id != org_id or tv.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Template version not found")
+
+    return StreamingResponse(
+        iter_export_lines(db, tv, fmt=format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": _export_disposition(tv, format)},
+    )
@@ -0,0 +1,133 @@
+# app/api/rbac.py
+"""
+Per-org переопределения RBAC (rbac_policies, M15). Изменения применяются worker'ами
+без рестарта: триггер шлёт NOTIFY, RbacPolicyRefresher перечитывает политику
+(settings.rbac_policy_source = "db"; при "static" действует только ALLOW).
+"""
+
+from __future__ import annotations
+
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.deps import ActorContext, get_actor_context
+from app.core.db import get_db
+from app.core.rbac import ALLOW, Forbidden, ensure_allowed
+from app.models.rbac_policy import RbacPolicy
+from app.schemas.rbac import RbacPermissionRead, RbacPermissionUpdate, RbacPolicyRead
+from app.services.rbac_policies import (
+    LockedPermission,
+    UnknownPermission,
+    policy_version,
+    reset_org_permission,
+    set_org_permission,
+)
+
+router = APIRouter(prefix="/orgs", tags=["rbac"])
+
+
+def _ensure_manage(ctx: ActorContext, org_id: UUID) -> None:
+    try:
+        ensure_allowed("org.rbac_manage", ctx.role, ctx.org_id)
+    except Forbidden:
+        # B5: deterministic error contract
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+    if ctx.org_id != org_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+
+
+def _policy_read(db: Session, org_id: UUID) -> RbacPolicyRead:
+    overrides = {
+        permission: roles
+        for permission, roles in db.execute(
+            select(RbacPolicy.permission, RbacPolicy.roles).where(RbacPolicy.org_id == org_id)
+        )
+    }
+    return RbacPolicyRead(
+        org_id=org_id,
+        version=policy_version(db),
+        permissions=[
+            RbacPermissionRead(
+                permission=permission,
+                roles=sorted(overrides.get(permission, default)),
+                overridden=permission in overrides,
+            )
+            for permission, default in sorted(ALLOW.items())
+        ],
+    )
+
+
+@router.get(
+    "/{org_id}/rbac-policies",
+    response_model=RbacPolicyRead,
+    summary="Effective RBAC policy of an org",
+    description=(
+        "Действующие роли по каждому permission: переопределение org (rbac_policies) "
+        "или значение по умолчанию. Доступ ограничен RBAC; org_id должен совпадать с X-Org-Id."
+    ),
+)
+def get_rbac_policy(
+    org_id: UUID,
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_db),
+):
+    _ensure_manage(ctx, org_id)
+    return _policy_read(db, org_id)
+
+
+@router.put(
+    "/{org_id}/rbac-policies/{permission}",
+    response_model=RbacPolicyRead,
+    summary="Override roles of a permission for an org",
+    description=(
+        "Заменяет список ролей permission для org. Worker'ы подхватывают изменение без "
+        "рестарта (NOTIFY rbac_policies). Неизвестный или защищённый permission -> 422."
+    ),
+)
+def put_rbac_permission(
+    org_id: UUID,
+    permission: str,
+    body: RbacPermissionUpdate,
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_db),
+):
+    _ensure_manage(ctx, org_id)
+
+    try:
+        set_org_permission(
+            db,
+            org_id=org_id,
+            permission=permission,
+            roles=body.roles,
+            actor_user_id=ctx.actor_user_id,
+        )
+    except (UnknownPermission, LockedPermission) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    db.commit()
+
+    return _policy_read(db, org_id)
+
+
+@router.delete(
+    "/{org_id}/rbac-policies/{permission}",
+    response_model=RbacPolicyRead,
+    summary="Reset a permission of an org to the default",
+    description="Удаляет переопределение org: permission снова проверяется по ролям по умолчанию.",
+)
+def delete_rbac_permission(
+    org_id: UUID,
+    permission: str,
+    ctx: ActorContext = Depends(get_actor_context),
+    db: Session = Depends(get_db),
+):
+    _ensure_manage(ctx, org_id)
+
+    if permission not in ALLOW:
+        raise HTTPException(status_code=422, detail=f"Unknown permission: {permission}")
+    reset_org_permission(db, org_id=org_id, permission=permission)
+    db.commit()
+
+    return _policy_read(db, org_id)
@@ -0,0 +1,121 @@
+# app/api/responses.py
+"""
+Быстрый путь сериализации для больших list-endpoint'ов.
+
+Обычный путь FastAPI: ORM -> validate(response_model) -> dump_python(mode="json")
+-> json.dumps. На страницах по 500 задач и dashboard'ах на 800 задач это основная
+нагрузка на CPU.
+
+Здесь:
+- TypeAdapter'ы собираются один раз при импорте (а не на каждый запрос);
+- dump_json идёт сразу в bytes (pydantic-core), без промежуточных dict'ов;
+- row -> dict проекции рендерятся через orjson, если он установлен.
+
+Формат ответа совпадает побайтно с JSONResponse (compact separators, UTF-8,
+без \\uXXXX-экранирования). response_model на endpoint'ах оставляем — он
+нужен для OpenAPI (snapshot не меняется).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Iterable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas.allocation import AllocationOut
+from app.schemas.deliverable import DeliverableRead
+from app.schemas.deliverable_dashboard import DeliverableDashboard
+from app.schemas.deliverable_signoff import DeliverableSignoffRead
+from app.schemas.fix_lineage import FixLineage
+from app.schemas.task import TaskPartialRead, TaskRead
+from app.schemas.transition import TaskTransitionItem
+
+try:
+    import orjson
+except ImportError:  # optional speedup: pip install orjson
+    orjson = None
+
+
+TASK_READ = TypeAdapter(TaskRead)
+TASK_READ_LIST = TypeAdapter(list[TaskRead])
+TASK_PARTIAL_LIST = TypeAdapter(list[TaskPartialRead])
+TASK_TRANSITION_ITEM_LIST = TypeAdapter(list[TaskTransitionItem])
+DELIVERABLE_READ = TypeAdapter(DeliverableRead)
+DELIVERABLE_READ_LIST = TypeAdapter(list[DeliverableRead])
+ALLOCATION_OUT_LIST = TypeAdapter(list[AllocationOut])
+DELIVERABLE_DASHBOARD = TypeAdapter(DeliverableDashboard)
+DELIVERABLE_SIGNOFF_READ = TypeAdapter(DeliverableSignoffRead)
+FIX_LINEAGE = TypeAdapter(FixLineage)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse, который:
+    - отдаёт уже сериализованные bytes (из TypeAdapter.dump_json) как есть;
+    - для dict/list использует orjson, если он установлен, иначе stdlib json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+def json_bytes(value: Any) -> bytes:
+    """JSON-native значение -> bytes в формате FastJSONResponse (для потоковых ответов)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def adapter_response(
+    adapter: TypeAdapter,
+    value: Any,
+    *,
+    exclude_none: bool = False,
+    exclude_unset: bool = False,
+    status_code: int = 200,
+) -> FastJSONResponse:
+    """ORM-объекты / dict'ы -> validate (from_attributes) -> dump_json -> Response."""
+    validated = adapter.validate_python(value, from_attributes=True)
+    return FastJSONResponse(
+        adapter.dump_json(validated, exclude_none=exclude_none, exclude_unset=exclude_unset),
+        status_code=status_code,
+    )
+
+
+def rows_response(rows: Iterable[dict[str, Any]]) -> FastJSONResponse:
+    """
+    Прямая проекция row -> dict, без pydantic.
+    Значения должны быть JSON-native (UUID/datetime приводить к str заранее).
+    """
+    return FastJSONResponse(list(rows))
+
+
+# -----------------------------------------------------------------------------
+# Conditional GET (ETag / If-None-Match)
+# -----------------------------------------------------------------------------
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag из версионных "водяных знаков" (row_version, updated_at, ...)."""
+    raw = ":".join("" if p is None else str(p) for p in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match: список ETag'ов через запятую или '*'. W/-префикс игнорируем."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in (t.removeprefix("W/") for t in tags)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -1,184 +1,71 @@
 # app/api/tasks.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request
 
-from sqlalchemy import select, text
+from sqlalchemy import select, text, union_all
 from sqlalchemy.orm import Session
 
 from uuid import UUID
 
+from app.services.fix_lineage import fix_lineage, fix_lineage_root, invalidate_fix_lineage
 from app.services.task_fix_service import TaskFixService
 from app.services.task_transition_service import apply_task_transition, VersionConflict, IdempotencyConflict
 
-from app.core.db import get_db
+from app.core.cache import Cache, get_cache
+from app.core.db import get_db, get_read_db
 from app.core.rbac import ensure_allowed, Forbidden
 
 from app.fsm.task_fsm import TransitionNotAllowed
 
 from app.schemas.task import TaskCreate, TaskRead, TaskUpdate, TaskBlockerRead, TaskDependencyCreate, TaskDependencyRead
-from app.schemas.task_event import TaskEventRead
 from app.schemas.transition import TaskTransitionRequest, TaskTransitionResponse, TaskTransitionItem
 from app.schemas.command import Command
+from app.schemas.fix_lineage import FixLineage
 from app.schemas.fix_task import ReportFixPayload
 from app.schemas.error import ErrorResponse
 
 from app.models.task import Task, TaskStatus, WorkKind
-from app.models.task_event import TaskEvent
-from app.models.task_transition import TaskTransition
+from app.models.task_transition import TaskTransition, TaskTransitionArchive
 from app.models.deliverable import Deliverable
 
-from app.api.deps import ActorContext, get_actor_context
-
-TASK_TRANSITION_OPENAPI_EXAMPLES = {
-    "unblock": {
-        "summary": "Unblock task",
-        "description": "Перевести задачу из blocked в available (готова к выдаче/выбору).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "unblock",
-            "expected_row_version": 1,
-            "client_event_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
-            "payload": {},
-        },
-    },
-    "self_assign": {
-        "summary": "Self-assign (pick from pool)",
-        "description": "Исполнитель выбирает задачу из пула (available -> assigned).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "self_assign",
-            "expected_row_version": 2,
-            "client_event_id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb",
-            "payload": {},
-        },
-    },
-    "assign": {
-        "summary": "Assign task (leader)",
-        "description": "Лид назначает исполнителя (available -> assigned).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "assign",
-            "expected_row_version": 3,
-            "client_event_id": "cccccccc-cccc-cccc-cccc-cccccccccccc",
-            "payload": {"assign_to": "33333333-3333-3333-3333-333333333333"},
-        },
-    },
-    "start": {
-        "summary": "Start task",
-        "description": "Начать работу (assigned -> in_progress).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "start",
-            "expected_row_version": 4,
-            "client_event_id": "dddddddd-dddd-dddd-dddd-dddddddddddd",
-            "payload": {},
-        },
-    },
-    "submit": {
-        "summary": "Submit task",
-        "description": "Отправить результат на проверку (in_progress -> submitted).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "submit",
-            "expected_row_version": 5,
-            "client_event_id": "eeeeeeee-eeee-eeee-eeee-eeeeeeeeeeee",
-            "payload": {},
-        },
-    },
-    "review_approve": {
-        "summary": "Approve submitted task",
-        "description": "Принять результат (submitted -> done).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "review_approve",
-            "expected_row_version": 6,
-            "client_event_id": "ffffffff-ffff-ffff-ffff-ffffffffffff",
-            "payload": {},
-        },
-    },
-    "review_reject": {
-        "summary": "Reject submitted task",
-        "description": "Отклонить результат и вернуть в работу (submitted -> in_progress).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "review_reject",
-            "expected_row_version": 7,
-            "client_event_id": "11111111-2222-3333-4444-555555555555",
-            "payload": {
-                "reason": "Найдены дефекты, требуется доработка",
-                "fix_title": "Исправить дефекты по задаче",
-                "assign_to": "33333333-3333-3333-3333-333333333333"
-            },
-        },
-    },
-    "shift_release": {
-        "summary": "Shift release",
-        "description": "Автоматически вернуть задачу в пул в конце смены (assigned/in_progress -> available).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "shift_release",
-            "expected_row_version": 8,
-            "client_event_id": "22222222-2222-3333-4444-555555555555",
-            "payload": {},
-        },
-    },
-    "recall_to_pool": {
-        "summary": "Recall to pool (leader)",
-        "description": "Лид принудительно отзывает задачу в пул (assigned/in_progress -> available).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "recall_to_pool",
-            "expected_row_version": 9,
-            "client_event_id": "33333333-2222-3333-4444-555555555555",
-            "payload": {},
-        },
-    },
-    "escalate": {
-        "summary": "Escalate",
-        "description": "Сигнал лидu: нужна помощь/переназначение (без смены статуса).",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "action": "escalate",
-            "expected_row_version": 10,
-            "client_event_id": "44444444-2222-3333-4444-555555555555",
-            "payload": {"message": "Нужна помощь: нет инструмента/не уверен в операции"},
-        },
-    },
-}
-
-REPORT_FIX_OPENAPI_EXAMPLES = {
-    "worker_initiative_fix": {
-        "summary": "Report fix (worker initiative)",
-        "description": "Работник заметил косяк и исправил — фиксируем время и серьёзность.",
-        "value": {
-            "org_id": "11111111-1111-1111-1111-111111111111",
-            "actor_user_id": "33333333-3333-3333-3333-333333333333",
-            "expected_row_version": 1,
-            "client_event_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
-            "payload": {
-                "title": "Исправил косяк по месту",
-                "description": "Нашёл дефект на соседнем этапе и устранил.",
-                "severity": "minor",
-                "minutes_spent": 15,
-                "attachments": []
-            }
-        },
-    }
-}
+from app.api.deps import ActorContext, get_actor_context, get_task_fields
+from app.api.docs import openapi_examples
+from app.api.idempotency import Idempotency, get_idempotency
+from app.api.responses import (
+    FIX_LINEAGE,
+    TASK_PARTIAL_LIST,
+    TASK_READ,
+    TASK_READ_LIST,
+    FastJSONResponse,
+    adapter_response,
+    etag_matches,
+    make_etag,
+    not_modified,
+    rows_response,
+)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+def _task_etag(task: Task) -> str:
+    # updated_at входит в ETag, т.к. PATCH меняет поля без инкремента row_version
+    return make_etag("task", task.id, task.row_version, task.updated_at)
+
+
+def _cache_task(cache: Cache, task: Task) -> FastJSONResponse:
+    """
+    TaskRead + ETag; тот же payload кладём в cache (write-through).
+    Запись версионная: более новую версию задачи в cache младшая не перезапишет.
+    """
+    etag = _task_etag(task)
+    resp = adapter_response(TASK_READ, task)
+    resp.headers["ETag"] = etag
+    cache.set_entry(
+        Cache.task_key(task.org_id, task.id), Cache.version(task.row_version, task.updated_at), etag, resp.body
+    )
+    return resp
+
+
 def get_task_in_org_or_404(db: Session, *, org_id: UUID, task_id: UUID) -> Task:
     task = db.execute(
         select(Task).where(Task.org_id == org_id, Task.id == task_id)
@@ -189,7 +76,15 @@ def get_task_in_org_or_404(db: Session, *, org_id: UUID, task_id: UUID) -> Task:
 
 
 @router.post("", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
-def create_task(data: TaskCreate, db: Session = Depends(get_db)):
+def create_task(
+    data: TaskCreate,
+    db: Session = Depends(get_db),
+    idem: Idempotency = Depends(get_idempotency),
+):
+    replay = idem.begin(db, org_id=data.org_id, body=data)
+    if replay is not None:
+        return replay
+
     if data.deliverable_id is not None:
         d = db.get(Deliverable, data.deliverable_id)
         if not d:
@@ -216,9 +111,9 @@ def create_task(data: TaskCreate, db: Session = Depends(get_db)):
         is_milestone=data.is_milestone,
     )
     db.add(task)
-    db.commit()
+    db.flush()
     db.refresh(task)
-    return task
+    return idem.commit(db, adapter_response(TASK_READ, task, status_code=status.HTTP_201_CREATED))
 
 
 @router.post(
@@ -241,9 +136,10 @@ def create_task(data: TaskCreate, db: Session = Depends(get_db)):
 )
 def transition_task(
     task_id: UUID,
-    payload: TaskTransitionRequest = Body(..., openapi_examples=TASK_TRANSITION_OPENAPI_EXAMPLES),
+    payload: TaskTransitionRequest = Body(..., openapi_examples=openapi_examples("TASK_TRANSITION_OPENAPI_EXAMPLES")),
     ctx: ActorContext = Depends(get_actor_context),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
 ):
     # --- Guard: QC actions are not allowed in Task FSM (Variant A) ---
     # TODO(qc): move QC actions to separate router / FSM
@@ -257,7 +153,7 @@ def transition_task(
         )
     # RBAC: разрешение зависит от action
     try:
-        ensure_allowed(f"task.{payload.action}", ctx.role)
+        ensure_allowed(f"task.{payload.action}", ctx.role, ctx.org_id)
     except Forbidden as e:
         # B5: deterministic error contract
         raise HTTPException(status_code=403, detail="forbidden")
@@ -279,6 +175,12 @@ def transition_task(
                 # B5: deterministic error contract
                 raise HTTPException(status_code=409, detail="client_event_id conflict")
 
+        # write-through: читатели get_task сразу видят новую версию
+        if cache.enabled:
+            _cache_task(cache, task)
+        if fix_task is not None:
+            invalidate_fix_lineage(db, cache, fix_task)
+
         return TaskTransitionResponse(
             task_id=task.id,
             status=task.status,          # строка
@@ -351,9 +253,21 @@ def list_tasks(
     project_id: UUID = Query(..., description="Проект"),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    fields: tuple[str, ...] | None = Depends(get_task_fields),
+    db: Session = Depends(get_read_db),
 ):
-    return (
+    if fields is not None:
+        # Проекция в SELECT: не тянем description/fix_reason и прочие тяжёлые колонки
+        rows = db.execute(
+            select(*(getattr(Task, f) for f in fields))
+            .where(Task.org_id == org_id, Task.project_id == project_id)
+            .order_by(Task.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+        ).mappings().all()
+        return adapter_response(TASK_PARTIAL_LIST, [dict(r) for r in rows], exclude_unset=True)
+
+    tasks = (
         db.query(Task)
         .filter(Task.org_id == org_id, Task.project_id == project_id)
         .order_by(Task.created_at.desc())
@@ -361,35 +275,109 @@ def list_tasks(
         .offset(offset)
         .all()
     )
+    return adapter_response(TASK_READ_LIST, tasks)
 
 
 
-@router.get("/{task_id}/transitions", response_model=list[TaskTransitionItem], response_model_exclude_none=True, )
+@router.get(
+    "/{task_id}/transitions",
+    response_model=list[TaskTransitionItem],
+    response_model_exclude_none=True,
+    responses={304: {"description": "Not Modified (ETag matches If-None-Match)"}},
+)
 def list_task_transitions(
     task_id: UUID,
+    request: Request,
     org_id: UUID = Query(
         ...,
         description="Организация (мультитенантность). Пока query, позже будет из auth.",
         examples=["11111111-1111-1111-1111-111111111111"],
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Timeline переходов FSM по задаче.
     org_id пока передаём query-параметром (мультитенантность), позже заменим на auth-context.
     """
-    # Проверим что задача существует в этой org (мультитенантность)
-    task = db.execute(select(Task).where(Task.org_id == org_id, Task.id == task_id)).scalar_one_or_none()
-    if not task:
+    # ETag: каждый transition пишет result_row_version = row_version задачи,
+    # поэтому текущий row_version — водяной знак timeline.
+    # Проверим что задача существует в этой org (мультитенантность) — читаем только версию
+    row_version = db.execute(
+        select(Task.row_version).where(Task.org_id == org_id, Task.id == task_id)
+    ).scalar_one_or_none()
+    if row_version is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    transitions = (
-        db.query(TaskTransition)
-        .filter(TaskTransition.org_id == org_id, TaskTransition.task_id == task_id)
-        .order_by(TaskTransition.created_at.asc())
-        .all()
+    etag = make_etag("timeline", task_id, row_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Timeline = archive tier (старые месяцы) + hot-таблица (месячные партиции).
+    def _timeline(model):
+        return select(
+            model.id,
+            model.task_id,
+            model.action,
+            model.from_status,
+            model.to_status,
+            model.created_at,
+            model.payload,
+        ).where(model.org_id == org_id, model.task_id == task_id)
+
+    timeline = union_all(_timeline(TaskTransitionArchive), _timeline(TaskTransition)).subquery()
+    rows = db.execute(select(timeline).order_by(timeline.c.created_at.asc())).all()
+
+    # Прямая проекция row -> dict (порядок ключей = TaskTransitionItem).
+    # created_at в TaskTransitionItem — строка, поэтому отдаём isoformat().
+    resp = rows_response(
+        {
+            "id": str(tr_id),
+            "task_id": str(tr_task_id),
+            "action": action,
+            "from_status": from_status,
+            "to_status": to_status,
+            "created_at": created_at.isoformat(),
+            "payload": payload,
+        }
+        for tr_id, tr_task_id, action, from_status, to_status, created_at, payload in rows
     )
-    return transitions
+    resp.headers["ETag"] = etag
+    return resp
+
+
+@router.get(
+    "/{task_id}/fix-lineage",
+    response_model=FixLineage,
+    summary="Fix-task lineage (rework tree) of a task",
+    description=(
+        "Дерево доработок, в которое входит задача: от корня (задачи без origin_task_id) "
+        "по origin_task_id вниз, с суммой minutes_spent. Кэшируется по корню до создания "
+        "нового fix-task в дереве."
+    ),
+)
+def get_fix_lineage(
+    task_id: UUID,
+    org_id: UUID = Query(
+        ...,
+        description="Организация (мультитенантность). Пока query, позже будет из auth.",
+        examples=["11111111-1111-1111-1111-111111111111"],
+    ),
+    # primary: после инвалидации дерево не должно перекэшироваться с отстающей реплики
+    db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
+):
+    root_id = fix_lineage_root(db, org_id=org_id, task_id=task_id)
+    if root_id is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    key = Cache.fix_lineage_key(org_id, root_id)
+    body = cache.get(key)
+    if body is not None:
+        return FastJSONResponse(body)
+
+    resp = adapter_response(FIX_LINEAGE, fix_lineage(db, org_id=org_id, root_id=root_id))
+    cache.set(key, resp.body)
+    return resp
 
 @router.get("/{task_id}/dependencies", response_model=list[TaskDependencyRead])
 def list_dependencies(
@@ -451,34 +439,64 @@ def list_task_blockers(
     return list(rows)
 
 
-@router.get("/{task_id}", response_model=TaskRead)
+@router.get(
+    "/{task_id}",
+    response_model=TaskRead,
+    responses={304: {"description": "Not Modified (ETag matches If-None-Match)"}},
+)
 def get_task(
     task_id: UUID,
+    request: Request,
     org_id: UUID = Query(
         ...,
         description="Организация (мультитенантность). Пока query, позже будет из auth.",
         examples=["11111111-1111-1111-1111-111111111111"],
         ),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
     ):
+    # Read-through: в cache лежит (ETag, TaskRead bytes), ключ включает org_id
+    entry = cache.get_entry(Cache.task_key(org_id, task_id))
+    if entry is not None:
+        etag, body = entry
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return FastJSONResponse(body, headers={"ETag": etag})
+
+    # Conditional GET: сначала дешёвый version-only запрос, полную строку грузим только при промахе.
+    if request.headers.get("if-none-match"):
+        version = db.execute(
+            select(Task.row_version, Task.updated_at).where(Task.org_id == org_id, Task.id == task_id)
+        ).one_or_none()
+        if version is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        etag = make_etag("task", task_id, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
     task = db.execute(select(Task).where(Task.org_id == org_id, Task.id == task_id)).scalar_one_or_none()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
 
+    return _cache_task(cache, task)
 
-@router.get("/{task_id}/events", response_model=list[TaskEventRead])
-def list_task_events(task_id: UUID, db: Session = Depends(get_db)):
-    task = db.get(Task, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
 
-    return (
-        db.query(TaskEvent)
-        .filter(TaskEvent.task_id == task_id)
-        .order_by(TaskEvent.id.asc())
-        .all()
+@router.get(
+    "/{task_id}/events",
+    deprecated=True,
+    status_code=status.HTTP_410_GONE,
+    responses={410: {"description": "Retired: use GET /deliverables/{deliverable_id}/timeline"}},
+)
+def list_task_events(task_id: UUID):
+    """
+    Legacy audit log task_events не пишет ни один сервис. История задачи —
+    GET /tasks/{task_id}/transitions, изделия целиком — GET /deliverables/{id}/timeline.
+    """
+    raise HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="task_events is retired: use GET /tasks/{task_id}/transitions or GET /deliverables/{deliverable_id}/timeline",
     )
 
 
@@ -492,6 +510,7 @@ def update_task(
         examples=["11111111-1111-1111-1111-111111111111"],
     ),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
 ):
     task = get_task_in_org_or_404(db, org_id=org_id, task_id=task_id)
 
@@ -501,9 +520,17 @@ def update_task(
     if payload.deliverable_id is not None:
         task.deliverable_id = payload.deliverable_id
 
+    keys = [Cache.task_key(org_id, task_id)]
+    if cache.enabled and payload.title is not None:
+        # title входит в узлы закэшированного дерева доработок
+        root_id = fix_lineage_root(db, org_id=org_id, task_id=task_id)
+        if root_id is not None:
+            keys.append(Cache.fix_lineage_key(org_id, root_id))
+
     db.add(task)
     db.commit()
     db.refresh(task)
+    cache.delete(*keys)
     return task
 
 
@@ -516,11 +543,18 @@ def delete_task(
         examples=["11111111-1111-1111-1111-111111111111"],
     ),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
 ):
     task = get_task_in_org_or_404(db, org_id=org_id, task_id=task_id)
+    keys = [Cache.task_key(org_id, task_id)]
+    if cache.enabled and task.origin_task_id is not None:
+        root_id = fix_lineage_root(db, org_id=org_id, task_id=task_id)
+        if root_id is not None:
+            keys.append(Cache.fix_lineage_key(org_id, root_id))
 
     db.delete(task)
     db.commit()
+    cache.delete(*keys)
     return None
 
 
@@ -541,11 +575,18 @@ def delete_dependency(task_id: UUID, predecessor_id: UUID, org_id: UUID, db: Ses
 @router.post("/{task_id}/report-fix", response_model=TaskRead)
 def report_fix(
     task_id: UUID,
-    cmd: Command[ReportFixPayload] = Body(..., openapi_examples=REPORT_FIX_OPENAPI_EXAMPLES),
+    cmd: Command[ReportFixPayload] = Body(..., openapi_examples=openapi_examples("REPORT_FIX_OPENAPI_EXAMPLES")),
+    ctx: ActorContext = Depends(get_actor_context),
     db: Session = Depends(get_db),
+    cache: Cache = Depends(get_cache),
+    idem: Idempotency = Depends(get_idempotency),
 ):
+    replay = idem.begin(db, org_id=ctx.org_id, body=cmd, client_event_id=cmd.client_event_id)
+    if replay is not None:
+        return replay
+
     origin = db.get(Task, task_id)
-    if not origin:
+    if not origin or origin.org_id != ctx.org_id:
         raise HTTPException(404, "Task not found")
     if origin.deliverable_id is None:
         raise HTTPException(422, "Origin task must be linked to a deliverable for report-fix (use deliverable fix endpoint).")
@@ -553,13 +594,15 @@ def report_fix(
     svc = TaskFixService(db)
     fix = svc.create_initiative_fix_for_task(
         origin_task=origin,
-        actor_user_id=cmd.actor_user_id,
+        actor_user_id=ctx.actor_user_id,
         title=cmd.payload.title,
         description=cmd.payload.description,
         severity=cmd.payload.severity,
         minutes_spent=cmd.payload.minutes_spent,
         attachments=[a.model_dump() for a in cmd.payload.attachments],
     )
-    db.commit()
+    db.flush()
     db.refresh(fix)
-    return fix
+    resp = idem.commit(db, adapter_response(TASK_READ, fix))
+    invalidate_fix_lineage(db, cache, fix)
+    return resp
@@ -0,0 +1,343 @@
+# app/core/cache.py
+"""
+Общий cache tier для горячих read-путей (get_task / get_deliverable / dashboard).
+
+Backend'ы:
+- "none"   — кэш выключен (default: безопасно при нескольких uvicorn-воркерах без Redis);
+- "memory" — in-process LRU+TTL (тесты, локальный single-process запуск, без сети);
+- "resp"   — Redis-совместимый сервер по протоколу RESP2 (минимальный клиент, без redis-py).
+
+Кэш — не source of truth: любые ошибки backend'а логируются и считаются промахом.
+
+Версии:
+- task:{org_id}:{task_id}     -> ETag(row_version, updated_at) + тело TaskRead, write-through из transitions
+- deliverable:{deliverable_id} -> тело DeliverableRead (версия updated_at), инвалидация из QC / bootstrap
+  Обе записи версионные (set_if_newer): значение хранит версию строки, и запись со старшей
+  версией не перезаписывается младшей — медленный читатель, загрузивший N, не затрёт
+  write-through N+1 от перехода.
+- dashboard:{id}:{etag}        -> тело dashboard; etag = водяной знак, поэтому инвалидация не нужна
+- fix_lineage:{org_id}:{root_id} -> тело FixLineage, инвалидация при создании fix-task под корнем
+"""
+from __future__ import annotations
+
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, BinaryIO, Protocol
+from urllib.parse import urlparse
+from uuid import UUID
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+
+    def delete(self, *keys: str) -> None: ...
+
+    def set_if_newer(self, key: str, version: bytes, value: bytes, ttl_seconds: int) -> None:
+        """Записать version + b"\\n" + value, если в key нет записи с версией >= version."""
+        ...
+
+
+def _stored_version(raw: bytes) -> bytes:
+    return raw.partition(b"\n")[0]
+
+
+class NullCacheBackend:
+    """Кэш выключен: всегда промах."""
+
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        return None
+
+    def delete(self, *keys: str) -> None:
+        return None
+
+    def set_if_newer(self, key: str, version: bytes, value: bytes, ttl_seconds: int) -> None:
+        return None
+
+
+class InMemoryCacheBackend:
+    """In-process LRU с TTL. Для тестов и окружений без сети."""
+
+    def __init__(self, *, max_entries: int = 10_000, clock=time.monotonic):
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._clock = clock
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def set_if_newer(self, key: str, version: bytes, value: bytes, ttl_seconds: int) -> None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > self._clock() and _stored_version(item[1]) >= version:
+                return
+            self._data[key] = (self._clock() + ttl_seconds, version + b"\n" + value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+
+# -----------------------------------------------------------------------------
+# RESP2 (Redis serialization protocol)
+# -----------------------------------------------------------------------------
+
+
+class RespError(Exception):
+    """Ошибка, которую вернул сервер (-ERR ...)."""
+
+
+def encode_command(*args: str | bytes | int) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for a in args:
+        if isinstance(a, int):
+            a = str(a)
+        if isinstance(a, str):
+            a = a.encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(a), a))
+    return b"".join(parts)
+
+
+def read_reply(f: BinaryIO) -> Any:
+    line = f.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("RESP: connection closed")
+
+    prefix, rest = line[:1], line[1:-2]
+    if prefix == b"+":
+        return rest.decode("utf-8")
+    if prefix == b"-":
+        raise RespError(rest.decode("utf-8"))
+    if prefix == b":":
+        return int(rest)
+    if prefix == b"$":
+        n = int(rest)
+        if n == -1:
+            return None
+        data = f.read(n + 2)
+        return data[:-2]
+    if prefix == b"*":
+        n = int(rest)
+        if n == -1:
+            return None
+        return [read_reply(f) for _ in range(n)]
+    raise ConnectionError(f"RESP: unexpected reply prefix {prefix!r}")
+
+
+# Сравнение версии и SET — атомарно на сервере. Версии фиксированной ширины (Cache.version),
+# поэтому строковое сравнение совпадает с числовым.
+_SET_IF_NEWER_LUA = """
+local cur = redis.call('GET', KEYS[1])
+if cur and string.match(cur, '^[^\\n]*') >= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class RespCacheBackend:
+    """
+    Минимальный клиент Redis-совместимого сервера: GET / SET EX / DEL.
+    Одно соединение на процесс, вызовы сериализуются lock'ом; при сетевой ошибке
+    соединение сбрасывается и переоткрывается на следующем вызове.
+    """
+
+    def __init__(self, url: str, *, timeout_seconds: float = 0.5):
+        u = urlparse(url)
+        self._host = u.hostname or "127.0.0.1"
+        self._port = u.port or 6379
+        self._password = u.password
+        self._db = int(u.path.lstrip("/") or 0)
+        self._timeout = timeout_seconds
+
+        self._sock: socket.socket | None = None
+        self._file: BinaryIO | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self._host, self._port), timeout=self._timeout)
+        self._file = self._sock.makefile("rb")
+        if self._password:
+            self._call("AUTH", self._password)
+        if self._db:
+            self._call("SELECT", self._db)
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def _call(self, *args: str | bytes | int) -> Any:
+        self._sock.sendall(encode_command(*args))
+        return read_reply(self._file)
+
+    def execute(self, *args: str | bytes | int) -> Any:
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._call(*args)
+            except OSError:
+                self._close()
+                raise
+
+    def get(self, key: str) -> bytes | None:
+        return self.execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self.execute("SET", key, value, "EX", ttl_seconds)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.execute("DEL", *keys)
+
+    def set_if_newer(self, key: str, version: bytes, value: bytes, ttl_seconds: int) -> None:
+        self.execute("EVAL", _SET_IF_NEWER_LUA, 1, key, version, version + b"\n" + value, ttl_seconds)
+
+
+# -----------------------------------------------------------------------------
+# Cache facade
+# -----------------------------------------------------------------------------
+
+
+class Cache:
+    def __init__(self, backend: CacheBackend, *, prefix: str = "planner:", ttl_seconds: int = 60):
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self.backend, NullCacheBackend)
+
+    # ---------- keys ----------
+
+    @staticmethod
+    def task_key(org_id: UUID, task_id: UUID) -> str:
+        return f"task:{org_id}:{task_id}"
+
+    @staticmethod
+    def deliverable_key(deliverable_id: UUID) -> str:
+        return f"deliverable:{deliverable_id}"
+
+    @staticmethod
+    def dashboard_key(deliverable_id: UUID, etag: str) -> str:
+        return f"dashboard:{deliverable_id}:{etag.strip(chr(34))}"
+
+    @staticmethod
+    def fix_lineage_key(org_id: UUID, root_id: UUID) -> str:
+        return f"fix_lineage:{org_id}:{root_id}"
+
+    @staticmethod
+    def version(*parts: int | datetime) -> bytes:
+        """Версия строки фиксированной ширины: (row_version, updated_at) сравниваются как байты."""
+        out = []
+        for p in parts:
+            if isinstance(p, datetime):
+                p = (p - _EPOCH) // _MICROSECOND
+            out.append(b"%020d" % p)
+        return b".".join(out)
+
+    # ---------- raw bytes ----------
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self.backend.get(self.prefix + key)
+        except (OSError, RespError) as e:
+            log.warning("cache get failed (%s): %s", key, e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl_seconds: int | None = None) -> None:
+        try:
+            self.backend.set(self.prefix + key, value, ttl_seconds or self.ttl_seconds)
+        except (OSError, RespError) as e:
+            log.warning("cache set failed (%s): %s", key, e)
+
+    def delete(self, *keys: str) -> None:
+        try:
+            self.backend.delete(*(self.prefix + k for k in keys))
+        except (OSError, RespError) as e:
+            log.warning("cache delete failed (%s): %s", keys, e)
+
+    # ---------- versioned ----------
+
+    def get_versioned(self, key: str) -> bytes | None:
+        raw = self.get(key)
+        return None if raw is None else raw.partition(b"\n")[2]
+
+    def set_if_newer(self, key: str, version: bytes, value: bytes, ttl_seconds: int | None = None) -> None:
+        try:
+            self.backend.set_if_newer(self.prefix + key, version, value, ttl_seconds or self.ttl_seconds)
+        except (OSError, RespError) as e:
+            log.warning("cache set failed (%s): %s", key, e)
+
+    # ---------- ETag + body ----------
+
+    def get_entry(self, key: str) -> tuple[str, bytes] | None:
+        raw = self.get_versioned(key)
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return etag.decode("utf-8"), body
+
+    def set_entry(self, key: str, version: bytes, etag: str, body: bytes) -> None:
+        self.set_if_newer(key, version, etag.encode("utf-8") + b"\n" + body)
+
+
+def build_cache() -> Cache:
+    backend: CacheBackend
+    if settings.cache_backend == "memory":
+        backend = InMemoryCacheBackend()
+    elif settings.cache_backend == "resp":
+        backend = RespCacheBackend(settings.cache_url)
+    else:
+        backend = NullCacheBackend()
+    return Cache(backend, ttl_seconds=settings.cache_ttl_seconds)
+
+
+cache = build_cache()
+
+
+def get_cache() -> Cache:
+    return cache
@@ -18,6 +18,11 @@ class Settings(BaseSettings):
         "Legacy body auth fields (org_id, actor_user_id, etc.) were removed in B2."
     )
 
+    # runtime | snapshot | off (app/api/docs.py). В production — snapshot: схема из артефакта
+    # сборки (scripts/openapi_snapshot.py --artifact), docs-only примеры не импортируются.
+    openapi_mode: str = "runtime"
+    openapi_artifact_path: str = "build/openapi_v2.json.gz"
+
     env: str = "local"
     debug: bool = True
 
@@ -27,6 +32,67 @@ class Settings(BaseSettings):
     db_user: str = "planner"
     db_password: str = "planner"
 
+    # ---------------------------------------------------------------------
+    # Read replicas (app/core/db.py: get_read_db)
+    # ---------------------------------------------------------------------
+
+    # SQLAlchemy URL'ы реплик через запятую; пусто = всё читаем с primary
+    db_replica_urls: str = ""
+    # реплика с отставанием больше этого порога не используется (fallback на primary)
+    db_replica_max_lag_seconds: float = 5.0
+    # как часто перепроверять отставание одной реплики
+    db_replica_lag_check_interval_seconds: float = 2.0
+
+    # ---------------------------------------------------------------------
+    # Cache tier (app/core/cache.py)
+    # ---------------------------------------------------------------------
+
+    # none | memory | resp
+    cache_backend: str = "none"
+    cache_url: str = "redis://127.0.0.1:6379/0"
+    cache_ttl_seconds: int = 60
+
+    # ---------------------------------------------------------------------
+    # Deliverable bootstrap (app/services/deliverable_bootstrap_service.py)
+    # ---------------------------------------------------------------------
+
+    # python | sql (INSERT ... SELECT внутри Postgres)
+    bootstrap_engine: str = "python"
+
+    # ---------------------------------------------------------------------
+    # RBAC policies (app/services/rbac_policies.py)
+    # ---------------------------------------------------------------------
+
+    # static (только ALLOW из app/core/rbac.py) | db (+ переопределения org из rbac_policies)
+    rbac_policy_source: str = "static"
+    # страховочный опрос rbac_policy_version, если NOTIFY потерялся (разрыв LISTEN-соединения)
+    rbac_policy_poll_seconds: float = 30.0
+
+    # ---------------------------------------------------------------------
+    # Idempotency keys for write endpoints (app/services/idempotency.py)
+    # ---------------------------------------------------------------------
+
+    # сколько хранится сохранённый ответ (окно повторов мобильного клиента)
+    idempotency_retention_hours: float = 24.0
+    # in-process front cache перед idempotency_keys
+    idempotency_cache_ttl_seconds: int = 30
+    # период фонового sweeper'а в каждом worker'е; 0 — выключен (make idempotency-sweep из cron)
+    idempotency_sweep_interval_seconds: float = 300.0
+
+    # ---------------------------------------------------------------------
+    # Template import / export (app/api/projects.py, app/services/template_io.py)
+    # ---------------------------------------------------------------------
+
+    # тело POST .../template-versions:import больше этого — 413 (файл спулится на диск)
+    template_import_max_bytes: int = 64 * 1024 * 1024
+
+    # ---------------------------------------------------------------------
+    # Point-in-time task state (app/services/task_as_of.py)
+    # ---------------------------------------------------------------------
+
+    # ?as_of= начинает с последнего снимка deliverable_task_snapshots (make task-snapshots)
+    as_of_use_snapshots: bool = True
+
     @property
     def database_url(self) -> str:
         return (
@@ -34,5 +100,9 @@ class Settings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def database_replica_urls(self) -> list[str]:
+        return [u.strip() for u in self.db_replica_urls.split(",") if u.strip()]
+
 
 settings = Settings()
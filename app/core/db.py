@@ -1,8 +1,21 @@
-from sqlalchemy import create_engine
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from typing import Callable
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+log = logging.getLogger(__name__)
+
 engine = create_engine(settings.database_url, pool_pre_ping=True)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
@@ -14,3 +27,144 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# -----------------------------------------------------------------------------
+# Read replicas
+# -----------------------------------------------------------------------------
+
+# Состояние реплики для оценки отставания (см. replica_lag_from_status).
+# caught_up: реплика проиграла весь полученный WAL; streaming: WAL receiver подключён к primary.
+# Без pg_read_all_stats колонки pg_stat_wal_receiver скрыты (streaming = false): оценка
+# уходит на возраст последней транзакции — осторожнее, но не "вечно свежая" реплика.
+REPLICA_STATUS_SQL = text(
+    """
+    SELECT pg_is_in_recovery() AS in_recovery,
+           pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AS caught_up,
+           EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') AS streaming,
+           EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS replay_lag
+    """
+)
+
+# Клиент только что записал задачу и хочет прочитать её не старше этой версии:
+# такие запросы идут на primary (read-your-writes).
+MIN_ROW_VERSION_HEADER = "x-min-row-version"
+
+
+def replica_lag_from_status(
+    *, in_recovery: bool, caught_up: bool | None, streaming: bool, replay_lag: float | None
+) -> float | None:
+    """
+    Отставание реплики в секундах; None — неизвестно (реплика ещё ничего не проиграла).
+
+    - primary (не в recovery) -> 0;
+    - реплика проиграла весь полученный WAL и WAL receiver стримит -> 0: на простаивающем
+      primary pg_last_xact_replay_timestamp() "стареет", хотя реплика ничего не догоняет;
+    - иначе — возраст последней проигранной транзакции. Отключённый receiver тоже сюда:
+      "проиграла всё полученное" ничего не говорит о том, что primary записал после обрыва.
+    """
+    if not in_recovery:
+        return 0.0
+    if caught_up and streaming:
+        return 0.0
+    return None if replay_lag is None else float(replay_lag)
+
+
+def replica_lag_seconds(bind: Engine) -> float | None:
+    with bind.connect() as conn:
+        row = conn.execute(REPLICA_STATUS_SQL).one()
+    return replica_lag_from_status(
+        in_recovery=row.in_recovery, caught_up=row.caught_up, streaming=row.streaming, replay_lag=row.replay_lag
+    )
+
+
+class ReplicaRouter:
+    """
+    Выбор engine для read-only запросов.
+
+    - реплики по round-robin;
+    - реплика с отставанием > max_lag_seconds (или недоступная) пропускается;
+    - отставание кэшируется на check_interval_seconds, чтобы не делать probe на каждый запрос;
+    - нет здоровых реплик -> primary.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: list[Engine],
+        *,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+        lag_probe: Callable[[Engine], float | None] = replica_lag_seconds,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._lag_probe = lag_probe
+        self._clock = clock
+
+        self._rr = itertools.cycle(range(len(replicas))) if replicas else None
+        self._checked: dict[int, tuple[float, bool]] = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, idx: int) -> bool:
+        now = self._clock()
+        with self._lock:
+            checked = self._checked.get(idx)
+        if checked is not None and now - checked[0] < self.check_interval_seconds:
+            return checked[1]
+
+        try:
+            lag = self._lag_probe(self.replicas[idx])
+        except SQLAlchemyError as e:
+            log.warning("replica #%d lag probe failed: %s", idx, e)
+            lag = None
+        fresh = lag is not None and lag <= self.max_lag_seconds
+
+        with self._lock:
+            self._checked[idx] = (now, fresh)
+        return fresh
+
+    def pick(self) -> Engine:
+        if self._rr is None:
+            return self.primary
+        with self._lock:
+            start = next(self._rr)
+        for i in range(len(self.replicas)):
+            idx = (start + i) % len(self.replicas)
+            if self._is_fresh(idx):
+                return self.replicas[idx]
+        return self.primary
+
+
+replica_engines = [create_engine(url, pool_pre_ping=True) for url in settings.database_replica_urls]
+
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag_seconds=settings.db_replica_max_lag_seconds,
+    check_interval_seconds=settings.db_replica_lag_check_interval_seconds,
+)
+
+
+def wants_primary(request: Request) -> bool:
+    """Запись или read-your-writes (клиент прислал свежий row_version) -> primary."""
+    if request.method not in ("GET", "HEAD"):
+        return True
+    return MIN_ROW_VERSION_HEADER in request.headers
+
+
+def get_read_db(request: Request):
+    """
+    Session для read-only endpoint'ов: реплика (если настроена и не отстаёт) или primary.
+    Endpoint'ы на этой session не должны писать.
+    """
+    bind = engine if wants_primary(request) else replica_router.pick()
+    db = SessionLocal(bind=bind)
+    db.info["replica"] = bind is not engine
+    try:
+        yield db
+    finally:
+        db.close()
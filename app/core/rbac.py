@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Iterable, Mapping, Sequence
+from uuid import UUID
 
 
 @dataclass(frozen=True)
@@ -41,21 +43,149 @@ ALLOW: dict[str, set[str]] = {
     "deliverable.signoff": {"system", "lead", "supervisor"},
     "deliverable.submit_to_qc": {"system", "lead", "supervisor"},
     "deliverable.qc_decision": {"system", "lead", "supervisor"},
+
+    # Templates
+    "template.import": {"system", "lead"},
+
+    # Reports
+    "org.executor_stats": {"system", "lead", "supervisor"},
+
+    # RBAC administration (rbac_policies, M15)
+    "org.rbac_manage": {"system"},
 }
 
 
-def ensure_allowed(permission: str, actor_role: str) -> None:
-    allowed_roles = ALLOW.get(permission)
-    if not allowed_roles or actor_role not in allowed_roles:
-        raise Forbidden(
-            f"Forbidden: role '{actor_role}' is not allowed for '{permission}'"
-        )
+# -----------------------------------------------------------------------------
+# Compiled matrix: role x permission -> bitset
+# -----------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RbacMatrix:
+    """
+    ALLOW, скомпилированный один раз: у каждой permission — целочисленный id (номер бита),
+    у каждой роли — int-битсет разрешённых permission. Проверка = dict lookup + сдвиг.
+    Неизменяемый: смена политики — это новый CompiledPolicy (см. load_policy).
+    """
+
+    permissions: tuple[str, ...]
+    permission_ids: dict[str, int]
+    role_masks: dict[str, int]
+    # отсортированные permission роли (для list_allowed_permissions_for_role)
+    role_permissions: dict[str, tuple[str, ...]]
+
+    @classmethod
+    def compile(cls, allow: Mapping[str, Iterable[str]]) -> "RbacMatrix":
+        permissions = tuple(sorted(allow))
+        permission_ids = {perm: i for i, perm in enumerate(permissions)}
+        role_masks: dict[str, int] = {}
+        for perm, roles in allow.items():
+            bit = 1 << permission_ids[perm]
+            for role in roles:
+                role_masks[role] = role_masks.get(role, 0) | bit
+        role_permissions = {
+            role: tuple(p for p in permissions if mask >> permission_ids[p] & 1)
+            for role, mask in role_masks.items()
+        }
+        return cls(permissions, permission_ids, role_masks, role_permissions)
+
+    def is_allowed(self, permission: str, role: str) -> bool:
+        pid = self.permission_ids.get(permission)
+        return pid is not None and bool(self.role_masks.get(role, 0) >> pid & 1)
+
+    def allowed_mask(self, role: str, permissions: Sequence[str]) -> int:
+        """Бит i результата = role может permissions[i]. Для batch-проверок одним вызовом."""
+        role_mask = self.role_masks.get(role, 0)
+        if not role_mask:
+            return 0
+        ids = self.permission_ids
+        result = 0
+        for i, perm in enumerate(permissions):
+            pid = ids.get(perm)
+            if pid is not None and role_mask >> pid & 1:
+                result |= 1 << i
+        return result
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """
+    Политика worker'а: матрица по умолчанию (ALLOW) + матрицы org с переопределениями
+    (rbac_policies, M15). Org без переопределений проверяется по default.
+    """
+
+    default: RbacMatrix
+    orgs: dict[UUID, RbacMatrix]
+    # rbac_policy_version.version, из которой собрана политика (0 = только ALLOW)
+    version: int = 0
+
+    def matrix(self, org_id: UUID | None) -> RbacMatrix:
+        if org_id is None:
+            return self.default
+        return self.orgs.get(org_id, self.default)
+
+
+def compile_policy(
+    allow: Mapping[str, Iterable[str]],
+    org_overrides: Mapping[UUID, Mapping[str, Iterable[str]]] | None = None,
+    *,
+    version: int = 0,
+) -> CompiledPolicy:
+    """org_overrides: org_id -> {permission: roles}; permission org заменяет её целиком."""
+    return CompiledPolicy(
+        default=RbacMatrix.compile(allow),
+        orgs={
+            org_id: RbacMatrix.compile({**allow, **overrides})
+            for org_id, overrides in (org_overrides or {}).items()
+        },
+        version=version,
+    )
+
+
+_policy = compile_policy(ALLOW)
+
+
+def current_policy() -> CompiledPolicy:
+    return _policy
+
+
+def current_matrix(org_id: UUID | None = None) -> RbacMatrix:
+    return _policy.matrix(org_id)
+
+
+def load_policy(
+    allow: Mapping[str, Iterable[str]],
+    org_overrides: Mapping[UUID, Mapping[str, Iterable[str]]] | None = None,
+    *,
+    version: int = 0,
+) -> CompiledPolicy:
+    """
+    Заменить политику целиком (app/services/rbac_policies.py читает её из БД). Присваивание
+    ссылки атомарно: конкурентные запросы видят либо старую, либо новую политику.
+    """
+    global _policy
+    _policy = compile_policy(allow, org_overrides, version=version)
+    return _policy
+
+
+def ensure_allowed(permission: str, actor_role: str, org_id: UUID | None = None) -> None:
+    m = _policy.matrix(org_id)
+    pid = m.permission_ids.get(permission)
+    if pid is not None and m.role_masks.get(actor_role, 0) >> pid & 1:
+        return
+    # сообщение собираем только на отказе
+    raise Forbidden(
+        f"Forbidden: role '{actor_role}' is not allowed for '{permission}'"
+    )
+
+
+def is_allowed(permission: str, actor_role: str, org_id: UUID | None = None) -> bool:
+    return _policy.matrix(org_id).is_allowed(permission, actor_role)
 
 
-def is_allowed(permission: str, actor_role: str) -> bool:
-    roles = ALLOW.get(permission)
-    return bool(roles) and actor_role in roles
+def allowed_mask(actor_role: str, permissions: Sequence[str], org_id: UUID | None = None) -> int:
+    return _policy.matrix(org_id).allowed_mask(actor_role, permissions)
 
 
-def list_allowed_permissions_for_role(role: str) -> list[str]:
-    return sorted([perm for perm, roles in ALLOW.items() if role in roles])
+def list_allowed_permissions_for_role(role: str, org_id: UUID | None = None) -> list[str]:
+    return list(_policy.matrix(org_id).role_permissions.get(role, ()))
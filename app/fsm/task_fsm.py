@@ -149,3 +149,21 @@ def apply_transition(
         )
 
     return to_status, side_effects
+
+
+def compile_transition_table() -> dict[tuple[str, str], str]:
+    """
+    (from_status, action) -> to_status для всех переходов, которые разрешает apply_transition
+    (без payload-проверок сервиса). Для массового replay журнала: dict lookup вместо
+    исключений на каждую строку.
+    """
+    table: dict[tuple[str, str], str] = {}
+    for action, (allowed_from, to_status) in TRANSITIONS.items():
+        for s in allowed_from:
+            table[(s.value, action.value)] = to_status.value
+    for s in NON_TERMINAL:
+        table[(s.value, Action.ESCALATE.value)] = s.value
+    return table
+
+
+TRANSITION_TABLE = compile_transition_table()
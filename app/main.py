@@ -1,7 +1,10 @@
 # app/main.py
-from fastapi import FastAPI, Request
+import json
+from contextlib import asynccontextmanager
+from functools import cache
+
+from fastapi import FastAPI, Request, Response
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
 
 
 
@@ -9,35 +12,85 @@ from app.api.health import router as health_router
 from app.api.tasks import router as tasks_router
 from app.api.allocations import router as allocations_router
 from app.api.deliverables import router as deliverables_router
+from app.api.metrics import router as metrics_router
+from app.api.executor_stats import router as executor_stats_router
+from app.api.projects import router as projects_router
+from app.api.rbac import router as rbac_router
+from app.api.docs import (
+    OpenAPIDocument,
+    artifact_path,
+    build_document,
+    dump_schema,
+    load_artifact,
+    openapi_response,
+    routes_hash,
+)
+from app.api.middleware import ActorHeadersMiddleware
 from app.core.config import settings
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    from app.core.db import SessionLocal
+
+    background = []
+    # rbac_policy_source=db: per-org политики из rbac_policies, перечитываются по NOTIFY
+    if settings.rbac_policy_source == "db":
+        from app.services.rbac_policies import RbacPolicyRefresher
+
+        background.append(
+            RbacPolicyRefresher(
+                session_factory=SessionLocal,
+                database_url=settings.database_url,
+                poll_seconds=settings.rbac_policy_poll_seconds,
+            )
+        )
+    # чистка idempotency_keys старше retention
+    if settings.idempotency_sweep_interval_seconds > 0:
+        from app.services.idempotency import IdempotencySweeper
+
+        background.append(
+            IdempotencySweeper(
+                session_factory=SessionLocal,
+                interval_seconds=settings.idempotency_sweep_interval_seconds,
+            )
+        )
+
+    for job in background:
+        job.start()
+    try:
+        yield
+    finally:
+        for job in background:
+            job.stop()
+
+
 # Contract v2 (B3): OpenAPI must reflect headers-only auth context.
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.app_name,
     version=settings.api_version,
     description=settings.api_description,
+    # off: без /openapi.json, /docs, /redoc (app/api/docs.py)
+    openapi_url=None if settings.openapi_mode == "off" else "/openapi.json",
 )
 
 OPEN_PATHS = {"/docs", "/openapi.json", "/redoc", "/favicon.ico", "/health"}
 
-@app.middleware("http")
-async def require_x_role(request: Request, call_next):
-    if request.url.path in OPEN_PATHS:
-        return await call_next(request)
-
-    x_role = request.headers.get("X-Role")
-    if not x_role or not x_role.strip():
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Missing X-Role header"},
-        )
-
-    return await call_next(request)
+# X-Role обязателен (401), заголовки актора разбираются один раз в scope state
+app.add_middleware(ActorHeadersMiddleware, open_paths=OPEN_PATHS)
 
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
 
+    if settings.openapi_mode == "snapshot":
+        doc = _artifact_document()
+        if doc is not None:
+            app.openapi_schema = json.loads(doc.body)
+            return app.openapi_schema
+        # артефакта нет или он от других routes — генерируем (без docs-only примеров)
+
     schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -85,7 +138,36 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+
+@cache
+def _artifact_document() -> OpenAPIDocument | None:
+    return load_artifact(artifact_path(), routes_hash(app.title, app.version, app.description, app.routes))
+
+
+@cache
+def openapi_document() -> OpenAPIDocument:
+    """/openapi.json в готовых bytes (identity/gzip/br) — один раз на worker."""
+    if settings.openapi_mode == "snapshot":
+        doc = _artifact_document()
+        if doc is not None:
+            return doc
+    return build_document(dump_schema(app.openapi()))
+
+
+async def openapi_endpoint(request: Request) -> Response:
+    return openapi_response(request, openapi_document())
+
+
+# Вместо штатного /openapi.json (json.dumps на каждый запрос) — заранее собранный документ
+if app.openapi_url:
+    app.router.routes = [r for r in app.router.routes if getattr(r, "path", None) != app.openapi_url]
+    app.add_route(app.openapi_url, openapi_endpoint, include_in_schema=False)
+
 app.include_router(health_router, tags=["health"])
 app.include_router(tasks_router, tags=["tasks"])
 app.include_router(allocations_router, tags=["allocations"])
-app.include_router(deliverables_router, tags=["deliverables"])
\ No newline at end of file
+app.include_router(deliverables_router, tags=["deliverables"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(executor_stats_router, tags=["metrics"])
+app.include_router(projects_router, tags=["projects"])
+app.include_router(rbac_router, tags=["rbac"])
\ No newline at end of file
@@ -0,0 +1,32 @@
+# app/models/deliverable_task_snapshot.py
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class DeliverableTaskSnapshot(Base):
+    """
+    Снимок status / row_version задачи изделия на taken_at (M17). Пишется периодически
+    (scripts/task_snapshots.py); as_of-запросы начинают с последнего снимка <= as_of.
+    """
+
+    __tablename__ = "deliverable_task_snapshots"
+
+    deliverable_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("deliverables.id", ondelete="CASCADE"), primary_key=True
+    )
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    task_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False)
+    row_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    # created_at последнего перехода <= taken_at; None — переходов ещё не было
+    changed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,35 @@
+# app/models/executor_stats.py
+from __future__ import annotations
+
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Date, Integer
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ExecutorStatsDaily(Base):
+    """
+    Дневной rollup по исполнителю (M13).
+    Пишется инкрементами из apply_task_transition (-> done) и TaskFixService.create_fix.
+    """
+
+    __tablename__ = "executor_stats_daily"
+
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    # задачи исполнителя, перешедшие в done (и сколько из них — fix-task)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_fix: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    minutes_spent: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    # fix-task, причиной которых стал исполнитель (origin_task.assigned_to / QC responsible_user_id)
+    fixes_caused: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fixes_caused_minor: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fixes_caused_major: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fixes_caused_critical: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
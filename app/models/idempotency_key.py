@@ -0,0 +1,32 @@
+# app/models/idempotency_key.py
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, LargeBinary, SmallInteger, Text, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Сохранённый ответ write-endpoint'а (M16). Пишется в транзакции самой операции:
+    либо есть и результат операции, и ключ, либо ничего. Старые строки удаляет sweeper.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    endpoint: Mapped[str] = mapped_column(Text, primary_key=True)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+
+    request_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    status_code: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    response_body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
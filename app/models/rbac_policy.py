@@ -0,0 +1,30 @@
+# app/models/rbac_policy.py
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class RbacPolicy(Base):
+    """
+    Переопределение RBAC для org (M15): roles целиком заменяют ALLOW[permission].
+    Любое изменение таблицы бампает rbac_policy_version и шлёт NOTIFY rbac_policies.
+    """
+
+    __tablename__ = "rbac_policies"
+
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    permission: Mapped[str] = mapped_column(Text, primary_key=True)
+    roles: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False, default=list)
+
+    updated_by: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -105,6 +105,8 @@ class Task(Base):
         ForeignKey("tasks.id", ondelete="SET NULL"),
         nullable=True,
     )
+    # node шаблона, из которого развёрнута задача (M14; для diff / миграции шаблона)
+    template_node_code: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     # Опционально: если хочешь хранить отдельную причину фикса, иначе используй description
     fix_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -0,0 +1,47 @@
+# app/models/task_metrics.py
+from __future__ import annotations
+
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Date, Float, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TaskMetricsDaily(Base):
+    """Дневной rollup по проекту (M12). Заполняет TaskMetricsRollupJob."""
+
+    __tablename__ = "task_metrics_daily"
+
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    project_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    # задачи, перешедшие в done за день (throughput)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_fix: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # lead time = done - tasks.created_at; cycle time = done - первый переход в in_progress
+    lead_time_seconds_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    cycle_time_seconds_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    cycle_time_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    review_approves: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    review_rejects: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TaskStatusTimeDaily(Base):
+    """Время в статусе: учитывается в день выхода из статуса."""
+
+    __tablename__ = "task_status_time_daily"
+
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    project_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[str] = mapped_column(Text, primary_key=True)
+
+    seconds_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    exits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -13,8 +13,8 @@ from sqlalchemy.orm import Mapped, mapped_column
 from app.models.base import Base
 
 
-class TaskTransition(Base):
-    __tablename__ = "task_transitions"
+class TaskTransitionColumns:
+    """Общие колонки hot-таблицы (партиции по месяцам) и archive tier."""
 
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
 
@@ -40,3 +40,31 @@ class TaskTransition(Base):
 
     expected_row_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
     result_row_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
+class TaskTransition(TaskTransitionColumns, Base):
+    # PARTITION BY RANGE (created_at), месячные партиции (M11).
+    # PK в БД = (id, created_at); для ORM достаточно id.
+    __tablename__ = "task_transitions"
+
+
+class TaskTransitionArchive(TaskTransitionColumns, Base):
+    # Старые месяцы, вынесенные TransitionPartitionJob из hot-таблицы.
+    __tablename__ = "task_transitions_archive"
+
+
+class TaskTransitionKey(Base):
+    """
+    Глобальные unique-инварианты task_transitions (заполняется триггером):
+    - (task_id, client_event_id) — idempotency
+    - (org_id, task_id, result_row_version) — M7.1
+    """
+
+    __tablename__ = "task_transition_keys"
+
+    transition_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    org_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    task_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    client_event_id: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
+    result_row_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
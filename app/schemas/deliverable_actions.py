@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+from typing import Annotated
 from uuid import UUID
 from pydantic import BaseModel, Field
 
+# как DeliverableCreate.serial
+Serial = Annotated[str, Field(min_length=1, max_length=120)]
+
 
 class SubmitToQcRequest(BaseModel):
     project_id: UUID = Field(
@@ -40,4 +44,69 @@ class DeliverableBootstrapRequest(BaseModel):
                 }
             ]
         },
-    }
\ No newline at end of file
+    }
+
+class DeliverableBulkBootstrapRequest(BaseModel):
+    deliverable_type: str = Field(
+        ...,
+        min_length=1,
+        max_length=64,
+        description="Тип изделия для всей партии.",
+        examples=["box_v1"],
+    )
+    serials: list[Serial] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Серийные номера партии (уникальны в рамках org). Не более 1000 за запрос.",
+        examples=[["SN-2026-0001", "SN-2026-0002"]],
+    )
+
+    model_config = {
+        "extra": "forbid",
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "deliverable_type": "box_v1",
+                    "serials": ["SN-2026-0001", "SN-2026-0002"],
+                }
+            ]
+        },
+    }
+
+
+class BulkBootstrapDeliverable(BaseModel):
+    id: UUID
+    serial: str
+
+
+class DeliverableBulkBootstrapResponse(BaseModel):
+    template_version_id: UUID
+    deliverables: list[BulkBootstrapDeliverable]
+    created_tasks: int
+    created_dependencies: int
+
+
+class DeliverableTemplateMigrateRequest(BaseModel):
+    project_id: UUID = Field(
+        ...,
+        description="Проект. Пока передаём явно, позже будет из auth/context.",
+        examples=["22222222-2222-2222-2222-222222222222"],
+    )
+    to_version_id: UUID = Field(
+        ...,
+        description="Версия шаблона, на которую переводим deliverable.",
+        examples=["44444444-4444-4444-4444-444444444444"],
+    )
+
+    model_config = {"extra": "forbid"}
+
+
+class DeliverableTemplateMigrateResponse(BaseModel):
+    template_version_id: UUID
+    created_tasks: int
+    updated_tasks: int
+    canceled_tasks: int
+    skipped_done: int
+    added_dependencies: int
+    removed_dependencies: int
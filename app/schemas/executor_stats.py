@@ -0,0 +1,27 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ExecutorStats(BaseModel):
+    user_id: UUID
+
+    completed: int
+    completed_fix: int
+    minutes_spent: int
+
+    fixes_caused: int
+    fixes_caused_minor: int
+    fixes_caused_major: int
+    fixes_caused_critical: int
+
+    # fixes_caused / completed (None, если в периоде нет выполненных задач)
+    fix_rate: float | None = None
+
+
+class ExecutorStatsReport(BaseModel):
+    org_id: UUID
+    date_from: date
+    date_to: date
+    executors: list[ExecutorStats]
@@ -0,0 +1,50 @@
+# app/schemas/fix_lineage.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class FixLineageNode(BaseModel):
+    id: UUID
+    origin_task_id: UUID | None = Field(None, description="Родитель в дереве (null — корень)")
+    qc_inspection_id: UUID | None = None
+    depth: int = Field(..., description="0 — корень, 1 — фикс корня, 2 — фикс фикса, ...")
+
+    title: str
+    work_kind: str
+    fix_source: str | None = None
+    fix_severity: str | None = None
+    minutes_spent: int | None = None
+    created_at: datetime
+
+
+class FixLineage(BaseModel):
+    """Дерево доработок от корня (задачи без origin_task_id) по origin_task_id."""
+
+    root_task_id: UUID
+    fix_count: int = Field(..., description="Число fix-task в дереве (включая корень, если он сам fix-task)")
+    max_depth: int
+    total_minutes_spent: int = Field(..., description="Сумма minutes_spent по всем узлам дерева")
+    nodes: list[FixLineageNode] = Field(..., description="Узлы по (depth, created_at); корень первый")
+
+
+class ReworkStats(BaseModel):
+    """Rework amplification проекта: сколько доработок порождает одна исходная задача."""
+
+    project_id: UUID
+    work_tasks: int = Field(..., description="Обычные задачи (work_kind=work)")
+    root_fixes: int = Field(..., description="Fix-task без origin_task_id (QC reject / фикс по изделию)")
+    reworked_roots: int = Field(..., description="Корни, в дереве которых есть хотя бы один fix-task")
+    fixes_total: int
+    nested_fixes: int = Field(..., description="Фиксы фиксов: origin_task_id указывает на fix-task")
+    max_depth: int
+    max_fixes_per_root: int
+    rework_ratio: float = Field(..., description="fixes_total / work_tasks")
+    amplification: float = Field(..., description="Среднее число fix-task на доработанный корень")
+    fix_minutes_total: int = Field(..., description="Сумма minutes_spent по fix-task")
+    by_source: dict[str, int]
+    by_severity: dict[str, int]
@@ -0,0 +1,56 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class StatusTime(BaseModel):
+    status: str
+    avg_seconds: float
+    exits: int
+
+
+class CycleTimeDay(BaseModel):
+    day: date
+    completed: int
+    avg_lead_time_seconds: float | None = None
+    avg_cycle_time_seconds: float | None = None
+
+
+class CycleTimeMetrics(BaseModel):
+    project_id: UUID
+    date_from: date
+    date_to: date
+
+    completed: int
+    avg_lead_time_seconds: float | None = None
+    avg_cycle_time_seconds: float | None = None
+
+    time_in_status: list[StatusTime]
+    days: list[CycleTimeDay]
+
+
+class ThroughputDay(BaseModel):
+    day: date
+    completed: int
+    completed_fix: int
+    review_approves: int
+    review_rejects: int
+
+
+class ThroughputMetrics(BaseModel):
+    project_id: UUID
+    date_from: date
+    date_to: date
+
+    completed: int
+    completed_fix: int
+    review_approves: int
+    review_rejects: int
+
+    # completed_fix / completed
+    fix_ratio: float | None = None
+    # review_reject / (review_approve + review_reject)
+    rework_rate: float | None = None
+
+    days: list[ThroughputDay]
@@ -0,0 +1,21 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class RbacPermissionRead(BaseModel):
+    permission: str
+    roles: list[str]
+    # True — роли заданы для org в rbac_policies, False — значение по умолчанию (ALLOW)
+    overridden: bool
+
+
+class RbacPolicyRead(BaseModel):
+    org_id: UUID
+    # rbac_policy_version.version (0 — переопределений ещё не было)
+    version: int
+    permissions: list[RbacPermissionRead]
+
+
+class RbacPermissionUpdate(BaseModel):
+    roles: list[str] = Field(..., description="Роли, которым разрешено permission (пустой список — никому)")
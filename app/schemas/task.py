@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, create_model, model_validator
 
 from app.models.task import TaskStatus, TaskKind
 
@@ -67,6 +67,24 @@ class TaskRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# Поля, доступные в sparse fieldset (?fields=...). Порядок = порядок TaskRead.
+TASK_READ_FIELDS: tuple[str, ...] = tuple(TaskRead.model_fields)
+
+
+# Sparse fieldset для списков задач (?fields=id,title,status): те же поля, что TaskRead,
+# но необязательные (кроме id). Сериализуется с exclude_unset: в ответе только запрошенные поля.
+TaskPartialRead = create_model(
+    "TaskPartialRead",
+    __doc__="Sparse fieldset задачи: только запрошенные поля TaskRead.",
+    id=(UUID, ...),
+    **{
+        name: (Optional[field.annotation], None)
+        for name, field in TaskRead.model_fields.items()
+        if name != "id"
+    },
+)
+
+
 class TaskBlockerRead(BaseModel):
     id: UUID
     title: str
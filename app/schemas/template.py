@@ -0,0 +1,51 @@
+# app/schemas/template.py
+
+from __future__ import annotations
+
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class TemplateNodeRead(BaseModel):
+    code: str
+    parent_code: str | None = None
+    title: str
+    description: str | None = None
+    priority: int = 0
+    kind: str
+    is_milestone: bool = False
+
+    model_config = {"from_attributes": True}
+
+
+class TemplateEdgeRead(BaseModel):
+    predecessor_code: str
+    successor_code: str
+
+
+class TemplateNodeChangeRead(BaseModel):
+    code: str
+    # какие поля node изменились (title, parent_code, ...)
+    fields: list[str]
+    node: TemplateNodeRead
+
+
+class TemplateDiffRead(BaseModel):
+    from_version_id: UUID
+    to_version_id: UUID
+
+    added_nodes: list[TemplateNodeRead]
+    removed_nodes: list[str]
+    changed_nodes: list[TemplateNodeChangeRead]
+
+    added_edges: list[TemplateEdgeRead]
+    removed_edges: list[TemplateEdgeRead]
+
+
+class TemplateImportResponse(BaseModel):
+    template_version_id: UUID
+    version: str
+    nodes: int
+    edges: int
+    activated: bool
@@ -0,0 +1,41 @@
+# app/schemas/timeline.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class TimelineEvent(BaseModel):
+    """Событие журнала изделия (GET /deliverables/{id}/timeline). Пустые поля не отдаются."""
+
+    kind: Literal["signoff", "qc_inspection", "fix", "transition"] = Field(
+        ...,
+        description="Источник: deliverable_signoffs / qc_inspections / fix-task / task_transitions",
+    )
+    id: UUID
+    created_at: datetime
+
+    task_id: UUID | None = Field(None, description="transition: задача; fix: сама fix-task")
+    actor_user_id: UUID | None = Field(
+        None, description="Кто: actor перехода / signed_off_by / inspector / created_by fix-task"
+    )
+
+    action: str | None = None
+    from_status: str | None = None
+    to_status: str | None = None
+
+    result: str | None = Field(None, description="signoff / qc_inspection: approved | rejected")
+    comment: str | None = Field(None, description="signoff: comment; qc_inspection: notes; fix: title")
+    payload: dict | None = None
+
+
+class TimelinePage(BaseModel):
+    items: list[TimelineEvent]
+    next_cursor: str | None = Field(
+        None,
+        description="Передать в ?cursor= за следующей страницей; null — событий больше нет",
+    )
@@ -0,0 +1,298 @@
+# app/services/deliverable_batch_bootstrap.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.deliverable import Deliverable, DeliverableStatus
+from app.models.project_template_node import ProjectTemplateNode
+from app.models.task import Task, TaskStatus, WorkKind
+from app.services.deliverable_bootstrap_service import BootstrapError, DeliverableBootstrapService
+from app.services.template_diff import TemplateNodeRow
+
+# Колонки tasks, которые заполняет bulk bootstrap (created_at/updated_at — DEFAULT now()).
+TASK_COLUMNS = (
+    "id",
+    "org_id",
+    "project_id",
+    "deliverable_id",
+    "created_by",
+    "title",
+    "description",
+    "priority",
+    "status",
+    "kind",
+    "work_kind",
+    "is_milestone",
+    "parent_task_id",
+    "template_node_code",
+    "row_version",
+)
+
+DEPENDENCY_COLUMNS = ("org_id", "project_id", "predecessor_id", "successor_id", "created_by", "created_at")
+
+_INSERT_DEPENDENCIES = text(
+    """
+    INSERT INTO task_dependencies (org_id, project_id, predecessor_id, successor_id, created_by, created_at)
+    VALUES (:org_id, :project_id, :predecessor_id, :successor_id, :created_by, :created_at)
+    """
+)
+
+
+class SerialConflict(BootstrapError):
+    """Серийник уже занят в org (или повторяется в запросе)."""
+
+    def __init__(self, serials: Sequence[str]):
+        self.serials = list(serials)
+        super().__init__(f"Serials already exist in org: {', '.join(self.serials[:20])}")
+
+
+def order_parents_first(nodes: Sequence[ProjectTemplateNode]) -> list[ProjectTemplateNode]:
+    """
+    Nodes в порядке «родитель раньше ребёнка».
+    Нужен для batched INSERT: FK parent_task_id проверяется в конце каждого statement'а,
+    а insertmanyvalues режет executemany на несколько statement'ов.
+    """
+    children: dict[str | None, list[ProjectTemplateNode]] = {}
+    for n in nodes:
+        children.setdefault(n.parent_code, []).append(n)
+
+    ordered: list[ProjectTemplateNode] = []
+    stack = list(reversed(children.get(None, [])))
+    while stack:
+        n = stack.pop()
+        ordered.append(n)
+        stack.extend(reversed(children.get(n.code, [])))
+
+    if len(ordered) != len(nodes):
+        raise BootstrapError("Template parent_code graph has a cycle")
+    return ordered
+
+
+@dataclass(frozen=True)
+class BatchDeliverable:
+    id: UUID
+    serial: str
+
+
+@dataclass
+class BatchBootstrapProgress:
+    template_version_id: UUID | None = None
+    deliverables: list[BatchDeliverable] = field(default_factory=list)
+    created_tasks: int = 0
+    created_dependencies: int = 0
+    chunks: int = 0
+
+
+class DeliverableBatchBootstrap:
+    """
+    Производственная партия: N deliverables одного типа + разворачивание активного шаблона
+    для всех сразу.
+
+    - шаблон читается один раз; UUID задач генерируются на клиенте, поэтому parent_task_id
+      и task_dependencies известны заранее — без flush и второго прохода UPDATE;
+    - deliverables / tasks / task_dependencies — по одному set-based statement'у на чанк
+      (COPY FROM STDIN, либо multi-row INSERT при use_copy=False);
+    - create_and_bootstrap() работает в транзакции вызывающего кода (API: одна партия — одна
+      транзакция), run() режет партию на чанки по chunk_size, каждый чанк — commit + on_progress.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        org_id: UUID,
+        project_id: UUID,
+        deliverable_type: str,
+        actor_user_id: UUID,
+        use_copy: bool = True,
+        chunk_size: int = 100,
+        on_progress: Callable[[BatchBootstrapProgress], None] | None = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+
+        self.db = db
+        self.org_id = org_id
+        self.project_id = project_id
+        self.deliverable_type = deliverable_type
+        self.actor_user_id = actor_user_id
+        self.use_copy = use_copy
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+
+        self._template: tuple[UUID, list[TemplateNodeRow], list[tuple[str, str]]] | None = None
+
+    # ---------- template ----------
+
+    def _load_template(self) -> tuple[UUID, list[TemplateNodeRow], list[tuple[str, str]]]:
+        if self._template is None:
+            tv, nodes, edges = DeliverableBootstrapService(self.db).load_active_template(
+                org_id=self.org_id, project_id=self.project_id
+            )
+            codes = {n.code for n in nodes}
+            for e in edges:
+                if e.predecessor_code not in codes:
+                    raise BootstrapError(f"Edge predecessor_code not found in nodes: {e.predecessor_code}")
+                if e.successor_code not in codes:
+                    raise BootstrapError(f"Edge successor_code not found in nodes: {e.successor_code}")
+                if e.predecessor_code == e.successor_code:
+                    raise BootstrapError("Template edge cannot be self-referential")
+            self._template = (
+                tv.id,
+                [
+                    TemplateNodeRow(
+                        code=n.code,
+                        parent_code=n.parent_code,
+                        title=n.title,
+                        description=n.description,
+                        priority=n.priority,
+                        kind=n.kind,
+                        is_milestone=bool(n.is_milestone),
+                    )
+                    for n in order_parents_first(nodes)
+                ],
+                [(e.predecessor_code, e.successor_code) for e in edges],
+            )
+        return self._template
+
+    # ---------- validation ----------
+
+    def _check_serials(self, serials: Sequence[str]) -> None:
+        seen: set[str] = set()
+        dupes: list[str] = []
+        for s in serials:
+            if s in seen:
+                dupes.append(s)
+            seen.add(s)
+        if dupes:
+            raise SerialConflict(dupes)
+
+        taken = self.db.execute(
+            select(Deliverable.serial).where(
+                Deliverable.org_id == self.org_id,
+                Deliverable.serial.in_(serials),
+            )
+        ).scalars().all()
+        if taken:
+            raise SerialConflict(sorted(taken))
+
+    # ---------- write ----------
+
+    def _copy(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+        # COPY идёт по тому же соединению (и в той же транзакции), что и Session
+        raw = self.db.connection().connection.driver_connection
+        with raw.cursor() as cur:
+            with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+    def _write_tasks(self, rows: list[tuple]) -> None:
+        if self.use_copy:
+            self._copy("tasks", TASK_COLUMNS, rows)
+        else:
+            self.db.execute(insert(Task), [dict(zip(TASK_COLUMNS, r)) for r in rows])
+
+    def _write_dependencies(self, rows: list[tuple]) -> None:
+        # task_dependencies не описана ORM-моделью (см. tasks.py) — только raw SQL
+        if not rows:
+            return
+        if self.use_copy:
+            self._copy("task_dependencies", DEPENDENCY_COLUMNS, rows)
+        else:
+            self.db.execute(_INSERT_DEPENDENCIES, [dict(zip(DEPENDENCY_COLUMNS, r)) for r in rows])
+
+    def create_and_bootstrap(self, serials: Sequence[str]) -> BatchBootstrapProgress:
+        """Одна партия в транзакции вызывающего кода. Коммит — на вызывающем."""
+        if not serials:
+            raise BootstrapError("serials must not be empty")
+
+        tv_id, nodes, edges = self._load_template()
+        self._check_serials(serials)
+
+        deliverables = [BatchDeliverable(id=uuid4(), serial=s) for s in serials]
+        now = datetime.now(timezone.utc)
+        task_rows: list[tuple] = []
+        dep_rows: list[tuple] = []
+
+        for d in deliverables:
+            task_id = {n.code: uuid4() for n in nodes}
+            for n in nodes:
+                task_rows.append(
+                    (
+                        task_id[n.code],
+                        self.org_id,
+                        self.project_id,
+                        d.id,
+                        self.actor_user_id,
+                        n.title,
+                        n.description,
+                        n.priority,
+                        TaskStatus.blocked.value,
+                        n.kind,
+                        WorkKind.work.value,
+                        n.is_milestone,
+                        task_id[n.parent_code] if n.parent_code else None,
+                        n.code,
+                        1,
+                    )
+                )
+            for pred, succ in edges:
+                dep_rows.append(
+                    (self.org_id, self.project_id, task_id[pred], task_id[succ], self.actor_user_id, now)
+                )
+
+        self.db.execute(
+            insert(Deliverable),
+            [
+                {
+                    "id": d.id,
+                    "org_id": self.org_id,
+                    "project_id": self.project_id,
+                    "template_version_id": tv_id,
+                    "deliverable_type": self.deliverable_type,
+                    "serial": d.serial,
+                    "status": DeliverableStatus.open.value,
+                    "created_by": self.actor_user_id,
+                }
+                for d in deliverables
+            ],
+        )
+        self._write_tasks(task_rows)
+        self._write_dependencies(dep_rows)
+
+        return BatchBootstrapProgress(
+            template_version_id=tv_id,
+            deliverables=deliverables,
+            created_tasks=len(task_rows),
+            created_dependencies=len(dep_rows),
+            chunks=1,
+        )
+
+    def run(self, serials: Sequence[str]) -> BatchBootstrapProgress:
+        """Партия чанками по chunk_size serials; каждый чанк — отдельная транзакция."""
+        total = BatchBootstrapProgress()
+
+        for start in range(0, len(serials), self.chunk_size):
+            chunk = serials[start : start + self.chunk_size]
+            try:
+                part = self.create_and_bootstrap(chunk)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            total.template_version_id = part.template_version_id
+            total.deliverables.extend(part.deliverables)
+            total.created_tasks += part.created_tasks
+            total.created_dependencies += part.created_dependencies
+            total.chunks += 1
+            if self.on_progress is not None:
+                self.on_progress(total)
+
+        return total
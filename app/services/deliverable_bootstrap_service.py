@@ -14,6 +14,9 @@ from app.models.project_template_edge import ProjectTemplateEdge
 from app.models.task import Task, TaskStatus, WorkKind
 
 
+BOOTSTRAP_ENGINES = ("python", "sql")
+
+
 class BootstrapError(ValueError):
     pass
 
@@ -25,14 +28,132 @@ class BootstrapResult:
     created_dependencies: int
 
 
+# Проверка шаблона на стороне БД: те же ошибки, что и у python-движка.
+_SQL_VALIDATE = text(
+    """
+    WITH n AS (
+        SELECT code, parent_code FROM project_template_nodes WHERE template_version_id = :tv
+    ),
+    e AS (
+        SELECT predecessor_code, successor_code FROM project_template_edges WHERE template_version_id = :tv
+    )
+    SELECT
+        (SELECT count(*) FROM n) AS nodes,
+        (SELECT min(c.code) FROM n c
+         WHERE c.parent_code IS NOT NULL AND NOT EXISTS (SELECT 1 FROM n p WHERE p.code = c.parent_code)) AS orphan,
+        (SELECT min(e.predecessor_code) FROM e
+         WHERE NOT EXISTS (SELECT 1 FROM n WHERE n.code = e.predecessor_code)) AS missing_pred,
+        (SELECT min(e.successor_code) FROM e
+         WHERE NOT EXISTS (SELECT 1 FROM n WHERE n.code = e.successor_code)) AS missing_succ,
+        EXISTS (SELECT 1 FROM e WHERE e.predecessor_code = e.successor_code) AS self_edge
+    """
+)
+
+# Разворачивание шаблона одним statement'ом:
+# nodes (MATERIALIZED — gen_random_uuid() вычисляется один раз на node) даёт mapping code -> uuid,
+# parent_task_id — self-join по parent_code, зависимости — join edges по обоим концам.
+# FK (parent_task_id, task_dependencies -> tasks) проверяются в конце statement'а, порядок не важен.
+_SQL_BOOTSTRAP = text(
+    """
+    WITH nodes AS MATERIALIZED (
+        SELECT gen_random_uuid() AS task_id, n.*
+        FROM project_template_nodes n
+        WHERE n.template_version_id = :tv
+    ),
+    ins_tasks AS (
+        INSERT INTO tasks (
+            id, org_id, project_id, deliverable_id, created_by,
+            title, description, priority, status, kind, work_kind, is_milestone,
+            parent_task_id, template_node_code, row_version
+        )
+        SELECT
+            c.task_id, :org_id, :project_id, :deliverable_id, :actor,
+            c.title, c.description, c.priority, 'blocked', c.kind, 'work'::work_kind, c.is_milestone,
+            p.task_id, c.code, 1
+        FROM nodes c
+        LEFT JOIN nodes p ON p.code = c.parent_code
+        RETURNING 1
+    ),
+    ins_deps AS (
+        INSERT INTO task_dependencies (org_id, project_id, predecessor_id, successor_id, created_by, created_at)
+        SELECT :org_id, :project_id, pn.task_id, sn.task_id, :actor, now()
+        FROM project_template_edges e
+        JOIN nodes pn ON pn.code = e.predecessor_code
+        JOIN nodes sn ON sn.code = e.successor_code
+        WHERE e.template_version_id = :tv
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM ins_tasks) AS tasks, (SELECT count(*) FROM ins_deps) AS deps
+    """
+)
+
+
 class DeliverableBootstrapService:
     """
     Разворачивает активную версию шаблона проекта в реальные задачи по deliverable.
     Делает это атомарно (в транзакции вызывающего кода).
+
+    engine:
+    - python — nodes/edges читаются в приложение, задачи создаются через ORM;
+    - sql    — INSERT ... SELECT целиком внутри Postgres (_SQL_BOOTSTRAP), по сети
+               уходят только счётчики: время не зависит от размера шаблона.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, *, engine: str = "python"):
+        if engine not in BOOTSTRAP_ENGINES:
+            raise ValueError(f"engine must be one of {BOOTSTRAP_ENGINES}")
         self.db = db
+        self.engine = engine
+
+    def active_template_version(self, *, org_id: UUID, project_id: UUID) -> ProjectTemplateVersion:
+        pt: ProjectTemplate | None = (
+            self.db.query(ProjectTemplate)
+            .filter(ProjectTemplate.project_id == project_id)
+            .first()
+        )
+        if not pt or pt.org_id != org_id:
+            raise BootstrapError("Project template not found for this project/org")
+        if not pt.active_template_version_id:
+            raise BootstrapError("Project has no active template version")
+
+        tv: ProjectTemplateVersion | None = self.db.get(ProjectTemplateVersion, pt.active_template_version_id)
+        if not tv or tv.org_id != org_id or tv.project_id != project_id:
+            raise BootstrapError("Active template version not found or mismatch")
+        return tv
+
+    def load_active_template(
+        self,
+        *,
+        org_id: UUID,
+        project_id: UUID,
+    ) -> tuple[ProjectTemplateVersion, list[ProjectTemplateNode], list[ProjectTemplateEdge]]:
+        """
+        Активная версия шаблона проекта + её nodes/edges.
+        Проверяет parent_code; edges проверяются при разворачивании.
+        """
+        tv = self.active_template_version(org_id=org_id, project_id=project_id)
+
+        nodes: list[ProjectTemplateNode] = (
+            self.db.query(ProjectTemplateNode)
+            .filter(ProjectTemplateNode.template_version_id == tv.id)
+            .all()
+        )
+        if not nodes:
+            raise BootstrapError("Template version has no nodes")
+
+        edges: list[ProjectTemplateEdge] = (
+            self.db.query(ProjectTemplateEdge)
+            .filter(ProjectTemplateEdge.template_version_id == tv.id)
+            .all()
+        )
+
+        # Небольшая проверка: parent_code должен существовать (если задан)
+        codes = {n.code for n in nodes}
+        for n in nodes:
+            if n.parent_code and n.parent_code not in codes:
+                raise BootstrapError(f"Template node '{n.code}' references missing parent_code '{n.parent_code}'")
+
+        return tv, nodes, edges
 
     def bootstrap(
         self,
@@ -62,46 +183,15 @@ class DeliverableBootstrapService:
         if existing_tasks:
             raise BootstrapError("Deliverable already has tasks; bootstrap is not allowed")
 
-        # 2) Получаем активную версию шаблона для проекта
-        pt: ProjectTemplate | None = (
-            self.db.query(ProjectTemplate)
-            .filter(ProjectTemplate.project_id == project_id)
-            .first()
-        )
-        if not pt or pt.org_id != org_id:
-            raise BootstrapError("Project template not found for this project/org")
-        if not pt.active_template_version_id:
-            raise BootstrapError("Project has no active template version")
+        if self.engine == "sql":
+            return self._bootstrap_sql(d, actor_user_id=actor_user_id)
 
-        tv: ProjectTemplateVersion | None = self.db.get(ProjectTemplateVersion, pt.active_template_version_id)
-        if not tv or tv.org_id != org_id or tv.project_id != project_id:
-            raise BootstrapError("Active template version not found or mismatch")
-
-        # 3) Загружаем nodes/edges шаблона
-        nodes: list[ProjectTemplateNode] = (
-            self.db.query(ProjectTemplateNode)
-            .filter(ProjectTemplateNode.template_version_id == tv.id)
-            .all()
-        )
-        if not nodes:
-            raise BootstrapError("Template version has no nodes")
-
-        edges: list[ProjectTemplateEdge] = (
-            self.db.query(ProjectTemplateEdge)
-            .filter(ProjectTemplateEdge.template_version_id == tv.id)
-            .all()
-        )
-
-        node_by_code = {n.code: n for n in nodes}
+        # 2-3) Активная версия шаблона + nodes/edges
+        tv, nodes, edges = self.load_active_template(org_id=org_id, project_id=project_id)
 
         # 4) Создаём Task для каждого node. Сначала без parent_task_id, потом проставим.
         task_by_code: dict[str, Task] = {}
 
-        # Небольшая проверка: parent_code должен существовать (если задан)
-        for n in nodes:
-            if n.parent_code and n.parent_code not in node_by_code:
-                raise BootstrapError(f"Template node '{n.code}' references missing parent_code '{n.parent_code}'")
-
         for n in nodes:
             t = Task(
                 org_id=org_id,
@@ -119,6 +209,7 @@ class DeliverableBootstrapService:
                 deliverable_id=deliverable_id,
                 is_milestone=bool(n.is_milestone),
                 parent_task_id=None,  # проставим ниже
+                template_node_code=n.code,
             )
             self.db.add(t)
             task_by_code[n.code] = t
@@ -179,3 +270,38 @@ class DeliverableBootstrapService:
             created_tasks=len(nodes),
             created_dependencies=created_deps,
         )
+
+    def _bootstrap_sql(self, d: Deliverable, *, actor_user_id: UUID) -> BootstrapResult:
+        tv = self.active_template_version(org_id=d.org_id, project_id=d.project_id)
+
+        check = self.db.execute(_SQL_VALIDATE, {"tv": tv.id}).one()
+        if not check.nodes:
+            raise BootstrapError("Template version has no nodes")
+        if check.orphan is not None:
+            raise BootstrapError(f"Template node '{check.orphan}' references missing parent_code")
+        if check.missing_pred is not None:
+            raise BootstrapError(f"Edge predecessor_code not found in nodes: {check.missing_pred}")
+        if check.missing_succ is not None:
+            raise BootstrapError(f"Edge successor_code not found in nodes: {check.missing_succ}")
+        if check.self_edge:
+            raise BootstrapError("Template edge cannot be self-referential")
+
+        counts = self.db.execute(
+            _SQL_BOOTSTRAP,
+            {
+                "tv": tv.id,
+                "org_id": d.org_id,
+                "project_id": d.project_id,
+                "deliverable_id": d.id,
+                "actor": actor_user_id,
+            },
+        ).one()
+
+        d.template_version_id = tv.id
+        self.db.add(d)
+
+        return BootstrapResult(
+            template_version_id=tv.id,
+            created_tasks=counts.tasks,
+            created_dependencies=counts.deps,
+        )
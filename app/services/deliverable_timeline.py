@@ -0,0 +1,228 @@
+# app/services/deliverable_timeline.py
+"""
+Единый журнал изделия (GET /deliverables/{id}/timeline): переходы задач изделия,
+production sign-off'ы, QC-инспекции и fix-task'и одним потоком по created_at.
+
+- каждый источник читается отдельным упорядоченным запросом ORDER BY created_at, id
+  LIMIT limit + 1 — по своему индексу:
+    deliverable_signoffs  (deliverable_id, created_at)
+    qc_inspections        (deliverable_id, created_at)
+    tasks (fix)           (deliverable_id, work_kind)
+    task_transitions / task_transitions_archive  (org_id, task_id, created_at), M11;
+  hot и archive tier — два отдельных потока, граница cursor'а отсекает старые партиции;
+- потоки сливаются heapq.merge (k-way merge), берётся limit + 1 событие: лишнее
+  означает, что есть следующая страница;
+- порядок полный: (created_at, kind, id). kind нужен для событий одной транзакции
+  с одинаковым now(): QC reject и его fix-task идут в порядке TIMELINE_KINDS;
+- cursor — (created_at, kind, id) последнего отданного события, base64url.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.deliverable_signoff import DeliverableSignoff
+from app.models.qc_inspection import QcInspection
+from app.models.task import Task, WorkKind
+from app.models.task_transition import TaskTransition, TaskTransitionArchive
+
+# Порядок событий с одинаковым created_at
+TIMELINE_KINDS = ("signoff", "qc_inspection", "fix", "transition")
+_RANK = {kind: rank for rank, kind in enumerate(TIMELINE_KINDS)}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TimelineCursor:
+    created_at: datetime
+    kind: str
+    id: UUID
+
+    def encode(self) -> str:
+        raw = f"{self.created_at.isoformat()}|{self.kind}|{self.id}".encode("ascii")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> TimelineCursor:
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("ascii")
+            created_at, kind, event_id = raw.split("|")
+            cursor = cls(datetime.fromisoformat(created_at), kind, UUID(event_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise InvalidCursor("invalid cursor") from e
+        if cursor.kind not in _RANK or cursor.created_at.tzinfo is None:
+            raise InvalidCursor("invalid cursor")
+        return cursor
+
+
+# (created_at, rank, id, event): сравнение heapq.merge не доходит до event — id уникален
+TimelineRow = tuple[datetime, int, UUID, dict[str, Any]]
+
+
+def _after(created_at_col, id_col, kind: str, cursor: TimelineCursor | None):
+    """Строки источника kind строго после cursor в порядке (created_at, kind, id)."""
+    if cursor is None:
+        return None
+    rank, cursor_rank = _RANK[kind], _RANK[cursor.kind]
+    if rank < cursor_rank:
+        return created_at_col > cursor.created_at
+    if rank > cursor_rank:
+        return created_at_col >= cursor.created_at
+    return tuple_(created_at_col, id_col) > tuple_(cursor.created_at, cursor.id)
+
+
+def _ordered(stmt, created_at_col, id_col, kind: str, cursor: TimelineCursor | None, limit: int):
+    after = _after(created_at_col, id_col, kind, cursor)
+    if after is not None:
+        stmt = stmt.where(after)
+    return stmt.order_by(created_at_col, id_col).limit(limit + 1)
+
+
+def _event(kind: str, event_id: UUID, created_at: datetime, **fields: Any) -> TimelineRow:
+    event = {"kind": kind, "id": str(event_id), "created_at": created_at.isoformat()}
+    event.update((k, v) for k, v in fields.items() if v is not None)
+    return created_at, _RANK[kind], event_id, event
+
+
+def _str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _signoffs(db: Session, deliverable_id: UUID, cursor, limit: int) -> list[TimelineRow]:
+    m = DeliverableSignoff
+    stmt = select(m.id, m.created_at, m.signed_off_by, m.result, m.comment).where(m.deliverable_id == deliverable_id)
+    return [
+        _event("signoff", i, at, actor_user_id=str(actor), result=result, comment=comment)
+        for i, at, actor, result, comment in db.execute(_ordered(stmt, m.created_at, m.id, "signoff", cursor, limit))
+    ]
+
+
+def _qc_inspections(db: Session, deliverable_id: UUID, cursor, limit: int) -> list[TimelineRow]:
+    m = QcInspection
+    stmt = select(m.id, m.created_at, m.inspector_user_id, m.responsible_user_id, m.result, m.notes).where(
+        m.deliverable_id == deliverable_id
+    )
+    return [
+        _event(
+            "qc_inspection",
+            i,
+            at,
+            actor_user_id=str(inspector),
+            result=result,
+            comment=notes,
+            payload={"responsible_user_id": str(responsible)} if responsible is not None else None,
+        )
+        for i, at, inspector, responsible, result, notes in db.execute(
+            _ordered(stmt, m.created_at, m.id, "qc_inspection", cursor, limit)
+        )
+    ]
+
+
+def _fixes(db: Session, deliverable_id: UUID, cursor, limit: int) -> list[TimelineRow]:
+    stmt = select(
+        Task.id,
+        Task.created_at,
+        Task.created_by,
+        Task.title,
+        Task.origin_task_id,
+        Task.qc_inspection_id,
+        Task.fix_source,
+        Task.fix_severity,
+        Task.fix_reason,
+    ).where(Task.deliverable_id == deliverable_id, Task.work_kind == WorkKind.fix)
+
+    rows = []
+    for i, at, created_by, title, origin, qc_id, source, severity, reason in db.execute(
+        _ordered(stmt, Task.created_at, Task.id, "fix", cursor, limit)
+    ):
+        payload = {
+            k: v
+            for k, v in (
+                ("origin_task_id", _str(origin)),
+                ("qc_inspection_id", _str(qc_id)),
+                ("fix_source", source.value if source is not None else None),
+                ("fix_severity", severity.value if severity is not None else None),
+                ("fix_reason", reason),
+            )
+            if v is not None
+        }
+        rows.append(_event("fix", i, at, task_id=str(i), actor_user_id=str(created_by), comment=title, payload=payload))
+    return rows
+
+
+def _transitions(db: Session, model, org_id: UUID, deliverable_id: UUID, cursor, limit: int) -> list[TimelineRow]:
+    task_ids = select(Task.id).where(Task.org_id == org_id, Task.deliverable_id == deliverable_id)
+    stmt = select(
+        model.id,
+        model.created_at,
+        model.task_id,
+        model.actor_user_id,
+        model.action,
+        model.from_status,
+        model.to_status,
+        model.payload,
+    ).where(model.org_id == org_id, model.task_id.in_(task_ids))
+    return [
+        _event(
+            "transition",
+            i,
+            at,
+            task_id=str(task_id),
+            actor_user_id=str(actor),
+            action=action,
+            from_status=from_status,
+            to_status=to_status,
+            payload=payload or None,
+        )
+        for i, at, task_id, actor, action, from_status, to_status, payload in db.execute(
+            _ordered(stmt, model.created_at, model.id, "transition", cursor, limit)
+        )
+    ]
+
+
+@dataclass(frozen=True)
+class TimelineResult:
+    items: list[dict[str, Any]]
+    next_cursor: str | None
+
+
+def deliverable_timeline(
+    db: Session,
+    *,
+    org_id: UUID,
+    deliverable_id: UUID,
+    cursor: TimelineCursor | None = None,
+    limit: int = 100,
+) -> TimelineResult:
+    """Страница журнала после cursor. Каждый источник читает не больше limit + 1 строк."""
+    if limit <= 0:
+        raise ValueError("limit must be > 0")
+
+    streams: list[list[TimelineRow]] = [
+        _signoffs(db, deliverable_id, cursor, limit),
+        _qc_inspections(db, deliverable_id, cursor, limit),
+        _fixes(db, deliverable_id, cursor, limit),
+        _transitions(db, TaskTransitionArchive, org_id, deliverable_id, cursor, limit),
+        _transitions(db, TaskTransition, org_id, deliverable_id, cursor, limit),
+    ]
+    merged = list(islice(heapq.merge(*streams, key=lambda row: row[:3]), limit + 1))
+
+    next_cursor = None
+    if len(merged) > limit:
+        merged = merged[:limit]
+        at, rank, event_id, _ = merged[-1]
+        next_cursor = TimelineCursor(at, TIMELINE_KINDS[rank], event_id).encode()
+    return TimelineResult(items=[row[3] for row in merged], next_cursor=next_cursor)
+
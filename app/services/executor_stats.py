@@ -0,0 +1,199 @@
+# app/services/executor_stats.py
+"""
+Дневной rollup по исполнителю (M13): выполненные задачи, минуты, вызванные fix-task.
+
+Пишется инкрементами в транзакции бизнес-операции (write-through):
+- apply_task_transition(-> done)  -> record_completion (кредит task.assigned_to);
+- TaskFixService.create_fix       -> record_fix_caused (origin_task.assigned_to,
+  иначе qc_inspections.responsible_user_id).
+
+Transition и инкремент коммитятся вместе, поэтому отдельный водяной знак не нужен.
+rebuild_executor_stats — ремонт/бэкфилл периода из исходных таблиц.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.executor_stats import ExecutorStatsDaily
+from app.models.qc_inspection import QcInspection
+from app.models.task import FixSeverity, Task, WorkKind
+
+_COUNTERS = (
+    "completed",
+    "completed_fix",
+    "minutes_spent",
+    "fixes_caused",
+    "fixes_caused_minor",
+    "fixes_caused_major",
+    "fixes_caused_critical",
+)
+
+_SEVERITY_COLUMN = {
+    FixSeverity.minor: "fixes_caused_minor",
+    FixSeverity.major: "fixes_caused_major",
+    FixSeverity.critical: "fixes_caused_critical",
+}
+
+
+def _day(at: datetime | None) -> date:
+    # день — по UTC, как и в task_metrics_daily (M12)
+    return (at or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+
+
+def _bump(db: Session, *, org_id: UUID, user_id: UUID, day: date, **deltas: int) -> None:
+    """Атомарный инкремент счётчиков строки (org_id, user_id, day)."""
+    table = ExecutorStatsDaily.__table__
+    row = {c: 0 for c in _COUNTERS}
+    row.update(deltas)
+    stmt = pg_insert(ExecutorStatsDaily).values(org_id=org_id, user_id=user_id, day=day, **row)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["org_id", "user_id", "day"],
+        set_={c: table.c[c] + stmt.excluded[c] for c in deltas},
+    )
+    db.execute(stmt)
+
+
+def record_completion(db: Session, task: Task, *, at: datetime | None = None) -> None:
+    """Задача перешла в done: кредит исполнителю."""
+    if task.assigned_to is None:
+        return
+
+    _bump(
+        db,
+        org_id=task.org_id,
+        user_id=task.assigned_to,
+        day=_day(at),
+        completed=1,
+        completed_fix=1 if WorkKind(task.work_kind) == WorkKind.fix else 0,
+        minutes_spent=task.minutes_spent or 0,
+    )
+
+
+def fix_responsible_user_id(db: Session, fix: Task) -> UUID | None:
+    """Кто «вызвал» fix-task: исполнитель origin_task, иначе responsible из QC."""
+    if fix.origin_task_id is not None:
+        origin = db.get(Task, fix.origin_task_id)
+        if origin is not None and origin.assigned_to is not None:
+            return origin.assigned_to
+
+    if fix.qc_inspection_id is not None:
+        qc = db.get(QcInspection, fix.qc_inspection_id)
+        if qc is not None:
+            return qc.responsible_user_id
+
+    return None
+
+
+def record_fix_caused(db: Session, fix: Task, *, at: datetime | None = None) -> None:
+    """Создан fix-task: счётчик (и severity) ответственному исполнителю."""
+    user_id = fix_responsible_user_id(db, fix)
+    if user_id is None:
+        return
+
+    severity = FixSeverity(fix.fix_severity) if fix.fix_severity is not None else FixSeverity.major
+    _bump(
+        db,
+        org_id=fix.org_id,
+        user_id=user_id,
+        day=_day(at),
+        fixes_caused=1,
+        **{_SEVERITY_COLUMN[severity]: 1},
+    )
+
+
+# ---------- repair / backfill ----------
+
+# Completion: transition -> done (hot + archive tier) + текущий assigned_to задачи
+# (done — терминальный статус, исполнитель после него не меняется).
+_REBUILD_COMPLETIONS = text(
+    """
+    INSERT INTO executor_stats_daily (org_id, user_id, day, completed, completed_fix, minutes_spent)
+    SELECT
+        t.org_id, t.assigned_to, (tr.created_at AT TIME ZONE 'UTC')::date,
+        count(*),
+        count(*) FILTER (WHERE t.work_kind::text = 'fix'),
+        COALESCE(sum(t.minutes_spent), 0)
+    FROM (
+        SELECT org_id, task_id, created_at FROM task_transitions
+        WHERE org_id = :org_id AND to_status = 'done' AND from_status <> 'done'
+          AND created_at >= :lo AND created_at < :hi
+        UNION ALL
+        SELECT org_id, task_id, created_at FROM task_transitions_archive
+        WHERE org_id = :org_id AND to_status = 'done' AND from_status <> 'done'
+          AND created_at >= :lo AND created_at < :hi
+    ) tr
+    JOIN tasks t ON t.id = tr.task_id
+    WHERE t.assigned_to IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (org_id, user_id, day) DO UPDATE SET
+        completed     = executor_stats_daily.completed + EXCLUDED.completed,
+        completed_fix = executor_stats_daily.completed_fix + EXCLUDED.completed_fix,
+        minutes_spent = executor_stats_daily.minutes_spent + EXCLUDED.minutes_spent
+    """
+)
+
+_REBUILD_FIXES = text(
+    """
+    INSERT INTO executor_stats_daily (
+        org_id, user_id, day,
+        fixes_caused, fixes_caused_minor, fixes_caused_major, fixes_caused_critical
+    )
+    SELECT
+        f.org_id, COALESCE(o.assigned_to, q.responsible_user_id), (f.created_at AT TIME ZONE 'UTC')::date,
+        count(*),
+        count(*) FILTER (WHERE f.fix_severity::text = 'minor'),
+        count(*) FILTER (WHERE COALESCE(f.fix_severity::text, 'major') = 'major'),
+        count(*) FILTER (WHERE f.fix_severity::text = 'critical')
+    FROM tasks f
+    LEFT JOIN tasks o ON o.id = f.origin_task_id
+    LEFT JOIN qc_inspections q ON q.id = f.qc_inspection_id
+    WHERE f.org_id = :org_id
+      AND f.work_kind::text = 'fix'
+      AND f.created_at >= :lo AND f.created_at < :hi
+      AND COALESCE(o.assigned_to, q.responsible_user_id) IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (org_id, user_id, day) DO UPDATE SET
+        fixes_caused          = executor_stats_daily.fixes_caused + EXCLUDED.fixes_caused,
+        fixes_caused_minor    = executor_stats_daily.fixes_caused_minor + EXCLUDED.fixes_caused_minor,
+        fixes_caused_major    = executor_stats_daily.fixes_caused_major + EXCLUDED.fixes_caused_major,
+        fixes_caused_critical = executor_stats_daily.fixes_caused_critical + EXCLUDED.fixes_caused_critical
+    """
+)
+
+
+@dataclass
+class ExecutorStatsRebuildResult:
+    deleted: int = 0
+    rows: int = 0
+
+
+def rebuild_executor_stats(db: Session, *, org_id: UUID, date_from: date, date_to: date) -> ExecutorStatsRebuildResult:
+    """
+    Пересчитывает executor_stats_daily за [date_from, date_to] (UTC) из tasks / task_transitions.
+    Одна транзакция: отчёт не видит «половину» периода. Коммит — на вызывающем.
+    """
+    if date_from > date_to:
+        raise ValueError("date_from must be <= date_to")
+
+    lo = datetime.combine(date_from, time.min, tzinfo=timezone.utc)
+    hi = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    params = {"org_id": org_id, "lo": lo, "hi": hi}
+
+    result = ExecutorStatsRebuildResult()
+    result.deleted = db.execute(
+        text("DELETE FROM executor_stats_daily WHERE org_id = :org_id AND day >= :d_from AND day <= :d_to"),
+        {"org_id": org_id, "d_from": date_from, "d_to": date_to},
+    ).rowcount
+    db.execute(_REBUILD_COMPLETIONS, params)
+    db.execute(_REBUILD_FIXES, params)
+    result.rows = db.execute(
+        text("SELECT count(*) FROM executor_stats_daily WHERE org_id = :org_id AND day >= :d_from AND day <= :d_to"),
+        {"org_id": org_id, "d_from": date_from, "d_to": date_to},
+    ).scalar_one()
+    return result
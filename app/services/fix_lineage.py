@@ -0,0 +1,168 @@
+# app/services/fix_lineage.py
+"""
+Дерево доработок (fix lineage) и rework amplification проекта.
+
+Fix-task ссылается на исходную задачу через origin_task_id, фикс может породить
+следующий фикс — получается дерево с корнем в задаче без origin_task_id (обычная
+задача или fix-task по изделию / QC reject). Оба запроса — один recursive CTE
+по индексу ix_tasks_origin_task_id.
+
+Дерево кэшируется по корню (Cache.fix_lineage_key). Состав дерева и minutes_spent
+меняются созданием fix-task (invalidate_fix_lineage после COMMIT) и удалением задачи,
+title — PATCH /tasks/{id}; оба endpoint'а сбрасывают ключ корня. Статус узлов в дерево
+не входит — его меняет каждый переход, и он устаревал бы в кэше.
+"""
+from __future__ import annotations
+
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import Cache
+from app.models.task import Task
+
+# Страховка recursive CTE от цикла в origin_task_id (в норме глубина 1-3)
+LINEAGE_MAX_DEPTH = 64
+
+_ROOT_SQL = text(
+    """
+    WITH RECURSIVE up AS (
+        SELECT id, origin_task_id, 0 AS hops
+        FROM tasks
+        WHERE org_id = :org_id AND id = :task_id
+      UNION ALL
+        SELECT t.id, t.origin_task_id, up.hops + 1
+        FROM up
+        JOIN tasks t ON t.id = up.origin_task_id AND t.org_id = :org_id
+        WHERE up.hops < :max_depth
+    )
+    SELECT id FROM up WHERE origin_task_id IS NULL
+    """
+)
+
+_TREE_SQL = text(
+    """
+    WITH RECURSIVE tree AS (
+        SELECT id, origin_task_id, qc_inspection_id, title, work_kind::text AS work_kind,
+               fix_source::text AS fix_source, fix_severity::text AS fix_severity,
+               minutes_spent, created_at, 0 AS depth
+        FROM tasks
+        WHERE org_id = :org_id AND id = :root_id
+      UNION ALL
+        SELECT t.id, t.origin_task_id, t.qc_inspection_id, t.title, t.work_kind::text,
+               t.fix_source::text, t.fix_severity::text,
+               t.minutes_spent, t.created_at, tree.depth + 1
+        FROM tree
+        JOIN tasks t ON t.origin_task_id = tree.id AND t.org_id = :org_id
+        WHERE tree.depth < :max_depth
+    )
+    SELECT id, origin_task_id, qc_inspection_id, depth, title, work_kind,
+           fix_source, fix_severity, minutes_spent, created_at
+    FROM tree
+    ORDER BY depth, created_at, id
+    """
+)
+
+
+def fix_lineage_root(db: Session, *, org_id: UUID, task_id: UUID) -> UUID | None:
+    """Корень дерева задачи (сама задача, если у неё нет origin_task_id). None — задачи нет в org."""
+    return db.execute(
+        _ROOT_SQL, {"org_id": org_id, "task_id": task_id, "max_depth": LINEAGE_MAX_DEPTH}
+    ).scalar_one_or_none()
+
+
+def fix_lineage(db: Session, *, org_id: UUID, root_id: UUID) -> dict[str, Any]:
+    """Дерево от root_id в форме FixLineage (узлы — плоским списком с origin_task_id)."""
+    nodes = [
+        dict(row)
+        for row in db.execute(
+            _TREE_SQL, {"org_id": org_id, "root_id": root_id, "max_depth": LINEAGE_MAX_DEPTH}
+        ).mappings()
+    ]
+    return {
+        "root_task_id": root_id,
+        "fix_count": sum(1 for n in nodes if n["work_kind"] == "fix"),
+        "max_depth": max((n["depth"] for n in nodes), default=0),
+        "total_minutes_spent": sum(n["minutes_spent"] or 0 for n in nodes),
+        "nodes": nodes,
+    }
+
+
+def invalidate_fix_lineage(db: Session, cache: Cache, fix: Task) -> None:
+    """После COMMIT нового fix-task: сбросить закэшированное дерево его корня."""
+    if not cache.enabled or fix.origin_task_id is None:
+        # фикс без origin — новый корень, дерева под ним в кэше ещё не было
+        return
+    root_id = fix_lineage_root(db, org_id=fix.org_id, task_id=fix.origin_task_id)
+    if root_id is not None:
+        cache.delete(Cache.fix_lineage_key(fix.org_id, root_id))
+
+
+# ---------- project rework stats ----------
+
+# Один проход: lineage обходит все деревья проекта, остальное — агрегаты по материализованному CTE
+_REWORK_STATS_SQL = text(
+    """
+    WITH RECURSIVE lineage AS (
+        SELECT id AS root_id, id, work_kind::text AS work_kind, fix_source::text AS fix_source,
+               fix_severity::text AS fix_severity, minutes_spent, 0 AS depth, false AS parent_fix
+        FROM tasks
+        WHERE org_id = :org_id AND project_id = :project_id AND origin_task_id IS NULL
+      UNION ALL
+        SELECT l.root_id, t.id, t.work_kind::text, t.fix_source::text,
+               t.fix_severity::text, t.minutes_spent, l.depth + 1, l.work_kind = 'fix'
+        FROM lineage l
+        JOIN tasks t ON t.origin_task_id = l.id AND t.org_id = :org_id
+        WHERE l.depth < :max_depth
+    ),
+    per_root AS (
+        SELECT root_id,
+               bool_or(depth = 0 AND work_kind = 'work') AS is_work,
+               count(*) FILTER (WHERE work_kind = 'fix') AS fixes,
+               max(depth) AS depth
+        FROM lineage
+        GROUP BY root_id
+    )
+    SELECT r.work_tasks, r.root_fixes, r.reworked_roots, r.fixes_total, r.max_depth, r.max_fixes_per_root,
+           f.nested_fixes, f.fix_minutes_total, s.by_source, v.by_severity
+    FROM (
+        SELECT count(*) FILTER (WHERE is_work) AS work_tasks,
+               count(*) FILTER (WHERE NOT is_work) AS root_fixes,
+               count(*) FILTER (WHERE fixes > 0) AS reworked_roots,
+               COALESCE(sum(fixes), 0) AS fixes_total,
+               COALESCE(max(depth), 0) AS max_depth,
+               COALESCE(max(fixes), 0) AS max_fixes_per_root
+        FROM per_root
+    ) r,
+    (
+        SELECT count(*) FILTER (WHERE work_kind = 'fix' AND parent_fix) AS nested_fixes,
+               COALESCE(sum(minutes_spent) FILTER (WHERE work_kind = 'fix'), 0) AS fix_minutes_total
+        FROM lineage
+    ) f,
+    (
+        SELECT COALESCE(jsonb_object_agg(fix_source, n), '{}'::jsonb) AS by_source
+        FROM (SELECT fix_source, count(*) AS n FROM lineage WHERE work_kind = 'fix' GROUP BY fix_source) x
+    ) s,
+    (
+        SELECT COALESCE(jsonb_object_agg(fix_severity, n), '{}'::jsonb) AS by_severity
+        FROM (SELECT fix_severity, count(*) AS n FROM lineage WHERE work_kind = 'fix' GROUP BY fix_severity) x
+    ) v
+    """
+)
+
+
+def rework_stats(db: Session, *, org_id: UUID, project_id: UUID) -> dict[str, Any]:
+    """Rework amplification проекта в форме ReworkStats."""
+    row = db.execute(
+        _REWORK_STATS_SQL, {"org_id": org_id, "project_id": project_id, "max_depth": LINEAGE_MAX_DEPTH}
+    ).mappings().one()
+
+    stats = dict(row)
+    stats["fix_minutes_total"] = int(stats["fix_minutes_total"])
+    stats["fixes_total"] = int(stats["fixes_total"])
+    stats["rework_ratio"] = stats["fixes_total"] / stats["work_tasks"] if stats["work_tasks"] else 0.0
+    stats["amplification"] = stats["fixes_total"] / stats["reworked_roots"] if stats["reworked_roots"] else 0.0
+    stats["project_id"] = project_id
+    return stats
@@ -0,0 +1,200 @@
+# app/services/idempotency.py
+"""
+Idempotency-ключи write-endpoint'ов (idempotency_keys, M16).
+
+Transitions держат свою строгую idempotency (task_transition_keys, M11). Остальные
+write-endpoint'ы (create_task, create_deliverable, signoffs, qc_decision, report-fix,
+fix-tasks, allocations/batch) сохраняют готовый ответ по (org_id, endpoint, key):
+повтор с тем же ключом получает сохранённый ответ без повторного выполнения handler'а.
+
+- запросы с одним ключом сериализуются advisory-lock'ом транзакции (begin): повтор,
+  пришедший пока первый запрос ещё выполняется, ждёт его COMMIT и отдаёт сохранённый ответ,
+  а не упирается в unique-индекс операции (serial изделия, одна QC-инспекция, ...);
+- ключ пишется в транзакции операции: INSERT ... ON CONFLICT DO NOTHING — страховка на случай,
+  если ключ всё же занят; проигравший откатывает свою работу и отдаёт ответ победителя;
+- сохраняются только успешные ответы: ошибка откатывает и операцию, и ключ, повтор выполнится заново;
+- front cache — in-process LRU+TTL: строки неизменяемы до удаления sweeper'ом, поэтому
+  кэш не нужно инвалидировать (TTL кэша << retention);
+- старые ключи удаляет IdempotencySweeper (фоновый поток worker'а) или scripts/idempotency_sweep.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, InMemoryCacheBackend
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: bytes
+
+    def encode(self) -> bytes:
+        return f"{self.status_code} {self.request_hash}\n".encode("ascii") + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes) -> StoredResponse:
+        head, _, body = raw.partition(b"\n")
+        status_code, request_hash = head.decode("ascii").split(" ", 1)
+        return cls(request_hash=request_hash, status_code=int(status_code), body=body)
+
+
+def request_hash(payload: Any) -> str:
+    """Отпечаток запроса (path params + тело в JSON-режиме), не зависящий от порядка ключей."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+_LOCK_SQL = text("SELECT pg_advisory_xact_lock(hashtextextended(:lock_key, 0))")
+
+
+class IdempotencyStore:
+    def __init__(self, *, front: CacheBackend, front_ttl_seconds: int):
+        self.front = front
+        self.front_ttl_seconds = front_ttl_seconds
+
+    @staticmethod
+    def _front_key(org_id: UUID, endpoint: str, key: str) -> str:
+        return f"{org_id}|{endpoint}|{key}"
+
+    def lock(self, db: Session, *, org_id: UUID, endpoint: str, key: str) -> None:
+        """До конца транзакции: параллельный запрос с тем же ключом ждёт здесь."""
+        db.execute(_LOCK_SQL, {"lock_key": self._front_key(org_id, endpoint, key)})
+
+    def get(self, db: Session, *, org_id: UUID, endpoint: str, key: str) -> StoredResponse | None:
+        front_key = self._front_key(org_id, endpoint, key)
+        raw = self.front.get(front_key)
+        if raw is not None:
+            return StoredResponse.decode(raw)
+
+        row = db.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body).where(
+                IdempotencyKey.org_id == org_id,
+                IdempotencyKey.endpoint == endpoint,
+                IdempotencyKey.key == key,
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+
+        stored = StoredResponse(request_hash=row[0], status_code=row[1], body=bytes(row[2]))
+        self.front.set(front_key, stored.encode(), self.front_ttl_seconds)
+        return stored
+
+    def save(self, db: Session, *, org_id: UUID, endpoint: str, key: str, stored: StoredResponse) -> bool:
+        """
+        Записать ключ в текущей транзакции. False — ключ уже занят (в т.ч. параллельным
+        запросом, который успел закоммитить): вызывающий откатывает свою работу.
+        """
+        inserted = db.execute(
+            pg_insert(IdempotencyKey)
+            .values(
+                org_id=org_id,
+                endpoint=endpoint,
+                key=key,
+                request_hash=stored.request_hash,
+                status_code=stored.status_code,
+                response_body=stored.body,
+            )
+            .on_conflict_do_nothing(index_elements=["org_id", "endpoint", "key"])
+            .returning(IdempotencyKey.key)
+        ).first()
+        return inserted is not None
+
+    def remember(self, *, org_id: UUID, endpoint: str, key: str, stored: StoredResponse) -> None:
+        """После COMMIT: следующий повтор в этом worker'е не идёт в БД."""
+        self.front.set(self._front_key(org_id, endpoint, key), stored.encode(), self.front_ttl_seconds)
+
+
+idempotency_store = IdempotencyStore(
+    front=InMemoryCacheBackend(max_entries=10_000),
+    front_ttl_seconds=settings.idempotency_cache_ttl_seconds,
+)
+
+
+# ---------- sweeper ----------
+
+# SKIP LOCKED: sweeper'ы нескольких worker'ов не ждут друг друга
+_SWEEP_SQL = text(
+    """
+    DELETE FROM idempotency_keys
+    WHERE ctid IN (
+        SELECT ctid FROM idempotency_keys
+        WHERE created_at < :cutoff
+        ORDER BY created_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    """
+)
+
+
+def sweep_idempotency_keys(db: Session, *, older_than: datetime, batch_size: int = 1000) -> int:
+    """Удалить ключи старше older_than пачками (коммит на пачку). Возвращает число удалённых."""
+    if batch_size <= 0:
+        raise ValueError("batch_size must be > 0")
+
+    total = 0
+    while True:
+        deleted = db.execute(_SWEEP_SQL, {"cutoff": older_than, "batch_size": batch_size}).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def retention_cutoff(now: datetime | None = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(hours=settings.idempotency_retention_hours)
+
+
+class IdempotencySweeper:
+    """Фоновый поток worker'а: раз в interval_seconds удаляет ключи старше retention."""
+
+    def __init__(self, *, session_factory: Callable[[], Session], interval_seconds: float):
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be > 0")
+
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sweep_once(self) -> int:
+        with self.session_factory() as db:
+            deleted = sweep_idempotency_keys(db, older_than=retention_cutoff())
+        if deleted:
+            log.info("idempotency keys swept: %d", deleted)
+        return deleted
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="idempotency-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sweep_once()
+            except Exception as e:
+                log.warning("idempotency sweep failed: %s", e)
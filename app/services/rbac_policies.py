@@ -0,0 +1,185 @@
+# app/services/rbac_policies.py
+"""
+RBAC-политики org из БД (rbac_policies, M15) поверх статического ALLOW.
+
+Проверки (app/core/rbac.py) всегда идут по in-memory CompiledPolicy worker'а — ноль
+запросов на запрос. Политика перечитывается целиком:
+- по NOTIFY rbac_policies (триггер на rbac_policies, доставляется после COMMIT);
+- страховочно — если rbac_policy_version в БД ушла вперёд (опрос раз в poll_seconds,
+  а также сразу после (пере)подключения LISTEN-соединения).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Iterable
+from uuid import UUID
+
+import psycopg
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.rbac import ALLOW, CompiledPolicy, current_policy, load_policy
+from app.models.rbac_policy import RbacPolicy
+
+log = logging.getLogger(__name__)
+
+RBAC_NOTIFY_CHANNEL = "rbac_policies"
+
+# Не переопределяются per-org: иначе org может отобрать у себя администрирование RBAC
+LOCKED_PERMISSIONS = frozenset({"org.rbac_manage"})
+
+_VERSION_SQL = text("SELECT version FROM rbac_policy_version")
+
+
+class UnknownPermission(ValueError):
+    pass
+
+
+class LockedPermission(ValueError):
+    pass
+
+
+def policy_version(db: Session) -> int:
+    return int(db.execute(_VERSION_SQL).scalar_one())
+
+
+def load_org_overrides(db: Session) -> tuple[int, dict[UUID, dict[str, list[str]]]]:
+    """
+    (версия, org_id -> {permission: roles}). Версию читаем ДО строк: если между запросами
+    кто-то закоммитит изменение, строки окажутся новее версии и следующий опрос
+    просто перечитает политику ещё раз (наоборот было бы опасно).
+    """
+    version = policy_version(db)
+    overrides: dict[UUID, dict[str, list[str]]] = {}
+    for org_id, permission, roles in db.execute(
+        select(RbacPolicy.org_id, RbacPolicy.permission, RbacPolicy.roles)
+    ):
+        overrides.setdefault(org_id, {})[permission] = list(roles)
+    return version, overrides
+
+
+def reload_policy(db: Session) -> CompiledPolicy:
+    version, overrides = load_org_overrides(db)
+    return load_policy(ALLOW, overrides, version=version)
+
+
+# ---------- writes (API) ----------
+
+
+def set_org_permission(
+    db: Session,
+    *,
+    org_id: UUID,
+    permission: str,
+    roles: Iterable[str],
+    actor_user_id: UUID,
+) -> None:
+    """Переопределить роли permission для org. Транзакция — вызывающего (триггер шлёт NOTIFY)."""
+    if permission not in ALLOW:
+        raise UnknownPermission(f"Unknown permission: {permission}")
+    if permission in LOCKED_PERMISSIONS:
+        raise LockedPermission(f"Permission cannot be overridden: {permission}")
+    roles = sorted({r.strip() for r in roles if r.strip()})
+    db.execute(
+        pg_insert(RbacPolicy)
+        .values(org_id=org_id, permission=permission, roles=roles, updated_by=actor_user_id)
+        .on_conflict_do_update(
+            index_elements=[RbacPolicy.org_id, RbacPolicy.permission],
+            set_={"roles": roles, "updated_by": actor_user_id, "updated_at": text("now()")},
+        )
+    )
+
+
+def reset_org_permission(db: Session, *, org_id: UUID, permission: str) -> bool:
+    """Вернуть permission org к ALLOW. True — переопределение было."""
+    return bool(
+        db.execute(
+            delete(RbacPolicy).where(RbacPolicy.org_id == org_id, RbacPolicy.permission == permission)
+        ).rowcount
+    )
+
+
+# ---------- worker refresher ----------
+
+
+def _listen_conninfo(database_url: str) -> str:
+    # psycopg принимает libpq URL, без "+psycopg" из SQLAlchemy
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class RbacPolicyRefresher:
+    """
+    Фоновый поток worker'а: отдельное autocommit-соединение с LISTEN rbac_policies.
+
+    - start() загружает политику синхронно (worker не принимает запросы со старой политикой);
+      если БД недоступна — остаёмся на ALLOW и догоняем в фоне;
+    - NOTIFY с версией новее текущей -> reload;
+    - раз в poll_seconds (и после переподключения) — сверка rbac_policy_version.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        database_url: str,
+        poll_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if poll_seconds <= 0:
+            raise ValueError("poll_seconds must be > 0")
+
+        self.session_factory = session_factory
+        self.conninfo = _listen_conninfo(database_url)
+        self.poll_seconds = poll_seconds
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def refresh(self, *, min_version: int | None = None) -> bool:
+        """Перечитать политику, если БД новее. True — политика заменена."""
+        current = current_policy().version
+        if min_version is not None and min_version <= current:
+            return False
+        with self.session_factory() as db:
+            if policy_version(db) == current:
+                return False
+            policy = reload_policy(db)
+        log.info("rbac policy reloaded: version=%s orgs=%d", policy.version, len(policy.orgs))
+        return True
+
+    def start(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            log.warning("rbac policy initial load failed, using static ALLOW: %s", e)
+        self._thread = threading.Thread(target=self._run, name="rbac-policy-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {RBAC_NOTIFY_CHANNEL}")
+                    # NOTIFY, пришедшие пока соединения не было, потеряны — сверяем версию
+                    self.refresh()
+                    polled_at = self._clock()
+                    while not self._stop.is_set():
+                        # короткий timeout: stop() не ждёт целый poll_seconds
+                        for notify in conn.notifies(timeout=1.0):
+                            payload = notify.payload
+                            self.refresh(min_version=int(payload) if payload.isdigit() else None)
+                        if self._clock() - polled_at >= self.poll_seconds:
+                            self.refresh()
+                            polled_at = self._clock()
+            except Exception as e:
+                log.warning("rbac policy listener failed, reconnecting: %s", e)
+                self._stop.wait(self.poll_seconds)
@@ -0,0 +1,159 @@
+# app/services/shift_release_job.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import Cache
+from app.fsm.task_fsm import Action, TransitionNotAllowed
+from app.models.task import Task, TaskStatus
+from app.services.task_transition_service import (
+    IdempotencyConflict,
+    VersionConflict,
+    apply_task_transition,
+)
+
+# Статусы, которые shift_release возвращает в пул (см. TRANSITIONS в task_fsm.py).
+RELEASABLE_STATUSES = (TaskStatus.assigned.value, TaskStatus.in_progress.value)
+
+# Namespace для детерминированных client_event_id (uuid5).
+SHIFT_RELEASE_NAMESPACE = uuid5(NAMESPACE_URL, "planner:shift_release")
+
+
+def shift_release_event_id(*, shift_key: str, task_id: UUID, row_version: int) -> UUID:
+    """
+    Детерминированный client_event_id для shift_release.
+
+    row_version входит в ключ: повторный запуск той же смены (после падения посреди чанка)
+    попадает в idempotency, а задача, которую за смену успели взять снова, получит новый id.
+    """
+    return uuid5(SHIFT_RELEASE_NAMESPACE, f"{shift_key}:{task_id}:{row_version}")
+
+
+@dataclass
+class ShiftReleaseProgress:
+    scanned: int = 0
+    released: int = 0
+    skipped: int = 0
+    chunks: int = 0
+
+
+class ShiftReleaseJob:
+    """
+    Конец смены: возвращает в пул все assigned/in_progress задачи проекта.
+
+    Выборка — весь проект, а не распределения смены: task_allocations не хранит
+    work_date / shift_code (см. TaskAllocationService.create_batch). work_date и shift_code
+    идут только в ключ client_event_id; сузить выборку можно assigned_before.
+
+    - выборка keyset-чанками по tasks.id (частичный индекс ix_tasks_releasable)
+    - каждый чанк — отдельная транзакция, каждая задача — SAVEPOINT
+      (конфликт версии по одной задаче не откатывает весь чанк)
+    - переход идёт через apply_task_transition (FSM + task_transitions + idempotency)
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        org_id: UUID,
+        project_id: UUID,
+        work_date: date,
+        shift_code: str,
+        actor_user_id: UUID,
+        assigned_before: datetime | None = None,
+        chunk_size: int = 500,
+        on_progress: Callable[[ShiftReleaseProgress], None] | None = None,
+        cache: Cache | None = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+
+        self.db = db
+        self.org_id = org_id
+        self.project_id = project_id
+        self.shift_key = f"{work_date.isoformat()}:{shift_code}"
+        self.actor_user_id = actor_user_id
+        self.assigned_before = assigned_before
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.cache = cache
+
+    def _next_chunk(self, after_id: UUID | None) -> list[tuple[UUID, int]]:
+        stmt = (
+            select(Task.id, Task.row_version)
+            .where(
+                Task.org_id == self.org_id,
+                Task.project_id == self.project_id,
+                Task.status.in_(RELEASABLE_STATUSES),
+            )
+            .order_by(Task.id.asc())
+            .limit(self.chunk_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Task.id > after_id)
+        if self.assigned_before is not None:
+            stmt = stmt.where(Task.assigned_at < self.assigned_before)
+
+        return [(task_id, row_version) for task_id, row_version in self.db.execute(stmt).all()]
+
+    def _release_one(self, task_id: UUID, row_version: int) -> bool:
+        try:
+            with self.db.begin_nested():
+                apply_task_transition(
+                    self.db,
+                    org_id=self.org_id,
+                    actor_user_id=self.actor_user_id,
+                    task_id=task_id,
+                    action=Action.SHIFT_RELEASE.value,
+                    expected_row_version=row_version,
+                    payload={},
+                    client_event_id=shift_release_event_id(
+                        shift_key=self.shift_key,
+                        task_id=task_id,
+                        row_version=row_version,
+                    ),
+                )
+        except (VersionConflict, TransitionNotAllowed, IdempotencyConflict, KeyError):
+            # задачу изменили параллельно (или она уже не в активном статусе) — пропускаем
+            return False
+        return True
+
+    def run(self) -> ShiftReleaseProgress:
+        progress = ShiftReleaseProgress()
+        after_id: UUID | None = None
+
+        while True:
+            chunk = self._next_chunk(after_id)
+            if not chunk:
+                break
+
+            released: list[UUID] = []
+            try:
+                for task_id, row_version in chunk:
+                    if self._release_one(task_id, row_version):
+                        released.append(task_id)
+                    else:
+                        progress.skipped += 1
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            progress.released += len(released)
+            if self.cache is not None and released:
+                self.cache.delete(*(Cache.task_key(self.org_id, task_id) for task_id in released))
+
+            progress.scanned += len(chunk)
+            progress.chunks += 1
+            after_id = chunk[-1][0]
+
+            if self.on_progress is not None:
+                self.on_progress(progress)
+
+        return progress
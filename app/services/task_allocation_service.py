@@ -3,8 +3,10 @@ from __future__ import annotations
 from datetime import date
 from uuid import UUID
 
+from sqlalchemy import Row, select
 from sqlalchemy.orm import Session
 
+from app.models.deliverable import Deliverable
 from app.models.task import Task
 from app.models.task_allocation import TaskAllocation
 
@@ -55,46 +57,44 @@ class TaskAllocationService:
             self.db.add(alloc)
             created.append(alloc)
 
-        self.db.commit()
+        # транзакция — вызывающего (API коммитит вместе с idempotency-ключом)
+        self.db.flush()
         return created
 
-    def list_for_shift(
+    def list_view(
         self,
         *,
         org_id: UUID,
         project_id: UUID,
-        work_date: date,
-        shift_code: str,
-    ) -> list[TaskAllocation]:
-        # task_allocations table doesn't contain project_id/work_date/shift_code.
-        # We filter by org_id and join tasks to apply project_id.
-        return (
-            self.db.query(TaskAllocation)
-            .join(Task, Task.id == TaskAllocation.task_id)
-            .filter(
-                TaskAllocation.org_id == org_id,
-                Task.project_id == project_id,
-            )
-            .order_by(TaskAllocation.created_at.desc())
-            .all()
-        )
+        user_id: UUID | None = None,
+    ) -> list[Row]:
+        """
+        Read-model для экранов /allocations/today и /allocations/my.
 
-    def list_for_user(
-        self,
-        *,
-        org_id: UUID,
-        project_id: UUID,
-        work_date: date,
-        user_id: UUID,
-    ) -> list[TaskAllocation]:
-        return (
-            self.db.query(TaskAllocation)
+        Один запрос: task_allocations JOIN tasks LEFT JOIN deliverables,
+        проецируем только колонки, которые нужны AllocationOut.
+        Строки возвращаются как tuples:
+          (id, org_id, task_id, user_id, deliverable_id, deliverable_type, deliverable_serial)
+        """
+        stmt = (
+            select(
+                TaskAllocation.id,
+                TaskAllocation.org_id,
+                TaskAllocation.task_id,
+                TaskAllocation.user_id,
+                Task.deliverable_id,
+                Deliverable.deliverable_type,
+                Deliverable.serial,
+            )
             .join(Task, Task.id == TaskAllocation.task_id)
-            .filter(
+            .outerjoin(Deliverable, Deliverable.id == Task.deliverable_id)
+            .where(
                 TaskAllocation.org_id == org_id,
                 Task.project_id == project_id,
-                TaskAllocation.user_id == user_id,
             )
             .order_by(TaskAllocation.created_at.desc())
-            .all()
         )
+        if user_id is not None:
+            stmt = stmt.where(TaskAllocation.user_id == user_id)
+
+        return list(self.db.execute(stmt).all())
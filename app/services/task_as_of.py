@@ -0,0 +1,242 @@
+# app/services/task_as_of.py
+"""
+Состояние задач на момент времени (GET /deliverables/{id}/tasks?as_of=...).
+
+status / row_version задачи на as_of = последний переход с created_at <= as_of:
+    SELECT DISTINCT ON (task_id) ... ORDER BY task_id, created_at DESC
+по hot-партициям и archive tier (индекс (org_id, task_id, created_at) есть на обоих, M11).
+
+Снимки (deliverable_task_snapshots, M17) отрезают историю: если есть снимок
+taken_at <= as_of, переходы читаются только из окна (taken_at, as_of] — по created_at
+отсекаются целые месячные партиции. Задача без перехода в окне берёт состояние из снимка
+(вместе с changed_at — временем последнего перехода до снимка).
+
+Задача без переходов до as_of (и без снимка) — в исходном состоянии: from_status /
+expected_row_version первого перехода после as_of, а если переходов нет вовсе — текущее.
+Остальные поля задачи — текущие (журнал хранит только смену статуса).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Снимок берётся на now - margin: created_at перехода ставит приложение до COMMIT,
+# поэтому самые свежие переходы могут быть ещё не видны. Всё, что старше margin, — видно.
+SNAPSHOT_SAFETY_MARGIN = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class TaskStateAsOf:
+    task_id: UUID
+    status: str
+    row_version: int
+    # created_at последнего перехода <= as_of (None — переходов до as_of не было)
+    changed_at: datetime | None
+
+
+def _union(select_sql: str, where: str) -> str:
+    return f"""
+        SELECT {select_sql} FROM task_transitions WHERE {where}
+        UNION ALL
+        SELECT {select_sql} FROM task_transitions_archive WHERE {where}
+    """
+
+
+_LATEST_COLUMNS = "task_id, to_status, COALESCE(result_row_version, expected_row_version + 1) AS rv, created_at"
+_WHERE = "org_id = :org_id AND task_id = ANY(:ids) AND created_at <= :as_of"
+
+_LATEST_SQL = text(
+    f"""
+    SELECT DISTINCT ON (task_id) task_id, to_status, rv, created_at
+    FROM ({_union(_LATEST_COLUMNS, _WHERE)}) t
+    ORDER BY task_id, created_at DESC
+    """
+)
+_LATEST_IN_WINDOW_SQL = text(
+    f"""
+    SELECT DISTINCT ON (task_id) task_id, to_status, rv, created_at
+    FROM ({_union(_LATEST_COLUMNS, _WHERE + " AND created_at > :after")}) t
+    ORDER BY task_id, created_at DESC
+    """
+)
+_FIRST_AFTER_SQL = text(
+    f"""
+    SELECT DISTINCT ON (task_id) task_id, from_status, expected_row_version
+    FROM ({_union("task_id, from_status, expected_row_version, created_at",
+                  "org_id = :org_id AND task_id = ANY(:ids) AND created_at > :as_of")}) t
+    ORDER BY task_id, created_at ASC
+    """
+)
+
+_SNAPSHOT_AT_SQL = text(
+    "SELECT max(taken_at) FROM deliverable_task_snapshots WHERE deliverable_id = :deliverable_id AND taken_at <= :as_of"
+)
+_SNAPSHOT_ROWS_SQL = text(
+    """
+    SELECT task_id, status, row_version, changed_at FROM deliverable_task_snapshots
+    WHERE deliverable_id = :deliverable_id AND taken_at = :taken_at AND task_id = ANY(:ids)
+    """
+)
+
+
+def task_states_as_of(
+    db: Session,
+    *,
+    org_id: UUID,
+    deliverable_id: UUID,
+    tasks: Sequence[tuple[UUID, str, int]],
+    as_of: datetime,
+    use_snapshots: bool | None = None,
+) -> dict[UUID, TaskStateAsOf]:
+    """tasks: (id, текущий status, текущий row_version) задач, созданных не позже as_of."""
+    if not tasks:
+        return {}
+    if use_snapshots is None:
+        use_snapshots = settings.as_of_use_snapshots
+
+    ids = [t[0] for t in tasks]
+    params = {"org_id": org_id, "ids": ids, "as_of": as_of}
+    states: dict[UUID, TaskStateAsOf] = {}
+
+    taken_at = None
+    if use_snapshots:
+        taken_at = db.execute(_SNAPSHOT_AT_SQL, {"deliverable_id": deliverable_id, "as_of": as_of}).scalar_one()
+
+    if taken_at is None:
+        rows = db.execute(_LATEST_SQL, params)
+    else:
+        rows = db.execute(_LATEST_IN_WINDOW_SQL, {**params, "after": taken_at})
+    for task_id, status, rv, created_at in rows:
+        states[task_id] = TaskStateAsOf(task_id, status, rv, created_at)
+
+    rest = [i for i in ids if i not in states]
+    if rest and taken_at is not None:
+        for task_id, status, rv, changed_at in db.execute(
+            _SNAPSHOT_ROWS_SQL, {"deliverable_id": deliverable_id, "taken_at": taken_at, "ids": rest}
+        ):
+            states[task_id] = TaskStateAsOf(task_id, status, rv, changed_at)
+        rest = [i for i in ids if i not in states]
+        if rest:
+            # задачи моложе снимка (или перенесённые в изделие позже): вся их история
+            for task_id, status, rv, created_at in db.execute(_LATEST_SQL, {**params, "ids": rest}):
+                states[task_id] = TaskStateAsOf(task_id, status, rv, created_at)
+            rest = [i for i in ids if i not in states]
+
+    if rest:
+        for task_id, from_status, expected_rv in db.execute(_FIRST_AFTER_SQL, {**params, "ids": rest}):
+            if expected_rv is not None:
+                states[task_id] = TaskStateAsOf(task_id, from_status, expected_rv, None)
+
+    current = {t[0]: t for t in tasks}
+    for task_id in ids:
+        state = states.get(task_id)
+        if state is None:
+            # переходов не было вовсе — состояние не менялось
+            _, status, rv = current[task_id]
+            states[task_id] = TaskStateAsOf(task_id, status, rv, None)
+        elif state.row_version is None:
+            states[task_id] = TaskStateAsOf(task_id, state.status, current[task_id][2], state.changed_at)
+    return states
+
+
+# ---------- snapshots job ----------
+
+# Изделия org, задачи которых менялись после их последнего снимка
+_CHANGED_DELIVERABLES_SQL = text(
+    """
+    SELECT d.id
+    FROM deliverables d
+    WHERE d.org_id = :org_id
+      AND EXISTS (
+          SELECT 1 FROM tasks x
+          WHERE x.deliverable_id = d.id
+            AND x.updated_at > COALESCE(
+                (SELECT max(s.taken_at) FROM deliverable_task_snapshots s WHERE s.deliverable_id = d.id),
+                '-infinity'
+            )
+      )
+    ORDER BY d.id
+    """
+)
+
+_DELIVERABLE_TASKS_SQL = text(
+    """
+    SELECT id, status, row_version FROM tasks
+    WHERE org_id = :org_id AND deliverable_id = :deliverable_id AND created_at <= :as_of
+    """
+)
+
+_INSERT_SNAPSHOT_SQL = text(
+    """
+    INSERT INTO deliverable_task_snapshots (org_id, deliverable_id, taken_at, task_id, status, row_version, changed_at)
+    VALUES (:org_id, :deliverable_id, :taken_at, :task_id, :status, :row_version, :changed_at)
+    ON CONFLICT DO NOTHING
+    """
+)
+
+_PRUNE_SNAPSHOTS_SQL = text(
+    "DELETE FROM deliverable_task_snapshots WHERE org_id = :org_id AND taken_at < :before"
+)
+
+
+@dataclass(frozen=True)
+class SnapshotResult:
+    taken_at: datetime
+    deliverables: int
+    rows: int
+    pruned: int
+
+
+def take_task_snapshots(
+    db: Session,
+    *,
+    org_id: UUID,
+    now: datetime,
+    prune_before: datetime | None = None,
+) -> SnapshotResult:
+    """
+    Снимки изменившихся изделий org на taken_at = now - SNAPSHOT_SAFETY_MARGIN. Состояние
+    считается из журнала (task_states_as_of поверх предыдущего снимка), а не копируется из
+    tasks: снимок обязан быть состоянием ровно на taken_at. Коммит — вызывающего.
+    """
+    taken_at = now - SNAPSHOT_SAFETY_MARGIN
+    deliverables = rows = 0
+
+    for (deliverable_id,) in db.execute(_CHANGED_DELIVERABLES_SQL, {"org_id": org_id}).all():
+        tasks = db.execute(
+            _DELIVERABLE_TASKS_SQL, {"org_id": org_id, "deliverable_id": deliverable_id, "as_of": taken_at}
+        ).all()
+        states = task_states_as_of(
+            db, org_id=org_id, deliverable_id=deliverable_id, tasks=tasks, as_of=taken_at, use_snapshots=True
+        )
+        if not states:
+            continue
+        db.execute(
+            _INSERT_SNAPSHOT_SQL,
+            [
+                {
+                    "org_id": org_id,
+                    "deliverable_id": deliverable_id,
+                    "taken_at": taken_at,
+                    "task_id": st.task_id,
+                    "status": st.status,
+                    "row_version": st.row_version,
+                    "changed_at": st.changed_at,
+                }
+                for st in states.values()
+            ],
+        )
+        deliverables += 1
+        rows += len(states)
+
+    pruned = 0
+    if prune_before is not None:
+        pruned = db.execute(_PRUNE_SNAPSHOTS_SQL, {"org_id": org_id, "before": prune_before}).rowcount
+    return SnapshotResult(taken_at=taken_at, deliverables=deliverables, rows=rows, pruned=pruned)
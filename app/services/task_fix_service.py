@@ -20,6 +20,7 @@ from app.models.task import (
 )
 
 from app.services.fix_invariants import validate_fix_task
+from app.services.executor_stats import record_fix_caused
 
 
 class TaskFixService:
@@ -177,6 +178,9 @@ class TaskFixService:
         self.db.add(fix)
         self.db.flush()  # гарантирует fix.id
 
+        # M13: fix засчитывается ответственному исполнителю в той же транзакции
+        record_fix_caused(self.db, fix)
+
         # attachments: на MVP можно писать в task_event payload или отдельную таблицу.
         _ = attachments
 
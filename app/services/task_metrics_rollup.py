@@ -0,0 +1,201 @@
+# app/services/task_metrics_rollup.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Журнал целиком: hot-партиции + archive tier (M11). Подзапрос, а не CTE: условия по
+# created_at / task_id проталкиваются в обе ветки UNION ALL и идут по индексам.
+_TRANSITIONS = """(
+    SELECT org_id, project_id, task_id, action, from_status, to_status, created_at, result_row_version
+    FROM task_transitions
+    UNION ALL
+    SELECT org_id, project_id, task_id, action, from_status, to_status, created_at, result_row_version
+    FROM task_transitions_archive
+)"""
+
+# Transitions окна (lo, hi] + история их задач для LAG.
+# - учитываются только переходы со сменой статуса (escalate не рвёт время в статусе);
+# - время в from_status = created_at - предыдущий переход (для первого — tasks.created_at);
+# - started_at = первый переход в in_progress (для cycle time).
+_FRESH_CTE = f"""
+WITH touched AS (
+    SELECT DISTINCT org_id, task_id
+    FROM {_TRANSITIONS} tt
+    WHERE created_at > :lo AND created_at <= :hi
+),
+w AS (
+    SELECT
+        tt.org_id, tt.project_id, tt.task_id, tt.action, tt.from_status, tt.to_status, tt.created_at,
+        LAG(tt.created_at) OVER (PARTITION BY tt.task_id ORDER BY tt.created_at, tt.result_row_version) AS prev_at,
+        MIN(tt.created_at) FILTER (WHERE tt.to_status = 'in_progress') OVER (PARTITION BY tt.task_id) AS started_at
+    FROM {_TRANSITIONS} tt
+    JOIN touched t ON t.org_id = tt.org_id AND t.task_id = tt.task_id
+    WHERE tt.created_at <= :hi
+      AND tt.from_status <> tt.to_status
+),
+fresh AS (
+    SELECT
+        w.*,
+        (w.created_at AT TIME ZONE 'UTC')::date AS day,
+        EXTRACT(EPOCH FROM w.created_at - COALESCE(w.prev_at, t.created_at)) AS in_status_seconds,
+        EXTRACT(EPOCH FROM w.created_at - t.created_at) AS lead_seconds,
+        EXTRACT(EPOCH FROM w.created_at - w.started_at) AS cycle_seconds,
+        t.work_kind::text AS work_kind
+    FROM w
+    JOIN tasks t ON t.id = w.task_id
+    WHERE w.created_at > :lo
+)
+"""
+
+_UPSERT_METRICS = text(
+    _FRESH_CTE
+    + """
+INSERT INTO task_metrics_daily (
+    org_id, project_id, day,
+    completed, completed_fix,
+    lead_time_seconds_sum, cycle_time_seconds_sum, cycle_time_count,
+    review_approves, review_rejects
+)
+SELECT
+    org_id, project_id, day,
+    count(*) FILTER (WHERE to_status = 'done'),
+    count(*) FILTER (WHERE to_status = 'done' AND work_kind = 'fix'),
+    COALESCE(sum(lead_seconds) FILTER (WHERE to_status = 'done'), 0),
+    COALESCE(sum(cycle_seconds) FILTER (WHERE to_status = 'done' AND started_at IS NOT NULL), 0),
+    count(*) FILTER (WHERE to_status = 'done' AND started_at IS NOT NULL),
+    count(*) FILTER (WHERE action = 'review_approve'),
+    count(*) FILTER (WHERE action = 'review_reject')
+FROM fresh
+GROUP BY org_id, project_id, day
+ON CONFLICT (org_id, project_id, day) DO UPDATE SET
+    completed              = task_metrics_daily.completed + EXCLUDED.completed,
+    completed_fix          = task_metrics_daily.completed_fix + EXCLUDED.completed_fix,
+    lead_time_seconds_sum  = task_metrics_daily.lead_time_seconds_sum + EXCLUDED.lead_time_seconds_sum,
+    cycle_time_seconds_sum = task_metrics_daily.cycle_time_seconds_sum + EXCLUDED.cycle_time_seconds_sum,
+    cycle_time_count       = task_metrics_daily.cycle_time_count + EXCLUDED.cycle_time_count,
+    review_approves        = task_metrics_daily.review_approves + EXCLUDED.review_approves,
+    review_rejects         = task_metrics_daily.review_rejects + EXCLUDED.review_rejects
+"""
+)
+
+_UPSERT_STATUS_TIME = text(
+    _FRESH_CTE
+    + """
+INSERT INTO task_status_time_daily (org_id, project_id, day, status, seconds_sum, exits)
+SELECT org_id, project_id, day, from_status, sum(in_status_seconds), count(*)
+FROM fresh
+GROUP BY org_id, project_id, day, from_status
+ON CONFLICT (org_id, project_id, day, status) DO UPDATE SET
+    seconds_sum = task_status_time_daily.seconds_sum + EXCLUDED.seconds_sum,
+    exits       = task_status_time_daily.exits + EXCLUDED.exits
+"""
+)
+
+_LOCK_SQL = text("SELECT pg_advisory_xact_lock(hashtext('task_metrics_rollup'))")
+_FIRST_SQL = text(f"SELECT min(created_at) FROM {_TRANSITIONS} tt")
+_COUNT_SQL = text(f"SELECT count(*) FROM {_TRANSITIONS} tt WHERE created_at > :lo AND created_at <= :hi")
+_NEXT_SQL = text(f"SELECT min(created_at) FROM {_TRANSITIONS} tt WHERE created_at > :hi")
+
+
+@dataclass
+class MetricsRollupProgress:
+    windows: int = 0
+    transitions: int = 0
+    watermark: datetime | None = None
+
+
+class TaskMetricsRollupJob:
+    """
+    Инкрементальный rollup task_transitions -> task_metrics_daily / task_status_time_daily.
+
+    - обрабатывает только transitions новее водяного знака (task_metrics_rollup_state);
+    - окнами по window (каждое — отдельная транзакция вместе со сдвигом водяного знака,
+      поэтому повторный запуск после падения ничего не посчитает дважды);
+    - параллельные запуски (два cron'а, ручной рядом с плановым) сериализуются
+      pg_advisory_xact_lock: второй ждёт окно первого и читает уже сдвинутый водяной знак;
+    - не трогает последние settle_seconds: transactions, которые ещё не закоммитились,
+      могли записать created_at в прошлом.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        window: timedelta = timedelta(days=1),
+        settle_seconds: int = 300,
+        now: datetime | None = None,
+        on_progress: Callable[[MetricsRollupProgress], None] | None = None,
+    ):
+        if window <= timedelta(0):
+            raise ValueError("window must be positive")
+
+        self.db = db
+        self.window = window
+        self.settle = timedelta(seconds=settle_seconds)
+        self.now = now
+        self.on_progress = on_progress
+
+    def _lock_watermark(self) -> datetime | None:
+        # Строки состояния до первого окна нет (FOR UPDATE нечего блокировать): параллельные
+        # запуски сериализуются advisory lock'ом до конца транзакции окна.
+        self.db.execute(_LOCK_SQL)
+        wm = self.db.execute(text("SELECT watermark FROM task_metrics_rollup_state WHERE id = 1")).scalar_one_or_none()
+        if wm is not None:
+            return wm
+
+        # первый запуск: начинаем с самого старого transition (включая archive tier)
+        first = self.db.execute(_FIRST_SQL).scalar_one()
+        if first is None:
+            return None
+        return first - timedelta(microseconds=1)
+
+    def _save_watermark(self, watermark: datetime) -> None:
+        self.db.execute(
+            text(
+                """
+                INSERT INTO task_metrics_rollup_state (id, watermark) VALUES (1, :wm)
+                ON CONFLICT (id) DO UPDATE SET watermark = EXCLUDED.watermark
+                """
+            ),
+            {"wm": watermark},
+        )
+
+    def run(self) -> MetricsRollupProgress:
+        progress = MetricsRollupProgress()
+        until = (self.now or datetime.now(timezone.utc)) - self.settle
+
+        while True:
+            try:
+                lo = self._lock_watermark()
+                if lo is None or lo >= until:
+                    self.db.commit()  # отпускаем advisory lock
+                    break
+
+                hi = min(lo + self.window, until)
+                params = {"lo": lo, "hi": hi}
+                n = self.db.execute(_COUNT_SQL, params).scalar_one()
+                if n:
+                    self.db.execute(_UPSERT_METRICS, params)
+                    self.db.execute(_UPSERT_STATUS_TIME, params)
+                else:
+                    # пустое окно: перескакиваем к следующему transition (дыры в истории)
+                    nxt = self.db.execute(_NEXT_SQL, params).scalar_one()
+                    hi = until if nxt is None else max(hi, min(nxt - timedelta(microseconds=1), until))
+                self._save_watermark(hi)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            progress.windows += 1
+            progress.transitions += n
+            progress.watermark = hi
+            if self.on_progress is not None:
+                self.on_progress(progress)
+
+        return progress
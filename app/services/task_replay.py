@@ -0,0 +1,413 @@
+# app/services/task_replay.py
+"""
+Event-sourced сверка tasks с журналом task_transitions (hot-партиции + archive tier).
+
+Для каждой задачи org переходы читаются потоком в порядке (task_id, result_row_version)
+и прогоняются через скомпилированную FSM (TRANSITION_TABLE):
+
+- журнал: to_status = FSM(from_status, action), from_status = to_status предыдущего
+  перехода, result_row_version = expected_row_version + 1, версии не идут назад;
+- состояние: status и assigned_to из журнала совпадают с tasks, tasks.row_version не
+  меньше последнего result_row_version (больше — можно: template-migrate поднимает
+  row_version без перехода).
+
+repair=True чинит только расхождения состояния и только у задач с целым журналом;
+битый журнал (fsm / chain / version) лишь попадает в отчёт. Ремонт — запись в tasks, как
+переход: row_version растёт, а после COMMIT вызывающий сбрасывает Cache.task_key
+починенных задач (invalidate_repaired; verify_org_parallel делает это сам по cache=).
+
+Параллельно: пространство task_id (uuid4 — равномерно) режется на диапазоны, каждый
+диапазон сверяет свой процесс со своим соединением (verify_org_parallel).
+"""
+from __future__ import annotations
+
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import Cache
+from app.fsm.task_fsm import TRANSITION_TABLE
+
+# Статусы, в которых задача обязана иметь исполнителя / не иметь его (M2)
+_ASSIGNED_STATUSES = frozenset({"assigned", "in_progress", "submitted"})
+_POOL_STATUSES = frozenset({"blocked", "available"})
+
+# Ошибки журнала: состояние по такому журналу не восстанавливаем
+LOG_KINDS = frozenset({"fsm", "chain", "version"})
+# Расхождения tasks с журналом (чинятся repair)
+STATE_KINDS = frozenset({"status", "row_version", "assignee", "missing_task"})
+
+_UUID_SPACE = 1 << 128
+
+
+@dataclass(frozen=True)
+class TransitionRow:
+    task_id: UUID
+    action: str
+    from_status: str
+    to_status: str
+    expected_row_version: int | None
+    result_row_version: int | None
+    actor_user_id: UUID
+    # только для action=assign: payload.assign_to / payload.user_id
+    assign_to: str | None
+    created_at: datetime
+
+
+@dataclass
+class ReplayedTask:
+    task_id: UUID
+    status: str
+    row_version: int | None
+    assigned_to: UUID | None
+    assigned_at: datetime | None
+    transitions: int
+
+
+@dataclass(frozen=True)
+class Divergence:
+    task_id: UUID
+    kind: str
+    detail: str
+
+
+@dataclass
+class ReplayReport:
+    tasks: int = 0
+    transitions: int = 0
+    divergent_tasks: int = 0
+    repaired: int = 0
+    repaired_ids: list[UUID] = field(default_factory=list)
+    by_kind: Counter = field(default_factory=Counter)
+    samples: list[Divergence] = field(default_factory=list)
+    max_samples: int = 100
+
+    def add(self, divergences: Sequence[Divergence]) -> None:
+        if not divergences:
+            return
+        self.divergent_tasks += 1
+        for d in divergences:
+            self.by_kind[d.kind] += 1
+        room = self.max_samples - len(self.samples)
+        if room > 0:
+            self.samples.extend(divergences[:room])
+
+    def merge(self, other: ReplayReport) -> None:
+        self.tasks += other.tasks
+        self.transitions += other.transitions
+        self.divergent_tasks += other.divergent_tasks
+        self.repaired += other.repaired
+        self.repaired_ids.extend(other.repaired_ids)
+        self.by_kind.update(other.by_kind)
+        room = self.max_samples - len(self.samples)
+        if room > 0:
+            self.samples.extend(other.samples[:room])
+
+
+def replay_task(
+    task_id: UUID,
+    rows: Iterable[TransitionRow],
+    *,
+    table: dict[tuple[str, str], str] = TRANSITION_TABLE,
+) -> tuple[ReplayedTask, list[Divergence]]:
+    """Прогнать журнал одной задачи (уже в порядке result_row_version) через FSM."""
+    out: list[Divergence] = []
+    status: str | None = None
+    row_version: int | None = None
+    assigned_to: UUID | None = None
+    assigned_at: datetime | None = None
+    n = 0
+
+    for r in rows:
+        n += 1
+        where = f"#{n} {r.action}"
+
+        if table.get((r.from_status, r.action)) != r.to_status:
+            out.append(Divergence(task_id, "fsm", f"{where}: {r.from_status} -> {r.to_status} is not an FSM transition"))
+        if status is not None and r.from_status != status:
+            out.append(Divergence(task_id, "chain", f"{where}: from_status {r.from_status} != previous to_status {status}"))
+
+        if r.result_row_version is not None:
+            if r.expected_row_version is None or r.result_row_version != r.expected_row_version + 1:
+                out.append(
+                    Divergence(
+                        task_id,
+                        "version",
+                        f"{where}: result_row_version {r.result_row_version} != expected {r.expected_row_version} + 1",
+                    )
+                )
+            if row_version is not None and (r.expected_row_version or 0) < row_version:
+                out.append(
+                    Divergence(
+                        task_id,
+                        "version",
+                        f"{where}: expected_row_version {r.expected_row_version} < previous result {row_version}",
+                    )
+                )
+            row_version = r.result_row_version
+
+        # присвоение исполнителя — как в apply_task_transition
+        if r.action == "self_assign":
+            assigned_to, assigned_at = r.actor_user_id, r.created_at
+        elif r.action == "assign":
+            assigned_to = UUID(r.assign_to) if r.assign_to else None
+            assigned_at = r.created_at
+        elif r.action in ("shift_release", "recall_to_pool", "cancel"):
+            assigned_to, assigned_at = None, None
+
+        status = r.to_status
+
+    return ReplayedTask(task_id, status, row_version, assigned_to, assigned_at, n), out
+
+
+def compare_task(replayed: ReplayedTask, actual: tuple[str, int, UUID | None] | None) -> list[Divergence]:
+    """Расхождения tasks (status, row_version, assigned_to) с состоянием из журнала."""
+    tid = replayed.task_id
+    if actual is None:
+        return [Divergence(tid, "missing_task", f"{replayed.transitions} transitions, no tasks row")]
+
+    status, row_version, assigned_to = actual
+    out: list[Divergence] = []
+    if status != replayed.status:
+        out.append(Divergence(tid, "status", f"tasks.status {status} != replayed {replayed.status}"))
+    if replayed.row_version is not None and row_version < replayed.row_version:
+        out.append(Divergence(tid, "row_version", f"tasks.row_version {row_version} < replayed {replayed.row_version}"))
+    if assigned_to != replayed.assigned_to:
+        out.append(Divergence(tid, "assignee", f"tasks.assigned_to {assigned_to} != replayed {replayed.assigned_to}"))
+    return out
+
+
+# ---------- DB ----------
+
+_TRANSITION_COLUMNS = """
+    task_id, action, from_status, to_status, expected_row_version, result_row_version,
+    actor_user_id,
+    CASE WHEN action = 'assign' THEN COALESCE(payload->>'assign_to', payload->>'user_id') END AS assign_to,
+    created_at
+"""
+
+
+def _transitions_sql(*, bounded: bool) -> str:
+    where = "org_id = :org_id AND task_id >= :lo" + (" AND task_id < :hi" if bounded else "")
+    # idx_task_transitions_task_time (org_id, task_id, ...) отдаёт строки уже по task_id —
+    # досортировка внутри задачи (incremental sort) дешёвая
+    return f"""
+        SELECT {_TRANSITION_COLUMNS} FROM task_transitions WHERE {where}
+        UNION ALL
+        SELECT {_TRANSITION_COLUMNS} FROM task_transitions_archive WHERE {where}
+        ORDER BY task_id, result_row_version NULLS FIRST, created_at
+    """
+
+
+_TASKS_SQL = text(
+    "SELECT id, status, row_version, assigned_to FROM tasks WHERE org_id = :org_id AND id = ANY(:ids)"
+)
+
+# Только если задачу никто не трогал с момента чтения (как optimistic lock переходов).
+# row_version + 1: смена status / assigned_to видна клиентам как новая версия (и ETag);
+# assigned_at сохраняем, если исполнитель не меняется.
+_REPAIR_SQL = text(
+    """
+    UPDATE tasks
+    SET status = :status,
+        row_version = GREATEST(row_version, :row_version) + 1,
+        assigned_at = CASE
+            WHEN CAST(:assigned_to AS uuid) IS NULL THEN NULL
+            WHEN assigned_to IS NOT DISTINCT FROM CAST(:assigned_to AS uuid) THEN assigned_at
+            ELSE :assigned_at
+        END,
+        assigned_to = CAST(:assigned_to AS uuid),
+        updated_at = now()
+    WHERE org_id = :org_id AND id = :task_id AND row_version = :seen_row_version
+    """
+)
+
+
+def uuid_ranges(shards: int) -> list[tuple[UUID, UUID | None]]:
+    """Поделить пространство task_id на shards диапазонов [lo, hi); у последнего hi=None."""
+    if shards <= 0:
+        raise ValueError("shards must be > 0")
+    step = _UUID_SPACE // shards
+    return [
+        (UUID(int=i * step), UUID(int=(i + 1) * step) if i < shards - 1 else None)
+        for i in range(shards)
+    ]
+
+
+class TaskReplayVerifier:
+    """Сверка одного диапазона task_id одной org на одном соединении."""
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        org_id: UUID,
+        repair: bool = False,
+        batch_size: int = 5000,
+        max_samples: int = 100,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+
+        self.db = db
+        self.org_id = org_id
+        self.repair = repair
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+
+    def _stream(self, lo: UUID, hi: UUID | None) -> Iterable[TransitionRow]:
+        params = {"org_id": self.org_id, "lo": lo}
+        if hi is not None:
+            params["hi"] = hi
+        # server-side cursor: 10M строк не материализуются в памяти
+        result = self.db.execute(
+            text(_transitions_sql(bounded=hi is not None)),
+            params,
+            execution_options={"yield_per": self.batch_size},
+        )
+        for row in result:
+            yield TransitionRow(*row)
+
+    def _group(self, rows: Iterable[TransitionRow]) -> Iterable[tuple[UUID, list[TransitionRow]]]:
+        task_id: UUID | None = None
+        group: list[TransitionRow] = []
+        for r in rows:
+            if r.task_id != task_id:
+                if group:
+                    yield task_id, group
+                task_id, group = r.task_id, []
+            group.append(r)
+        if group:
+            yield task_id, group
+
+    def _flush(self, batch: list[tuple[ReplayedTask, list[Divergence]]], report: ReplayReport) -> None:
+        actual = {
+            row[0]: row[1:]
+            for row in self.db.execute(
+                _TASKS_SQL, {"org_id": self.org_id, "ids": [t.task_id for t, _ in batch]}
+            )
+        }
+        for replayed, log_divergences in batch:
+            current = actual.get(replayed.task_id)
+            state = compare_task(replayed, current)
+            report.add(log_divergences + state)
+
+            repairable = state and not log_divergences and current is not None
+            if self.repair and repairable and self._repair(replayed, seen_row_version=current[1]):
+                report.repaired += 1
+                report.repaired_ids.append(replayed.task_id)
+
+    def _repair(self, t: ReplayedTask, *, seen_row_version: int) -> bool:
+        if t.status in _ASSIGNED_STATUSES and t.assigned_to is None:
+            return False  # M2 не даст; нужен ручной разбор
+        if t.status in _POOL_STATUSES and t.assigned_to is not None:
+            return False
+        try:
+            with self.db.begin_nested():
+                updated = self.db.execute(
+                    _REPAIR_SQL,
+                    {
+                        "org_id": self.org_id,
+                        "task_id": t.task_id,
+                        "status": t.status,
+                        "row_version": t.row_version or seen_row_version,
+                        "assigned_to": t.assigned_to,
+                        "assigned_at": t.assigned_at,
+                        "seen_row_version": seen_row_version,
+                    },
+                ).rowcount
+        except IntegrityError:
+            return False
+        return updated == 1
+
+    def verify_range(self, lo: UUID = UUID(int=0), hi: UUID | None = None) -> ReplayReport:
+        report = ReplayReport(max_samples=self.max_samples)
+        batch: list[tuple[ReplayedTask, list[Divergence]]] = []
+
+        for task_id, rows in self._group(self._stream(lo, hi)):
+            replayed, divergences = replay_task(task_id, rows)
+            report.tasks += 1
+            report.transitions += replayed.transitions
+            batch.append((replayed, divergences))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report)
+                batch = []
+        if batch:
+            self._flush(batch, report)
+        return report
+
+
+def invalidate_repaired(cache: Cache, org_id: UUID, report: ReplayReport) -> None:
+    """После COMMIT ремонта: get_task не должен отдавать тело (и ETag) до ремонта."""
+    if report.repaired_ids:
+        cache.delete(*(Cache.task_key(org_id, task_id) for task_id in report.repaired_ids))
+
+
+def _verify_shard(
+    database_url: str,
+    org_id: UUID,
+    lo: UUID,
+    hi: UUID | None,
+    repair: bool,
+    batch_size: int,
+    max_samples: int,
+) -> ReplayReport:
+    # в дочернем процессе — своё соединение, без пула родителя
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with Session(engine) as db:
+            report = TaskReplayVerifier(
+                db, org_id=org_id, repair=repair, batch_size=batch_size, max_samples=max_samples
+            ).verify_range(lo, hi)
+            db.commit()
+        return report
+    finally:
+        engine.dispose()
+
+
+def verify_org_parallel(
+    *,
+    database_url: str,
+    org_id: UUID,
+    workers: int,
+    shards: int | None = None,
+    repair: bool = False,
+    batch_size: int = 5000,
+    max_samples: int = 100,
+    cache: Cache | None = None,
+    on_shard: Callable[[int, int, ReplayReport], None] | None = None,
+) -> ReplayReport:
+    """
+    Сверить org в workers процессах. shards по умолчанию = workers * 4: диапазоны мельче,
+    чтобы неравномерность (крупные задачи) выравнивалась очередью пула.
+    """
+    if workers <= 0:
+        raise ValueError("workers must be > 0")
+
+    ranges = uuid_ranges(shards or workers * 4)
+    total = ReplayReport(max_samples=max_samples)
+    # spawn: дочерние процессы не наследуют соединения / потоки родителя
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(_verify_shard, database_url, org_id, lo, hi, repair, batch_size, max_samples)
+            for lo, hi in ranges
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            shard_report = future.result()
+            # shard уже закоммичен в своём процессе
+            if cache is not None:
+                invalidate_repaired(cache, org_id, shard_report)
+            total.merge(shard_report)
+            if on_shard is not None:
+                on_shard(done, len(ranges), shard_report)
+    return total
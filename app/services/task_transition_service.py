@@ -14,13 +14,17 @@ from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 
 from app.models.task import Task, TaskStatus, FixSeverity, FixSource
-from app.models.task_transition import TaskTransition
+from app.models.task_transition import TaskTransition, TaskTransitionKey
 from app.models.qc_inspection import QcInspection, QcResult
 from app.fsm.task_fsm import apply_transition, TransitionNotAllowed
 from app.services.task_fix_service import TaskFixService
+from app.services.executor_stats import record_completion
 
 FIX_EFFECT_CREATE = "create_fix_task"
 
+# unique (task_id, client_event_id) — живёт в task_transition_keys (M11, партиционирование)
+IDEMPOTENCY_INDEX = "uq_task_transitions_task_client_event"
+
 
 class VersionConflict(Exception):
     pass
@@ -152,6 +156,66 @@ def _enforce_wip_limit(db: Session, *, org_id: UUID, executor_id: UUID, exclude_
     if existing is not None:
         raise TransitionNotAllowed("WIP limit exceeded: executor already has an active task")
 
+def _find_by_client_event(db: Session, *, task_id: UUID, client_event_id: UUID) -> TaskTransition | None:
+    """
+    Idempotency lookup: (task_id, client_event_id) -> task_transition_keys,
+    затем сам transition по (id, created_at) — с partition pruning.
+    """
+    key = db.execute(
+        select(TaskTransitionKey.transition_id, TaskTransitionKey.created_at).where(
+            TaskTransitionKey.task_id == task_id,
+            TaskTransitionKey.client_event_id == client_event_id,
+        )
+    ).one_or_none()
+    if key is None:
+        return None
+
+    return db.execute(
+        select(TaskTransition).where(
+            TaskTransition.id == key.transition_id,
+            TaskTransition.created_at == key.created_at,
+        )
+    ).scalar_one()
+
+
+def _is_idempotency_violation(e: IntegrityError) -> bool:
+    diag = getattr(e.orig, "diag", None)
+    return getattr(diag, "constraint_name", None) == IDEMPOTENCY_INDEX
+
+
+def _create_review_fix(db: Session, task: Task, *, actor_user_id: UUID, effect) -> Task:
+    """review_reject: QC-инспекция (rejected) + fix-task на исходную задачу."""
+    reason = (effect.payload.get("reason") or "").strip()
+    fix_title = (effect.payload.get("fix_title") or "").strip()
+
+    qc = QcInspection(
+        org_id=task.org_id,
+        project_id=task.project_id,
+        deliverable_id=task.deliverable_id,
+        inspector_user_id=actor_user_id,
+        responsible_user_id=None,
+        result=QcResult.rejected.value,
+        notes=reason,
+    )
+    db.add(qc)
+    db.flush()  # need qc.id for fix-task
+
+    return TaskFixService(db).create_fix(
+        org_id=task.org_id,
+        project_id=task.project_id,
+        deliverable_id=task.deliverable_id,
+        actor_user_id=actor_user_id,
+        title=fix_title or f"Fix: {task.title}",
+        description=reason,
+        source=FixSource.qc_reject,
+        severity=_parse_severity(effect.payload.get("severity")),
+        minutes_spent=None,
+        origin_task_id=task.id,
+        qc_inspection_id=qc.id,
+        attachments=None,
+    )
+
+
 def _load_result_by_transition(db: Session, tr: TaskTransition) -> tuple[Task, Task | None]:
     task = db.execute(
         select(Task).where(Task.org_id == tr.org_id, Task.id == tr.task_id)
@@ -190,12 +254,7 @@ def apply_task_transition(
 
     # 0) Idempotency (strict) — SCOPE: (task_id, client_event_id)
     if client_event_id is not None:
-        existing = db.execute(
-            select(TaskTransition).where(
-                TaskTransition.task_id == task_id,
-                TaskTransition.client_event_id == client_event_id,
-            )
-        ).scalar_one_or_none()
+        existing = _find_by_client_event(db, task_id=task_id, client_event_id=client_event_id)
 
         if existing is not None:
             if not _same_request(
@@ -236,16 +295,12 @@ def apply_task_transition(
 
     # 4) Prepare payload for transition (включая fix_task_id, если появится)
     tr_payload = dict(payload_norm)
-    fix_task: Task | None = None
 
-    # 5) Side effects (reject => create fix-task)
+    # 5) Side effects (reject => create fix-task): проверки — до записи, создание — вместе с transition
+    fix_effect = None
     for eff in side_effects:
         if eff.kind == FIX_EFFECT_CREATE:
-            reason = (eff.payload.get("reason") or "").strip()
-            fix_title = (eff.payload.get("fix_title") or "").strip()
-            severity = _parse_severity(eff.payload.get("severity"))
-
-            if not reason:
+            if not (eff.payload.get("reason") or "").strip():
                 raise TransitionNotAllowed(
                     "Action 'review_reject' requires payload.reason (what to fix)."
                 )
@@ -254,36 +309,7 @@ def apply_task_transition(
                 raise TransitionNotAllowed(
                     "Cannot create fix-task: task is not linked to deliverable_id"
                 )
-
-            qc = QcInspection(
-                org_id=task.org_id,
-                project_id=task.project_id,
-                deliverable_id=task.deliverable_id,
-                inspector_user_id=actor_user_id,
-                responsible_user_id=None,
-                result=QcResult.rejected.value,
-                notes=reason,
-            )
-            db.add(qc)
-            db.flush()  # need qc.id for fix-task
-
-            svc = TaskFixService(db)
-            fix_task = svc.create_fix(
-                org_id=task.org_id,
-                project_id=task.project_id,
-                deliverable_id=task.deliverable_id,
-                actor_user_id=actor_user_id,
-                title=fix_title or f"Fix: {task.title}",
-                description=reason,
-                source=FixSource.qc_reject,
-                severity=severity,
-                minutes_spent=None,
-                origin_task_id=task.id,
-                qc_inspection_id=qc.id,
-                attachments=None,
-            )
-
-            tr_payload["fix_task_id"] = str(fix_task.id)
+            fix_effect = eff
 
     # 6) Write transition first (race-safe). result_row_version считаем заранее.
     values = {
@@ -295,37 +321,39 @@ def apply_task_transition(
         "action": action,
         "from_status": from_status.value,
         "to_status": to_status.value,
-        "payload": tr_payload,
         "client_event_id": client_event_id,
         "created_at": _now(),
         "expected_row_version": expected_row_version,
         "result_row_version": expected_row_version + 1,
     }
 
-    stmt = pg_insert(TaskTransition).values(**values)
+    def write() -> Task | None:
+        # QC + fix-task (и record_fix_caused внутри create_fix) пишутся в той же транзакции/SAVEPOINT,
+        # что и transition: проигравший гонку client_event_id откатывает их вместе со своей вставкой.
+        fix = None
+        if fix_effect is not None:
+            fix = _create_review_fix(db, task, actor_user_id=actor_user_id, effect=fix_effect)
+            tr_payload["fix_task_id"] = str(fix.id)
+        db.execute(pg_insert(TaskTransition).values(**values, payload=tr_payload))
+        return fix
 
     if client_event_id is not None:
-        # IMPORTANT: conflict target must be (task_id, client_event_id)
-        stmt = (
-            stmt.on_conflict_do_nothing(
-                index_elements=[TaskTransition.task_id, TaskTransition.client_event_id],
-                index_where=TaskTransition.client_event_id.is_not(None),
-            )
-            .returning(TaskTransition.id)
-        )
-        inserted_id = db.execute(stmt).scalar_one_or_none()
-
-        # гонка/повтор: transition не вставился => возвращаем existing и НЕ трогаем Task
-        if inserted_id is None:
-            existing = db.execute(
-                select(TaskTransition).where(
-                    TaskTransition.task_id == task_id,
-                    TaskTransition.client_event_id == client_event_id,
-                )
-            ).scalar_one()
+        # ON CONFLICT тут невозможен: unique (task_id, client_event_id) лежит не на
+        # партиционированной task_transitions, а в task_transition_keys (триггер).
+        # Поэтому — SAVEPOINT и разбор IntegrityError по имени индекса.
+        try:
+            with db.begin_nested():
+                fix_task = write()
+        except IntegrityError as e:
+            # гонка/повтор: transition не вставился => возвращаем existing и НЕ трогаем Task.
+            # Параллельный review_reject с тем же client_event_id может упереться раньше —
+            # в uq_tasks_one_fix_per_qc_reject; победитель к этому моменту уже закоммитил transition.
+            existing = _find_by_client_event(db, task_id=task_id, client_event_id=client_event_id)
+            if existing is None or (fix_effect is None and not _is_idempotency_violation(e)):
+                raise
             return _load_result_by_transition(db, existing)
     else:
-        db.execute(stmt)
+        fix_task = write()
 
     # 7) ТОЛЬКО если transition реально вставился — применяем изменения к Task
     if action in ("self_assign", "assign"):
@@ -355,5 +383,9 @@ def apply_task_transition(
     task.updated_at = _now()
     task.row_version = expected_row_version + 1
 
+    # M13: rollup по исполнителю — в той же транзакции, что и transition
+    if to_status == TaskStatus.done and from_status != TaskStatus.done:
+        record_completion(db, task, at=values["created_at"])
+
     db.flush()
     return task, fix_task
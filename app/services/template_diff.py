@@ -0,0 +1,128 @@
+# app/services/template_diff.py
+"""
+Diff двух версий шаблона проекта.
+
+Nodes сравниваются по code, edges — по паре (predecessor_code, successor_code).
+Обе версии читаются двумя запросами (только нужные колонки), сравнение — через dict/set,
+т.е. O(nodes + edges).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.project_template_edge import ProjectTemplateEdge
+from app.models.project_template_node import ProjectTemplateNode
+
+
+@dataclass(frozen=True)
+class TemplateNodeRow:
+    """Снимок node шаблона: не зависит от Session (переживает commit между чанками)."""
+
+    code: str
+    parent_code: str | None
+    title: str
+    description: str | None
+    priority: int
+    kind: str
+    is_milestone: bool
+
+
+# Поля node, изменение которых считается изменением node (code — ключ)
+NODE_FIELDS = tuple(f.name for f in fields(TemplateNodeRow) if f.name != "code")
+
+
+def load_template_nodes(db: Session, template_version_id: UUID) -> dict[str, TemplateNodeRow]:
+    rows = db.execute(
+        select(
+            ProjectTemplateNode.code,
+            ProjectTemplateNode.parent_code,
+            ProjectTemplateNode.title,
+            ProjectTemplateNode.description,
+            ProjectTemplateNode.priority,
+            ProjectTemplateNode.kind,
+            ProjectTemplateNode.is_milestone,
+        ).where(ProjectTemplateNode.template_version_id == template_version_id)
+    ).all()
+    return {r.code: TemplateNodeRow(*r[:6], bool(r.is_milestone)) for r in rows}
+
+
+def load_template_edges(db: Session, template_version_id: UUID) -> set[tuple[str, str]]:
+    rows = db.execute(
+        select(ProjectTemplateEdge.predecessor_code, ProjectTemplateEdge.successor_code).where(
+            ProjectTemplateEdge.template_version_id == template_version_id
+        )
+    ).all()
+    return {(r[0], r[1]) for r in rows}
+
+
+@dataclass(frozen=True)
+class NodeChange:
+    code: str
+    # поле -> (старое значение, новое значение)
+    changes: dict[str, tuple[Any, Any]]
+    node: TemplateNodeRow
+
+
+@dataclass
+class TemplateDiff:
+    from_version_id: UUID | None = None
+    to_version_id: UUID | None = None
+
+    added_nodes: list[TemplateNodeRow] = field(default_factory=list)
+    removed_nodes: list[str] = field(default_factory=list)
+    changed_nodes: list[NodeChange] = field(default_factory=list)
+
+    added_edges: list[tuple[str, str]] = field(default_factory=list)
+    removed_edges: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added_nodes or self.removed_nodes or self.changed_nodes or self.added_edges or self.removed_edges
+        )
+
+
+def diff_templates(
+    old_nodes: dict[str, TemplateNodeRow],
+    new_nodes: dict[str, TemplateNodeRow],
+    old_edges: set[tuple[str, str]],
+    new_edges: set[tuple[str, str]],
+) -> TemplateDiff:
+    """Чистая функция: результат детерминирован (всё отсортировано по code)."""
+    diff = TemplateDiff()
+
+    for code in sorted(new_nodes.keys() - old_nodes.keys()):
+        diff.added_nodes.append(new_nodes[code])
+    diff.removed_nodes = sorted(old_nodes.keys() - new_nodes.keys())
+
+    for code in sorted(old_nodes.keys() & new_nodes.keys()):
+        old, new = old_nodes[code], new_nodes[code]
+        if old == new:
+            continue
+        changes = {
+            name: (getattr(old, name), getattr(new, name))
+            for name in NODE_FIELDS
+            if getattr(old, name) != getattr(new, name)
+        }
+        diff.changed_nodes.append(NodeChange(code=code, changes=changes, node=new))
+
+    diff.added_edges = sorted(new_edges - old_edges)
+    diff.removed_edges = sorted(old_edges - new_edges)
+    return diff
+
+
+def diff_template_versions(db: Session, from_version_id: UUID, to_version_id: UUID) -> TemplateDiff:
+    diff = diff_templates(
+        load_template_nodes(db, from_version_id),
+        load_template_nodes(db, to_version_id),
+        load_template_edges(db, from_version_id),
+        load_template_edges(db, to_version_id),
+    )
+    diff.from_version_id = from_version_id
+    diff.to_version_id = to_version_id
+    return diff
@@ -0,0 +1,456 @@
+# app/services/template_io.py
+"""
+Импорт / экспорт версии шаблона проекта (nodes + edges) в JSON Lines или CSV.
+
+Импорт — один проход по потоку:
+- nodes сразу уходят в COPY project_template_nodes (в памяти не держим title/description);
+- для проверок держим только code -> (parent_code, строка) и список edges;
+- в конце: parent_code / концы edges существуют, parent-дерево и граф edges ацикличны;
+  edges пишутся вторым COPY. Любая ошибка -> исключение, транзакция вызывающего откатывается.
+
+Формат JSON Lines (одна запись на строку):
+  {"type": "version", "version": "v2", "description": "..."}       # опционально, игнорируется
+  {"type": "node", "code": "frame", "title": "Каркас", "parent_code": null,
+   "description": null, "priority": 0, "kind": "production", "is_milestone": false}
+  {"type": "edge", "predecessor_code": "frame", "successor_code": "paint"}
+
+CSV — те же поля, заголовок обязателен (CSV_COLUMNS; лишние колонки запрещены).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, TextIO
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.project_template import ProjectTemplate
+from app.models.project_template_edge import ProjectTemplateEdge
+from app.models.project_template_node import ProjectTemplateNode
+from app.models.project_template_version import ProjectTemplateVersion
+from app.models.task import TaskKind
+
+try:
+    import orjson
+except ImportError:  # optional speedup: pip install orjson
+    orjson = None
+
+
+TEMPLATE_FORMATS = ("jsonl", "csv")
+
+MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+CSV_COLUMNS = (
+    "type",
+    "code",
+    "parent_code",
+    "title",
+    "description",
+    "priority",
+    "kind",
+    "is_milestone",
+    "predecessor_code",
+    "successor_code",
+)
+
+NODE_COLUMNS = ("id", "template_version_id", "code", "title", "description", "parent_code", "kind", "priority", "is_milestone")
+EDGE_COLUMNS = ("id", "template_version_id", "predecessor_code", "successor_code")
+
+MAX_CODE_LENGTH = 120
+
+# non-COPY режим: вставка пачками, чтобы не держать весь шаблон в памяти
+_INSERT_BATCH = 5000
+
+_KINDS = {k.value for k in TaskKind}
+_TRUE = {"true", "1", "yes"}
+_FALSE = {"false", "0", "no", ""}
+
+
+class TemplateImportError(ValueError):
+    def __init__(self, message: str, *, line: int | None = None):
+        self.line = line
+        super().__init__(f"line {line}: {message}" if line is not None else message)
+
+
+@dataclass(frozen=True)
+class TemplateImportResult:
+    template_version_id: UUID
+    version: str
+    nodes: int
+    edges: int
+    activated: bool
+
+
+# ---------- parsing ----------
+
+
+def _loads(line: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _dumps(obj: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    """(номер строки, запись). Пустые значения CSV -> None."""
+    if fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                rec = _loads(line)
+            except ValueError as e:
+                raise TemplateImportError(f"invalid JSON: {e}", line=line_no) from e
+            if not isinstance(rec, dict):
+                raise TemplateImportError("record must be a JSON object", line=line_no)
+            yield line_no, rec
+
+    elif fmt == "csv":
+        reader = csv.DictReader(stream)
+        header = reader.fieldnames or []
+        unknown = sorted(set(header) - set(CSV_COLUMNS))
+        if "type" not in header or unknown:
+            raise TemplateImportError(
+                f"CSV header must be a subset of {','.join(CSV_COLUMNS)} with 'type'", line=1
+            )
+        for rec in reader:
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in rec.items()}
+
+    else:
+        raise ValueError(f"fmt must be one of {TEMPLATE_FORMATS}")
+
+
+def _code(rec: dict[str, Any], key: str, line: int, *, required: bool = True) -> str | None:
+    value = rec.get(key)
+    if value is None:
+        if required:
+            raise TemplateImportError(f"'{key}' is required", line=line)
+        return None
+    if not isinstance(value, str) or not value.strip():
+        raise TemplateImportError(f"'{key}' must be a non-empty string", line=line)
+    value = value.strip()
+    if len(value) > MAX_CODE_LENGTH:
+        raise TemplateImportError(f"'{key}' is longer than {MAX_CODE_LENGTH}", line=line)
+    return value
+
+
+def _int(value: Any, key: str, line: int) -> int:
+    if value is None:
+        return 0
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        return int(value)
+    except (TypeError, ValueError):
+        raise TemplateImportError(f"'{key}' must be an integer", line=line)
+
+
+def _bool(value: Any, key: str, line: int) -> bool:
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+        return value.strip().lower() in _TRUE
+    raise TemplateImportError(f"'{key}' must be a boolean", line=line)
+
+
+# ---------- validation ----------
+
+
+def find_cycle(nodes: Iterable[str], edges: Iterable[tuple[str, str]]) -> str | None:
+    """Kahn: code, лежащий на цикле (или зависящий от цикла), либо None для DAG."""
+    indegree: dict[str, int] = {n: 0 for n in nodes}
+    successors: dict[str, list[str]] = {}
+    for pred, succ in edges:
+        successors.setdefault(pred, []).append(succ)
+        indegree[succ] = indegree.get(succ, 0) + 1
+        indegree.setdefault(pred, 0)
+
+    ready = [n for n, d in indegree.items() if d == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for s in successors.get(n, ()):
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                ready.append(s)
+
+    if seen == len(indegree):
+        return None
+    return min(n for n, d in indegree.items() if d > 0)
+
+
+class TemplateValidator:
+    """Состояние однопроходной проверки: только codes, parent-ссылки и edges."""
+
+    def __init__(self) -> None:
+        self.parents: dict[str, str | None] = {}
+        self.lines: dict[str, int] = {}
+        self.edges: list[tuple[str, str]] = []
+        self._edge_set: set[tuple[str, str]] = set()
+        self._edge_lines: list[int] = []
+
+    def node(self, rec: dict[str, Any], line: int) -> dict[str, Any]:
+        code = _code(rec, "code", line)
+        if code in self.parents:
+            raise TemplateImportError(f"duplicate node code '{code}' (first at line {self.lines[code]})", line=line)
+
+        title = rec.get("title")
+        if not isinstance(title, str) or not title.strip():
+            raise TemplateImportError("'title' is required", line=line)
+
+        kind = rec.get("kind") or TaskKind.production.value
+        if kind not in _KINDS:
+            raise TemplateImportError(f"unknown kind '{kind}'", line=line)
+
+        parent_code = _code(rec, "parent_code", line, required=False)
+        if parent_code == code:
+            raise TemplateImportError(f"node '{code}' cannot be its own parent", line=line)
+
+        self.parents[code] = parent_code
+        self.lines[code] = line
+        return {
+            "code": code,
+            "title": title,
+            "description": rec.get("description"),
+            "parent_code": parent_code,
+            "kind": kind,
+            "priority": _int(rec.get("priority"), "priority", line),
+            "is_milestone": _bool(rec.get("is_milestone"), "is_milestone", line),
+        }
+
+    def edge(self, rec: dict[str, Any], line: int) -> tuple[str, str]:
+        pred = _code(rec, "predecessor_code", line)
+        succ = _code(rec, "successor_code", line)
+        if pred == succ:
+            raise TemplateImportError("edge cannot be self-referential", line=line)
+        if (pred, succ) in self._edge_set:
+            raise TemplateImportError(f"duplicate edge {pred} -> {succ}", line=line)
+        self._edge_set.add((pred, succ))
+        self.edges.append((pred, succ))
+        self._edge_lines.append(line)
+        return pred, succ
+
+    def finish(self) -> None:
+        if not self.parents:
+            raise TemplateImportError("template has no nodes")
+
+        for code, parent in self.parents.items():
+            if parent is not None and parent not in self.parents:
+                raise TemplateImportError(
+                    f"node '{code}' references missing parent_code '{parent}'", line=self.lines[code]
+                )
+
+        for (pred, succ), line in zip(self.edges, self._edge_lines):
+            for c in (pred, succ):
+                if c not in self.parents:
+                    raise TemplateImportError(f"edge references unknown node '{c}'", line=line)
+
+        cyclic = find_cycle(
+            self.parents, ((p, c) for c, p in self.parents.items() if p is not None)
+        )
+        if cyclic is not None:
+            raise TemplateImportError(f"parent_code cycle through '{cyclic}'", line=self.lines[cyclic])
+
+        cyclic = find_cycle(self.parents, self.edges)
+        if cyclic is not None:
+            raise TemplateImportError(f"dependency cycle through '{cyclic}'", line=self.lines[cyclic])
+
+
+# ---------- import ----------
+
+
+class _Writer:
+    """COPY FROM STDIN по соединению Session, либо INSERT пачками (use_copy=False)."""
+
+    def __init__(self, db: Session, model, columns: tuple[str, ...], *, use_copy: bool):
+        self.db = db
+        self.model = model
+        self.columns = columns
+        self.use_copy = use_copy
+        self.count = 0
+        self._buffer: list[dict[str, Any]] = []
+        self._cursor = None
+        self._copy = None
+
+    def __enter__(self) -> "_Writer":
+        if self.use_copy:
+            raw = self.db.connection().connection.driver_connection
+            self._cursor = raw.cursor()
+            self._copy = self._cursor.copy(
+                f"COPY {self.model.__tablename__} ({', '.join(self.columns)}) FROM STDIN"
+            )
+            self._copy.__enter__()
+        return self
+
+    def write(self, row: dict[str, Any]) -> None:
+        self.count += 1
+        if self.use_copy:
+            self._copy.write_row([row[c] for c in self.columns])
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= _INSERT_BATCH:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self.db.execute(insert(self.model), self._buffer)
+            self._buffer = []
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.use_copy:
+            try:
+                self._copy.__exit__(exc_type, exc, tb)
+            finally:
+                self._cursor.close()
+        elif exc_type is None:
+            self._flush()
+
+
+def import_template_version(
+    db: Session,
+    stream: TextIO,
+    *,
+    org_id: UUID,
+    project_id: UUID,
+    actor_user_id: UUID,
+    version: str,
+    description: str | None = None,
+    fmt: str = "jsonl",
+    activate: bool = False,
+    use_copy: bool = True,
+) -> TemplateImportResult:
+    """Новая версия шаблона из потока. Транзакция — вызывающего (ошибка => rollback)."""
+    if fmt not in TEMPLATE_FORMATS:
+        raise ValueError(f"fmt must be one of {TEMPLATE_FORMATS}")
+
+    pt: ProjectTemplate | None = db.execute(
+        select(ProjectTemplate).where(ProjectTemplate.project_id == project_id)
+    ).scalar_one_or_none()
+    if pt is None or pt.org_id != org_id:
+        raise LookupError("Project template not found for this project/org")
+
+    tv = ProjectTemplateVersion(
+        id=uuid4(),
+        org_id=org_id,
+        project_id=project_id,
+        version=version,
+        description=description,
+        created_by=actor_user_id,
+    )
+    db.add(tv)
+    db.flush()
+
+    validator = TemplateValidator()
+    with _Writer(db, ProjectTemplateNode, NODE_COLUMNS, use_copy=use_copy) as nodes:
+        for line, rec in iter_records(stream, fmt):
+            kind = rec.get("type")
+            if kind == "node":
+                row = validator.node(rec, line)
+                nodes.write({"id": uuid4(), "template_version_id": tv.id, **row})
+            elif kind == "edge":
+                validator.edge(rec, line)
+            elif kind == "version":
+                continue
+            else:
+                raise TemplateImportError(f"unknown record type '{kind}'", line=line)
+
+    validator.finish()
+
+    with _Writer(db, ProjectTemplateEdge, EDGE_COLUMNS, use_copy=use_copy) as edges:
+        for pred, succ in validator.edges:
+            edges.write(
+                {"id": uuid4(), "template_version_id": tv.id, "predecessor_code": pred, "successor_code": succ}
+            )
+
+    if activate:
+        pt.active_template_version_id = tv.id
+        pt.updated_by = actor_user_id
+        db.add(pt)
+        db.flush()
+
+    return TemplateImportResult(
+        template_version_id=tv.id,
+        version=version,
+        nodes=nodes.count,
+        edges=edges.count,
+        activated=activate,
+    )
+
+
+# ---------- export ----------
+
+
+def iter_export_lines(
+    db: Session,
+    tv: ProjectTemplateVersion,
+    *,
+    fmt: str = "jsonl",
+    batch_size: int = 5000,
+) -> Iterator[str]:
+    """Строки файла (server-side cursor): сначала nodes по code, затем edges."""
+    if fmt not in TEMPLATE_FORMATS:
+        raise ValueError(f"fmt must be one of {TEMPLATE_FORMATS}")
+
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, lineterminator="\n")
+
+        def emit(rec: dict[str, Any]) -> str:
+            buf.seek(0)
+            buf.truncate()
+            writer.writerow(rec)
+            return buf.getvalue()
+
+        yield emit({c: c for c in CSV_COLUMNS})
+    else:
+        def emit(rec: dict[str, Any]) -> str:
+            return _dumps(rec) + "\n"
+
+        yield emit({"type": "version", "version": tv.version, "description": tv.description})
+
+    nodes = db.execute(
+        select(
+            ProjectTemplateNode.code,
+            ProjectTemplateNode.parent_code,
+            ProjectTemplateNode.title,
+            ProjectTemplateNode.description,
+            ProjectTemplateNode.priority,
+            ProjectTemplateNode.kind,
+            ProjectTemplateNode.is_milestone,
+        )
+        .where(ProjectTemplateNode.template_version_id == tv.id)
+        .order_by(ProjectTemplateNode.code)
+        .execution_options(yield_per=batch_size)
+    )
+    for r in nodes:
+        yield emit(
+            {
+                "type": "node",
+                "code": r.code,
+                "parent_code": r.parent_code,
+                "title": r.title,
+                "description": r.description,
+                "priority": r.priority,
+                "kind": r.kind,
+                "is_milestone": bool(r.is_milestone),
+            }
+        )
+
+    edges = db.execute(
+        select(ProjectTemplateEdge.predecessor_code, ProjectTemplateEdge.successor_code)
+        .where(ProjectTemplateEdge.template_version_id == tv.id)
+        .order_by(ProjectTemplateEdge.predecessor_code, ProjectTemplateEdge.successor_code)
+        .execution_options(yield_per=batch_size)
+    )
+    for pred, succ in edges:
+        yield emit({"type": "edge", "predecessor_code": pred, "successor_code": succ})
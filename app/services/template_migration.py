@@ -0,0 +1,340 @@
+# app/services/template_migration.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable
+from uuid import NAMESPACE_URL, UUID, uuid4, uuid5
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import Cache
+from app.fsm.task_fsm import Action, TransitionNotAllowed
+from app.models.deliverable import Deliverable, DeliverableStatus
+from app.models.task import Task, TaskStatus, WorkKind
+from app.services.deliverable_bootstrap_service import BootstrapError
+from app.services.task_transition_service import IdempotencyConflict, VersionConflict, apply_task_transition
+from app.services.template_diff import TemplateDiff, TemplateNodeRow, diff_template_versions, load_template_nodes
+
+# Namespace для детерминированных client_event_id отмены (uuid5), как у shift_release.
+TEMPLATE_MIGRATION_NAMESPACE = uuid5(NAMESPACE_URL, "planner:template_migration")
+
+# Изделия в этих статусах не мигрируем
+FROZEN_DELIVERABLE_STATUSES = (DeliverableStatus.qc_approved.value, DeliverableStatus.canceled.value)
+
+# Node -> поле задачи (parent_code обрабатывается отдельно: это parent_task_id)
+_TASK_FIELDS = ("title", "description", "priority", "kind", "is_milestone")
+
+_INSERT_DEPENDENCY = text(
+    """
+    INSERT INTO task_dependencies (org_id, project_id, predecessor_id, successor_id, created_by, created_at)
+    VALUES (:org_id, :project_id, :pred, :succ, :created_by, now())
+    ON CONFLICT DO NOTHING
+    """
+)
+
+_DELETE_DEPENDENCY = text(
+    """
+    DELETE FROM task_dependencies
+    WHERE org_id = :org_id AND predecessor_id = :pred AND successor_id = :succ
+    """
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _depth(code: str, nodes: dict[str, TemplateNodeRow]) -> int:
+    depth = 0
+    parent = nodes[code].parent_code
+    while parent is not None and parent in nodes and depth <= len(nodes):
+        depth += 1
+        parent = nodes[parent].parent_code
+    return depth
+
+
+@dataclass
+class DeliverableMigrationResult:
+    deliverable_id: UUID
+    created_tasks: int = 0
+    updated_tasks: int = 0
+    canceled_tasks: int = 0
+    skipped_done: int = 0
+    added_dependencies: int = 0
+    removed_dependencies: int = 0
+    # задачи, у которых сменился row_version (для инвалидации кеша после commit)
+    touched_task_ids: list[UUID] = field(default_factory=list)
+
+
+class TemplateMigrationService:
+    """
+    Переводит развёрнутый deliverable на другую версию шаблона, применяя только diff:
+
+    - added nodes   -> новые задачи (blocked), parent_task_id — к новым или существующим задачам;
+    - changed nodes -> UPDATE полей задачи (+ row_version), parent_code -> parent_task_id;
+    - removed nodes -> cancel через apply_task_transition (FSM + task_transitions);
+    - edges         -> INSERT / DELETE task_dependencies.
+
+    Задачи в статусе done не трогаем никогда (и canceled тоже). Связь задача <-> node —
+    tasks.template_node_code (M14); задачи без неё (fix-task, ручные) не затрагиваются.
+    Работает в транзакции вызывающего кода.
+    """
+
+    def __init__(self, db: Session, *, actor_user_id: UUID):
+        self.db = db
+        self.actor_user_id = actor_user_id
+
+    def _template_tasks(self, deliverable_id: UUID) -> dict[str, Task]:
+        tasks = self.db.execute(
+            select(Task).where(
+                Task.deliverable_id == deliverable_id,
+                Task.work_kind == WorkKind.work,
+                Task.template_node_code.is_not(None),
+                Task.status != TaskStatus.canceled.value,
+            )
+        ).scalars()
+        return {t.template_node_code: t for t in tasks}
+
+    def _cancel(self, task: Task, to_version_id: UUID) -> bool:
+        try:
+            with self.db.begin_nested():
+                apply_task_transition(
+                    self.db,
+                    org_id=task.org_id,
+                    actor_user_id=self.actor_user_id,
+                    task_id=task.id,
+                    action=Action.CANCEL.value,
+                    expected_row_version=task.row_version,
+                    payload={},
+                    client_event_id=uuid5(
+                        TEMPLATE_MIGRATION_NAMESPACE, f"{to_version_id}:{task.id}:{task.row_version}"
+                    ),
+                )
+        except (VersionConflict, TransitionNotAllowed, IdempotencyConflict):
+            return False
+        return True
+
+    def migrate_deliverable(self, d: Deliverable, diff: TemplateDiff) -> DeliverableMigrationResult:
+        if d.template_version_id != diff.from_version_id:
+            raise BootstrapError("Deliverable is not on the diff's source template version")
+        if d.status in FROZEN_DELIVERABLE_STATUSES:
+            raise BootstrapError(f"Deliverable in status '{d.status}' cannot be migrated")
+
+        result = DeliverableMigrationResult(deliverable_id=d.id)
+        by_code = self._template_tasks(d.id)
+        touched = result.touched_task_ids
+
+        # 1) added nodes: id генерируем заранее, вставляем «родитель раньше ребёнка»
+        added = {n.code: n for n in diff.added_nodes}
+        new_ids = {code: uuid4() for code in added}
+
+        def task_id_for(code: str | None) -> UUID | None:
+            if code is None:
+                return None
+            if code in new_ids:
+                return new_ids[code]
+            parent = by_code.get(code)
+            return parent.id if parent is not None else None
+
+        for code in sorted(added, key=lambda c: _depth(c, added)):
+            n = added[code]
+            self.db.add(
+                Task(
+                    id=new_ids[code],
+                    org_id=d.org_id,
+                    project_id=d.project_id,
+                    deliverable_id=d.id,
+                    created_by=self.actor_user_id,
+                    title=n.title,
+                    description=n.description,
+                    priority=n.priority,
+                    status=TaskStatus.blocked.value,
+                    kind=n.kind,
+                    work_kind=WorkKind.work,
+                    is_milestone=n.is_milestone,
+                    parent_task_id=task_id_for(n.parent_code),
+                    template_node_code=code,
+                )
+            )
+            result.created_tasks += 1
+        # порядок INSERT'ов внутри flush = порядок add() (self-FK parent_task_id)
+        self.db.flush()
+
+        # 2) changed nodes
+        now = _now()
+        for change in diff.changed_nodes:
+            task = by_code.get(change.code)
+            if task is None:
+                continue
+            if task.status == TaskStatus.done.value:
+                result.skipped_done += 1
+                continue
+            for name in _TASK_FIELDS:
+                if name in change.changes:
+                    setattr(task, name, getattr(change.node, name))
+            if "parent_code" in change.changes:
+                task.parent_task_id = task_id_for(change.node.parent_code)
+            task.updated_at = now
+            task.row_version = task.row_version + 1
+            touched.append(task.id)
+            result.updated_tasks += 1
+        self.db.flush()
+
+        # 3) removed nodes
+        for code in diff.removed_nodes:
+            task = by_code.get(code)
+            if task is None:
+                continue
+            if task.status == TaskStatus.done.value:
+                result.skipped_done += 1
+                continue
+            if self._cancel(task, diff.to_version_id):
+                touched.append(task.id)
+                result.canceled_tasks += 1
+
+        # 4) edges. Связи отменённых задач тоже удаляем (removed_edges их содержит):
+        #    иначе отменённый predecessor навсегда остаётся blocker'ом.
+        params = {"org_id": d.org_id, "project_id": d.project_id, "created_by": self.actor_user_id}
+        for pred, succ in diff.removed_edges:
+            p, s = by_code.get(pred), by_code.get(succ)
+            if p is None or s is None:
+                continue
+            result.removed_dependencies += self.db.execute(
+                _DELETE_DEPENDENCY, {**params, "pred": p.id, "succ": s.id}
+            ).rowcount
+        for pred, succ in diff.added_edges:
+            p, s = task_id_for(pred), task_id_for(succ)
+            if p is None or s is None:
+                continue
+            result.added_dependencies += self.db.execute(
+                _INSERT_DEPENDENCY, {**params, "pred": p, "succ": s}
+            ).rowcount
+
+        # 5) deliverable теперь на новой версии
+        d.template_version_id = diff.to_version_id
+        self.db.add(d)
+        self.db.flush()
+        return result
+
+
+def invalidate_migrated(cache: Cache, org_id: UUID, result: DeliverableMigrationResult) -> None:
+    cache.delete(
+        Cache.deliverable_key(result.deliverable_id),
+        *(Cache.task_key(org_id, task_id) for task_id in result.touched_task_ids),
+    )
+
+
+@dataclass
+class TemplateRolloutProgress:
+    scanned: int = 0
+    migrated: int = 0
+    failed: int = 0
+    chunks: int = 0
+    created_tasks: int = 0
+    canceled_tasks: int = 0
+    updated_tasks: int = 0
+    errors: list[tuple[UUID, str]] = field(default_factory=list)
+
+
+class TemplateRolloutJob:
+    """
+    Раскатка версии шаблона на все открытые deliverables проекта.
+
+    - выборка keyset-чанками по deliverables.id;
+    - diff считается один раз на каждую исходную версию (кешируется в памяти);
+    - каждый deliverable — SAVEPOINT (ошибка не откатывает чанк), каждый чанк — commit.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        org_id: UUID,
+        project_id: UUID,
+        to_version_id: UUID,
+        actor_user_id: UUID,
+        chunk_size: int = 200,
+        on_progress: Callable[[TemplateRolloutProgress], None] | None = None,
+        cache: Cache | None = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+
+        self.db = db
+        self.org_id = org_id
+        self.project_id = project_id
+        self.to_version_id = to_version_id
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.cache = cache
+        self.service = TemplateMigrationService(db, actor_user_id=actor_user_id)
+        self._diffs: dict[UUID, TemplateDiff] = {}
+
+    def _diff(self, from_version_id: UUID) -> TemplateDiff:
+        if from_version_id not in self._diffs:
+            self._diffs[from_version_id] = diff_template_versions(self.db, from_version_id, self.to_version_id)
+        return self._diffs[from_version_id]
+
+    def _next_chunk(self, after_id: UUID | None) -> list[Deliverable]:
+        stmt = (
+            select(Deliverable)
+            .where(
+                Deliverable.org_id == self.org_id,
+                Deliverable.project_id == self.project_id,
+                Deliverable.template_version_id.is_not(None),
+                Deliverable.template_version_id != self.to_version_id,
+                Deliverable.status.not_in(FROZEN_DELIVERABLE_STATUSES),
+            )
+            .order_by(Deliverable.id.asc())
+            .limit(self.chunk_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Deliverable.id > after_id)
+        return list(self.db.execute(stmt).scalars())
+
+    def run(self) -> TemplateRolloutProgress:
+        if not load_template_nodes(self.db, self.to_version_id):
+            raise BootstrapError("Target template version has no nodes")
+
+        progress = TemplateRolloutProgress()
+        after_id: UUID | None = None
+
+        while True:
+            chunk = self._next_chunk(after_id)
+            if not chunk:
+                break
+
+            migrated: list[DeliverableMigrationResult] = []
+            try:
+                for d in chunk:
+                    progress.scanned += 1
+                    try:
+                        with self.db.begin_nested():
+                            r = self.service.migrate_deliverable(d, self._diff(d.template_version_id))
+                    except BootstrapError as e:
+                        progress.failed += 1
+                        progress.errors.append((d.id, str(e)))
+                        continue
+                    migrated.append(r)
+                after_id = chunk[-1].id
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            # кеш чистим только после commit: иначе читатель успеет закешировать старое
+            for r in migrated:
+                progress.migrated += 1
+                progress.created_tasks += r.created_tasks
+                progress.canceled_tasks += r.canceled_tasks
+                progress.updated_tasks += r.updated_tasks
+                if self.cache is not None:
+                    invalidate_migrated(self.cache, self.org_id, r)
+
+            progress.chunks += 1
+            if self.on_progress is not None:
+                self.on_progress(progress)
+
+        return progress
@@ -0,0 +1,213 @@
+# app/services/transition_export.py
+"""
+Колоночный экспорт task_transitions (Parquet / Arrow IPC) для аналитики.
+
+- строки читаются server-side cursor'ом (yield_per) и пишутся row group'ами:
+  в памяти одновременно только один батч;
+- UUID -> fixed_size_binary(16), action/from_status/to_status -> dictionary,
+  payload -> JSON-строка, created_at -> timestamp[us, UTC];
+- читаем archive tier и hot-таблицу (см. M11), каждую по created_at.
+
+pyarrow — опциональная зависимость: pip install pyarrow
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.task_transition import TaskTransition, TaskTransitionArchive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pip install pyarrow
+    pa = None
+    pq = None
+
+try:
+    import orjson
+except ImportError:  # optional speedup: pip install orjson
+    orjson = None
+
+
+EXPORT_FORMATS = ("parquet", "arrow")
+
+# Порядок колонок в файле = порядок в SELECT
+EXPORT_COLUMNS = (
+    "id",
+    "org_id",
+    "project_id",
+    "task_id",
+    "actor_user_id",
+    "action",
+    "from_status",
+    "to_status",
+    "client_event_id",
+    "expected_row_version",
+    "result_row_version",
+    "created_at",
+    "payload",
+)
+
+_UUID_COLUMNS = ("id", "org_id", "project_id", "task_id", "actor_user_id", "client_event_id")
+_DICT_COLUMNS = ("action", "from_status", "to_status")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for transition export: pip install pyarrow")
+
+
+def export_schema():
+    _require_pyarrow()
+    uuid16 = pa.binary(16)
+    status = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema(
+        [
+            pa.field("id", uuid16, nullable=False),
+            pa.field("org_id", uuid16, nullable=False),
+            pa.field("project_id", uuid16, nullable=False),
+            pa.field("task_id", uuid16, nullable=False),
+            pa.field("actor_user_id", uuid16, nullable=False),
+            pa.field("action", status, nullable=False),
+            pa.field("from_status", status, nullable=False),
+            pa.field("to_status", status, nullable=False),
+            pa.field("client_event_id", uuid16),
+            pa.field("expected_row_version", pa.int32()),
+            pa.field("result_row_version", pa.int32()),
+            pa.field("created_at", pa.timestamp("us", tz="UTC"), nullable=False),
+            pa.field("payload", pa.string()),
+        ]
+    )
+
+
+def _dump_payload(value: Any) -> str | None:
+    if value is None:
+        return None
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def rows_to_record_batch(rows: Sequence[Sequence[Any]], schema=None):
+    """Батч строк (в порядке EXPORT_COLUMNS) -> RecordBatch."""
+    _require_pyarrow()
+    schema = schema or export_schema()
+    columns = list(zip(*rows)) if rows else [() for _ in EXPORT_COLUMNS]
+
+    arrays = []
+    for name, values in zip(EXPORT_COLUMNS, columns):
+        field = schema.field(name)
+        if name in _UUID_COLUMNS:
+            arrays.append(pa.array([None if v is None else v.bytes for v in values], type=field.type))
+        elif name in _DICT_COLUMNS:
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode().cast(field.type))
+        elif name == "payload":
+            arrays.append(pa.array([_dump_payload(v) for v in values], type=field.type))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _select(model, *, org_id: UUID, project_id: UUID | None, since: datetime | None, until: datetime | None):
+    stmt = select(*(getattr(model, c) for c in EXPORT_COLUMNS)).where(model.org_id == org_id)
+    if project_id is not None:
+        stmt = stmt.where(model.project_id == project_id)
+    if since is not None:
+        stmt = stmt.where(model.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(model.created_at < until)
+    return stmt.order_by(model.created_at.asc(), model.id.asc())
+
+
+def iter_transition_rows(
+    db: Session,
+    *,
+    org_id: UUID,
+    project_id: UUID | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = 50_000,
+) -> Iterator[list[Sequence[Any]]]:
+    """Батчи строк: сначала archive tier, потом hot-таблица. Server-side cursor."""
+    for model in (TaskTransitionArchive, TaskTransition):
+        stmt = _select(model, org_id=org_id, project_id=project_id, since=since, until=until)
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for part in result.partitions():
+            yield part
+
+
+@dataclass
+class TransitionExportResult:
+    path: Path
+    rows: int = 0
+    row_groups: int = 0
+    bytes_written: int = 0
+
+
+def export_transitions(
+    db: Session,
+    path: str | Path,
+    *,
+    org_id: UUID,
+    project_id: UUID | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    fmt: str = "parquet",
+    row_group_size: int = 50_000,
+    compression: str = "zstd",
+) -> TransitionExportResult:
+    """
+    Пишет transitions в один файл.
+    parquet — ParquetWriter, один row group на батч;
+    arrow — Arrow IPC stream (словари могут меняться между батчами).
+    """
+    _require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"fmt must be one of {EXPORT_FORMATS}")
+    if row_group_size < 1:
+        raise ValueError("row_group_size must be >= 1")
+
+    schema = export_schema()
+    result = TransitionExportResult(path=Path(path))
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(str(path), schema, compression=compression)
+
+        def write(batch):
+            writer.write_table(pa.Table.from_batches([batch]), row_group_size=batch.num_rows or None)
+
+    else:
+        # IPC поддерживает только lz4 / zstd
+        ipc_compression = compression if compression in ("lz4", "zstd") else None
+        sink = pa.OSFile(str(path), "wb")
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression=ipc_compression))
+        write = writer.write_batch
+
+    try:
+        for rows in iter_transition_rows(
+            db,
+            org_id=org_id,
+            project_id=project_id,
+            since=since,
+            until=until,
+            batch_size=row_group_size,
+        ):
+            write(rows_to_record_batch(rows, schema))
+            result.rows += len(rows)
+            result.row_groups += 1
+    finally:
+        writer.close()
+        if fmt == "arrow":
+            sink.close()
+
+    result.bytes_written = result.path.stat().st_size
+    return result
@@ -0,0 +1,217 @@
+# app/services/transition_partition_job.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.task_transition import TaskTransitionArchive
+
+PARTITION_PREFIX = "task_transitions_p"
+DEFAULT_PARTITION = "task_transitions_default"
+_PARTITION_RE = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})_(\d{{2}})$")
+
+# Явный список колонок: archive создан через LIKE, но порядок не хотим считать контрактом.
+_COLUMNS = ", ".join(c.name for c in TaskTransitionArchive.__table__.columns)
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    m = _PARTITION_RE.match(name)
+    if m is None:
+        return None
+    return date(int(m.group(1)), int(m.group(2)), 1)
+
+
+def _bound(month: date) -> datetime:
+    # границы партиций — по UTC (как в миграции M11)
+    return datetime.combine(month, time.min, tzinfo=timezone.utc)
+
+
+@dataclass
+class TransitionPartitionResult:
+    created: list[str] = field(default_factory=list)
+    archived: list[str] = field(default_factory=list)
+    archived_rows: int = 0
+
+
+class TransitionPartitionJob:
+    """
+    Обслуживание месячных партиций task_transitions (M11).
+
+    - создаёт партиции на months_ahead месяцев вперёд (если месяц уже попал
+      в DEFAULT-партицию — строки переносятся в новую партицию);
+    - месяцы старше retention_months: DETACH -> task_transitions_archive -> DROP,
+      ключи idempotency этих месяцев удаляются из task_transition_keys;
+    - каждая партиция — отдельная транзакция.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        months_ahead: int = 3,
+        retention_months: int = 12,
+        today: date | None = None,
+        on_progress: Callable[[str, str], None] | None = None,
+    ):
+        if months_ahead < 0:
+            raise ValueError("months_ahead must be >= 0")
+        if retention_months < 1:
+            raise ValueError("retention_months must be >= 1")
+
+        self.db = db
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.today = today or datetime.now(timezone.utc).date()
+        self.on_progress = on_progress
+
+    # ---------- introspection ----------
+
+    def attached_partitions(self) -> dict[date, str]:
+        rows = self.db.execute(
+            text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'task_transitions'::regclass
+                """
+            )
+        ).scalars()
+        out: dict[date, str] = {}
+        for name in rows:
+            month = partition_month(name)
+            if month is not None:
+                out[month] = name
+        return out
+
+    # ---------- create ----------
+
+    def _create_partition(self, month: date) -> None:
+        name = partition_name(month)
+        params = {"lo": _bound(month), "hi": _bound(add_months(month, 1))}
+
+        in_default = self.db.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+                "WHERE created_at >= :lo AND created_at < :hi)"
+            ),
+            params,
+        ).scalar_one()
+
+        if not in_default:
+            self.db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF task_transitions "
+                    f"FOR VALUES FROM ('{params['lo'].isoformat()}') TO ('{params['hi'].isoformat()}')"
+                )
+            )
+            return
+
+        # Месяц уже пишется в DEFAULT (job не успел вовремя): переносим строки.
+        # DELETE из DEFAULT срабатывает триггером по task_transition_keys — ключи возвращаем
+        # в той же транзакции.
+        self.db.execute(text(f"CREATE TABLE {name} (LIKE task_transitions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        self.db.execute(
+            text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE created_at >= :lo AND created_at < :hi
+                    RETURNING *
+                )
+                INSERT INTO {name} ({_COLUMNS}) SELECT {_COLUMNS} FROM moved
+                """
+            ),
+            params,
+        )
+        self.db.execute(
+            text(
+                f"""
+                INSERT INTO task_transition_keys
+                    (transition_id, org_id, task_id, client_event_id, result_row_version, created_at)
+                SELECT id, org_id, task_id, client_event_id, result_row_version, created_at
+                FROM {name}
+                """
+            )
+        )
+        self.db.execute(
+            text(
+                f"ALTER TABLE task_transitions ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{params['lo'].isoformat()}') TO ('{params['hi'].isoformat()}')"
+            )
+        )
+
+    def ensure_future_partitions(self, result: TransitionPartitionResult) -> None:
+        existing = self.attached_partitions()
+        first = month_start(self.today)
+
+        for i in range(self.months_ahead + 1):
+            month = add_months(first, i)
+            if month in existing:
+                continue
+            try:
+                self._create_partition(month)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            result.created.append(partition_name(month))
+            if self.on_progress is not None:
+                self.on_progress("created", partition_name(month))
+
+    # ---------- archive ----------
+
+    def archive_before(self, cutoff: date, result: TransitionPartitionResult) -> None:
+        """Все месячные партиции с month < cutoff уезжают в task_transitions_archive."""
+        for month, name in sorted(self.attached_partitions().items()):
+            if month >= cutoff:
+                continue
+
+            params = {"lo": _bound(month), "hi": _bound(add_months(month, 1))}
+            try:
+                self.db.execute(text(f"ALTER TABLE task_transitions DETACH PARTITION {name}"))
+                moved = self.db.execute(
+                    text(
+                        f"INSERT INTO task_transitions_archive ({_COLUMNS}) "
+                        f"SELECT {_COLUMNS} FROM {name}"
+                    )
+                ).rowcount
+                self.db.execute(
+                    text("DELETE FROM task_transition_keys WHERE created_at >= :lo AND created_at < :hi"),
+                    params,
+                )
+                self.db.execute(text(f"DROP TABLE {name}"))
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            result.archived.append(name)
+            result.archived_rows += moved
+            if self.on_progress is not None:
+                self.on_progress("archived", name)
+
+    def run(self) -> TransitionPartitionResult:
+        result = TransitionPartitionResult()
+        self.ensure_future_partitions(result)
+        self.archive_before(add_months(month_start(self.today), -self.retention_months), result)
+        return result
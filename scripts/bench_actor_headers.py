@@ -0,0 +1,189 @@
+# scripts/bench_actor_headers.py
+"""
+Микробенчмарк: старый require_x_role (@app.middleware("http") + sync-dependency заголовков)
+против ActorHeadersMiddleware (pure ASGI, разбор заголовков один раз в scope state).
+
+Запуск локально:
+  python scripts/bench_actor_headers.py --requests 20000
+
+Запросы идут напрямую в ASGI-приложение (без сервера и сети), поэтому разница —
+это именно per-request overhead middleware + dependency. Endpoint'ы:
+  json   — get_actor_context + маленький JSON;
+  stream — get_actor_context + StreamingResponse из 64 чанков.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from uuid import UUID
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.api.deps import ActorContext, get_actor_context
+from app.api.middleware import ActorHeadersMiddleware
+
+OPEN_PATHS = {"/health"}
+STREAM_CHUNKS = 64
+
+
+# ---------- baseline: как было до ActorHeadersMiddleware ----------
+
+
+def legacy_org_id(x_org_id: str | None = Header(default=None, alias="X-Org-Id")) -> UUID:
+    if not x_org_id:
+        raise HTTPException(status_code=401, detail="Missing X-Org-Id header")
+    try:
+        return UUID(x_org_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid X-Org-Id format (must be UUID)") from e
+
+
+def legacy_user_id(x_actor_user_id: str | None = Header(default=None, alias="X-Actor-User-Id")) -> UUID:
+    if not x_actor_user_id:
+        raise HTTPException(status_code=401, detail="Missing X-Actor-User-Id header")
+    try:
+        return UUID(x_actor_user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid X-Actor-User-Id format (must be UUID)") from e
+
+
+def legacy_actor_user_id(actor_user_id: UUID = Depends(legacy_user_id)) -> UUID:
+    return actor_user_id
+
+
+def legacy_role(x_role: str = Header("system", alias="X-Role")) -> str:
+    return x_role.strip()
+
+
+def legacy_actor_context(
+    org_id: UUID = Depends(legacy_org_id),
+    actor_user_id: UUID = Depends(legacy_actor_user_id),
+    role: str = Depends(legacy_role),
+) -> ActorContext:
+    return ActorContext(org_id=org_id, actor_user_id=actor_user_id, role=role)
+
+
+def _routes(app: FastAPI, dependency) -> FastAPI:
+    @app.get("/json")
+    async def json_endpoint(ctx: ActorContext = Depends(dependency)):
+        return {"role": ctx.role}
+
+    @app.get("/stream")
+    async def stream_endpoint(ctx: ActorContext = Depends(dependency)):
+        async def body():
+            for _ in range(STREAM_CHUNKS):
+                yield b"x" * 256
+
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+def legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def require_x_role(request: Request, call_next):
+        if request.url.path in OPEN_PATHS:
+            return await call_next(request)
+        x_role = request.headers.get("X-Role")
+        if not x_role or not x_role.strip():
+            return JSONResponse(status_code=401, content={"detail": "Missing X-Role header"})
+        return await call_next(request)
+
+    return _routes(app, legacy_actor_context)
+
+
+def asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ActorHeadersMiddleware, open_paths=OPEN_PATHS)
+    return _routes(app, get_actor_context)
+
+
+# ---------- driver ----------
+
+
+HEADERS = [
+    (b"x-org-id", str(uuid.uuid4()).encode()),
+    (b"x-actor-user-id", str(uuid.uuid4()).encode()),
+    (b"x-role", b"lead"),
+    (b"accept", b"*/*"),
+]
+
+
+async def _request(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": HEADERS,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+        "state": {},
+    }
+    status = 0
+    sent_body = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # как сервер: тело один раз, дальше ждём disconnect (StreamingResponse слушает его)
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _bench(app, path: str, n: int) -> float:
+    for _ in range(min(500, n)):
+        assert await _request(app, path) == 200
+    t = time.perf_counter()
+    for _ in range(n):
+        await _request(app, path)
+    return (time.perf_counter() - t) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("ActorHeadersMiddleware microbenchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3, help="берём лучший из N прогонов")
+    args = parser.parse_args()
+
+    async def run() -> None:
+        apps = {"legacy": legacy_app(), "asgi": asgi_app()}
+        print(f"{'endpoint':<8}  {'legacy us/req':>14}  {'asgi us/req':>12}  {'saved':>8}")
+        for path in ("/json", "/stream"):
+            best = {
+                name: min([await _bench(app, path, args.requests) for _ in range(args.repeat)])
+                for name, app in apps.items()
+            }
+            saved = best["legacy"] - best["asgi"]
+            print(
+                f"{path:<8}  {best['legacy']:>14.1f}  {best['asgi']:>12.1f}  "
+                f"{saved:>6.1f}us ({saved / best['legacy'] * 100:.0f}%)"
+            )
+
+    asyncio.run(run())
+    print("[OK] done")
+
+
+if __name__ == "__main__":
+    main()
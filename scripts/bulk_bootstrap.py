@@ -0,0 +1,62 @@
+# scripts/bulk_bootstrap.py
+"""
+Партия изделий: создать deliverables по списку serials и развернуть активный шаблон проекта.
+
+Запуск локально:
+  python scripts/bulk_bootstrap.py --org-id <uuid> --project-id <uuid> --actor-user-id <uuid> \
+    --deliverable-type box_v1 --serials-file serials.txt
+
+serials.txt — один serial на строку. Каждый чанк — отдельная транзакция:
+при падении уже закоммиченные чанки остаются, повторный запуск упадёт на занятых serials
+(их нужно убрать из файла).
+"""
+from __future__ import annotations
+
+import argparse
+from uuid import UUID
+
+from app.core.db import SessionLocal
+from app.services.deliverable_batch_bootstrap import BatchBootstrapProgress, DeliverableBatchBootstrap
+
+
+def _print_progress(p: BatchBootstrapProgress) -> None:
+    print(f"[bulk-bootstrap] chunk={p.chunks} deliverables={len(p.deliverables)} tasks={p.created_tasks}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Bulk create + bootstrap deliverables")
+    parser.add_argument("--org-id", required=True, type=UUID)
+    parser.add_argument("--project-id", required=True, type=UUID)
+    parser.add_argument("--actor-user-id", required=True, type=UUID)
+    parser.add_argument("--deliverable-type", required=True)
+    parser.add_argument("--serials-file", required=True, help="One serial per line")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Serials per transaction")
+    parser.add_argument("--no-copy", action="store_true", help="Multi-row INSERT instead of COPY")
+    args = parser.parse_args()
+
+    with open(args.serials_file, encoding="utf-8") as f:
+        serials = [line.strip() for line in f if line.strip()]
+
+    db = SessionLocal()
+    try:
+        result = DeliverableBatchBootstrap(
+            db,
+            org_id=args.org_id,
+            project_id=args.project_id,
+            deliverable_type=args.deliverable_type,
+            actor_user_id=args.actor_user_id,
+            use_copy=not args.no_copy,
+            chunk_size=args.chunk_size,
+            on_progress=_print_progress,
+        ).run(serials)
+    finally:
+        db.close()
+
+    print(
+        f"[OK] deliverables={len(result.deliverables)} tasks={result.created_tasks} "
+        f"dependencies={result.created_dependencies} chunks={result.chunks}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# scripts/executor_stats_rebuild.py
+"""
+Пересчёт executor_stats_daily за период из tasks / task_transitions (бэкфилл или ремонт).
+
+Запуск локально:
+  python scripts/executor_stats_rebuild.py --org-id <uuid> --date-from 2026-01-01 --date-to 2026-01-31
+
+В штатном режиме rollup пишется инкрементами вместе с transition/create_fix;
+скрипт нужен после миграции M13 и для сверки.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date
+from uuid import UUID
+
+from app.core.db import SessionLocal
+from app.services.executor_stats import rebuild_executor_stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Executor stats rebuild")
+    parser.add_argument("--org-id", required=True, type=UUID)
+    parser.add_argument("--date-from", required=True, type=date.fromisoformat, help="UTC, inclusive")
+    parser.add_argument("--date-to", required=True, type=date.fromisoformat, help="UTC, inclusive")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = rebuild_executor_stats(db, org_id=args.org_id, date_from=args.date_from, date_to=args.date_to)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(f"[OK] deleted={result.deleted} rows={result.rows}")
+
+
+if __name__ == "__main__":
+    main()
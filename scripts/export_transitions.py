@@ -0,0 +1,61 @@
+# scripts/export_transitions.py
+"""
+Экспорт task_transitions в Parquet / Arrow IPC для аналитики (pandas / duckdb).
+
+Запуск:
+  python scripts/export_transitions.py \
+    --org-id 11111111-1111-1111-1111-111111111111 \
+    --project-id 22222222-2222-2222-2222-222222222222 \
+    --since 2026-01-01 --until 2026-02-01 \
+    --out transitions_2026_01.parquet
+
+Требует pyarrow: pip install pyarrow
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.core.db import SessionLocal
+from app.services.transition_export import EXPORT_FORMATS, export_transitions
+
+
+def _utc(value: str) -> datetime:
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("task_transitions columnar export")
+    parser.add_argument("--org-id", type=UUID, required=True)
+    parser.add_argument("--project-id", type=UUID, default=None)
+    parser.add_argument("--since", type=_utc, default=None, help="created_at >= (ISO 8601, UTC by default)")
+    parser.add_argument("--until", type=_utc, default=None, help="created_at < (ISO 8601, UTC by default)")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="parquet")
+    parser.add_argument("--row-group-size", type=int, default=50_000)
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = export_transitions(
+            db,
+            args.out,
+            org_id=args.org_id,
+            project_id=args.project_id,
+            since=args.since,
+            until=args.until,
+            fmt=args.format,
+            row_group_size=args.row_group_size,
+            compression=args.compression,
+        )
+    finally:
+        db.close()
+
+    print(f"[OK] {result.path}: rows={result.rows} row_groups={result.row_groups} bytes={result.bytes_written}")
+
+
+if __name__ == "__main__":
+    main()
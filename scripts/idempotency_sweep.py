@@ -0,0 +1,36 @@
+# scripts/idempotency_sweep.py
+"""
+Удалить idempotency-ключи (idempotency_keys, M16) старше retention.
+
+Worker'ы делают это сами (IDEMPOTENCY_SWEEP_INTERVAL_SECONDS); скрипт — для cron,
+если фоновый sweeper выключен:
+  python scripts/idempotency_sweep.py [--retention-hours 24] [--batch-size 1000]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services.idempotency import sweep_idempotency_keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Idempotency keys sweeper")
+    parser.add_argument("--retention-hours", type=float, default=settings.idempotency_retention_hours)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=args.retention_hours)
+    db = SessionLocal()
+    try:
+        deleted = sweep_idempotency_keys(db, older_than=cutoff, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"[OK] deleted={deleted} older_than={cutoff.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# scripts/import_profile.py
+"""
+Профиль холодного импорта (python -X importtime) в виде таблицы.
+
+Запуск локально:
+  python scripts/import_profile.py                      # app.main, top 25 по self-времени
+  python scripts/import_profile.py --sort cumulative --top 40
+  OPENAPI_MODE=snapshot python scripts/import_profile.py   # как в production
+
+Импорт идёт в отдельном процессе (кеши модулей текущего процесса не мешают).
+Время — микросекунды из -X importtime; wall — общее время `import <module>`.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    rows: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m is None:
+            continue
+        self_us, cumulative_us, indent, module = m.groups()
+        rows.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def profile(module: str) -> tuple[float, list[ImportTiming]]:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Cold import profile")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=("self", "cumulative"), default="self")
+    parser.add_argument("--prefix", default=None, help="только модули с этим префиксом (например app.)")
+    args = parser.parse_args()
+
+    wall, rows = profile(args.module)
+    total_self = sum(r.self_us for r in rows) / 1000
+    modules = len(rows)
+    if args.prefix:
+        rows = [r for r in rows if r.module.startswith(args.prefix)]
+    key = (lambda r: r.self_us) if args.sort == "self" else (lambda r: r.cumulative_us)
+    rows.sort(key=key, reverse=True)
+
+    width = max([len(r.module) for r in rows[: args.top]] + [6])
+    print(f"{'module':<{width}}  {'self ms':>9}  {'cum ms':>9}")
+    print(f"{'-' * width}  {'-' * 9}  {'-' * 9}")
+    for r in rows[: args.top]:
+        print(f"{r.module:<{width}}  {r.self_us / 1000:>9.1f}  {r.cumulative_us / 1000:>9.1f}")
+
+    print(f"[OK] import {args.module}: wall={wall * 1000:.0f}ms modules={modules} sum(self)={total_self:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# scripts/metrics_rollup.py
+"""
+Инкрементальный rollup аналитики (cycle time / throughput) по новым task_transitions.
+
+Запуск локально / из cron (например, каждые 5 минут):
+  python scripts/metrics_rollup.py
+
+Повторный запуск безопасен: учтённые transitions отсекаются водяным знаком.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import timedelta
+
+from app.core.db import SessionLocal
+from app.services.task_metrics_rollup import MetricsRollupProgress, TaskMetricsRollupJob
+
+
+def _print_progress(p: MetricsRollupProgress) -> None:
+    print(f"[metrics-rollup] window={p.windows} transitions={p.transitions} watermark={p.watermark.isoformat()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Task metrics daily rollup")
+    parser.add_argument("--window-hours", type=int, default=24, help="Transitions per transaction (by created_at)")
+    parser.add_argument("--settle-seconds", type=int, default=300, help="Skip the most recent N seconds")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = TaskMetricsRollupJob(
+            db,
+            window=timedelta(hours=args.window_hours),
+            settle_seconds=args.settle_seconds,
+            on_progress=_print_progress,
+        ).run()
+    finally:
+        db.close()
+
+    print(f"[OK] windows={result.windows} transitions={result.transitions}")
+
+
+if __name__ == "__main__":
+    main()
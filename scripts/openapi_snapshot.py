@@ -2,12 +2,18 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Any
 
+# snapshot и артефакт всегда собираются из runtime-схемы (с docs-only примерами),
+# даже если окружение сборки выставило OPENAPI_MODE=snapshot
+os.environ["OPENAPI_MODE"] = "runtime"
+
 from fastapi.testclient import TestClient
 
+from app.api.docs import artifact_path, routes_hash, write_artifact
 from app.main import app
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -76,19 +82,37 @@ def check_snapshot() -> None:
     print("[OK] OpenAPI snapshot matches")
 
 
+def write_openapi_artifact(path: Path) -> None:
+    """
+    Артефакт сборки для OPENAPI_MODE=snapshot: gzip компактного JSON + routes_hash.
+    Порядок ключей не нормализуем — это документ для Swagger, а не для diff'а.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = write_artifact(
+        app.openapi(),
+        routes_hash(app.title, app.version, app.description, app.routes),
+        path,
+    )
+    print(f"[OK] OpenAPI artifact written to {path} ({len(doc.body)} -> {len(doc.gzip)} bytes, etag={doc.etag})")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser("OpenAPI v2 snapshot tool")
     parser.add_argument("--write", action="store_true", help="Write snapshot")
     parser.add_argument("--check", action="store_true", help="Check snapshot")
+    parser.add_argument("--artifact", action="store_true", help="Write compressed OpenAPI build artifact")
+    parser.add_argument("--out", type=Path, default=None, help="Artifact path (default: settings.openapi_artifact_path)")
     args = parser.parse_args()
 
-    if args.write == args.check:
-        parser.error("Specify exactly one of --write or --check")
+    if args.write + args.check + args.artifact != 1:
+        parser.error("Specify exactly one of --write, --check or --artifact")
 
     if args.write:
         write_snapshot()
-    else:
+    elif args.check:
         check_snapshot()
+    else:
+        write_openapi_artifact(args.out or artifact_path())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+# scripts/shift_release.py
+"""
+Shift-end release: вернуть в пул все assigned/in_progress задачи проекта.
+
+Релизится весь проект, не только распределения смены: task_allocations не хранит
+work_date / shift_code, они — лишь соль детерминированных client_event_id.
+Сузить выборку — --assigned-before.
+
+Запуск локально / из cron:
+  python scripts/shift_release.py \
+    --org-id 11111111-1111-1111-1111-111111111111 \
+    --project-id 22222222-2222-2222-2222-222222222222 \
+    --work-date 2026-01-20 --shift-code end_of_week \
+    --actor-user-id 33333333-3333-3333-3333-333333333333
+
+Повторный запуск с теми же параметрами безопасен (детерминированные client_event_id).
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime
+from uuid import UUID
+
+from app.core.cache import cache
+from app.core.db import SessionLocal
+from app.services.shift_release_job import ShiftReleaseJob, ShiftReleaseProgress
+
+
+def _print_progress(p: ShiftReleaseProgress) -> None:
+    print(f"[shift-release] chunk={p.chunks} scanned={p.scanned} released={p.released} skipped={p.skipped}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        "Shift-end release job",
+        description=(
+            "Release ALL assigned/in_progress tasks of the project back to the pool "
+            "(not only the shift's allocations). Narrow the scope with --assigned-before."
+        ),
+    )
+    parser.add_argument("--org-id", type=UUID, required=True)
+    parser.add_argument("--project-id", type=UUID, required=True)
+    parser.add_argument(
+        "--work-date",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="Shift date: only salts client_event_id (safe re-runs), does not filter tasks",
+    )
+    parser.add_argument(
+        "--shift-code",
+        choices=["begin_of_week", "end_of_week"],
+        required=True,
+        help="Shift code: only salts client_event_id, does not filter tasks",
+    )
+    parser.add_argument("--actor-user-id", type=UUID, required=True, help="system/lead user for audit")
+    parser.add_argument(
+        "--assigned-before",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Release only tasks assigned before this timestamp (ISO 8601)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        job = ShiftReleaseJob(
+            db,
+            org_id=args.org_id,
+            project_id=args.project_id,
+            work_date=args.work_date,
+            shift_code=args.shift_code,
+            actor_user_id=args.actor_user_id,
+            assigned_before=args.assigned_before,
+            chunk_size=args.chunk_size,
+            on_progress=_print_progress,
+            cache=cache,
+        )
+        result = job.run()
+    finally:
+        db.close()
+
+    print(f"[OK] released={result.released} skipped={result.skipped} scanned={result.scanned}")
+
+
+if __name__ == "__main__":
+    main()
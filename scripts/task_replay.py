@@ -0,0 +1,67 @@
+# scripts/task_replay.py
+"""
+Сверка tasks с журналом task_transitions (replay через FSM), опционально — ремонт.
+
+Запуск локально:
+  python scripts/task_replay.py --org-id <uuid> [--workers 8] [--repair] [--samples 20]
+
+Без --repair только читает. С --repair чинит status / row_version / assigned_to задач,
+журнал которых проигрывается без ошибок; ошибки самого журнала только печатаются.
+Код выхода 1, если остались расхождения.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from uuid import UUID
+
+from app.core.cache import build_cache
+from app.core.config import settings
+from app.services.task_replay import ReplayReport, verify_org_parallel
+
+
+def _print_progress(done: int, total: int, shard: ReplayReport) -> None:
+    print(
+        f"[task-replay] shard {done}/{total} tasks={shard.tasks} transitions={shard.transitions} "
+        f"divergent={shard.divergent_tasks} repaired={shard.repaired}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Task state replay / verification")
+    parser.add_argument("--org-id", type=UUID, required=True)
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--shards", type=int, default=None, help="task_id ranges (default: workers * 4)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repair", action="store_true", help="Fix tasks rows that diverge from the log")
+    parser.add_argument("--samples", type=int, default=20, help="Divergences to print")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = verify_org_parallel(
+        database_url=settings.database_url,
+        org_id=args.org_id,
+        workers=args.workers,
+        shards=args.shards,
+        repair=args.repair,
+        batch_size=args.batch_size,
+        max_samples=args.samples,
+        cache=build_cache() if args.repair else None,
+        on_shard=_print_progress,
+    )
+    elapsed = time.perf_counter() - started
+
+    for d in report.samples:
+        print(f"  {d.task_id} {d.kind}: {d.detail}")
+    kinds = " ".join(f"{k}={v}" for k, v in sorted(report.by_kind.items())) or "-"
+    print(
+        f"[OK] tasks={report.tasks} transitions={report.transitions} divergent={report.divergent_tasks} "
+        f"repaired={report.repaired} kinds: {kinds} elapsed={elapsed:.1f}s"
+    )
+    if report.divergent_tasks > report.repaired:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
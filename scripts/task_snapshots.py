@@ -0,0 +1,48 @@
+# scripts/task_snapshots.py
+"""
+Периодические снимки состояния задач изделий (deliverable_task_snapshots, M17) для
+GET /deliverables/{id}/tasks?as_of=... — чтобы запросы в далёкое прошлое не читали
+всю историю переходов.
+
+Запуск из cron (например, раз в сутки):
+  python scripts/task_snapshots.py --org-id <uuid> [--keep-days 730]
+
+Снимаются только изделия, задачи которых менялись после их последнего снимка.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from app.core.db import SessionLocal
+from app.services.task_as_of import take_task_snapshots
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Deliverable task snapshots")
+    parser.add_argument("--org-id", type=UUID, required=True)
+    parser.add_argument("--keep-days", type=int, default=None, help="Delete snapshots older than N days")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    prune_before = now - timedelta(days=args.keep_days) if args.keep_days is not None else None
+
+    db = SessionLocal()
+    try:
+        result = take_task_snapshots(db, org_id=args.org_id, now=now, prune_before=prune_before)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(
+        f"[OK] taken_at={result.taken_at.isoformat()} deliverables={result.deliverables} "
+        f"rows={result.rows} pruned={result.pruned}"
+    )
+
+
+if __name__ == "__main__":
+    main()
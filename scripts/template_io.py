@@ -0,0 +1,106 @@
+# scripts/template_io.py
+"""
+Импорт / экспорт версии шаблона проекта (JSON Lines или CSV).
+
+Запуск локально:
+  python scripts/template_io.py export --version-id <uuid> --out template.jsonl
+  python scripts/template_io.py import --org-id <uuid> --project-id <uuid> \
+    --actor-user-id <uuid> --version v2 --file template.jsonl [--activate]
+
+Формат определяется по расширению файла (.csv -> csv, иначе jsonl) или --format.
+Импорт — одна транзакция: при ошибке версия не создаётся.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from uuid import UUID
+
+from app.core.db import SessionLocal
+from app.models.project_template_version import ProjectTemplateVersion
+from app.services.template_io import TEMPLATE_FORMATS, TemplateImportError, import_template_version, iter_export_lines
+
+
+def _format(args: argparse.Namespace, path: str) -> str:
+    if args.format:
+        return args.format
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _export(args: argparse.Namespace) -> None:
+    fmt = _format(args, args.out)
+    db = SessionLocal()
+    try:
+        tv = db.get(ProjectTemplateVersion, args.version_id)
+        if tv is None:
+            sys.exit(f"[ERR] template version not found: {args.version_id}")
+        lines = 0
+        with open(args.out, "w", encoding="utf-8", newline="") as f:
+            for line in iter_export_lines(db, tv, fmt=fmt):
+                f.write(line)
+                lines += 1
+    finally:
+        db.close()
+
+    print(f"[OK] version={tv.version} lines={lines} -> {args.out}")
+
+
+def _import(args: argparse.Namespace) -> None:
+    fmt = _format(args, args.file)
+    db = SessionLocal()
+    try:
+        with open(args.file, encoding="utf-8-sig", newline="") as f:
+            result = import_template_version(
+                db,
+                f,
+                org_id=args.org_id,
+                project_id=args.project_id,
+                actor_user_id=args.actor_user_id,
+                version=args.version,
+                description=args.description,
+                fmt=fmt,
+                activate=args.activate,
+            )
+        db.commit()
+    except TemplateImportError as e:
+        db.rollback()
+        sys.exit(f"[ERR] {e}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(
+        f"[OK] template_version_id={result.template_version_id} nodes={result.nodes} "
+        f"edges={result.edges} activated={result.activated}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Template version import/export")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export")
+    exp.add_argument("--version-id", required=True, type=UUID)
+    exp.add_argument("--out", required=True)
+    exp.add_argument("--format", choices=TEMPLATE_FORMATS)
+    exp.set_defaults(func=_export)
+
+    imp = sub.add_parser("import")
+    imp.add_argument("--org-id", required=True, type=UUID)
+    imp.add_argument("--project-id", required=True, type=UUID)
+    imp.add_argument("--actor-user-id", required=True, type=UUID)
+    imp.add_argument("--version", required=True)
+    imp.add_argument("--description")
+    imp.add_argument("--file", required=True)
+    imp.add_argument("--format", choices=TEMPLATE_FORMATS)
+    imp.add_argument("--activate", action="store_true")
+    imp.set_defaults(func=_import)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# scripts/template_rollout.py
+"""
+Раскатка новой версии шаблона на все открытые deliverables проекта (только diff).
+
+Запуск локально:
+  python scripts/template_rollout.py --org-id <uuid> --project-id <uuid> \
+    --to-version-id <uuid> --actor-user-id <uuid>
+
+Повторный запуск безопасен: уже переведённые deliverables не выбираются,
+отмены задач идут с детерминированным client_event_id.
+"""
+from __future__ import annotations
+
+import argparse
+from uuid import UUID
+
+from app.core.cache import cache
+from app.core.db import SessionLocal
+from app.services.template_migration import TemplateRolloutJob, TemplateRolloutProgress
+
+
+def _print_progress(p: TemplateRolloutProgress) -> None:
+    print(f"[template-rollout] chunk={p.chunks} scanned={p.scanned} migrated={p.migrated} failed={p.failed}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Template version rollout")
+    parser.add_argument("--org-id", required=True, type=UUID)
+    parser.add_argument("--project-id", required=True, type=UUID)
+    parser.add_argument("--to-version-id", required=True, type=UUID)
+    parser.add_argument("--actor-user-id", required=True, type=UUID)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = TemplateRolloutJob(
+            db,
+            org_id=args.org_id,
+            project_id=args.project_id,
+            to_version_id=args.to_version_id,
+            actor_user_id=args.actor_user_id,
+            chunk_size=args.chunk_size,
+            on_progress=_print_progress,
+            cache=cache,
+        ).run()
+    finally:
+        db.close()
+
+    for deliverable_id, error in result.errors:
+        print(f"[SKIP] deliverable={deliverable_id}: {error}")
+    print(
+        f"[OK] migrated={result.migrated} failed={result.failed} created={result.created_tasks} "
+        f"updated={result.updated_tasks} canceled={result.canceled_tasks}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# scripts/transition_partitions.py
+"""
+Обслуживание месячных партиций task_transitions: создать будущие месяцы,
+старые — перенести в task_transitions_archive.
+
+Запуск локально / из cron (раз в сутки достаточно):
+  python scripts/transition_partitions.py --months-ahead 3 --retention-months 12
+
+Повторный запуск безопасен: существующие партиции пропускаются.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date
+
+from app.core.db import SessionLocal
+from app.services.transition_partition_job import TransitionPartitionJob
+
+
+def _print_progress(step: str, partition: str) -> None:
+    print(f"[transition-partitions] {step} {partition}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("task_transitions partition maintenance")
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--retention-months", type=int, default=12, help="Hot months kept in task_transitions")
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="Override current date (ISO 8601)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        job = TransitionPartitionJob(
+            db,
+            months_ahead=args.months_ahead,
+            retention_months=args.retention_months,
+            today=args.today,
+            on_progress=_print_progress,
+        )
+        result = job.run()
+    finally:
+        db.close()
+
+    print(
+        f"[OK] created={len(result.created)} archived={len(result.archived)} "
+        f"archived_rows={result.archived_rows}"
+    )
+
+
+if __name__ == "__main__":
+    main()
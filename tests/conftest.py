@@ -19,6 +19,9 @@ import app.models.task_allocation  # noqa: F401
 import app.models.deliverable_signoff  # noqa: F401
 import app.models.task_event  # noqa: F401
 import app.models.task_transition  # noqa: F401
+import app.models.rbac_policy  # noqa: F401
+import app.models.idempotency_key  # noqa: F401
+import app.models.deliverable_task_snapshot  # noqa: F401
 
 
 def _test_database_url() -> str:
@@ -10,6 +10,9 @@ from app.models.task_allocation import TaskAllocation
 from app.models.deliverable import Deliverable
 from app.models.qc_inspection import QcInspection
 from app.models.project_template import ProjectTemplate
+from app.models.project_template_edge import ProjectTemplateEdge
+from app.models.project_template_node import ProjectTemplateNode
+from app.models.project_template_version import ProjectTemplateVersion
 
 
 def _now() -> datetime:
@@ -43,6 +46,56 @@ def make_project_template(
     return pt
 
 
+def make_template_version(
+    db,
+    pt: ProjectTemplate,
+    *,
+    nodes: list[tuple[str, str | None]],
+    edges: list[tuple[str, str]] | None = None,
+    version: str | None = None,
+    activate: bool = True,
+) -> ProjectTemplateVersion:
+    """
+    Версия шаблона проекта:
+      nodes = [(code, parent_code)], edges = [(predecessor_code, successor_code)]
+    activate=True делает её активной (project_templates.active_template_version_id).
+    """
+    tv = ProjectTemplateVersion(
+        id=uuid.uuid4(),
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        version=version or f"v-{uuid.uuid4().hex[:6]}",
+        created_by=uuid.uuid4(),
+    )
+    db.add(tv)
+    db.flush()
+
+    for code, parent_code in nodes:
+        db.add(
+            ProjectTemplateNode(
+                id=uuid.uuid4(),
+                template_version_id=tv.id,
+                code=code,
+                title=f"node {code}",
+                parent_code=parent_code,
+            )
+        )
+    for pred, succ in edges or ():
+        db.add(
+            ProjectTemplateEdge(
+                id=uuid.uuid4(),
+                template_version_id=tv.id,
+                predecessor_code=pred,
+                successor_code=succ,
+            )
+        )
+
+    if activate:
+        pt.active_template_version_id = tv.id
+    db.flush()
+    return tv
+
+
 def make_task(
     db,
     *,
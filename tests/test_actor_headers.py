@@ -0,0 +1,95 @@
+# tests/test_actor_headers.py
+"""
+ActorHeadersMiddleware (pure ASGI) + get_actor_context: контракт ошибок заголовков
+и разбор X-Org-Id / X-Actor-User-Id / X-Role один раз в scope state.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api.deps import ACTOR_HEADERS_STATE, ActorContext, get_actor_context
+from app.api.middleware import ActorHeadersMiddleware
+
+ORG_ID = uuid.uuid4()
+ACTOR_ID = uuid.uuid4()
+
+
+def _client(*, middleware: bool = True) -> TestClient:
+    app = FastAPI()
+    if middleware:
+        app.add_middleware(ActorHeadersMiddleware, open_paths={"/open"})
+
+    @app.get("/ctx")
+    async def ctx(request: Request, ctx: ActorContext = Depends(get_actor_context)):
+        return {
+            "org_id": str(ctx.org_id),
+            "actor_user_id": str(ctx.actor_user_id),
+            "role": ctx.role,
+            "parsed_in_middleware": ACTOR_HEADERS_STATE in request.scope.get("state", {}),
+        }
+
+    @app.get("/open")
+    async def open_():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def _headers(**overrides: str) -> dict[str, str]:
+    return {"X-Org-Id": str(ORG_ID), "X-Actor-User-Id": str(ACTOR_ID), "X-Role": " lead ", **overrides}
+
+
+def test_context_is_parsed_once_in_middleware():
+    body = _client().get("/ctx", headers=_headers()).json()
+
+    assert body == {
+        "org_id": str(ORG_ID),
+        "actor_user_id": str(ACTOR_ID),
+        "role": "lead",
+        "parsed_in_middleware": True,
+    }
+
+
+def test_missing_role_is_rejected_except_open_paths():
+    client = _client()
+
+    for role in (None, "  "):
+        headers = _headers()
+        if role is None:
+            del headers["X-Role"]
+        else:
+            headers["X-Role"] = role
+        r = client.get("/ctx", headers=headers)
+        assert (r.status_code, r.json()) == (401, {"detail": "Missing X-Role header"})
+
+    assert client.get("/open").status_code == 200
+
+
+def test_header_errors_keep_contract():
+    client = _client()
+
+    cases = [
+        ({"X-Org-Id": ""}, 401, "Missing X-Org-Id header"),
+        ({"X-Org-Id": "nope"}, 400, "Invalid X-Org-Id format (must be UUID)"),
+        ({"X-Actor-User-Id": ""}, 401, "Missing X-Actor-User-Id header"),
+        ({"X-Actor-User-Id": "nope"}, 400, "Invalid X-Actor-User-Id format (must be UUID)"),
+        # org проверяется раньше actor (порядок dependency)
+        ({"X-Org-Id": "nope", "X-Actor-User-Id": ""}, 400, "Invalid X-Org-Id format (must be UUID)"),
+    ]
+    for overrides, code, detail in cases:
+        r = client.get("/ctx", headers=_headers(**overrides))
+        assert (r.status_code, r.json()) == (code, {"detail": detail}), overrides
+
+
+def test_dependencies_work_without_middleware():
+    body = _client(middleware=False).get("/ctx", headers=_headers()).json()
+
+    assert body["org_id"] == str(ORG_ID)
+    assert body["parsed_in_middleware"] is False
+
+    r = _client(middleware=False).get("/ctx", headers=_headers(**{"X-Org-Id": "nope"}))
+    assert r.status_code == 400
@@ -0,0 +1,53 @@
+# tests/test_allocation_read_model.py
+"""
+Allocation read-model: один запрос allocations JOIN tasks LEFT JOIN deliverables.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.services.task_allocation_service import TaskAllocationService
+
+from tests.factories import make_allocation, make_deliverable, make_project_template, make_task
+
+
+def test_list_view_projects_deliverable_columns(db: Session):
+    pt = make_project_template(db)
+    d = make_deliverable(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        created_by=uuid.uuid4(),
+        status="open",
+        deliverable_type="chair",
+    )
+    t_with = make_task(db, org_id=pt.org_id, project_id=pt.project_id, deliverable_id=d.id, flush=True)
+    t_without = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+
+    user_id = uuid.uuid4()
+    a1 = make_allocation(db, org_id=pt.org_id, task_id=t_with.id, user_id=user_id)
+    a2 = make_allocation(db, org_id=pt.org_id, task_id=t_without.id)
+
+    rows = TaskAllocationService(db).list_view(org_id=pt.org_id, project_id=pt.project_id)
+    by_id = {r[0]: tuple(r) for r in rows}
+
+    assert set(by_id) == {a1.id, a2.id}
+    assert by_id[a1.id] == (a1.id, pt.org_id, t_with.id, user_id, d.id, "chair", d.serial)
+    assert by_id[a2.id][4:] == (None, None, None)
+
+
+def test_list_view_filters_by_user(db: Session):
+    pt = make_project_template(db)
+    t1 = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+    t2 = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+
+    me = uuid.uuid4()
+    mine = make_allocation(db, org_id=pt.org_id, task_id=t1.id, user_id=me)
+    make_allocation(db, org_id=pt.org_id, task_id=t2.id)
+
+    rows = TaskAllocationService(db).list_view(org_id=pt.org_id, project_id=pt.project_id, user_id=me)
+
+    assert [r[0] for r in rows] == [mine.id]
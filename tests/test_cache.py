@@ -0,0 +1,147 @@
+# tests/test_cache.py
+"""
+Cache tier: in-memory backend (LRU+TTL), RESP2-кодек и fail-open фасад.
+"""
+
+from __future__ import annotations
+
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.cache import (
+    Cache,
+    InMemoryCacheBackend,
+    NullCacheBackend,
+    RespCacheBackend,
+    RespError,
+    encode_command,
+    read_reply,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_memory_backend_ttl_expires():
+    clock = _Clock()
+    backend = InMemoryCacheBackend(clock=clock)
+
+    backend.set("k", b"v", 10)
+    assert backend.get("k") == b"v"
+
+    clock.now = 10.0
+    assert backend.get("k") is None
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = InMemoryCacheBackend(max_entries=2)
+
+    backend.set("a", b"1", 60)
+    backend.set("b", b"2", 60)
+    assert backend.get("a") == b"1"  # a становится "свежим"
+    backend.set("c", b"3", 60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.get("c") == b"3"
+
+
+def test_resp_encode_command():
+    assert encode_command("SET", "k", b"v", "EX", 60) == (
+        b"*5\r\n$3\r\nSET\r\n$1\r\nk\r\n$1\r\nv\r\n$2\r\nEX\r\n$2\r\n60\r\n"
+    )
+
+
+def test_resp_read_reply_types():
+    assert read_reply(io.BytesIO(b"+OK\r\n")) == "OK"
+    assert read_reply(io.BytesIO(b":3\r\n")) == 3
+    assert read_reply(io.BytesIO(b"$-1\r\n")) is None
+    assert read_reply(io.BytesIO(b"$5\r\na\r\nbc\r\n")) == b"a\r\nbc"
+    assert read_reply(io.BytesIO(b"*2\r\n$1\r\na\r\n:1\r\n")) == [b"a", 1]
+
+    with pytest.raises(RespError):
+        read_reply(io.BytesIO(b"-ERR wrong type\r\n"))
+    with pytest.raises(ConnectionError):
+        read_reply(io.BytesIO(b""))
+
+
+class _BrokenBackend:
+    def get(self, key):
+        raise ConnectionRefusedError("down")
+
+    def set(self, key, value, ttl_seconds):
+        raise RespError("READONLY")
+
+    def delete(self, *keys):
+        raise TimeoutError("slow")
+
+    def set_if_newer(self, key, version, value, ttl_seconds):
+        raise ConnectionResetError("reset")
+
+
+def test_cache_fails_open_on_backend_errors():
+    cache = Cache(_BrokenBackend())
+
+    assert cache.get("k") is None
+    cache.set("k", b"v")
+    cache.set_if_newer("k", b"1", b"v")
+    cache.delete("k")
+
+
+def test_cache_entry_roundtrip_and_prefix():
+    backend = InMemoryCacheBackend()
+    cache = Cache(backend, prefix="t:")
+    key = Cache.task_key(uuid.uuid4(), uuid.uuid4())
+
+    cache.set_entry(key, Cache.version(1), '"abc"', b'{"a":"x\ny"}')
+
+    assert cache.get_entry(key) == ('"abc"', b'{"a":"x\ny"}')
+    assert backend.get("t:" + key) is not None
+
+    cache.delete(key)
+    assert cache.get_entry(key) is None
+
+
+def test_older_version_does_not_overwrite_newer():
+    cache = Cache(InMemoryCacheBackend())
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    v1 = Cache.version(1, t0)
+    v2 = Cache.version(2, t0 - timedelta(seconds=1))  # row_version старше updated_at
+    v2_patched = Cache.version(2, t0)
+
+    cache.set_entry("task", v2, '"n2"', b"2")
+    cache.set_entry("task", v1, '"n1"', b"1")  # медленный читатель с версией N
+    assert cache.get_entry("task") == ('"n2"', b"2")
+
+    cache.set_entry("task", v2_patched, '"n2p"', b"2p")
+    assert cache.get_entry("task") == ('"n2p"', b"2p")
+
+    cache.delete("task")
+    cache.set_entry("task", v1, '"n1"', b"1")
+    assert cache.get_entry("task") == ('"n1"', b"1")
+
+
+def test_resp_set_if_newer_is_one_eval():
+    sent = []
+
+    class _Resp(RespCacheBackend):
+        def execute(self, *args):
+            sent.append(args)
+
+    _Resp("resp://localhost").set_if_newer("k", b"v1", b"body", 60)
+
+    assert sent[0][0] == "EVAL"
+    assert sent[0][2:] == (1, "k", b"v1", b"v1\nbody", 60)
+
+
+def test_null_backend_is_disabled():
+    assert not Cache(NullCacheBackend()).enabled
+    assert Cache(InMemoryCacheBackend()).enabled
@@ -0,0 +1,147 @@
+# tests/test_conditional_get.py
+"""
+ETag / If-None-Match (conditional GET по row_version): helpers, get_task,
+timeline переходов и водяной знак dashboard.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app.api.deliverables import get_dashboard
+from app.api.responses import etag_matches, make_etag, not_modified
+from app.api.tasks import get_task, list_task_transitions
+from app.core.cache import Cache, NullCacheBackend
+from app.models.deliverable_signoff import DeliverableSignoff
+from app.services.task_transition_service import apply_task_transition
+
+from tests.factories import make_deliverable, make_project_template, make_qc_inspection, make_task
+
+ACTOR = uuid.uuid4()
+NO_CACHE = Cache(NullCacheBackend())
+
+
+def _request(if_none_match: str | None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_changes_with_row_version():
+    task_id = uuid.uuid4()
+
+    assert make_etag("task", task_id, 3) == make_etag("task", task_id, 3)
+    assert make_etag("task", task_id, 3) != make_etag("task", task_id, 4)
+    assert make_etag("task", task_id, 3).startswith('"')
+
+
+def test_if_none_match_variants():
+    etag = make_etag("task", uuid.uuid4(), 1)
+
+    assert not etag_matches(_request(None), etag)
+    assert etag_matches(_request(etag), etag)
+    assert etag_matches(_request(f'"other", W/{etag}'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('"stale"'), etag)
+
+
+def test_not_modified_has_no_body():
+    etag = make_etag("x")
+    resp = not_modified(etag)
+
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.body == b""
+
+
+# ---------- endpoints (DB) ----------
+
+
+def _transition(db: Session, task, action: str) -> None:
+    apply_task_transition(
+        db,
+        org_id=task.org_id,
+        actor_user_id=ACTOR,
+        task_id=task.id,
+        action=action,
+        expected_row_version=task.row_version,
+        payload={},
+        client_event_id=uuid.uuid4(),
+    )
+    db.refresh(task)
+
+
+def test_get_task_304_uses_version_only_query(db: Session):
+    pt = make_project_template(db)
+    task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+    etag = get_task(task.id, _request(None), org_id=task.org_id, db=db, cache=NO_CACHE).headers["etag"]
+
+    statements = []
+    conn = db.connection()
+
+    def _capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(conn, "before_cursor_execute", _capture)
+    try:
+        resp = get_task(task.id, _request(etag), org_id=task.org_id, db=db, cache=NO_CACHE)
+    finally:
+        event.remove(conn, "before_cursor_execute", _capture)
+
+    assert resp.status_code == 304
+    # только (row_version, updated_at), полная строка не грузится
+    assert len(statements) == 1
+    assert "tasks.title" not in statements[0]
+
+    _transition(db, task, "unblock")
+    resp = get_task(task.id, _request(etag), org_id=task.org_id, db=db, cache=NO_CACHE)
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+
+def test_transitions_timeline_etag(db: Session):
+    pt = make_project_template(db)
+    task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+    _transition(db, task, "unblock")
+
+    etag = list_task_transitions(task.id, _request(None), org_id=task.org_id, db=db).headers["etag"]
+    assert list_task_transitions(task.id, _request(etag), org_id=task.org_id, db=db).status_code == 304
+
+    _transition(db, task, "self_assign")
+    resp = list_task_transitions(task.id, _request(etag), org_id=task.org_id, db=db)
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+
+def test_dashboard_watermark_changes_on_each_write(db: Session):
+    pt = make_project_template(db)
+    d = make_deliverable(db, org_id=pt.org_id, project_id=pt.project_id, created_by=ACTOR)
+    task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, deliverable_id=d.id, flush=True)
+
+    def dashboard(if_none_match=None):
+        return get_dashboard(d.id, _request(if_none_match), org_id=d.org_id, db=db, cache=NO_CACHE)
+
+    etag = dashboard().headers["etag"]
+    # ETag полного ответа совпадает с version-only водяным знаком
+    assert dashboard(etag).status_code == 304
+
+    writes = [
+        lambda: _transition(db, task, "unblock"),
+        lambda: db.add(
+            DeliverableSignoff(
+                org_id=d.org_id, project_id=d.project_id, deliverable_id=d.id, signed_off_by=ACTOR, result="approved"
+            )
+        ),
+        lambda: make_qc_inspection(db, org_id=d.org_id, project_id=d.project_id, deliverable_id=d.id),
+    ]
+    for write in writes:
+        write()
+        db.flush()
+        resp = dashboard(etag)
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+        etag = resp.headers["etag"]
+        assert dashboard(etag).status_code == 304
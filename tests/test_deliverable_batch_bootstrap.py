@@ -0,0 +1,105 @@
+# tests/test_deliverable_batch_bootstrap.py
+"""
+Партия deliverables: создание + bootstrap активного шаблона set-based (COPY / multi-row INSERT).
+"""
+
+from __future__ import annotations
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.deliverable import Deliverable
+from app.models.task import Task
+from app.services.deliverable_batch_bootstrap import (
+    DeliverableBatchBootstrap,
+    SerialConflict,
+    order_parents_first,
+)
+from app.services.deliverable_bootstrap_service import BootstrapError
+
+from tests.factories import make_deliverable, make_project_template, make_template_version
+
+NODES = [("assembly", "frame"), ("frame", None), ("paint", "frame"), ("pack", None)]
+EDGES = [("assembly", "paint"), ("paint", "pack")]
+
+
+def _node(code, parent_code):
+    return SimpleNamespace(code=code, parent_code=parent_code)
+
+
+def test_order_parents_first():
+    ordered = [n.code for n in order_parents_first([_node(c, p) for c, p in NODES])]
+    assert ordered.index("frame") < ordered.index("assembly")
+    assert ordered.index("frame") < ordered.index("paint")
+    assert sorted(ordered) == sorted(c for c, _ in NODES)
+
+    with pytest.raises(BootstrapError):
+        order_parents_first([_node("a", "b"), _node("b", "a")])
+
+
+def _batch(db: Session, pt, **kw) -> DeliverableBatchBootstrap:
+    return DeliverableBatchBootstrap(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_type="box_v1",
+        actor_user_id=uuid.uuid4(),
+        **kw,
+    )
+
+
+@pytest.mark.parametrize("use_copy", [True, False])
+def test_batch_expands_template_for_every_serial(db: Session, use_copy: bool):
+    pt = make_project_template(db)
+    tv = make_template_version(db, pt, nodes=NODES, edges=EDGES)
+
+    result = _batch(db, pt, use_copy=use_copy).create_and_bootstrap(["SN-1", "SN-2", "SN-3"])
+
+    assert result.template_version_id == tv.id
+    assert (result.created_tasks, result.created_dependencies) == (12, 6)
+
+    for d in result.deliverables:
+        assert db.get(Deliverable, d.id).template_version_id == tv.id
+        tasks = {t.title: t for t in db.execute(select(Task).where(Task.deliverable_id == d.id)).scalars()}
+        assert len(tasks) == 4
+        assert tasks["node assembly"].parent_task_id == tasks["node frame"].id
+        assert tasks["node pack"].parent_task_id is None
+
+        deps = db.execute(
+            text("SELECT count(*) FROM task_dependencies WHERE successor_id = :id"),
+            {"id": tasks["node pack"].id},
+        ).scalar_one()
+        assert deps == 1
+
+
+def test_batch_rejects_taken_and_duplicate_serials(db: Session):
+    pt = make_project_template(db)
+    make_template_version(db, pt, nodes=NODES)
+    make_deliverable(db, org_id=pt.org_id, project_id=pt.project_id, created_by=uuid.uuid4(), serial="SN-taken")
+
+    with pytest.raises(SerialConflict) as e:
+        _batch(db, pt).create_and_bootstrap(["SN-new", "SN-taken"])
+    assert e.value.serials == ["SN-taken"]
+
+    with pytest.raises(SerialConflict):
+        _batch(db, pt).create_and_bootstrap(["SN-dup", "SN-dup"])
+
+    count = db.execute(select(func.count()).where(Deliverable.org_id == pt.org_id)).scalar_one()
+    assert count == 1
+
+
+def test_run_reports_progress_per_chunk(db: Session):
+    pt = make_project_template(db)
+    make_template_version(db, pt, nodes=NODES, edges=EDGES)
+    seen = []
+
+    total = _batch(db, pt, chunk_size=2, on_progress=lambda p: seen.append(len(p.deliverables))).run(
+        [f"SN-{i}" for i in range(5)]
+    )
+
+    assert seen == [2, 4, 5]
+    assert (total.chunks, total.created_tasks, total.created_dependencies) == (3, 20, 10)
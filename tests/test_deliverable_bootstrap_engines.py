@@ -0,0 +1,94 @@
+# tests/test_deliverable_bootstrap_engines.py
+"""
+Bootstrap deliverable: python (ORM) и sql (INSERT ... SELECT) движки дают одинаковое дерево задач.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models.deliverable import Deliverable
+from app.models.task import Task
+from app.services.deliverable_bootstrap_service import BootstrapError, DeliverableBootstrapService
+
+from tests.factories import make_project_template, make_template_version
+
+NODES = [("frame", None), ("assembly", "frame"), ("paint", "frame"), ("pack", None)]
+EDGES = [("assembly", "paint"), ("paint", "pack")]
+
+
+def _deliverable(db: Session, pt) -> Deliverable:
+    d = Deliverable(
+        id=uuid.uuid4(),
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_type="box_v1",
+        serial=f"SN-{uuid.uuid4().hex[:8]}",
+        created_by=uuid.uuid4(),
+    )
+    db.add(d)
+    db.flush()
+    return d
+
+
+def _bootstrap(db: Session, d: Deliverable, engine: str):
+    return DeliverableBootstrapService(db, engine=engine).bootstrap(
+        org_id=d.org_id,
+        project_id=d.project_id,
+        deliverable_id=d.id,
+        actor_user_id=uuid.uuid4(),
+    )
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        DeliverableBootstrapService(None, engine="turbo")
+
+
+@pytest.mark.parametrize("engine", ["python", "sql"])
+def test_engines_expand_same_tree(db: Session, engine: str):
+    pt = make_project_template(db)
+    tv = make_template_version(db, pt, nodes=NODES, edges=EDGES)
+    d = _deliverable(db, pt)
+
+    result = _bootstrap(db, d, engine)
+    db.flush()
+    db.expire_all()
+
+    assert (result.template_version_id, result.created_tasks, result.created_dependencies) == (tv.id, 4, 2)
+    assert db.get(Deliverable, d.id).template_version_id == tv.id
+
+    tasks = {t.title: t for t in db.execute(select(Task).where(Task.deliverable_id == d.id)).scalars()}
+    assert tasks["node assembly"].parent_task_id == tasks["node frame"].id
+    assert tasks["node paint"].parent_task_id == tasks["node frame"].id
+    assert tasks["node frame"].parent_task_id is None
+    assert {t.status for t in tasks.values()} == {"blocked"}
+
+    pairs = db.execute(
+        text(
+            """
+            SELECT p.title, s.title
+            FROM task_dependencies dep
+            JOIN tasks p ON p.id = dep.predecessor_id
+            JOIN tasks s ON s.id = dep.successor_id
+            WHERE s.deliverable_id = :d
+            """
+        ),
+        {"d": d.id},
+    ).all()
+    assert sorted(pairs) == [("node assembly", "node paint"), ("node paint", "node pack")]
+
+
+def test_sql_engine_validates_template_before_insert(db: Session):
+    pt = make_project_template(db)
+    make_template_version(db, pt, nodes=NODES, edges=[("paint", "missing")])
+    d = _deliverable(db, pt)
+
+    with pytest.raises(BootstrapError, match="successor_code"):
+        _bootstrap(db, d, "sql")
+
+    assert db.execute(select(Task.id).where(Task.deliverable_id == d.id)).first() is None
@@ -0,0 +1,136 @@
+# tests/test_deliverable_timeline.py
+"""
+Единый журнал изделия: k-way merge sign-off'ов, QC-инспекций, fix-task'ов и переходов
+задач по (created_at, kind, id) + cursor-пагинация (app/services/deliverable_timeline.py).
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.deliverables import _iter_timeline_json
+from app.models.deliverable_signoff import DeliverableSignoff
+from app.models.task_transition import TaskTransition
+from app.services.deliverable_timeline import InvalidCursor, TimelineCursor, TimelineResult, deliverable_timeline
+
+from tests.factories import make_deliverable, make_project_template, make_qc_inspection, make_task
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+ACTOR = uuid.uuid4()
+
+
+def test_cursor_roundtrip():
+    cursor = TimelineCursor(T0 + timedelta(microseconds=7), "qc_inspection", uuid.uuid4())
+
+    assert TimelineCursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "not-base64!",
+        TimelineCursor(T0, "signoff", uuid.uuid4()).encode()[:-4],
+        TimelineCursor(T0, "bogus", uuid.uuid4()).encode(),
+        TimelineCursor(T0.replace(tzinfo=None), "signoff", uuid.uuid4()).encode(),
+    ],
+    ids=["garbage", "truncated", "unknown-kind", "naive-time"],
+)
+def test_invalid_cursor(raw):
+    with pytest.raises(InvalidCursor):
+        TimelineCursor.decode(raw)
+
+
+def test_streamed_page_is_one_json_document():
+    items = [{"kind": "signoff", "id": str(uuid.uuid4()), "comment": "ок"}, {"kind": "fix", "id": str(uuid.uuid4())}]
+
+    body = b"".join(_iter_timeline_json(TimelineResult(items=items, next_cursor="abc")))
+
+    assert json.loads(body) == {"items": items, "next_cursor": "abc"}
+    assert json.loads(b"".join(_iter_timeline_json(TimelineResult(items=[], next_cursor=None)))) == {
+        "items": [],
+        "next_cursor": None,
+    }
+
+
+@pytest.fixture
+def timeline(db: Session):
+    pt = make_project_template(db)
+    d = make_deliverable(db, org_id=pt.org_id, project_id=pt.project_id, created_by=ACTOR)
+    task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, deliverable_id=d.id, created_at=T0, flush=True)
+    # задача другого изделия: её переходы в журнал не попадают
+    other = make_task(db, org_id=pt.org_id, project_id=pt.project_id, created_at=T0, flush=True)
+
+    def transition(t, at, expected):
+        db.add(
+            TaskTransition(
+                id=uuid.uuid4(),
+                org_id=t.org_id,
+                project_id=t.project_id,
+                task_id=t.id,
+                actor_user_id=ACTOR,
+                action="escalate",
+                from_status="blocked",
+                to_status="blocked",
+                payload={"message": "help"},
+                created_at=at,
+                expected_row_version=expected,
+                result_row_version=expected + 1,
+            )
+        )
+
+    transition(task, T0 + HOUR, 1)
+    transition(other, T0 + 2 * HOUR, 1)
+    transition(task, T0 + 3 * HOUR, 2)
+    db.add(
+        DeliverableSignoff(
+            org_id=d.org_id,
+            project_id=d.project_id,
+            deliverable_id=d.id,
+            signed_off_by=ACTOR,
+            result="approved",
+            created_at=T0 + 2 * HOUR,
+        )
+    )
+    # одна транзакция с переходом: при равном created_at qc_inspection идёт раньше transition
+    make_qc_inspection(
+        db, org_id=d.org_id, project_id=d.project_id, deliverable_id=d.id, result="rejected", created_at=T0 + 3 * HOUR
+    )
+    db.flush()
+    return d
+
+
+def _kinds_and_times(items):
+    return [(e["kind"], datetime.fromisoformat(e["created_at"])) for e in items]
+
+
+def test_timeline_merges_sources_in_order(db: Session, timeline):
+    page = deliverable_timeline(db, org_id=timeline.org_id, deliverable_id=timeline.id)
+
+    assert _kinds_and_times(page.items) == [
+        ("transition", T0 + HOUR),
+        ("signoff", T0 + 2 * HOUR),
+        ("qc_inspection", T0 + 3 * HOUR),
+        ("transition", T0 + 3 * HOUR),
+    ]
+    assert page.next_cursor is None
+    assert page.items[0]["payload"] == {"message": "help"}
+
+
+def test_timeline_cursor_pages_cover_everything_once(db: Session, timeline):
+    full = deliverable_timeline(db, org_id=timeline.org_id, deliverable_id=timeline.id).items
+
+    seen, cursor = [], None
+    while True:
+        page = deliverable_timeline(db, org_id=timeline.org_id, deliverable_id=timeline.id, cursor=cursor, limit=1)
+        seen.extend(page.items)
+        if page.next_cursor is None:
+            break
+        cursor = TimelineCursor.decode(page.next_cursor)
+
+    assert seen == full
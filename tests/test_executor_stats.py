@@ -0,0 +1,235 @@
+# tests/test_executor_stats.py
+"""
+M13: rollup по исполнителям (executor_stats_daily) и /orgs/{org_id}/executor-stats.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.deps import ActorContext
+from app.api.executor_stats import get_executor_stats
+from app.models.executor_stats import ExecutorStatsDaily
+from app.models.task import FixSeverity, FixSource
+from app.services.executor_stats import rebuild_executor_stats
+from app.services.task_fix_service import TaskFixService
+from app.services.task_transition_service import apply_task_transition
+
+from tests.factories import make_deliverable, make_project_template, make_qc_inspection, make_task
+
+
+def _setup(db: Session):
+    pt = make_project_template(db)
+    deliverable = make_deliverable(db, org_id=pt.org_id, project_id=pt.project_id, created_by=uuid.uuid4())
+    return pt, deliverable
+
+
+def _submitted(db: Session, pt, deliverable, executor, **kw):
+    return make_task(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_id=deliverable.id,
+        status="submitted",
+        assigned_to=executor,
+        assigned_at=datetime.now(timezone.utc),
+        flush=True,
+        **kw,
+    )
+
+
+def _review(db: Session, task, action: str, **payload):
+    return apply_task_transition(
+        db,
+        org_id=task.org_id,
+        actor_user_id=uuid.uuid4(),
+        task_id=task.id,
+        action=action,
+        expected_row_version=task.row_version,
+        payload=payload,
+        client_event_id=uuid.uuid4(),
+    )
+
+
+def _today_row(db: Session, org_id, user_id) -> ExecutorStatsDaily:
+    return db.get(ExecutorStatsDaily, (org_id, user_id, datetime.now(timezone.utc).date()))
+
+
+def test_completion_and_reject_are_counted_inline(db: Session):
+    pt, deliverable = _setup(db)
+    executor = uuid.uuid4()
+
+    done = _submitted(db, pt, deliverable, executor, minutes_spent=45)
+    _review(db, done, "review_approve")
+
+    rejected = _submitted(db, pt, deliverable, executor)
+    _, fix = _review(db, rejected, "review_reject", reason="скол", severity="critical")
+    assert fix is not None
+
+    row = _today_row(db, pt.org_id, executor)
+    db.refresh(row)
+    assert (row.completed, row.completed_fix, row.minutes_spent) == (1, 0, 45)
+    assert (row.fixes_caused, row.fixes_caused_critical, row.fixes_caused_major) == (1, 1, 0)
+
+
+def test_concurrent_reject_with_same_event_counts_fix_once(engine):
+    """Проигравший гонку client_event_id откатывает QC, fix-task и счётчик fixes_caused вместе с transition."""
+    Session_ = sessionmaker(bind=engine, expire_on_commit=False)
+    executor, event_id = uuid.uuid4(), uuid.uuid4()
+    with Session_() as setup:
+        pt, deliverable = _setup(setup)
+        task = _submitted(setup, pt, deliverable, executor)
+        setup.commit()
+        org_id, task_id = pt.org_id, task.id
+
+    barrier = threading.Barrier(2)
+    results, errors = [], []
+
+    def run():
+        try:
+            with Session_() as s:
+                barrier.wait()
+                _, fix = apply_task_transition(
+                    s,
+                    org_id=org_id,
+                    actor_user_id=executor,
+                    task_id=task_id,
+                    action="review_reject",
+                    expected_row_version=1,
+                    payload={"reason": "скол", "severity": "minor"},
+                    client_event_id=event_id,
+                )
+                s.commit()
+                results.append(fix.id)
+        except Exception as e:  # pragma: no cover - поднимем в основном потоке
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        assert not errors
+        assert len(results) == 2 and results[0] == results[1]
+
+        with Session_() as check:
+            row = _today_row(check, org_id, executor)
+            assert (row.fixes_caused, row.fixes_caused_minor) == (1, 1)
+            fixes = check.execute(
+                text("SELECT count(*) FROM tasks WHERE org_id = :org_id AND origin_task_id = :task_id"),
+                {"org_id": org_id, "task_id": task_id},
+            ).scalar_one()
+            assert fixes == 1
+    finally:
+        with Session_() as cleanup:
+            params = {"org_id": org_id}
+            for table in (
+                "task_transitions",
+                "task_transition_keys",
+                "executor_stats_daily",
+                "tasks",
+                "qc_inspections",
+                "deliverables",
+                "project_templates",
+            ):
+                cleanup.execute(text(f"DELETE FROM {table} WHERE org_id = :org_id"), params)
+            cleanup.commit()
+
+
+def test_qc_reject_fix_is_attributed_to_responsible_user(db: Session):
+    pt, deliverable = _setup(db)
+    responsible = uuid.uuid4()
+    qc = make_qc_inspection(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_id=deliverable.id,
+        responsible_user_id=responsible,
+    )
+
+    TaskFixService(db).create_qc_reject_fix(
+        deliverable=deliverable,
+        actor_user_id=uuid.uuid4(),
+        qc_inspection_id=qc.id,
+        title="fix",
+        description=None,
+        severity=FixSeverity.minor,
+    )
+    # фикс по изделию без origin_task и без QC — никому не засчитывается
+    TaskFixService(db).create_initiative_fix_for_deliverable(
+        deliverable=deliverable,
+        actor_user_id=uuid.uuid4(),
+        title="fix",
+        description=None,
+        severity=FixSeverity.major,
+        minutes_spent=None,
+    )
+
+    row = _today_row(db, pt.org_id, responsible)
+    db.refresh(row)
+    assert (row.fixes_caused, row.fixes_caused_minor) == (1, 1)
+    assert db.query(ExecutorStatsDaily).filter(ExecutorStatsDaily.org_id == pt.org_id).count() == 1
+
+
+def test_rebuild_matches_inline_rollup(db: Session):
+    pt, deliverable = _setup(db)
+    executor = uuid.uuid4()
+    _review(db, _submitted(db, pt, deliverable, executor, minutes_spent=30), "review_approve")
+    _review(db, _submitted(db, pt, deliverable, executor), "review_reject", reason="перекос")
+    fix_task = make_task(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_id=deliverable.id,
+        status="submitted",
+        assigned_to=executor,
+        assigned_at=datetime.now(timezone.utc),
+        work_kind="fix",
+        fix_source=FixSource.worker_initiative,
+        fix_severity=FixSeverity.minor,
+        flush=True,
+    )
+    _review(db, fix_task, "review_approve")
+
+    today = datetime.now(timezone.utc).date()
+    inline = _today_row(db, pt.org_id, executor)
+    db.refresh(inline)
+    before = (inline.completed, inline.completed_fix, inline.minutes_spent, inline.fixes_caused)
+    assert before == (2, 1, 30, 1)
+
+    result = rebuild_executor_stats(db, org_id=pt.org_id, date_from=today, date_to=today)
+    assert result.rows == 1
+
+    db.expire_all()
+    rebuilt = _today_row(db, pt.org_id, executor)
+    assert (rebuilt.completed, rebuilt.completed_fix, rebuilt.minutes_spent, rebuilt.fixes_caused) == before
+
+
+def test_endpoint_aggregates_period_and_enforces_rbac(db: Session):
+    pt, deliverable = _setup(db)
+    executor = uuid.uuid4()
+    _review(db, _submitted(db, pt, deliverable, executor, minutes_spent=10), "review_approve")
+    _review(db, _submitted(db, pt, deliverable, executor), "review_reject", reason="брак")
+
+    today = datetime.now(timezone.utc).date()
+    lead = ActorContext(org_id=pt.org_id, actor_user_id=uuid.uuid4(), role="lead")
+    report = get_executor_stats(pt.org_id, date_from=today, date_to=today, user_id=None, ctx=lead, db=db)
+
+    assert [e.user_id for e in report.executors] == [executor]
+    assert report.executors[0].fix_rate == 1.0
+
+    for ctx in (
+        ActorContext(org_id=pt.org_id, actor_user_id=executor, role="executor"),
+        ActorContext(org_id=uuid.uuid4(), actor_user_id=uuid.uuid4(), role="lead"),
+    ):
+        with pytest.raises(HTTPException) as e:
+            get_executor_stats(pt.org_id, date_from=today, date_to=today, user_id=None, ctx=ctx, db=db)
+        assert e.value.status_code == 403
@@ -0,0 +1,56 @@
+# tests/test_fast_json_response.py
+"""
+Быстрый путь сериализации должен давать те же байты, что и стандартный путь FastAPI
+(response_model -> dump_python(mode="json") -> JSONResponse).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+
+from app.api.responses import TASK_READ_LIST, adapter_response, rows_response
+
+
+def _task(**overrides):
+    now = datetime(2026, 1, 20, 8, 30, tzinfo=timezone.utc)
+    data = dict(
+        id=uuid.uuid4(),
+        org_id=uuid.uuid4(),
+        project_id=uuid.uuid4(),
+        created_by=uuid.uuid4(),
+        title="Сборка корпуса",
+        description=None,
+        priority=3,
+        status="available",
+        deliverable_id=None,
+        is_milestone=False,
+        kind="production",
+        other_kind_label=None,
+        row_version=2,
+        created_at=now,
+        updated_at=now,
+    )
+    data.update(overrides)
+    return SimpleNamespace(**data)
+
+
+def _baseline(adapter, value, *, exclude_none: bool = False) -> bytes:
+    validated = adapter.validate_python(value, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json", exclude_none=exclude_none)
+    return JSONResponse(content).body
+
+
+def test_task_list_bytes_identical_to_default_path():
+    tasks = [_task(), _task(description="описание", deliverable_id=uuid.uuid4())]
+
+    assert adapter_response(TASK_READ_LIST, tasks).body == _baseline(TASK_READ_LIST, tasks)
+
+
+def test_rows_response_matches_json_response():
+    rows = [{"id": str(uuid.uuid4()), "action": "start", "payload": {"reason": "брак"}}]
+
+    assert rows_response(rows).body == JSONResponse(rows).body
@@ -0,0 +1,126 @@
+# tests/test_fix_lineage.py
+"""
+Дерево доработок по origin_task_id (recursive CTE), его кэш по корню и rework
+amplification проекта (app/services/fix_lineage.py).
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.tasks import update_task
+from app.core.cache import Cache, InMemoryCacheBackend
+from app.models.task import FixSeverity, Task
+from app.schemas.task import TaskUpdate
+from app.services.fix_lineage import fix_lineage, fix_lineage_root, invalidate_fix_lineage, rework_stats
+from app.services.task_fix_service import TaskFixService
+
+from tests.factories import make_deliverable, make_project_template, make_qc_inspection, make_task
+
+ACTOR = uuid.uuid4()
+
+
+def test_fix_without_origin_does_not_touch_db_or_cache():
+    cache = Cache(InMemoryCacheBackend())
+    fix = Task(org_id=uuid.uuid4(), origin_task_id=None)
+    cache.set("fix_lineage:x", b"{}")
+
+    invalidate_fix_lineage(None, cache, fix)  # db не нужен: новый корень
+
+    assert cache.get("fix_lineage:x") == b"{}"
+
+
+@pytest.fixture
+def rework(db: Session):
+    """W <- F1 <- F2 (фикс фикса), Q — QC reject без origin, W2 — без доработок."""
+    pt = make_project_template(db)
+    d = make_deliverable(db, org_id=pt.org_id, project_id=pt.project_id, created_by=ACTOR)
+    w = make_task(db, org_id=pt.org_id, project_id=pt.project_id, deliverable_id=d.id, flush=True)
+    make_task(db, org_id=pt.org_id, project_id=pt.project_id, deliverable_id=d.id, flush=True)
+
+    svc = TaskFixService(db)
+
+    def fix(origin, minutes, severity=FixSeverity.minor):
+        return svc.create_initiative_fix_for_task(
+            origin_task=origin,
+            actor_user_id=ACTOR,
+            title=f"fix {origin.title}",
+            description=None,
+            severity=severity,
+            minutes_spent=minutes,
+        )
+
+    f1 = fix(w, 10)
+    f2 = fix(f1, 5, FixSeverity.major)
+    qc = make_qc_inspection(db, org_id=d.org_id, project_id=d.project_id, deliverable_id=d.id)
+    q = svc.create_qc_reject_fix(d, ACTOR, qc.id, title="qc fix", description=None)
+    return pt, w, f1, f2, q
+
+
+def test_root_is_found_from_any_node(db: Session, rework):
+    pt, w, f1, f2, q = rework
+
+    assert fix_lineage_root(db, org_id=pt.org_id, task_id=f2.id) == w.id
+    assert fix_lineage_root(db, org_id=pt.org_id, task_id=w.id) == w.id
+    assert fix_lineage_root(db, org_id=pt.org_id, task_id=q.id) == q.id
+    assert fix_lineage_root(db, org_id=uuid.uuid4(), task_id=f2.id) is None
+
+
+def test_lineage_tree_and_minutes(db: Session, rework):
+    pt, w, f1, f2, _ = rework
+
+    lineage = fix_lineage(db, org_id=pt.org_id, root_id=w.id)
+
+    assert [(n["id"], n["origin_task_id"], n["depth"]) for n in lineage["nodes"]] == [
+        (w.id, None, 0),
+        (f1.id, w.id, 1),
+        (f2.id, f1.id, 2),
+    ]
+    assert (lineage["fix_count"], lineage["max_depth"], lineage["total_minutes_spent"]) == (2, 2, 15)
+
+
+def test_new_fix_invalidates_cached_root(db: Session, rework):
+    pt, w, f1, _, _ = rework
+    cache = Cache(InMemoryCacheBackend())
+    key = Cache.fix_lineage_key(pt.org_id, w.id)
+    cache.set(key, b"{}")
+
+    f3 = TaskFixService(db).create_initiative_fix_for_task(
+        origin_task=f1, actor_user_id=ACTOR, title="fix again", description=None, severity=FixSeverity.minor
+    )
+    invalidate_fix_lineage(db, cache, f3)
+
+    assert cache.get(key) is None
+
+
+def test_title_update_invalidates_cached_root(db: Session, rework):
+    pt, w, _, f2, _ = rework
+    cache = Cache(InMemoryCacheBackend())
+    key = Cache.fix_lineage_key(pt.org_id, w.id)
+    cache.set(key, b"{}")
+
+    update_task(f2.id, TaskUpdate(title="renamed"), org_id=pt.org_id, db=db, cache=cache)
+
+    assert cache.get(key) is None
+
+
+def test_rework_stats_one_pass(db: Session, rework):
+    pt, *_ = rework
+
+    stats = rework_stats(db, org_id=pt.org_id, project_id=pt.project_id)
+
+    assert stats["work_tasks"] == 2
+    assert stats["root_fixes"] == 1
+    assert stats["reworked_roots"] == 2  # W и Q
+    assert stats["fixes_total"] == 3
+    assert stats["nested_fixes"] == 1  # F2
+    assert stats["max_depth"] == 2
+    assert stats["max_fixes_per_root"] == 2
+    assert stats["rework_ratio"] == pytest.approx(1.5)
+    assert stats["amplification"] == pytest.approx(1.5)
+    assert stats["fix_minutes_total"] == 15
+    assert stats["by_source"] == {"worker_initiative": 2, "qc_reject": 1}
+    assert stats["by_severity"] == {"minor": 1, "major": 2}
@@ -0,0 +1,215 @@
+# tests/test_idempotency.py
+"""
+Idempotency-ключи write-endpoint'ов (idempotency_keys, M16): повтор отдаёт сохранённый
+ответ без выполнения handler'а, чужое тело -> 409, проигравший гонку получает ответ победителя.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.deliverables import create_deliverable
+from app.api.deps import ActorContext
+from app.api.idempotency import IDEMPOTENT_REPLAY_HEADER, Idempotency
+from app.api.responses import FastJSONResponse
+from app.core.cache import InMemoryCacheBackend
+from app.models.idempotency_key import IdempotencyKey
+from app.schemas.deliverable import DeliverableCreate
+from app.services.idempotency import (
+    IdempotencyStore,
+    StoredResponse,
+    request_hash,
+    sweep_idempotency_keys,
+)
+
+from tests.factories import make_project_template
+
+ENDPOINT = "POST /deliverables"
+
+
+class Body(BaseModel):
+    serial: str
+
+
+@pytest.fixture
+def store() -> IdempotencyStore:
+    return IdempotencyStore(front=InMemoryCacheBackend(), front_ttl_seconds=30)
+
+
+def _idem(store: IdempotencyStore, key: str | None) -> Idempotency:
+    return Idempotency(store, endpoint=ENDPOINT, path_params={}, key=key)
+
+
+def test_stored_response_roundtrip_and_hash_is_key_order_independent():
+    stored = StoredResponse(request_hash="ab" * 32, status_code=201, body=b'{"a":"\n"}')
+
+    assert StoredResponse.decode(stored.encode()) == stored
+    assert request_hash({"a": 1, "b": [1, 2]}) == request_hash({"b": [1, 2], "a": 1})
+    assert request_hash({"a": 1}) != request_hash({"a": 2})
+
+
+def test_replay_returns_stored_response(db: Session, store):
+    org_id = uuid.uuid4()
+
+    first = _idem(store, "k1")
+    assert first.begin(db, org_id=org_id, body=Body(serial="S-1")) is None
+    resp = first.commit(db, FastJSONResponse(b'{"id":1}', status_code=201))
+    assert resp.status_code == 201
+
+    # новый store без front cache: ответ берётся из БД
+    replay = _idem(IdempotencyStore(front=InMemoryCacheBackend(), front_ttl_seconds=30), "k1").begin(
+        db, org_id=org_id, body=Body(serial="S-1")
+    )
+    assert replay is not None
+    assert (replay.status_code, replay.body) == (201, b'{"id":1}')
+    assert replay.headers[IDEMPOTENT_REPLAY_HEADER] == "true"
+
+    # ключи разных org не пересекаются
+    assert _idem(store, "k1").begin(db, org_id=uuid.uuid4(), body=Body(serial="S-1")) is None
+
+
+def test_same_key_different_body_is_conflict(db: Session, store):
+    org_id = uuid.uuid4()
+    first = _idem(store, "k1")
+    first.begin(db, org_id=org_id, body=Body(serial="S-1"))
+    first.commit(db, FastJSONResponse(b"{}", status_code=201))
+
+    with pytest.raises(HTTPException) as e:
+        _idem(store, "k1").begin(db, org_id=org_id, body=Body(serial="S-2"))
+    assert e.value.status_code == 409
+
+
+def test_client_event_id_is_key_when_header_missing(db: Session, store):
+    org_id, event_id = uuid.uuid4(), uuid.uuid4()
+    first = _idem(store, None)
+    first.begin(db, org_id=org_id, body=Body(serial="S-1"), client_event_id=event_id)
+    first.commit(db, FastJSONResponse(b"{}"))
+
+    assert db.get(IdempotencyKey, (org_id, ENDPOINT, str(event_id))) is not None
+
+
+def test_race_loser_rolls_back_and_returns_winner(db: Session, store):
+    org_id = uuid.uuid4()
+    loser = _idem(store, "k1")
+    assert loser.begin(db, org_id=org_id, body=Body(serial="S-1")) is None
+
+    winner = _idem(IdempotencyStore(front=InMemoryCacheBackend(), front_ttl_seconds=30), "k1")
+    winner.begin(db, org_id=org_id, body=Body(serial="S-1"))
+    winner.commit(db, FastJSONResponse(b'{"winner":true}', status_code=201))
+
+    # работа проигравшего должна откатиться
+    db.execute(text("CREATE TEMP TABLE idem_loser_work (x int) ON COMMIT DROP"))
+    resp = loser.commit(db, FastJSONResponse(b'{"winner":false}', status_code=201))
+
+    assert resp.body == b'{"winner":true}'
+    assert db.execute(text("SELECT to_regclass('pg_temp.idem_loser_work')")).scalar_one() is None
+
+
+class _RollbackOnly:
+    def __init__(self):
+        self.rolled_back = False
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_unique_violation_without_key_is_409(store):
+    db = _RollbackOnly()
+
+    with pytest.raises(HTTPException) as e:
+        _idem(store, None).unique_violation(db, "duplicate serial")
+
+    assert (e.value.status_code, e.value.detail) == (409, "duplicate serial")
+    assert db.rolled_back
+
+
+def test_unique_violation_returns_winner(db: Session, store):
+    org_id = uuid.uuid4()
+    loser = _idem(store, "k1")
+    loser.begin(db, org_id=org_id, body=Body(serial="S-1"))
+
+    winner = _idem(IdempotencyStore(front=InMemoryCacheBackend(), front_ttl_seconds=30), "k1")
+    winner.begin(db, org_id=org_id, body=Body(serial="S-1"))
+    winner.commit(db, FastJSONResponse(b'{"winner":true}', status_code=201))
+
+    resp = loser.unique_violation(db, "duplicate serial")
+
+    assert (resp.status_code, resp.body) == (201, b'{"winner":true}')
+    assert resp.headers[IDEMPOTENT_REPLAY_HEADER] == "true"
+
+
+def test_concurrent_retry_in_flight_gets_winner_response(engine):
+    """Повтор с тем же ключом, пока первый create_deliverable не закоммитил: не 500, а ответ победителя."""
+    Session_ = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session_() as setup:
+        pt = make_project_template(setup)
+        setup.commit()
+        org_id, project_id = pt.org_id, pt.project_id
+
+    store = IdempotencyStore(front=InMemoryCacheBackend(), front_ttl_seconds=30)
+    ctx = ActorContext(org_id=org_id, actor_user_id=uuid.uuid4(), role="lead")
+    data = DeliverableCreate(project_id=project_id, deliverable_type="box_v1", serial="SN-RACE")
+    barrier = threading.Barrier(2)
+    responses, errors = [], []
+
+    def run():
+        try:
+            with Session_() as s:
+                barrier.wait()
+                idem = Idempotency(store, endpoint=ENDPOINT, path_params={}, key="retry-1")
+                responses.append(create_deliverable(data=data, ctx=ctx, db=s, idem=idem))
+        except Exception as e:  # pragma: no cover - поднимем в основном потоке
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        assert not errors
+
+        assert sorted(r.status_code for r in responses) == [201, 201]
+        assert responses[0].body == responses[1].body
+        assert sum(IDEMPOTENT_REPLAY_HEADER in r.headers for r in responses) == 1
+    finally:
+        with Session_() as cleanup:
+            params = {"org_id": org_id}
+            for table in ("idempotency_keys", "deliverables", "project_templates"):
+                cleanup.execute(text(f"DELETE FROM {table} WHERE org_id = :org_id"), params)
+            cleanup.commit()
+
+
+def test_no_key_just_commits(db: Session, store):
+    idem = _idem(store, None)
+    assert idem.begin(db, org_id=uuid.uuid4(), body=Body(serial="S-1")) is None
+
+    resp = idem.commit(db, FastJSONResponse(b"{}"))
+
+    assert IDEMPOTENT_REPLAY_HEADER not in resp.headers
+
+
+def test_sweep_deletes_only_old_keys(db: Session, store):
+    org_id = uuid.uuid4()
+    for key in ("old-1", "old-2", "fresh"):
+        store.save(db, org_id=org_id, endpoint=ENDPOINT, key=key, stored=StoredResponse("h", 200, b"{}"))
+    now = datetime.now(timezone.utc)
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.org_id == org_id, IdempotencyKey.key.like("old-%"))
+        .values(created_at=now - timedelta(days=2))
+    )
+
+    deleted = sweep_idempotency_keys(db, older_than=now - timedelta(days=1), batch_size=1)
+
+    assert deleted >= 2
+    assert db.get(IdempotencyKey, (org_id, ENDPOINT, "fresh")) is not None
+    assert db.get(IdempotencyKey, (org_id, ENDPOINT, "old-1")) is None
@@ -0,0 +1,65 @@
+# tests/test_openapi_artifact.py
+"""
+OpenAPI как артефакт сборки: gzip + routes_hash, /openapi.json из готовых bytes с ETag.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.docs import ROUTES_HASH_KEY, load_artifact, routes_hash, write_artifact
+from app.main import app
+
+
+def _hash(routes=None) -> str:
+    return routes_hash(app.title, app.version, app.description, app.routes if routes is None else routes)
+
+
+def test_artifact_roundtrip(tmp_path):
+    path = tmp_path / "openapi.json.gz"
+    written = write_artifact(app.openapi(), _hash(), path)
+
+    doc = load_artifact(path, _hash())
+
+    assert doc is not None
+    assert doc.gzip == path.read_bytes()
+    assert gzip.decompress(doc.gzip) == doc.body
+    assert doc.etag == written.etag
+    schema = json.loads(doc.body)
+    assert schema[ROUTES_HASH_KEY] == _hash()
+    assert schema["paths"].keys() == app.openapi()["paths"].keys()
+
+
+def test_artifact_from_other_routes_is_ignored(tmp_path):
+    path = tmp_path / "openapi.json.gz"
+    write_artifact(app.openapi(), _hash(app.routes[:-1]), path)
+
+    assert _hash(app.routes[:-1]) != _hash()
+    assert load_artifact(path, _hash()) is None
+    assert load_artifact(tmp_path / "missing.json.gz", _hash()) is None
+
+
+def test_openapi_json_is_precompressed_with_etag():
+    client = TestClient(app)
+
+    r = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.json()["paths"].keys() == app.openapi()["paths"].keys()
+
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    # strong ETag у каждого content-coding свой
+    assert plain.headers["etag"] != r.headers["etag"]
+
+    cached = client.get("/openapi.json", headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == r.headers["etag"]
+
+    # ETag gzip-представления не подтверждает identity
+    other = client.get("/openapi.json", headers={"Accept-Encoding": "identity", "If-None-Match": r.headers["etag"]})
+    assert other.status_code == 200
@@ -0,0 +1,80 @@
+# tests/test_rbac.py
+"""
+RBAC: скомпилированная матрица role x permission (битсеты) совпадает с ALLOW.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app.core import rbac
+from app.core.rbac import ALLOW, Forbidden, RbacMatrix, allowed_mask, ensure_allowed, is_allowed
+
+ROLES = sorted({r for roles in ALLOW.values() for r in roles} | {"qc", "nobody", ""})
+PERMISSIONS = sorted(ALLOW) + ["task.unknown", ""]
+
+
+def test_matrix_matches_allow_dict():
+    for perm in PERMISSIONS:
+        for role in ROLES:
+            expected = role in ALLOW.get(perm, set())
+            assert is_allowed(perm, role) is expected, (perm, role)
+            if expected:
+                ensure_allowed(perm, role)
+            else:
+                with pytest.raises(Forbidden):
+                    ensure_allowed(perm, role)
+
+
+def test_allowed_mask_follows_request_order():
+    perms = ["task.start", "task.unknown", "deliverable.bootstrap", "task.assign"]
+
+    assert allowed_mask("lead", perms) == 0b1101
+    assert allowed_mask("executor", perms) == 0b0001
+    assert allowed_mask("nobody", perms) == 0
+
+
+def test_list_allowed_permissions_is_sorted_copy():
+    perms = rbac.list_allowed_permissions_for_role("lead")
+
+    assert perms == sorted(p for p, roles in ALLOW.items() if "lead" in roles)
+    perms.clear()
+    assert rbac.list_allowed_permissions_for_role("lead")
+
+
+def test_load_policy_swaps_matrix_without_changing_call_sites():
+    try:
+        rbac.load_policy({"task.start": {"qc"}})
+        assert is_allowed("task.start", "qc")
+        assert not is_allowed("task.start", "executor")
+        assert rbac.list_allowed_permissions_for_role("qc") == ["task.start"]
+    finally:
+        rbac.load_policy(ALLOW)
+
+    assert is_allowed("task.start", "executor")
+
+
+def test_empty_role_set_is_forbidden():
+    m = RbacMatrix.compile({"x.y": set()})
+
+    assert not m.is_allowed("x.y", "system")
+
+
+def test_org_override_applies_only_to_that_org():
+    org_a, org_b = uuid.uuid4(), uuid.uuid4()
+    try:
+        policy = rbac.load_policy(ALLOW, {org_a: {"task.start": {"qc"}}}, version=7)
+
+        assert policy.version == 7
+        assert is_allowed("task.start", "qc", org_a)
+        assert not is_allowed("task.start", "executor", org_a)
+        with pytest.raises(Forbidden):
+            ensure_allowed("task.start", "executor", org_a)
+        # остальные permission org_a и другие org — по ALLOW
+        assert is_allowed("task.assign", "lead", org_a)
+        assert is_allowed("task.start", "executor", org_b)
+        assert is_allowed("task.start", "executor")
+    finally:
+        rbac.load_policy(ALLOW)
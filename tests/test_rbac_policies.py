@@ -0,0 +1,69 @@
+# tests/test_rbac_policies.py
+"""
+Per-org RBAC из rbac_policies (M15): триггер поднимает rbac_policy_version,
+reload_policy собирает политику worker'а поверх ALLOW.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import rbac
+from app.core.rbac import ALLOW, is_allowed
+from app.services.rbac_policies import (
+    LockedPermission,
+    UnknownPermission,
+    load_org_overrides,
+    policy_version,
+    reload_policy,
+    reset_org_permission,
+    set_org_permission,
+)
+
+
+@pytest.fixture
+def restore_policy():
+    yield
+    rbac.load_policy(ALLOW)
+
+
+def test_write_bumps_version(db: Session):
+    org_id = uuid.uuid4()
+    before = policy_version(db)
+
+    set_org_permission(db, org_id=org_id, permission="task.start", roles=["qc"], actor_user_id=uuid.uuid4())
+    assert policy_version(db) == before + 1
+
+    assert reset_org_permission(db, org_id=org_id, permission="task.start") is True
+    assert reset_org_permission(db, org_id=org_id, permission="task.start") is False
+    # statement-level триггер: DELETE без строк тоже меняет версию — лишний reload безвреден
+    assert policy_version(db) == before + 3
+
+
+def test_reload_policy_applies_org_overrides(db: Session, restore_policy):
+    org_id, other_org = uuid.uuid4(), uuid.uuid4()
+    actor = uuid.uuid4()
+    set_org_permission(db, org_id=org_id, permission="task.start", roles=["qc", " qc "], actor_user_id=actor)
+    set_org_permission(db, org_id=org_id, permission="task.start", roles=["supervisor"], actor_user_id=actor)
+
+    version, overrides = load_org_overrides(db)
+    assert overrides[org_id] == {"task.start": ["supervisor"]}
+
+    policy = reload_policy(db)
+
+    assert policy.version == version
+    assert is_allowed("task.start", "supervisor", org_id)
+    assert not is_allowed("task.start", "executor", org_id)
+    assert is_allowed("task.start", "executor", other_org)
+
+
+def test_unknown_and_locked_permissions_rejected(db: Session):
+    org_id, actor = uuid.uuid4(), uuid.uuid4()
+
+    with pytest.raises(UnknownPermission):
+        set_org_permission(db, org_id=org_id, permission="task.unknown", roles=["qc"], actor_user_id=actor)
+    with pytest.raises(LockedPermission):
+        set_org_permission(db, org_id=org_id, permission="org.rbac_manage", roles=[], actor_user_id=actor)
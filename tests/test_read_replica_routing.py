@@ -0,0 +1,108 @@
+# tests/test_read_replica_routing.py
+"""
+Read-replica routing: выбор engine для read-only endpoint'ов.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from app.core.db import ReplicaRouter, replica_lag_from_status, replica_lag_seconds, wants_primary
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _router(lags: dict, *, clock=None, max_lag: float = 5.0) -> tuple[ReplicaRouter, list[int]]:
+    calls: list[int] = []
+
+    def probe(replica):
+        calls.append(replica)
+        lag = lags[replica]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    router = ReplicaRouter(
+        "primary",
+        sorted(lags),
+        max_lag_seconds=max_lag,
+        check_interval_seconds=2.0,
+        lag_probe=probe,
+        clock=clock or _Clock(),
+    )
+    return router, calls
+
+
+def _request(method: str = "GET", headers: dict | None = None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "path": "/", "headers": raw})
+
+
+def test_no_replicas_means_primary():
+    router = ReplicaRouter("primary", [], max_lag_seconds=5, check_interval_seconds=2)
+    assert router.pick() == "primary"
+
+
+def test_round_robin_over_fresh_replicas():
+    router, _ = _router({1: 0.0, 2: 0.5})
+    assert [router.pick() for _ in range(4)] == [1, 2, 1, 2]
+
+
+def test_lagging_or_broken_replica_is_skipped():
+    router, _ = _router({1: 30.0, 2: OperationalError("select", {}, Exception("down"))})
+    assert router.pick() == "primary"
+
+    router, _ = _router({1: None, 2: 1.0})
+    assert {router.pick() for _ in range(3)} == {2}
+
+
+def test_lag_is_rechecked_after_interval():
+    clock = _Clock()
+    lags = {1: 30.0}
+    router, calls = _router(lags, clock=clock)
+
+    assert router.pick() == "primary"
+    lags[1] = 0.0
+    assert router.pick() == "primary"  # результат probe ещё в кэше
+    assert calls == [1]
+
+    clock.now = 2.0
+    assert router.pick() == 1
+    assert calls == [1, 1]
+
+
+def test_caught_up_replica_is_fresh_only_while_streaming():
+    idle = dict(in_recovery=True, caught_up=True, replay_lag=600.0)
+
+    assert replica_lag_from_status(streaming=True, **idle) == 0
+    # WAL receiver отвалился: проиграно всё полученное, но primary мог уйти вперёд
+    disconnected = replica_lag_from_status(streaming=False, **idle)
+    assert disconnected == 600.0
+
+    router, _ = _router({1: disconnected})
+    assert router.pick() == "primary"
+
+
+def test_lag_status_of_primary_and_fresh_replica():
+    assert replica_lag_from_status(in_recovery=False, caught_up=None, streaming=False, replay_lag=None) == 0
+    assert replica_lag_from_status(in_recovery=True, caught_up=False, streaming=True, replay_lag=1.5) == 1.5
+    assert replica_lag_from_status(in_recovery=True, caught_up=None, streaming=False, replay_lag=None) is None
+
+
+def test_writes_and_read_your_writes_go_to_primary():
+    assert not wants_primary(_request("GET"))
+    assert wants_primary(_request("POST"))
+    assert wants_primary(_request("GET", {"X-Min-Row-Version": "7"}))
+
+
+def test_local_primary_reports_zero_lag(engine):
+    # В тестах "реплика" = тот же Postgres: не в recovery -> отставание 0
+    assert replica_lag_seconds(engine) == 0
+    assert ReplicaRouter(engine, [engine], max_lag_seconds=5, check_interval_seconds=2).pick() is engine
@@ -0,0 +1,131 @@
+# tests/test_shift_release_job.py
+"""
+ShiftReleaseJob: конец смены возвращает assigned/in_progress задачи в пул.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.task import TaskStatus
+from app.models.task_transition import TaskTransition
+from app.services.shift_release_job import ShiftReleaseJob, shift_release_event_id
+
+from tests.factories import make_project_template, make_task
+
+ACTOR = uuid.uuid4()
+
+
+def _now():
+    return datetime.now(tz=timezone.utc)
+
+
+def _job(db: Session, pt, **kw) -> ShiftReleaseJob:
+    return ShiftReleaseJob(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        work_date=date(2026, 1, 20),
+        shift_code="end_of_week",
+        actor_user_id=ACTOR,
+        **kw,
+    )
+
+
+def test_releases_active_tasks_in_chunks(db: Session):
+    pt = make_project_template(db)
+    active = [
+        make_task(
+            db,
+            org_id=pt.org_id,
+            project_id=pt.project_id,
+            status=status,
+            assigned_to=uuid.uuid4(),
+            assigned_at=_now(),
+            flush=True,
+        )
+        for status in ("assigned", "assigned", "in_progress")
+    ]
+    idle = make_task(db, org_id=pt.org_id, project_id=pt.project_id, status="available", flush=True)
+
+    seen = []
+    result = _job(db, pt, chunk_size=2, on_progress=lambda p: seen.append(p.chunks)).run()
+
+    assert (result.released, result.skipped, result.scanned) == (3, 0, 3)
+    assert seen == [1, 2]
+
+    for t in active:
+        db.refresh(t)
+        assert t.status == TaskStatus.available.value
+        assert t.assigned_to is None
+        assert t.row_version == 2
+
+        tr = db.execute(select(TaskTransition).where(TaskTransition.task_id == t.id)).scalar_one()
+        assert tr.action == "shift_release"
+        assert tr.client_event_id == shift_release_event_id(
+            shift_key="2026-01-20:end_of_week", task_id=t.id, row_version=1
+        )
+
+    db.refresh(idle)
+    assert idle.row_version == 1
+
+
+def test_rerun_is_noop(db: Session):
+    pt = make_project_template(db)
+    make_task(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        status="in_progress",
+        assigned_to=uuid.uuid4(),
+        assigned_at=_now(),
+        flush=True,
+    )
+
+    first = _job(db, pt).run()
+    second = _job(db, pt).run()
+
+    assert first.released == 1
+    assert (second.released, second.scanned) == (0, 0)
+
+
+def test_replay_of_committed_release_is_idempotent(db: Session, monkeypatch):
+    """Чанк прочитан до COMMIT первого прогона: повтор попадает в тот же client_event_id."""
+    pt = make_project_template(db)
+    task = make_task(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        status="assigned",
+        assigned_to=uuid.uuid4(),
+        assigned_at=_now(),
+        flush=True,
+    )
+    assert _job(db, pt).run().released == 1
+
+    replay = _job(db, pt)
+    stale = iter([[(task.id, 1)], []])
+    monkeypatch.setattr(replay, "_next_chunk", lambda after_id: next(stale))
+    result = replay.run()
+
+    assert (result.released, result.skipped) == (1, 0)
+    rows = db.execute(
+        select(TaskTransition).where(TaskTransition.task_id == task.id, TaskTransition.action == "shift_release")
+    ).scalars().all()
+    assert len(rows) == 1
+    db.refresh(task)
+    assert task.row_version == 2
+
+
+def test_event_id_is_deterministic():
+    task_id = uuid.uuid4()
+    a = shift_release_event_id(shift_key="2026-01-20:end_of_week", task_id=task_id, row_version=3)
+    b = shift_release_event_id(shift_key="2026-01-20:end_of_week", task_id=task_id, row_version=3)
+    c = shift_release_event_id(shift_key="2026-01-20:end_of_week", task_id=task_id, row_version=4)
+
+    assert a == b
+    assert a != c
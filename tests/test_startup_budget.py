@@ -0,0 +1,65 @@
+# tests/test_startup_budget.py
+"""
+Бюджет холодного старта: `import app.main` в отдельном процессе.
+
+Бюджет — STARTUP_BUDGET_SECONDS (по умолчанию 3с с запасом на медленный CI);
+детальный профиль: python scripts/import_profile.py.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.main import app
+
+ROOT = Path(__file__).resolve().parents[1]
+
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "3.0"))
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t
+print(json.dumps({
+    "elapsed": elapsed,
+    "examples_imported": "app.api.openapi_examples" in sys.modules,
+    "schema_built": app.main.app.openapi_schema is not None,
+}))
+"""
+
+
+def _cold_import(**env: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT), **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_cold_import_within_budget():
+    # лучший из двух: первый запуск может компилировать .pyc
+    elapsed = min(_cold_import(OPENAPI_MODE="snapshot")["elapsed"] for _ in range(2))
+    assert elapsed < STARTUP_BUDGET_SECONDS, f"import app.main took {elapsed:.2f}s (budget {STARTUP_BUDGET_SECONDS}s)"
+
+
+def test_production_mode_skips_docs_only_work():
+    probe = _cold_import(OPENAPI_MODE="snapshot")
+
+    assert probe["examples_imported"] is False
+    assert probe["schema_built"] is False
+
+
+def test_runtime_mode_keeps_request_examples():
+    schema = app.openapi()
+
+    body = schema["paths"]["/tasks/{task_id}/transitions"]["post"]["requestBody"]["content"]["application/json"]
+    assert "unblock" in body["examples"]
@@ -0,0 +1,124 @@
+# tests/test_task_as_of.py
+"""
+Состояние задач изделия на момент времени: DISTINCT ON по журналу переходов и
+снимки deliverable_task_snapshots (app/services/task_as_of.py).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.task_transition import TaskTransition
+from app.services.task_as_of import SNAPSHOT_SAFETY_MARGIN, take_task_snapshots, task_states_as_of
+
+from tests.factories import make_deliverable, make_project_template, make_task
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+DAY = timedelta(days=1)
+ACTOR = uuid.uuid4()
+
+
+def _transition(db: Session, task, action, from_status, to_status, expected, at):
+    db.add(
+        TaskTransition(
+            id=uuid.uuid4(),
+            org_id=task.org_id,
+            project_id=task.project_id,
+            task_id=task.id,
+            actor_user_id=ACTOR,
+            action=action,
+            from_status=from_status,
+            to_status=to_status,
+            payload={},
+            created_at=at,
+            expected_row_version=expected,
+            result_row_version=expected + 1,
+        )
+    )
+    db.flush()
+
+
+@pytest.fixture
+def deliverable_tasks(db: Session):
+    pt = make_project_template(db)
+    d = make_deliverable(db, org_id=pt.org_id, project_id=pt.project_id, created_by=ACTOR)
+    # журнал: blocked -(T0+1d)-> available -(T0+2d)-> assigned
+    moving = make_task(
+        db,
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_id=d.id,
+        status="assigned",
+        assigned_to=ACTOR,
+        assigned_at=T0 + 2 * DAY,
+        row_version=3,
+        created_at=T0,
+        flush=True,
+    )
+    _transition(db, moving, "unblock", "blocked", "available", 1, T0 + DAY)
+    _transition(db, moving, "self_assign", "available", "assigned", 2, T0 + 2 * DAY)
+    # без переходов: состояние не менялось
+    still = make_task(db, org_id=pt.org_id, project_id=pt.project_id, deliverable_id=d.id, created_at=T0, flush=True)
+    return d, moving, still
+
+
+def _states(db: Session, d, tasks, as_of, **kw):
+    states = task_states_as_of(
+        db,
+        org_id=d.org_id,
+        deliverable_id=d.id,
+        tasks=[(t.id, t.status, t.row_version) for t in tasks],
+        as_of=as_of,
+        **kw,
+    )
+    return {t.id: (states[t.id].status, states[t.id].row_version) for t in tasks}
+
+
+@pytest.mark.parametrize(
+    "as_of, expected",
+    [
+        (T0 + DAY / 2, ("blocked", 1)),
+        (T0 + DAY, ("available", 2)),
+        (T0 + 3 * DAY, ("assigned", 3)),
+    ],
+    ids=["before-first", "at-first", "after-last"],
+)
+def test_state_as_of_from_log(db: Session, deliverable_tasks, as_of, expected):
+    d, moving, still = deliverable_tasks
+
+    states = _states(db, d, [moving, still], as_of, use_snapshots=False)
+
+    assert states[moving.id] == expected
+    assert states[still.id] == ("blocked", 1)
+
+
+def test_snapshot_is_state_at_taken_at_and_cuts_history(db: Session, deliverable_tasks):
+    d, moving, still = deliverable_tasks
+
+    # снимок между переходами: должен увидеть available, а не текущий assigned
+    result = take_task_snapshots(db, org_id=d.org_id, now=T0 + DAY * 3 / 2 + SNAPSHOT_SAFETY_MARGIN)
+    assert (result.deliverables, result.rows) == (1, 2)
+
+    # переход до снимка «теряем»: если запрос читает окно после снимка, ответ не меняется
+    db.query(TaskTransition).filter(
+        TaskTransition.task_id == moving.id, TaskTransition.action == "unblock"
+    ).delete()
+
+    assert _states(db, d, [moving, still], T0 + DAY * 7 / 4, use_snapshots=True)[moving.id] == ("available", 2)
+    assert _states(db, d, [moving, still], T0 + 3 * DAY, use_snapshots=True)[moving.id] == ("assigned", 3)
+
+    # время изменения тоже берётся из снимка, а не подменяется created_at задачи
+    states = task_states_as_of(
+        db,
+        org_id=d.org_id,
+        deliverable_id=d.id,
+        tasks=[(t.id, t.status, t.row_version) for t in (moving, still)],
+        as_of=T0 + DAY * 7 / 4,
+        use_snapshots=True,
+    )
+    assert states[moving.id].changed_at == T0 + DAY
+    assert states[still.id].changed_at is None
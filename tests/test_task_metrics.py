@@ -0,0 +1,195 @@
+# tests/test_task_metrics.py
+"""
+M12: инкрементальные rollup'ы cycle time / throughput и endpoint'ы /metrics.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.metrics import _date_range, get_cycle_time, get_throughput
+from app.services.task_metrics_rollup import TaskMetricsRollupJob
+
+from tests.factories import make_project_template, make_task
+
+DAY = datetime(2034, 3, 1, tzinfo=timezone.utc)
+H = timedelta(hours=1)
+
+# (action, from, to, offset от DAY)
+HISTORY = [
+    ("self_assign", "available", "assigned", 10 * H),
+    ("start", "assigned", "in_progress", 10.5 * H),
+    ("submit", "in_progress", "submitted", 12 * H),
+    ("escalate", "submitted", "submitted", 12.5 * H),  # без смены статуса — не рвёт время в статусе
+    ("review_reject", "submitted", "in_progress", 13 * H),
+    ("submit", "in_progress", "submitted", 14 * H),
+    ("review_approve", "submitted", "done", 15 * H),
+]
+
+
+def _insert_history(db: Session, task, history, *, first_rv: int = 1, table: str = "task_transitions") -> None:
+    for rv, (action, from_status, to_status, offset) in enumerate(history, start=first_rv):
+        db.execute(
+            text(
+                f"""
+                INSERT INTO {table} (
+                    id, org_id, project_id, task_id, from_status, to_status, action,
+                    payload, actor_user_id, expected_row_version, result_row_version, created_at
+                )
+                VALUES (
+                    :id, :org_id, :project_id, :task_id, :from_status, :to_status, :action,
+                    '{{}}'::jsonb, :actor, :rv, :rv + 1, :created_at
+                )
+                """
+            ),
+            {
+                "id": uuid.uuid4(),
+                "org_id": task.org_id,
+                "project_id": task.project_id,
+                "task_id": task.id,
+                "from_status": from_status,
+                "to_status": to_status,
+                "action": action,
+                "actor": uuid.uuid4(),
+                "rv": rv,
+                "created_at": DAY + offset,
+            },
+        )
+
+
+def _set_watermark(db: Session, watermark: datetime) -> None:
+    db.execute(
+        text(
+            """
+            INSERT INTO task_metrics_rollup_state (id, watermark) VALUES (1, :wm)
+            ON CONFLICT (id) DO UPDATE SET watermark = EXCLUDED.watermark
+            """
+        ),
+        {"wm": watermark},
+    )
+
+
+def test_date_range_defaults_and_validation():
+    assert _date_range(None, date(2026, 1, 30)) == (date(2026, 1, 1), date(2026, 1, 30))
+
+    with pytest.raises(HTTPException):
+        _date_range(date(2026, 2, 1), date(2026, 1, 1))
+    with pytest.raises(HTTPException):
+        _date_range(date(2024, 1, 1), date(2026, 1, 1))
+
+
+def test_rollup_is_incremental_and_feeds_metrics(db: Session):
+    pt = make_project_template(db)
+    task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, status="done", created_at=DAY + 9 * H, flush=True)
+    _set_watermark(db, DAY)
+
+    _insert_history(db, task, HISTORY[:3])
+    first = TaskMetricsRollupJob(db, settle_seconds=0, now=DAY + 12.25 * H).run()
+    assert first.transitions == 3
+
+    _insert_history(db, task, HISTORY[3:], first_rv=4)
+
+    second = TaskMetricsRollupJob(db, settle_seconds=0, now=DAY + timedelta(days=1)).run()
+    assert second.transitions == 4
+
+    # повторный запуск ничего не пересчитывает
+    again = TaskMetricsRollupJob(db, settle_seconds=0, now=DAY + timedelta(days=1)).run()
+    assert again.transitions == 0
+
+    kw = dict(org_id=pt.org_id, date_from=DAY.date(), date_to=DAY.date(), db=db)
+
+    throughput = get_throughput(pt.project_id, **kw)
+    assert (throughput.completed, throughput.review_approves, throughput.review_rejects) == (1, 1, 1)
+    assert throughput.rework_rate == 0.5
+    assert throughput.fix_ratio == 0.0
+
+    cycle = get_cycle_time(pt.project_id, **kw)
+    assert cycle.avg_lead_time_seconds == 6 * 3600
+    assert cycle.avg_cycle_time_seconds == 4.5 * 3600
+    in_status = {s.status: (s.avg_seconds, s.exits) for s in cycle.time_in_status}
+    assert in_status == {
+        "available": (3600, 1),
+        "assigned": (1800, 1),
+        "in_progress": (1.25 * 3600, 2),
+        "submitted": (3600, 2),
+    }
+
+
+def test_first_run_includes_archive_tier(db: Session):
+    pt = make_project_template(db)
+    task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, status="done", created_at=DAY + 9 * H, flush=True)
+    db.execute(text("DELETE FROM task_metrics_rollup_state"))
+
+    # начало истории (включая первый in_progress) уже перенесено в archive tier
+    _insert_history(db, task, HISTORY[:2], table="task_transitions_archive")
+    _insert_history(db, task, HISTORY[2:], first_rv=3)
+
+    progress = TaskMetricsRollupJob(db, settle_seconds=0, now=DAY + timedelta(days=1)).run()
+    assert progress.transitions == len(HISTORY)
+
+    cycle = get_cycle_time(pt.project_id, org_id=pt.org_id, date_from=DAY.date(), date_to=DAY.date(), db=db)
+    assert cycle.avg_cycle_time_seconds == 4.5 * 3600
+    in_status = {s.status: (s.avg_seconds, s.exits) for s in cycle.time_in_status}
+    assert in_status["available"] == (3600, 1)
+    assert in_status["assigned"] == (1800, 1)
+
+
+def test_concurrent_first_runs_do_not_double_count(engine):
+    """Два первых запуска одновременно: без строки состояния сериализует только advisory lock."""
+    Session_ = sessionmaker(bind=engine, expire_on_commit=False)
+
+    with Session_() as setup:
+        saved = setup.execute(text("SELECT watermark FROM task_metrics_rollup_state WHERE id = 1")).scalar_one_or_none()
+        setup.execute(text("DELETE FROM task_metrics_rollup_state"))
+        pt = make_project_template(setup)
+        task = make_task(setup, org_id=pt.org_id, project_id=pt.project_id, status="done", created_at=DAY + 9 * H, flush=True)
+        _insert_history(setup, task, HISTORY)
+        setup.commit()
+        org_id, project_id = pt.org_id, pt.project_id
+
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def run():
+        try:
+            with Session_() as s:
+                barrier.wait()
+                TaskMetricsRollupJob(s, settle_seconds=0, now=DAY + timedelta(days=1)).run()
+        except Exception as e:  # pragma: no cover - поднимем в основном потоке
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        assert not errors
+
+        with Session_() as check:
+            completed, approves = check.execute(
+                text(
+                    "SELECT sum(completed), sum(review_approves) FROM task_metrics_daily "
+                    "WHERE org_id = :org_id AND project_id = :project_id"
+                ),
+                {"org_id": org_id, "project_id": project_id},
+            ).one()
+        assert (completed, approves) == (1, 1)
+    finally:
+        with Session_() as cleanup:
+            params = {"org_id": org_id}
+            for table in ("task_transitions", "task_metrics_daily", "task_status_time_daily", "tasks", "project_templates"):
+                cleanup.execute(text(f"DELETE FROM {table} WHERE org_id = :org_id"), params)
+            cleanup.execute(text("DELETE FROM task_metrics_rollup_state"))
+            if saved is not None:
+                cleanup.execute(
+                    text("INSERT INTO task_metrics_rollup_state (id, watermark) VALUES (1, :wm)"), {"wm": saved}
+                )
+            cleanup.commit()
@@ -0,0 +1,164 @@
+# tests/test_task_replay.py
+"""
+Replay журнала task_transitions через FSM и сверка с tasks (app/services/task_replay.py).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.cache import Cache, InMemoryCacheBackend
+from app.fsm.task_fsm import Action, TRANSITION_TABLE, TransitionNotAllowed, apply_transition
+from app.models.task import Task, TaskStatus
+from app.services.task_replay import (
+    TaskReplayVerifier,
+    TransitionRow,
+    compare_task,
+    invalidate_repaired,
+    replay_task,
+    uuid_ranges,
+)
+from app.services.task_transition_service import apply_task_transition
+
+from tests.factories import make_project_template, make_task
+
+TASK_ID = uuid.uuid4()
+ACTOR = uuid.uuid4()
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(action, from_status, to_status, expected, result=None, **kw) -> TransitionRow:
+    return TransitionRow(
+        task_id=TASK_ID,
+        action=action,
+        from_status=from_status,
+        to_status=to_status,
+        expected_row_version=expected,
+        result_row_version=expected + 1 if result is None else result,
+        actor_user_id=kw.get("actor", ACTOR),
+        assign_to=kw.get("assign_to"),
+        created_at=NOW,
+    )
+
+
+def test_transition_table_matches_apply_transition():
+    for status in TaskStatus:
+        for action in Action:
+            try:
+                expected, _ = apply_transition(status, action.value, payload={"reason": "x"})
+            except TransitionNotAllowed:
+                expected = None
+            got = TRANSITION_TABLE.get((status.value, action.value))
+            assert got == (expected.value if expected else None), (status, action)
+
+
+def test_clean_log_replays_to_final_state():
+    replayed, divergences = replay_task(
+        TASK_ID,
+        [
+            _row("unblock", "blocked", "available", 1),
+            _row("self_assign", "available", "assigned", 2),
+            # template-migrate поднял row_version без перехода: разрыв версий допустим
+            _row("start", "assigned", "in_progress", 5),
+        ],
+    )
+
+    assert divergences == []
+    assert (replayed.status, replayed.row_version, replayed.assigned_to) == ("in_progress", 6, ACTOR)
+    assert compare_task(replayed, ("in_progress", 7, ACTOR)) == []
+
+
+@pytest.mark.parametrize(
+    "rows, kind",
+    [
+        ([_row("submit", "available", "submitted", 1)], "fsm"),
+        ([_row("unblock", "blocked", "available", 1), _row("unblock", "blocked", "available", 2)], "chain"),
+        ([_row("unblock", "blocked", "available", 1, result=5)], "version"),
+        (
+            [_row("unblock", "blocked", "available", 3), _row("self_assign", "available", "assigned", 2)],
+            "version",
+        ),
+    ],
+    ids=["fsm", "chain", "result-version", "version-backwards"],
+)
+def test_broken_log_is_reported(rows, kind):
+    _, divergences = replay_task(TASK_ID, rows)
+
+    assert kind in {d.kind for d in divergences}
+
+
+def test_compare_reports_state_divergences():
+    replayed, _ = replay_task(TASK_ID, [_row("unblock", "blocked", "available", 1)])
+
+    kinds = {d.kind for d in compare_task(replayed, ("blocked", 1, ACTOR))}
+    assert kinds == {"status", "row_version", "assignee"}
+    assert [d.kind for d in compare_task(replayed, None)] == ["missing_task"]
+
+
+def test_uuid_ranges_cover_space():
+    ranges = uuid_ranges(4)
+
+    assert ranges[0][0] == uuid.UUID(int=0)
+    assert ranges[-1][1] is None
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def _transition(db: Session, task: Task, action: str, *, actor: uuid.UUID = ACTOR):
+    apply_task_transition(
+        db,
+        org_id=task.org_id,
+        actor_user_id=actor,
+        task_id=task.id,
+        action=action,
+        expected_row_version=task.row_version,
+        payload={},
+        client_event_id=uuid.uuid4(),
+    )
+
+
+def test_verify_and_repair(db: Session):
+    pt = make_project_template(db)
+    ok = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+    broken = make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True)
+    # WIP=1 (M3): у каждой задачи свой исполнитель
+    for t, actor in ((ok, uuid.uuid4()), (broken, ACTOR)):
+        _transition(db, t, "unblock", actor=actor)
+        _transition(db, t, "self_assign", actor=actor)
+
+    verifier = TaskReplayVerifier(db, org_id=pt.org_id, batch_size=1)
+    report = verifier.verify_range()
+    assert (report.tasks, report.transitions, report.divergent_tasks) == (2, 4, 0)
+
+    # «потерянный» переход: tasks откатили на available
+    db.execute(
+        update(Task)
+        .where(Task.id == broken.id)
+        .values(status="available", row_version=2, assigned_to=None, assigned_at=None)
+    )
+    report = verifier.verify_range()
+    assert report.divergent_tasks == 1
+    assert {d.kind for d in report.samples} == {"status", "row_version", "assignee"}
+
+    cache = Cache(InMemoryCacheBackend())
+    cache.set(Cache.task_key(pt.org_id, broken.id), b"stale")
+    cache.set(Cache.task_key(pt.org_id, ok.id), b"fresh")
+
+    verifier.repair = True
+    repaired = verifier.verify_range()
+    assert (repaired.repaired, repaired.repaired_ids) == (1, [broken.id])
+    invalidate_repaired(cache, pt.org_id, repaired)
+    assert cache.get(Cache.task_key(pt.org_id, broken.id)) is None
+    assert cache.get(Cache.task_key(pt.org_id, ok.id)) == b"fresh"
+
+    db.expire_all()
+    fixed = db.get(Task, broken.id)
+    # ремонт — новая версия строки, как у перехода
+    assert (fixed.status, fixed.row_version, fixed.assigned_to) == ("assigned", 4, ACTOR)
+    assert fixed.assigned_at is not None
+    verifier.repair = False
+    assert verifier.verify_range().divergent_tasks == 0
@@ -0,0 +1,44 @@
+# tests/test_task_sparse_fields.py
+"""
+Sparse fieldsets для списков задач (?fields=...).
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.deps import get_task_fields
+from app.api.responses import TASK_PARTIAL_LIST, adapter_response
+from app.schemas.task import TASK_READ_FIELDS, TaskPartialRead
+
+
+def test_fields_none_means_full_model():
+    assert get_task_fields(None) is None
+    assert get_task_fields("  ") is None
+
+
+def test_fields_are_ordered_and_always_include_id():
+    assert get_task_fields("row_version, status,title") == ("id", "title", "status", "row_version")
+
+
+def test_unknown_field_is_422():
+    with pytest.raises(HTTPException) as e:
+        get_task_fields("id,fix_reason")
+    assert e.value.status_code == 422
+
+
+def test_partial_model_mirrors_task_read():
+    assert tuple(TaskPartialRead.model_fields) == TASK_READ_FIELDS
+    assert [n for n, f in TaskPartialRead.model_fields.items() if f.is_required()] == ["id"]
+
+
+def test_partial_response_contains_only_requested_keys():
+    row = {"id": uuid.uuid4(), "title": "t", "status": "available", "priority": 0, "row_version": 1}
+
+    body = json.loads(adapter_response(TASK_PARTIAL_LIST, [row], exclude_unset=True).body)
+
+    assert body == [{**row, "id": str(row["id"])}]
@@ -0,0 +1,193 @@
+# tests/test_template_io.py
+"""
+Импорт / экспорт версии шаблона (JSON Lines, CSV): однопроходная валидация + COPY.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import uuid
+from urllib.parse import unquote
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.projects import _export_disposition, _spool_body
+from app.models.project_template_version import ProjectTemplateVersion
+from app.services.template_diff import diff_template_versions, load_template_edges, load_template_nodes
+from app.services.template_io import (
+    TemplateImportError,
+    TemplateValidator,
+    find_cycle,
+    import_template_version,
+    iter_export_lines,
+    iter_records,
+)
+
+from tests.factories import make_project_template, make_template_version
+
+JSONL = """\
+{"type": "node", "code": "frame", "title": "Каркас"}
+{"type": "node", "code": "paint", "title": "Покраска", "parent_code": "frame", "priority": 2}
+
+{"type": "node", "code": "pack", "title": "Упаковка", "is_milestone": true, "kind": "admin"}
+{"type": "edge", "predecessor_code": "paint", "successor_code": "pack"}
+"""
+
+CSV = """\
+type,code,parent_code,title,priority,is_milestone,predecessor_code,successor_code
+edge,,,,,,paint,pack
+node,paint,frame,Покраска,2,false,,
+node,frame,,Каркас,,,,
+node,pack,,Упаковка,,true,,
+"""
+
+
+def _validate(text: str, fmt: str = "jsonl") -> None:
+    v = TemplateValidator()
+    for line, rec in iter_records(io.StringIO(text), fmt):
+        if rec["type"] == "node":
+            v.node(rec, line)
+        else:
+            v.edge(rec, line)
+    v.finish()
+
+
+def test_find_cycle():
+    assert find_cycle(["a", "b", "c"], [("a", "b"), ("b", "c")]) is None
+    assert find_cycle(["a", "b", "c"], [("a", "b"), ("b", "c"), ("c", "a")]) == "a"
+
+
+@pytest.mark.parametrize("text, fmt", [(JSONL, "jsonl"), (CSV, "csv")], ids=["jsonl", "csv"])
+def test_valid_file_passes(text, fmt):
+    _validate(text, fmt)
+
+
+@pytest.mark.parametrize(
+    "text, message, line",
+    [
+        ('{"type": "node", "code": "a", "title": "A"}\n{"type": "node", "code": "a", "title": "A"}\n', "duplicate node code", 2),
+        ('{"type": "node", "code": "a", "title": "A", "parent_code": "x"}\n', "missing parent_code", 1),
+        (
+            '{"type": "node", "code": "a", "title": "A", "parent_code": "b"}\n'
+            '{"type": "node", "code": "b", "title": "B", "parent_code": "a"}\n',
+            "parent_code cycle",
+            1,
+        ),
+        (
+            '{"type": "node", "code": "a", "title": "A"}\n{"type": "node", "code": "b", "title": "B"}\n'
+            '{"type": "edge", "predecessor_code": "a", "successor_code": "b"}\n'
+            '{"type": "edge", "predecessor_code": "b", "successor_code": "a"}\n',
+            "dependency cycle",
+            1,
+        ),
+        ('{"type": "node", "code": "a", "title": "A"}\n{"type": "edge", "predecessor_code": "a", "successor_code": "z"}\n', "unknown node", 2),
+        ('{"type": "node", "code": "a", "title": "A", "kind": "nope"}\n', "unknown kind", 1),
+        ('{"type": "node", "code": "a"\n', "invalid JSON", 1),
+    ],
+)
+def test_invalid_file_reports_line(text, message, line):
+    with pytest.raises(TemplateImportError) as e:
+        _validate(text)
+    assert message in str(e.value)
+    assert e.value.line == line
+
+
+def _import(db: Session, pt, text: str, *, fmt: str = "jsonl", version: str = "imported", **kw):
+    return import_template_version(
+        db,
+        io.StringIO(text),
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        actor_user_id=uuid.uuid4(),
+        version=version,
+        fmt=fmt,
+        **kw,
+    )
+
+
+@pytest.mark.parametrize("use_copy", [True, False])
+def test_import_creates_version(db: Session, use_copy):
+    pt = make_project_template(db)
+
+    result = _import(db, pt, JSONL, activate=True, use_copy=use_copy)
+
+    assert (result.nodes, result.edges, result.activated) == (3, 1, True)
+    assert pt.active_template_version_id == result.template_version_id
+    nodes = load_template_nodes(db, result.template_version_id)
+    assert nodes["paint"].parent_code == "frame"
+    assert nodes["paint"].priority == 2
+    assert nodes["pack"].is_milestone is True
+    assert nodes["pack"].kind == "admin"
+    assert load_template_edges(db, result.template_version_id) == {("paint", "pack")}
+
+
+def test_csv_import_matches_jsonl(db: Session):
+    pt = make_project_template(db)
+
+    a = _import(db, pt, JSONL, version="a")
+    b = _import(db, pt, CSV, fmt="csv", version="b")
+
+    assert diff_template_versions(db, a.template_version_id, b.template_version_id).is_empty
+
+
+def test_invalid_import_raises(db: Session):
+    pt = make_project_template(db)
+
+    with pytest.raises(TemplateImportError):
+        _import(db, pt, '{"type": "node", "code": "a", "title": "A", "parent_code": "x"}\n')
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+def test_export_roundtrip(db: Session, fmt):
+    pt = make_project_template(db)
+    tv = make_template_version(
+        db, pt, nodes=[("frame", None), ("paint", "frame"), ("pack", None)], edges=[("paint", "pack")]
+    )
+
+    text = "".join(iter_export_lines(db, tv, fmt=fmt))
+    result = _import(db, pt, text, fmt=fmt)
+
+    assert diff_template_versions(db, tv.id, result.template_version_id).is_empty
+    assert db.get(ProjectTemplateVersion, result.template_version_id).version == "imported"
+
+
+def test_export_disposition_is_latin1_safe():
+    tv = ProjectTemplateVersion(id=uuid.uuid4(), version='Весна "v2"')
+
+    header = _export_disposition(tv, "csv")
+
+    header.encode("latin-1")  # Starlette кодирует заголовки latin-1
+    assert f'filename="template-{tv.id}.csv"' in header
+    assert unquote(header.split("filename*=UTF-8''", 1)[1]) == 'template-Весна "v2".csv'
+
+
+class _Upload:
+    def __init__(self, chunks: list[bytes], content_length: int | None = None):
+        self.chunks = chunks
+        self.headers = {} if content_length is None else {"content-length": str(content_length)}
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.parametrize("declared", [None, 10], ids=["chunked", "content-length"])
+def test_import_body_over_limit_is_413(declared):
+    raw = io.BytesIO()
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(_spool_body(_Upload([b"abcd", b"efgh"], declared), raw, max_bytes=6))
+
+    assert e.value.status_code == 413
+    assert len(raw.getvalue()) <= 6
+
+
+def test_import_body_within_limit_is_spooled():
+    raw = io.BytesIO()
+
+    asyncio.run(_spool_body(_Upload([b"abc", b"def"], 6), raw, max_bytes=6))
+
+    assert raw.getvalue() == b"abcdef"
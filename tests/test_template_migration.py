@@ -0,0 +1,136 @@
+# tests/test_template_migration.py
+"""
+Diff версий шаблона и инкрементальная миграция deliverables (M14: tasks.template_node_code).
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models.deliverable import Deliverable
+from app.models.task import Task
+from app.services.deliverable_bootstrap_service import DeliverableBootstrapService
+from app.services.template_diff import TemplateNodeRow, diff_template_versions, diff_templates
+from app.services.template_migration import TemplateMigrationService, TemplateRolloutJob
+
+from tests.factories import make_project_template, make_template_version
+
+V1_NODES = [("frame", None), ("assembly", "frame"), ("paint", "frame"), ("pack", None)]
+V1_EDGES = [("assembly", "paint"), ("paint", "pack")]
+
+# paint удалён, polish добавлен под frame, assembly переехал в корень
+V2_NODES = [("frame", None), ("assembly", None), ("polish", "frame"), ("pack", None)]
+V2_EDGES = [("assembly", "polish"), ("polish", "pack")]
+
+
+def _row(code, parent_code=None, title=None):
+    return TemplateNodeRow(
+        code=code,
+        parent_code=parent_code,
+        title=title or f"node {code}",
+        description=None,
+        priority=0,
+        kind="production",
+        is_milestone=False,
+    )
+
+
+def test_diff_templates_by_code_and_edge_pairs():
+    old = {n.code: n for n in [_row("a"), _row("b", "a"), _row("c")]}
+    new = {n.code: n for n in [_row("a", title="A"), _row("b"), _row("d")]}
+
+    diff = diff_templates(old, new, {("a", "b"), ("b", "c")}, {("a", "b"), ("b", "d")})
+
+    assert [n.code for n in diff.added_nodes] == ["d"]
+    assert diff.removed_nodes == ["c"]
+    assert {c.code: set(c.changes) for c in diff.changed_nodes} == {"a": {"title"}, "b": {"parent_code"}}
+    assert diff.added_edges == [("b", "d")]
+    assert diff.removed_edges == [("b", "c")]
+
+    assert diff_templates(old, old, {("a", "b")}, {("a", "b")}).is_empty
+
+
+def _bootstrapped(db: Session, pt) -> Deliverable:
+    d = Deliverable(
+        id=uuid.uuid4(),
+        org_id=pt.org_id,
+        project_id=pt.project_id,
+        deliverable_type="box_v1",
+        serial=f"SN-{uuid.uuid4().hex[:8]}",
+        created_by=uuid.uuid4(),
+    )
+    db.add(d)
+    db.flush()
+    DeliverableBootstrapService(db).bootstrap(
+        org_id=d.org_id, project_id=d.project_id, deliverable_id=d.id, actor_user_id=uuid.uuid4()
+    )
+    db.flush()
+    return d
+
+
+def _tasks(db: Session, d: Deliverable) -> dict[str, Task]:
+    rows = db.execute(select(Task).where(Task.deliverable_id == d.id)).scalars()
+    return {t.template_node_code: t for t in rows if t.status != "canceled"}
+
+
+def _dependencies(db: Session, d: Deliverable) -> list[tuple[str, str]]:
+    return sorted(
+        db.execute(
+            text(
+                """
+                SELECT p.template_node_code, s.template_node_code
+                FROM task_dependencies dep
+                JOIN tasks p ON p.id = dep.predecessor_id
+                JOIN tasks s ON s.id = dep.successor_id
+                WHERE s.deliverable_id = :d
+                """
+            ),
+            {"d": d.id},
+        ).all()
+    )
+
+
+def test_migrate_applies_only_delta_and_keeps_done_tasks(db: Session):
+    pt = make_project_template(db)
+    v1 = make_template_version(db, pt, nodes=V1_NODES, edges=V1_EDGES)
+    d = _bootstrapped(db, pt)
+
+    before = _tasks(db, d)
+    before["frame"].status = "done"
+    db.flush()
+    v2 = make_template_version(db, pt, nodes=V2_NODES, edges=V2_EDGES)
+
+    diff = diff_template_versions(db, v1.id, v2.id)
+    result = TemplateMigrationService(db, actor_user_id=uuid.uuid4()).migrate_deliverable(d, diff)
+    db.expire_all()
+
+    assert (result.created_tasks, result.updated_tasks, result.canceled_tasks) == (1, 1, 1)
+    assert db.get(Deliverable, d.id).template_version_id == v2.id
+
+    after = _tasks(db, d)
+    assert set(after) == {"frame", "assembly", "polish", "pack"}
+    assert after["frame"].row_version == before["frame"].row_version  # done — не трогали
+    assert after["assembly"].id == before["assembly"].id and after["assembly"].parent_task_id is None
+    assert after["polish"].parent_task_id == after["frame"].id
+    assert db.get(Task, before["paint"].id).status == "canceled"
+
+    assert _dependencies(db, d) == [("assembly", "polish"), ("polish", "pack")]
+
+
+def test_rollout_migrates_each_deliverable_once(db: Session):
+    pt = make_project_template(db)
+    make_template_version(db, pt, nodes=V1_NODES, edges=V1_EDGES)
+    ds = [_bootstrapped(db, pt) for _ in range(3)]
+    v2 = make_template_version(db, pt, nodes=V2_NODES, edges=V2_EDGES)
+
+    job = dict(org_id=pt.org_id, project_id=pt.project_id, to_version_id=v2.id, actor_user_id=uuid.uuid4())
+    first = TemplateRolloutJob(db, chunk_size=2, **job).run()
+    again = TemplateRolloutJob(db, chunk_size=2, **job).run()
+
+    assert (first.migrated, first.failed, first.chunks) == (3, 0, 2)
+    assert again.scanned == 0
+    for d in ds:
+        assert set(_tasks(db, d)) == {"frame", "assembly", "polish", "pack"}
@@ -0,0 +1,96 @@
+# tests/test_transition_export.py
+"""
+Колоночный экспорт task_transitions (Parquet / Arrow IPC).
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.services.task_transition_service import apply_task_transition  # noqa: E402
+from app.services.transition_export import (  # noqa: E402
+    EXPORT_COLUMNS,
+    export_schema,
+    export_transitions,
+    rows_to_record_batch,
+)
+
+from tests.factories import make_project_template, make_task  # noqa: E402
+
+
+def _row(action: str = "start", client_event_id: uuid.UUID | None = None) -> tuple:
+    return (
+        uuid.uuid4(),
+        uuid.uuid4(),
+        uuid.uuid4(),
+        uuid.uuid4(),
+        uuid.uuid4(),
+        action,
+        "assigned",
+        "in_progress",
+        client_event_id,
+        1,
+        2,
+        datetime(2026, 1, 20, 8, 30, tzinfo=timezone.utc),
+        {"note": "ок"},
+    )
+
+
+def test_record_batch_types():
+    event_id = uuid.uuid4()
+    rows = [_row(client_event_id=event_id), _row(action="submit")]
+
+    batch = rows_to_record_batch(rows)
+
+    assert batch.schema.names == list(EXPORT_COLUMNS)
+    assert batch.schema.field("id").type == pa.binary(16)
+    assert pa.types.is_dictionary(batch.column(batch.schema.get_field_index("action")).type)
+
+    data = batch.to_pydict()
+    assert uuid.UUID(bytes=data["id"][0]) == rows[0][0]
+    assert uuid.UUID(bytes=data["client_event_id"][0]) == event_id
+    assert data["client_event_id"][1] is None
+    assert data["action"] == ["start", "submit"]
+    assert json.loads(data["payload"][0]) == {"note": "ок"}
+
+
+def test_empty_batch():
+    assert rows_to_record_batch([], export_schema()).num_rows == 0
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_project_transitions(db: Session, tmp_path, fmt):
+    pt = make_project_template(db)
+    for _ in range(3):
+        task = make_task(db, org_id=pt.org_id, project_id=pt.project_id, status="available", flush=True)
+        apply_task_transition(
+            db,
+            org_id=pt.org_id,
+            actor_user_id=uuid.uuid4(),  # WIP=1 на исполнителя
+            task_id=task.id,
+            action="self_assign",
+            expected_row_version=task.row_version,
+            payload={},
+            client_event_id=None,
+        )
+
+    path = tmp_path / f"transitions.{fmt}"
+    result = export_transitions(
+        db, path, org_id=pt.org_id, project_id=pt.project_id, fmt=fmt, row_group_size=2
+    )
+
+    assert (result.rows, result.row_groups) == (3, 2)
+    if fmt == "parquet":
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_stream(path).read_all()
+    assert table.num_rows == 3
+    assert {uuid.UUID(bytes=b) for b in table.column("project_id").to_pylist()} == {pt.project_id}
@@ -0,0 +1,130 @@
+# tests/test_transition_partitions.py
+"""
+M11: месячные партиции task_transitions, task_transition_keys и archive tier.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.task_transition import TaskTransition, TaskTransitionArchive, TaskTransitionKey
+from app.services.task_transition_service import apply_task_transition
+from app.services.transition_partition_job import (
+    TransitionPartitionJob,
+    TransitionPartitionResult,
+    add_months,
+    partition_month,
+    partition_name,
+)
+
+from tests.factories import make_project_template, make_task
+
+
+def _insert_transition(db: Session, task, *, created_at: datetime) -> uuid.UUID:
+    tr_id = uuid.uuid4()
+    db.execute(
+        text(
+            """
+            INSERT INTO task_transitions (
+                id, org_id, project_id, task_id, from_status, to_status, action,
+                payload, actor_user_id, client_event_id,
+                expected_row_version, result_row_version, created_at
+            )
+            VALUES (
+                :id, :org_id, :project_id, :task_id, 'available', 'assigned', 'assign',
+                '{}'::jsonb, :actor, :client_event_id, 1, 2, :created_at
+            )
+            """
+        ),
+        {
+            "id": tr_id,
+            "org_id": task.org_id,
+            "project_id": task.project_id,
+            "task_id": task.id,
+            "actor": uuid.uuid4(),
+            "client_event_id": uuid.uuid4(),
+            "created_at": created_at,
+        },
+    )
+    return tr_id
+
+
+def _task(db: Session, **kw):
+    pt = make_project_template(db)
+    return make_task(db, org_id=pt.org_id, project_id=pt.project_id, flush=True, **kw)
+
+
+def test_partition_naming_and_month_math():
+    assert partition_name(date(2026, 1, 1)) == "task_transitions_p2026_01"
+    assert partition_month("task_transitions_p2026_01") == date(2026, 1, 1)
+    assert partition_month("task_transitions_default") is None
+
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -12) == date(2025, 1, 1)
+
+
+def test_future_partitions_are_created_once(db: Session):
+    job = TransitionPartitionJob(db, months_ahead=1, today=date(2031, 1, 15))
+
+    first = TransitionPartitionResult()
+    job.ensure_future_partitions(first)
+    again = TransitionPartitionResult()
+    job.ensure_future_partitions(again)
+
+    assert first.created == ["task_transitions_p2031_01", "task_transitions_p2031_02"]
+    assert again.created == []
+
+
+def test_rows_in_default_partition_are_moved_with_keys(db: Session):
+    task = _task(db)
+    tr_id = _insert_transition(db, task, created_at=datetime(2032, 3, 10, tzinfo=timezone.utc))
+
+    result = TransitionPartitionResult()
+    TransitionPartitionJob(db, months_ahead=0, today=date(2032, 3, 1)).ensure_future_partitions(result)
+
+    assert result.created == ["task_transitions_p2032_03"]
+    in_partition = db.execute(text("SELECT count(*) FROM task_transitions_p2032_03 WHERE id = :id"), {"id": tr_id})
+    assert in_partition.scalar_one() == 1
+    assert db.get(TaskTransitionKey, tr_id) is not None
+
+
+def test_archive_moves_month_and_drops_keys(db: Session):
+    task = _task(db)
+    job = TransitionPartitionJob(db, months_ahead=0, today=date(2033, 5, 1))
+    job.ensure_future_partitions(TransitionPartitionResult())
+    tr_id = _insert_transition(db, task, created_at=datetime(2033, 5, 2, tzinfo=timezone.utc))
+
+    result = TransitionPartitionResult()
+    job.archive_before(date(2033, 6, 1), result)
+
+    assert "task_transitions_p2033_05" in result.archived
+    assert db.execute(select(func.count()).where(TaskTransition.id == tr_id)).scalar_one() == 0
+    assert db.execute(select(func.count()).where(TaskTransitionArchive.id == tr_id)).scalar_one() == 1
+    assert db.get(TaskTransitionKey, tr_id) is None
+
+
+def test_idempotent_replay_is_found_through_keys(db: Session):
+    task = _task(db, status="available")
+    event_id = uuid.uuid4()
+    kw = dict(
+        org_id=task.org_id,
+        actor_user_id=uuid.uuid4(),
+        task_id=task.id,
+        action="self_assign",
+        expected_row_version=task.row_version,
+        payload={},
+        client_event_id=event_id,
+    )
+
+    first, _ = apply_task_transition(db, **kw)
+    again, _ = apply_task_transition(db, **kw)
+
+    assert again.row_version == first.row_version
+    keys = db.execute(
+        select(func.count()).where(TaskTransitionKey.task_id == task.id, TaskTransitionKey.client_event_id == event_id)
+    ).scalar_one()
+    assert keys == 1